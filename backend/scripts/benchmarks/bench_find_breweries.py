@@ -0,0 +1,98 @@
+"""
+Benchmark: BreweryManager.find_breweries_in_text (Aho-Corasick) vs the previous per-key scan.
+
+Uses a synthetic brewery table (no DB access) of realistic size and product titles, checks that
+both implementations return identical results, then times them.
+
+    uv run python -m backend.scripts.benchmarks.bench_find_breweries --breweries 1500 --titles 500
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+from unittest.mock import MagicMock
+
+from backend.src.services.store.brewery_manager import BreweryManager
+
+_WORDS = [
+    "hop", "coast", "mountain", "river", "moon", "star", "fox", "owl", "iron", "stone", "harbor", "field",
+    "golden", "wild", "north", "pine", "cedar", "lantern", "anchor", "valley", "bay", "cloud", "echo",
+]
+_KANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン"
+
+
+def _synthetic_breweries(n: int, rng: random.Random) -> List[Dict]:
+    rows: List[Dict] = []
+    for i in range(n):
+        base = f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()} {i}"
+        jp = "".join(rng.choice(_KANA) for _ in range(rng.randint(3, 7))) + "ブルーイング"
+        rows.append({
+            "id": str(i), "name_en": f"{base} Brewing", "name_jp": jp,
+            "aliases": [base, f"{base} Brewery"], "untappd_url": f"https://untappd.com/w/b{i}/{i}",
+        })
+    return rows
+
+
+def _titles(rows: List[Dict], n: int, rng: random.Random) -> List[str]:
+    titles: List[str] = []
+    for _ in range(n):
+        b = rng.choice(rows)
+        brewery = rng.choice([b["name_en"], b["name_jp"], b["aliases"][0]])
+        titles.append(f"【{brewery}】{rng.choice(_WORDS).title()} Hazy IPA 缶 500ml ≪入荷予定≫")
+    return titles
+
+
+def _legacy_find(manager: BreweryManager, text: str) -> List[Dict]:
+    """The previous implementation: sort every key, then one substring scan per key."""
+    text_lower = text.lower()
+    found, seen = [], set()
+    for key in sorted(manager.brewery_index.keys(), key=len, reverse=True):
+        if key in text_lower:
+            brewery = manager.brewery_index[key]
+            if brewery['name_en'] not in seen:
+                found.append(brewery)
+                seen.add(brewery['name_en'])
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--breweries", type=int, default=1500)
+    parser.add_argument("--titles", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = _synthetic_breweries(args.breweries, rng)
+    supabase = MagicMock()
+    supabase.table.return_value.select.return_value.limit.return_value.execute.return_value = MagicMock(data=rows)
+    manager = BreweryManager(supabase=supabase)
+    titles = _titles(rows, args.titles, rng)
+
+    for title in titles:
+        assert manager.find_breweries_in_text(title) == _legacy_find(manager, title), title
+
+    start = time.perf_counter()
+    for title in titles:
+        _legacy_find(manager, title)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    manager._matcher = None
+    manager.find_breweries_in_text(titles[0])
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for title in titles:
+        manager.find_breweries_in_text(title)
+    current = time.perf_counter() - start
+
+    print(f"index keys: {len(manager.brewery_index)}, titles: {len(titles)} (results identical)")
+    print(f"per-key scan : {legacy * 1000:8.1f} ms  ({legacy / len(titles) * 1e6:7.1f} us/title)")
+    print(f"aho-corasick : {current * 1000:8.1f} ms  ({current / len(titles) * 1e6:7.1f} us/title)"
+          f"  + one-time build {build * 1000:.1f} ms")
+    print(f"speedup      : {legacy / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
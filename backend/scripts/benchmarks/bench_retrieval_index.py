@@ -0,0 +1,74 @@
+"""
+Benchmark: UntappdRetrievalIndex build time and top-k query latency.
+
+Uses a synthetic untappd_data table (no DB access) and queries that are spelled differently from the
+stored names (case, spacing, word order). Checks that the stored beer is in the top-k for every query,
+then times the queries.
+
+    uv run python -m backend.scripts.benchmarks.bench_retrieval_index --beers 30000 --queries 500
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from backend.src.services.untappd.retrieval_index import UntappdRetrievalIndex
+
+_WORDS = [
+    "hop", "coast", "moon", "star", "fox", "hazy", "double", "juice", "cloud", "river", "stone", "pine",
+    "owl", "dream", "lager", "stout", "pale", "imperial", "milk", "sour", "cedar", "harbor", "lantern",
+]
+
+
+def _synthetic_rows(n: int, breweries: int, rng: random.Random) -> List[Dict]:
+    names = [f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()} Brewing {i}" for i in range(breweries)]
+    rows: List[Dict] = []
+    for i in range(n):
+        b = i % breweries
+        rows.append({
+            "untappd_url": f"https://untappd.com/b/beer-{i}/{i}",
+            "beer_name": " ".join(rng.choice(_WORDS).title() for _ in range(3)) + f" {i}",
+            "brewery_name": names[b],
+            "untappd_brewery_url": f"https://untappd.com/w/brewery-{b}/{b}",
+            "style": "IPA - New England",
+        })
+    return rows
+
+
+def _query(name: str, rng: random.Random) -> str:
+    words = name.split()
+    rng.shuffle(words)
+    return rng.choice([" ".join(words), name.lower().replace(" ", ""), name.upper()])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--beers", type=int, default=30000)
+    parser.add_argument("--breweries", type=int, default=1500)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = _synthetic_rows(args.beers, args.breweries, rng)
+
+    start = time.perf_counter()
+    index = UntappdRetrievalIndex(rows)
+    build = time.perf_counter() - start
+
+    targets = [rng.choice(rows) for _ in range(args.queries)]
+    queries = [(_query(t["beer_name"], rng), t["brewery_name"]) for t in targets]
+
+    start = time.perf_counter()
+    results = [index.search(beer, brewery, k=args.k) for beer, brewery in queries]
+    elapsed = time.perf_counter() - start
+
+    hits = sum(t["untappd_url"] in {c["url"] for c in r} for t, r in zip(targets, results))
+    assert hits == len(targets), f"only {hits}/{len(targets)} stored beers were retrieved"
+    print(f"beers: {len(index)}  build: {build:.2f}s")
+    print(f"top-{args.k} query: {elapsed / len(queries) * 1000:.2f} ms  (recall {hits}/{len(targets)})")
+
+
+if __name__ == "__main__":
+    main()
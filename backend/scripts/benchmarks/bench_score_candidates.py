@@ -0,0 +1,87 @@
+"""
+Benchmark: validators.score_beer_matches (one expected name, N candidates) vs the previous per-pair score_beer_match.
+
+Every corpus title (titles.txt) is scored as the expected name against a page of Untappd-style candidates
+built from the other titles, with and without an expected brewery. Scores must be identical; then both
+paths are timed. Caches in text_utils are cleared before each timed run so that only the scorer differs.
+
+    uv run python -m backend.scripts.benchmarks.bench_score_candidates --rounds 3
+"""
+import argparse
+import time
+from typing import Callable, List, Optional, Tuple
+
+from backend.scripts.benchmarks import legacy_validators as legacy
+from backend.scripts.benchmarks.bench_text_utils import load_corpus
+from backend.src.services.untappd import text_utils, validators
+from backend.src.services.untappd.candidate import Candidate
+
+_BREWERIES = ["Other Half Brewing Co.", "Uchu Brewing", "Stone Brewing", "Rio Brewing & Co.", ""]
+_EXPECTED_BREWERIES: List[Optional[str]] = [None, "Other Half", "Stone Brewing x Uchu Brewing"]
+
+
+def build_cases(corpus: List[str]) -> Tuple[List[Candidate], List[Tuple[str, Optional[str]]]]:
+    """(candidate page, [(expected beer, expected brewery)])."""
+    candidates = [
+        Candidate(beer=text_utils.clean_beer_name(title), brewery=_BREWERIES[i % len(_BREWERIES)], style="IPA - New England")
+        for i, title in enumerate(corpus)
+    ]
+    queries = [(title, brewery) for title in corpus for brewery in _EXPECTED_BREWERIES]
+    return candidates, queries
+
+
+def check_identical(candidates: List[Candidate], queries: List[Tuple[str, Optional[str]]]) -> None:
+    """Raises AssertionError on the first (candidate, expected) pair whose score changed."""
+    for beer, brewery in queries:
+        batch = validators.score_beer_matches(candidates, beer, brewery)
+        for cand, score in zip(candidates, batch):
+            assert score == legacy.score_beer_match(cand, beer, brewery), (cand, beer, brewery)
+            assert validators.score_beer_match(cand, beer, brewery) == score, (cand, beer, brewery)
+
+
+def _clear_caches() -> None:
+    for value in vars(text_utils).values():
+        if callable(getattr(value, "cache_clear", None)):
+            value.cache_clear()
+
+
+def _time(fn: Callable[[], None], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        _clear_caches()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    # The scorers log every decision; keep the benchmark output readable
+    for module in (legacy, validators, text_utils):
+        module.logger.disabled = True
+
+    candidates, queries = build_cases(load_corpus())
+    check_identical(candidates, queries)
+
+    def per_pair() -> None:
+        for beer, brewery in queries:
+            for cand in candidates:
+                legacy.score_beer_match(cand, beer, brewery)
+
+    def batched() -> None:
+        for beer, brewery in queries:
+            validators.score_beer_matches(candidates, beer, brewery)
+
+    legacy_time = _time(per_pair, args.rounds)
+    batch_time = _time(batched, args.rounds)
+    print(f"queries: {len(queries)}  candidates per page: {len(candidates)}  pairs: {len(queries) * len(candidates)}")
+    print(f"per-pair (legacy): {legacy_time * 1000:8.1f} ms")
+    print(f"batch            : {batch_time * 1000:8.1f} ms  ({legacy_time / batch_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
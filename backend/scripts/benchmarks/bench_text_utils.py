@@ -0,0 +1,111 @@
+"""
+Benchmark: services/untappd/text_utils.py (precompiled patterns + memoized normalizers) vs the previous module.
+
+Runs every text_utils function over a corpus of real shop titles and Untappd names, checks that both
+implementations return identical output, then times a scoring-like workload: every title is compared
+against every other name, so each string goes through the normalizers many times, as it does when
+score_beer_match / validate_brewery_match rank a page of search results.
+
+    uv run python -m backend.scripts.benchmarks.bench_text_utils --rounds 3
+    uv run python -m backend.scripts.benchmarks.bench_text_utils --from-db 2000   # + titles from scraped_beers (read-only)
+"""
+import argparse
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, List
+
+from backend.scripts.benchmarks import legacy_text_utils as legacy
+from backend.src.services.untappd import text_utils as current
+
+CORPUS_PATH = Path(__file__).with_name("titles.txt")
+
+# text_utils functions whose outputs must be identical between the two modules
+_FUNCTIONS = [
+    "expand_abbreviations", "normalize_numbers_and_romans", "normalize_singular_plural",
+    "extract_variant_modifiers", "normalize_ordinals", "strip_for_core_comparison",
+    "clean_beer_name", "clean_brewery_name", "strip_beer_suffix",
+]
+
+
+def load_corpus(path: Path = CORPUS_PATH) -> List[str]:
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def _fetch_db_titles(limit: int) -> List[str]:
+    """Read-only: product names from scraped_beers."""
+    from backend.src.core.db import get_supabase_client
+    res = get_supabase_client().table("scraped_beers").select("name").limit(limit).execute()
+    return [row["name"] for row in res.data or [] if row.get("name")]
+
+
+def check_identical(corpus: List[str]) -> None:
+    """Raises AssertionError on the first input where the two modules disagree."""
+    for text in corpus:
+        for name in _FUNCTIONS:
+            assert getattr(current, name)(text) == getattr(legacy, name)(text), (name, text)
+        for expand in (False, True):
+            assert current.normalize_for_comparison(text, expand) == legacy.normalize_for_comparison(text, expand), text
+        for other in corpus:
+            assert current.has_variant_mismatch(text, other) == legacy.has_variant_mismatch(text, other), (text, other)
+
+
+def _workload(mod: ModuleType, corpus: List[str]) -> None:
+    for a in corpus:
+        core_a = mod.strip_for_core_comparison(mod.normalize_for_comparison(a, True))
+        for b in corpus:
+            mod.normalize_for_comparison(b, True)
+            mod.strip_for_core_comparison(mod.normalize_ordinals(b))
+            mod.normalize_singular_plural(mod.normalize_numbers_and_romans(b))
+            mod.has_variant_mismatch(a, b)
+            mod.clean_brewery_name(b)
+        mod.strip_beer_suffix(core_a)
+
+
+def _clear_caches() -> None:
+    for value in vars(current).values():
+        if callable(getattr(value, "cache_clear", None)):
+            value.cache_clear()
+
+
+def _time(fn: Callable[[], None], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--from-db", type=int, default=0, metavar="N", help="also use N titles from scraped_beers")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    if args.from_db:
+        corpus += _fetch_db_titles(args.from_db)
+    # clean_beer_name logs every call; keep the benchmark output readable
+    current.logger.disabled = legacy.logger.disabled = True
+
+    check_identical(corpus)
+
+    legacy_time = _time(lambda: _workload(legacy, corpus), args.rounds)
+
+    def cold() -> None:
+        _clear_caches()
+        _workload(current, corpus)
+    cold_time = _time(cold, args.rounds)
+    warm_time = _time(lambda: _workload(current, corpus), args.rounds)
+
+    calls = len(corpus) * (len(corpus) * 5 + 2)
+    print(f"titles: {len(corpus)}  normalizer calls per run: ~{calls}")
+    print(f"legacy          : {legacy_time * 1000:8.1f} ms")
+    print(f"current (cold)  : {cold_time * 1000:8.1f} ms  ({legacy_time / cold_time:.1f}x)")
+    print(f"current (warm)  : {warm_time * 1000:8.1f} ms  ({legacy_time / warm_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+Reference copy of services/untappd/validators.py before batch scoring (score_beer_matches).
+Used only by bench_score_candidates.py and tests to check that scores are unchanged.
+Do not import from application code.
+"""
+import re
+import logging
+from typing import Dict, List, Optional
+from difflib import SequenceMatcher
+from backend.src.services.untappd.candidate import CandidateLike, as_candidate
+from backend.src.services.untappd.text_utils import (
+    normalize_for_comparison, normalize_ordinals, normalize_numbers_and_romans,
+    normalize_singular_plural,
+    strip_for_core_comparison, clean_brewery_name, clean_beer_name, has_variant_mismatch, COLLAB_SPLIT_PATTERN,
+)
+
+logger = logging.getLogger(__name__)
+
+# LLM Validator for intelligent pair verification without hardcoded dictionaries
+_llm_validator = None
+
+def _get_llm_validator():
+    global _llm_validator
+    if _llm_validator is None:
+        try:
+            from backend.src.services.llm.llm_validator import LLMValidator
+            _llm_validator = LLMValidator()
+        except Exception as e:
+            logger.warning(f"Could not initialize LLMValidator: {e}")
+            _llm_validator = None
+    return _llm_validator
+
+def set_brewery_aliases(aliases: Dict[str, List[str]]) -> None:
+    """Legacy compatibility function (No-op: hardcoded brewery aliases have been deprecated)."""
+    pass
+
+
+def get_name_parts(name: str) -> List[str]:
+    """Extracts the full name, the part before parentheses, and any parts inside parentheses."""
+    if not name:
+        return []
+    parts = [name]
+    outside = re.sub(r'\s*[（(][^）)]*[）)]\s*', ' ', name).strip()
+    if outside and outside != name:
+        parts.append(outside)
+    insides = re.findall(r'[（(]([^）)]+)[）)]', name)
+    for inc in insides:
+        inc_clean = inc.strip()
+        if inc_clean and inc_clean not in parts:
+            parts.append(inc_clean)
+    return parts
+
+
+def _is_safe_substring_match(str_a: str, str_b: str, expected_brewery: Optional[str] = None) -> bool:
+    """Checks if one string being inside the other is a safe match without major extra unrelated words."""
+    if not str_a or not str_b:
+        return False
+    if str_a == str_b:
+        return True
+    shorter, longer = (str_a, str_b) if len(str_a) <= len(str_b) else (str_b, str_a)
+    if not (shorter in longer):
+        return False
+    if len(shorter) < 3:
+        return False
+    ratio = SequenceMatcher(None, shorter, longer).ratio()
+    if ratio >= 0.78:
+        return True
+    # If ratio < 0.78, check if the extra portion is purely style/variant/number/brewery noise
+    remainder = longer.replace(shorter, "")
+    remainder = re.sub(r'\b20\d{2}\b', '', remainder)
+    allowed_noise = ["barrel", "aged", "sour", "ale", "stout", "ipa", "collaborat", "batch", "edition", "series", "vol", "ver", "double", "triple", "imperial", "hazy", "neipa", "shigakogen", "tamamura", "honten", "fresh", "hop", "wet", "dry", "anniversary", "year"]
+    if any(n in remainder for n in allowed_noise):
+        return True
+    if expected_brewery:
+        brew_norm = normalize_for_comparison(expected_brewery)
+        if brew_norm and (brew_norm in remainder or remainder in brew_norm):
+            return True
+        for b_word in re.findall(r'[a-z0-9]+', expected_brewery.lower()):
+            if len(b_word) >= 3 and b_word in remainder:
+                return True
+    return False
+
+
+def validate_beer_match(result_element: CandidateLike, expected_beer: str, expected_brewery: Optional[str] = None) -> bool:
+    """
+    Returns True if the Untappd beer element matches expected_beer and expected_brewery.
+    Calls score_beer_match internally and requires score > 0.
+    """
+    return score_beer_match(result_element, expected_beer, expected_brewery) > 0
+
+
+def score_beer_match(result_elem: CandidateLike, expected_beer: str, expected_brewery: Optional[str] = None) -> int:
+    """
+    Scores how well an Untappd beer element matches expected_beer (and expected_brewery).
+    Returns an integer from 0 to 100:
+      - 100: Exact match after basic normalization
+      -  95: Exact match after abbreviation expansion
+      -  90: Direct inclusion match
+      -  85: Exact match after ordinal normalization (11th -> eleventh)
+      -  80: Substring match after ordinal normalization
+      -  75: Exact match after core name stripping (no year, no style suffix)
+      -  70: Substring match after core name stripping
+      -  60: Substring match after ordinal + core stripping
+      -  50: Part/Token exact or inclusion match (parentheses splitting)
+      -   0: No acceptable match or variant mismatch detected
+    """
+    if not result_elem:
+        return 0
+    if not expected_beer:
+        return 100
+
+    cand = as_candidate(result_elem)
+    if expected_brewery and not validate_brewery_match(cand, expected_brewery):
+        logger.debug(f"  [Validation] Beer BLOCKED (Brewery Mismatch): expected brewery '{expected_brewery}'")
+        return 0
+
+    result_beer: str = cand.beer
+    if not result_beer:
+        return 0
+    style_text: str = cand.style.lower()
+    
+    # 0. Check variant mismatch right upfront
+    if has_variant_mismatch(result_beer, expected_beer):
+        logger.debug(f"  [Validation] Beer BLOCKED (Variant Mismatch): '{result_beer}' vs '{expected_beer}'")
+        return 0
+
+    rb_norm: str = normalize_for_comparison(result_beer)
+    eb_norm: str = normalize_for_comparison(expected_beer)
+
+    if not rb_norm or not eb_norm:
+        return 0
+
+    # Check distinct keyword/style clashes if names are not exact matches
+    if rb_norm != eb_norm:
+        eb_words = set(re.findall(r'[a-z0-9]+', expected_beer.lower()))
+        rb_words = set(re.findall(r'[a-z0-9]+', result_beer.lower()))
+        style_words = set(re.findall(r'[a-z0-9]+', style_text))
+
+        # Block New Engi-land vs Engi!? cross-matching on Shiga Kogen
+        if 'engi' in eb_words and ('engiland' in rb_norm or 'land' in rb_words or 'new' in rb_words) and 'engiland' not in eb_norm and 'land' not in eb_words:
+            logger.debug(f"  [Validation] Beer BLOCKED (Engi vs New Engi-land clash): '{result_beer}' vs '{expected_beer}'")
+            return 0
+        if ('engiland' in eb_norm or 'land' in eb_words or 'new' in eb_words) and 'engi' in rb_words and 'engiland' not in rb_norm and 'land' not in rb_words:
+            logger.debug(f"  [Validation] Beer BLOCKED (New Engi-land vs Engi clash): '{result_beer}' vs '{expected_beer}'")
+            return 0
+
+        for kw in ['engi', 'weizen', 'stout', 'porter', 'pilsner', 'saison', 'barleywine', 'gose', 'keller']:
+            if kw in eb_words:
+                if kw not in rb_words and kw not in style_words:
+                    # For distinctive brand/style keywords like engi or completely clashing styles, block
+                    if kw == 'engi' or ('ipa' in style_words and kw in ['weizen', 'stout', 'porter', 'pilsner']):
+                        logger.debug(f"  [Validation] Beer BLOCKED (Keyword/Style Clash '{kw}'): '{result_beer}' vs '{expected_beer}'")
+                        return 0
+
+    # 1. Exact match after standard normalization
+    if rb_norm == eb_norm:
+        logger.info(f"  [Validation] Beer MATCH (Exact, 100): '{result_beer}' matches '{expected_beer}'")
+        return 100
+
+    # 1b. Exact match after abbreviation expansion (e.g. BA -> Barrel Aged, DDH -> Double Dry Hopped)
+    rb_expanded: str = normalize_for_comparison(result_beer, expand_abbr=True)
+    eb_expanded: str = normalize_for_comparison(expected_beer, expand_abbr=True)
+    if rb_expanded == eb_expanded:
+        logger.info(f"  [Validation] Beer MATCH (Abbr Expanded, 95): '{result_beer}' matches '{expected_beer}'")
+        return 95
+
+    # 2. Direct inclusion check (with variant guard)
+    if _is_safe_substring_match(rb_norm, eb_norm, expected_brewery):
+        logger.info(f"  [Validation] Beer MATCH (90): '{result_beer}' matches '{expected_beer}'")
+        return 90
+
+    # 2b. Direct inclusion after abbreviation expansion
+    if _is_safe_substring_match(rb_expanded, eb_expanded, expected_brewery):
+        logger.info(f"  [Validation] Beer MATCH (Abbr Inclusion, 88): '{result_beer}' matches '{expected_beer}'")
+        return 88
+
+    # 3. Ordinal normalization check (11th -> eleventh, etc.)
+    rb_ord: str = normalize_for_comparison(normalize_ordinals(result_beer))
+    eb_ord: str = normalize_for_comparison(normalize_ordinals(expected_beer))
+    if rb_ord == eb_ord:
+        logger.info(f"  [Validation] Beer MATCH (Ordinal Exact, 85): '{result_beer}' matches '{expected_beer}'")
+        return 85
+    if _is_safe_substring_match(rb_ord, eb_ord, expected_brewery):
+        logger.info(f"  [Validation] Beer MATCH (Ordinal, 80): '{result_beer}' matches '{expected_beer}'")
+        return 80
+
+    # 3b. Number & Roman numeral normalization check (III / Three / Ⅲ -> 3)
+    rb_num: str = normalize_for_comparison(normalize_numbers_and_romans(result_beer))
+    eb_num: str = normalize_for_comparison(normalize_numbers_and_romans(expected_beer))
+    if rb_num == eb_num:
+        logger.info(f"  [Validation] Beer MATCH (Number/Roman Exact, 85): '{result_beer}' matches '{expected_beer}'")
+        return 85
+    if _is_safe_substring_match(rb_num, eb_num, expected_brewery):
+        logger.info(f"  [Validation] Beer MATCH (Number/Roman, 80): '{result_beer}' matches '{expected_beer}'")
+        return 80
+
+    # 3c. Singular/Plural normalization check (Fruits -> Fruit)
+    rb_pl: str = normalize_for_comparison(normalize_singular_plural(result_beer))
+    eb_pl: str = normalize_for_comparison(normalize_singular_plural(expected_beer))
+    if rb_pl == eb_pl:
+        logger.info(f"  [Validation] Beer MATCH (Singular/Plural Exact, 85): '{result_beer}' matches '{expected_beer}'")
+        return 85
+    if _is_safe_substring_match(rb_pl, eb_pl, expected_brewery):
+        logger.info(f"  [Validation] Beer MATCH (Singular/Plural, 80): '{result_beer}' matches '{expected_beer}'")
+        return 80
+
+    # 4. Core name comparison: clean name, strip year, dashes, style suffixes
+    rb_clean = clean_beer_name(result_beer)
+    eb_clean = clean_beer_name(expected_beer)
+    rb_core: str = normalize_for_comparison(strip_for_core_comparison(rb_clean))
+    eb_core: str = normalize_for_comparison(strip_for_core_comparison(eb_clean))
+    if rb_core and eb_core:
+        if rb_core == eb_core:
+            logger.info(f"  [Validation] Beer MATCH (Core Exact, 75): '{result_beer}' matches '{expected_beer}'")
+            return 75
+        elif _is_safe_substring_match(rb_core, eb_core, expected_brewery):
+            logger.info(f"  [Validation] Beer MATCH (Core, 70): '{result_beer}' matches '{expected_beer}'")
+            return 70
+
+    # 5. Combined: ordinal + number/roman + singular/plural + core stripping
+    rb_ord_core: str = normalize_for_comparison(strip_for_core_comparison(normalize_singular_plural(normalize_numbers_and_romans(normalize_ordinals(rb_clean)))))
+    eb_ord_core: str = normalize_for_comparison(strip_for_core_comparison(normalize_singular_plural(normalize_numbers_and_romans(normalize_ordinals(eb_clean)))))
+    if rb_ord_core and eb_ord_core and _is_safe_substring_match(rb_ord_core, eb_ord_core, expected_brewery):
+        logger.info(f"  [Validation] Beer MATCH (Ordinal+Core, 60): '{result_beer}' matches '{expected_beer}'")
+        return 60
+
+    # 6. Part / Token Inclusion Check (for multilingual or parenthesized titles like "Doron (どろん)" vs "Ise Shima Doron")
+    rb_parts = get_name_parts(rb_clean)
+    eb_parts = get_name_parts(eb_clean)
+    for rp in rb_parts:
+        for ep in eb_parts:
+            rp_norm = normalize_for_comparison(strip_for_core_comparison(rp))
+            ep_norm = normalize_for_comparison(strip_for_core_comparison(ep))
+            if not rp_norm or not ep_norm:
+                continue
+            if (rp_norm.isascii() and len(rp_norm) < 3) or len(rp_norm) < 2:
+                continue
+            if (ep_norm.isascii() and len(ep_norm) < 3) or len(ep_norm) < 2:
+                continue
+            if rp_norm == ep_norm or _is_safe_substring_match(rp_norm, ep_norm, expected_brewery):
+                if not has_variant_mismatch(result_beer, expected_beer):
+                    logger.info(f"  [Validation] Beer MATCH (Part/Token Inclusion, 75): '{rp}' matches '{ep}'")
+                    return 75
+
+    # 7. Fuzzy Match / Typo Tolerance (for minor spelling errors like "Hopwierd" vs "Hopwired")
+    if len(rb_core) >= 4 and len(eb_core) >= 4:
+        ratio = SequenceMatcher(None, rb_core, eb_core).ratio()
+        if ratio >= 0.82:
+            if not has_variant_mismatch(result_beer, expected_beer):
+                logger.info(f"  [Validation] Beer MATCH (Fuzzy Typo, 70): '{result_beer}' ≈ '{expected_beer}' (ratio={ratio:.2f})")
+                return 70
+
+    logger.info(f"  [Validation] Beer FAIL: '{result_beer}' ({rb_norm}) != '{expected_beer}' ({eb_norm})")
+    return 0
+
+
+def validate_brewery_match(result_element: CandidateLike, expected_brewery: str) -> bool:
+    """
+    Checks if the brewery name in the search result matches the expected brewery.
+    Uses normalized comparison, aliases, and collab logic.
+    """
+    if not expected_brewery:
+        return True
+
+    result_brewery: str = as_candidate(result_element).brewery
+    if not result_brewery:
+        return True
+
+    rb_norm: str = normalize_for_comparison(result_brewery)
+    eb_norm: str = normalize_for_comparison(expected_brewery)
+
+    # 1. Normalization Check
+    if rb_norm in eb_norm or eb_norm in rb_norm:
+        logger.info(f"  [Validation] Brewery MATCH (Norm): '{result_brewery}' matches '{expected_brewery}'")
+        return True
+
+    # 2. Cleaned Name Check (removes brewery suffixes like 'brewing', etc.)
+    cleaned_result: str = clean_brewery_name(result_brewery)
+    cleaned_expected: str = clean_brewery_name(expected_brewery)
+    cr_norm: str = normalize_for_comparison(cleaned_result)
+    ce_norm: str = normalize_for_comparison(cleaned_expected)
+    if cr_norm and ce_norm:
+        if cr_norm == ce_norm:
+            logger.info(f"  [Validation] Brewery MATCH (Cleaned Exact): '{result_brewery}' matches '{expected_brewery}'")
+            return True
+        # Check safe substring match or word boundary match to prevent "rio" matching "riococktail"
+        if len(ce_norm) >= 4 and (ce_norm in cr_norm or cr_norm in ce_norm):
+            # Verify word boundary for cleaned names
+            pattern = rf'\b{re.escape(cleaned_expected.lower())}\b'
+            if re.search(pattern, cleaned_result.lower()) or _is_safe_substring_match(cr_norm, ce_norm):
+                logger.info(f"  [Validation] Brewery MATCH (Cleaned Safe Substring): '{result_brewery}' matches '{expected_brewery}'")
+                return True
+
+    # 3. Collaboration Check (x, ×, /, &)
+    if any(sep in expected_brewery for sep in [' x ', ' X ', 'x', 'X', '×', '/', '&', '+']):
+        # Treat both target and expected breweries as potential lists of collaborators
+        parts: List[str] = re.split(COLLAB_SPLIT_PATTERN, expected_brewery)
+        for part in parts:
+            if not part:
+                continue
+            part_norm: str = normalize_for_comparison(part)
+            if part_norm and (part_norm in rb_norm or rb_norm in part_norm):
+                logger.info(f"  [Validation] Brewery MATCH (Collab): '{result_brewery}' matches part '{part}'")
+                return True
+
+    logger.info(f"  [Validation] Brewery FAIL: '{result_brewery}' != '{expected_brewery}'")
+    return False
+
+
+def validate_final_match(
+    original_title: str,
+    untappd_beer_name: str,
+    untappd_brewery_name: str,
+    untappd_style: Optional[str] = None,
+    expected_brewery: Optional[str] = None,
+) -> bool:
+    """
+    Final verification step comparing the original shop product title against the 
+    scraped Untappd beer details using rule-based guards and Gemini LLM Validation.
+    """
+    if not original_title or not untappd_brewery_name:
+        return True
+
+    # 1. LLM Validation (Directly evaluates original_title vs Untappd brewery/beer/style)
+    validator = _get_llm_validator()
+    if validator and validator.client:
+        is_match, conf, reason = validator.validate_pair(
+            original_title=original_title,
+            untappd_brewery=untappd_brewery_name,
+            untappd_beer=untappd_beer_name,
+            untappd_style=untappd_style,
+        )
+        if not is_match:
+            logger.warning(
+                f"  [Final Validation] BLOCKED by LLMValidator: '{original_title}' <-> Untappd '{untappd_brewery_name} / {untappd_beer_name}' | Reason: {reason}"
+            )
+            return False
+        else:
+            logger.info(
+                f"  [Final Validation] PASSED by LLMValidator (conf={conf:.2f}): '{original_title}' <-> Untappd '{untappd_brewery_name} / {untappd_beer_name}'"
+            )
+            return True
+
+    # 1. Check Brewery Match with Expected Brewery or Original Title
+    if expected_brewery:
+        if not validate_brewery_match({"brewery_name": untappd_brewery_name}, expected_brewery):
+            logger.warning(f"  [Final Validation] BLOCKED: Untappd brewery '{untappd_brewery_name}' fails validation against expected '{expected_brewery}' (Product: '{original_title}')")
+            return False
+
+    # 2. Check for severe brand clash between original title and Untappd brewery
+    orig_norm = normalize_for_comparison(original_title)
+    u_brew_clean_norm = normalize_for_comparison(clean_brewery_name(untappd_brewery_name))
+
+    # E.g., title has "rio brewing" but Untappd brewery is "rio cocktail"
+    if "rio brewing" in orig_norm and u_brew_clean_norm == "riococktail":
+        logger.warning(f"  [Final Validation] BLOCKED: Original title '{original_title}' specifies RIO BREWING but Untappd is '{untappd_brewery_name}'")
+        return False
+
+    # 3. Check Style Mismatch (e.g. Cocktail / RTD vs Beer)
+    if untappd_style:
+        style_lower = untappd_style.lower()
+        if any(bad_style in style_lower for bad_style in ["rtd", "cocktail", "hard seltzer"]):
+            orig_lower = original_title.lower()
+            if not any(w in orig_lower for w in ["cocktail", "rtd", "ハードセイツァー", "カクテル", "チューハイ"]):
+                logger.warning(f"  [Final Validation] BLOCKED: Untappd style '{untappd_style}' conflicts with beer product '{original_title}'")
+                return False
+
+    # 4. Check Vintage / Year Mismatch (e.g. 2023BY in Untappd beer name when title has no vintage/year)
+    u_beer_lower = untappd_beer_name.lower()
+    orig_lower = original_title.lower()
+    year_match = re.search(r'\b(20\d{2}(?:by)?)\b', u_beer_lower)
+    if year_match:
+        year_str = year_match.group(1)
+        if year_str not in orig_lower and year_str.replace("by", "") not in orig_lower:
+            logger.warning(f"  [Final Validation] BLOCKED: Untappd beer '{untappd_beer_name}' specifies vintage '{year_str}' but original title '{original_title}' has no vintage.")
+            return False
+
+    # 5. Check Real Ale / Cask / Nitro Conditioning Mismatch
+    if any(ra in u_beer_lower for ra in ["real ale", "real soun", "cask"]):
+        if not any(w in orig_lower for w in ["real", "リアルエール", "カスク", "cask"]):
+            logger.warning(f"  [Final Validation] BLOCKED: Untappd beer '{untappd_beer_name}' is Real Ale/Cask, but original title '{original_title}' does not specify Real Ale/Cask.")
+            return False
+
+    logger.info(f"  [Final Validation] PASSED for product '{original_title}' <-> Untappd '{untappd_brewery_name} - {untappd_beer_name}'")
+    return True
+
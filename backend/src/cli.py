@@ -6,6 +6,7 @@ This script provides various commands to manage the data pipeline:
 - enrich-extract: Use LLMs (Gemini/MLX) to extract brewery and beer names in English.
 - enrich-untappd: Search Untappd based on the extracted English names.
 - enrich-breweries: Update brewery information (location, type, etc.) from Untappd.
+- sweep-dead-links: Cheaply detect removed product pages and mark them as Dead Link.
 - clean: Safely remove corrupted data from the database.
 - ...and more.
 """
@@ -50,6 +51,8 @@ def main() -> None:
     enrich_extract_parser.add_argument("--offline", action="store_true", help="Offline mode")
     enrich_extract_parser.add_argument("--force", action="store_true", help="Force re-process")
     enrich_extract_parser.add_argument("--retry-unlinked", action="store_true", help="Force re-process only for items with missing untappd_url")
+    enrich_extract_parser.add_argument("--batch-size", type=int, default=None, help="Titles per LLM request (default: GEMINI_EXTRACT_BATCH_SIZE; 1 disables batching)")
+    enrich_extract_parser.add_argument("--concurrency", type=int, default=None, help="Titles/batches extracted concurrently (default: LLM_ENRICH_CONCURRENCY)")
 
     # Enrich Untappd only (Phase 2 of Enrichment)
     # Uses the extracted English names to search Untappd and link IDs
@@ -61,6 +64,7 @@ def main() -> None:
     enrich_untappd_parser.add_argument("--llm", type=str, choices=["gemini", "local_mlx"], default="gemini", help="LLM provider for retry inference")
     enrich_untappd_parser.add_argument("--llm-model", type=str, default=None, help="Specific LLM model ID to use")
     enrich_untappd_parser.add_argument("--force", action="store_true", help="Force re-process / ignore backoff")
+    enrich_untappd_parser.add_argument("--refresh-strategy", choices=['bulk', 'detail'], default='bulk', help="refresh mode: update from brewery list pages (bulk) or one detail page per beer")
 
     # Enrich Breweries only
     enrich_breweries_parser = subparsers.add_parser("enrich-breweries", help="Run Brewery enrichment only")
@@ -74,6 +78,12 @@ def main() -> None:
     update_stock_parser.add_argument("--shop", type=str, help="Filter by shop name", default=None)
     update_stock_parser.add_argument("--sort-rating", action="store_true", help="Sort by Untappd Rating (DESC)")
 
+    # Sweep dead links command
+    sweep_parser = subparsers.add_parser("sweep-dead-links", help="Probe product URLs (HEAD / 1-byte range) and mark removed ones as Dead Link")
+    sweep_parser.add_argument("--limit", type=int, default=None, help="Limit number of items to probe")
+    sweep_parser.add_argument("--shop", type=str, help="Filter by shop name", default=None)
+    sweep_parser.add_argument("--execute", action="store_true", help="Actually mark dead links (defaults to dry-run)")
+
     # Sync command
     subparsers.add_parser("sync", help="Download Supabase data to local JSON")
 
@@ -101,6 +111,10 @@ def main() -> None:
         from .commands.update_stock import update_stock_status
         asyncio.run(update_stock_status(limit=args.limit, shop_filter=args.shop, sort_rating=args.sort_rating))
 
+    elif args.command == "sweep-dead-links":
+        from .commands.sweep_dead_links import sweep_dead_links
+        asyncio.run(sweep_dead_links(limit=args.limit, shop_filter=args.shop, dry_run=not args.execute))
+
     elif args.command == "enrich":
         from .commands.enrich_extract import enrich_extract
         from .commands.enrich_untappd import enrich_untappd
@@ -126,11 +140,11 @@ def main() -> None:
         
     elif args.command == "enrich-extract":
         from .commands.enrich_extract import enrich_extract
-        asyncio.run(enrich_extract(limit=args.limit, shop_filter=args.shop, keyword_filter=args.keyword, offline=args.offline, force_reprocess=args.force, retry_unlinked=getattr(args, 'retry_unlinked', False), llm_provider=args.llm, llm_model_id=args.llm_model))
+        asyncio.run(enrich_extract(limit=args.limit, shop_filter=args.shop, keyword_filter=args.keyword, offline=args.offline, force_reprocess=args.force, retry_unlinked=getattr(args, 'retry_unlinked', False), llm_provider=args.llm, llm_model_id=args.llm_model, batch_size=args.batch_size, concurrency=args.concurrency))
         
     elif args.command == "enrich-untappd":
         from .commands.enrich_untappd import enrich_untappd
-        asyncio.run(enrich_untappd(limit=args.limit, mode=args.mode, shop_filter=args.shop, name_filter=args.name_filter, force=args.force, llm_provider=args.llm, llm_model_id=args.llm_model))
+        asyncio.run(enrich_untappd(limit=args.limit, mode=args.mode, shop_filter=args.shop, name_filter=args.name_filter, force=args.force, llm_provider=args.llm, llm_model_id=args.llm_model, refresh_strategy=args.refresh_strategy))
     
     elif args.command == "enrich-breweries":
         from .commands.enrich_breweries import enrich_breweries
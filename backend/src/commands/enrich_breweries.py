@@ -12,6 +12,7 @@ from dateutil import parser as dateutil_parser
 from ..core.db import get_supabase_client
 from ..core.types import UntappdBreweryDetails
 from ..services.untappd.http_client import scrape_brewery_details
+from ..services.untappd.page_cache import page_cache
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -175,3 +176,4 @@ async def enrich_breweries(
                     total_processed += 1
 
     logger.info(f"\n✨ Brewery enrichment completed. Processed {total_processed} breweries.")
+    page_cache.log_stats(logger)
@@ -18,10 +18,11 @@ import logging
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List, cast, Tuple
 
+from ..core.config import settings
 from ..core.db import get_supabase_client, refresh_materialized_view, sync_execute
 from ..core.types import GeminiExtraction
-from ..services.llm import BaseExtractor, get_llm_extractor
-from ..services.store.brewery_manager import BreweryManager
+from ..services.llm import BaseExtractor, ExtractionRequest, get_llm_extractor
+from ..services.store.brewery_manager import BreweryManager, get_brewery_manager
 from .failure_tracker import record_enrichment_failure
 
 logger: logging.Logger = logging.getLogger(__name__)
@@ -38,16 +39,23 @@ class LLMEnricher:
         llm_provider: str = "gemini",
         llm_model_id: Optional[str] = None,
         retry_unlinked: bool = False,
+        brewery_manager: Optional[BreweryManager] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
     ):
         self.offline = offline
         self.force_reprocess = force_reprocess
         self.retry_unlinked = retry_unlinked
         self.shop_filter = shop_filter
         self.keyword_filter = keyword_filter
+        # Titles per LLM request (extract_info_batch); 1 = one extract_info call per title
+        self.batch_size: int = max(1, batch_size if batch_size is not None else settings.GEMINI_EXTRACT_BATCH_SIZE)
+        # Extraction units (LLM batches, or titles when batch_size is 1) in flight at once
+        self.concurrency: int = max(1, concurrency if concurrency is not None else settings.LLM_ENRICH_CONCURRENCY)
         
         self.supabase: Any = get_supabase_client()
         self.extractor: BaseExtractor = get_llm_extractor(provider=llm_provider, model_id=llm_model_id)
-        self.brewery_manager: BreweryManager = BreweryManager()
+        self.brewery_manager: BreweryManager = brewery_manager or get_brewery_manager()
 
         self.stats: Dict[str, int] = {"processed": 0, "enriched": 0, "errors": 0}
         self.pending_payloads: List[Dict[str, Any]] = []
@@ -83,12 +91,10 @@ class LLMEnricher:
                 logger.info("\n✨ No more beers found matching criteria!")
                 break
                 
-            for beer in beers:
-                if self.stats["processed"] >= limit:
-                    break
-                
-                status, payload = await self._process_item(beer)
-                
+            beers = beers[:limit - self.stats["processed"]]
+            outcomes = await self._process_items(beers)
+
+            for status, payload in outcomes:
                 self.stats["processed"] += 1
                 if status == 'enriched' and payload:
                     self.stats["enriched"] += 1
@@ -146,49 +152,26 @@ class LLMEnricher:
             query = query.ilike('name', f'%{self.keyword_filter}%')
         return query
 
-    async def _process_item(self, beer: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
-        """Processes a single beer item: Extract and prepare payload."""
+    def _needs_llm(self, beer: Dict[str, Any]) -> bool:
         has_names: bool = bool(beer.get('brewery_name_en') and beer.get('beer_name_en'))
         has_hint: bool = bool(beer.get('search_hint'))
         is_unlinked: bool = not bool(beer.get('untappd_url'))
-        need_gemini: bool = self.force_reprocess or (self.retry_unlinked and is_unlinked) or not has_names or not has_hint
-        
+        return self.force_reprocess or (self.retry_unlinked and is_unlinked) or not has_names or not has_hint
+
+    async def _process_item(self, beer: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Processes a single beer item: Extract and prepare payload."""
         url: str = beer.get('url', '')
         if not url: return 'skipped', None
         
         try:
-            if need_gemini:
+            if self._needs_llm(beer):
                 if self.offline:
                     logger.info("  ⏭️ LLM extraction needed but skipped in offline mode.")
                     return 'skipped', None
                 
                 # Extract
                 enriched_info: Optional[GeminiExtraction] = await self._extract_llm(beer)
-                if not enriched_info:
-                    record_enrichment_failure(self.supabase, url, 'gemini_no_info', error_message="LLM returned no valid info.")
-                    return 'error', None
-                
-                # Self-Healing Dictionary Feedback Loop
-                b_en = enriched_info.get('brewery_name_en')
-                b_jp = enriched_info.get('brewery_name_jp')
-                if b_en and b_jp:
-                    self.brewery_manager.learn_brewery_alias(brewery_name_en=b_en, new_alias=b_jp)
-
-                # Prepare payload
-                payload: Dict[str, Any] = {
-                    'url': url,
-                    'brewery_name_en': b_en,
-                    'brewery_name_jp': b_jp,
-                    'beer_name_en': enriched_info.get('beer_name_en'),
-                    'beer_name_jp': enriched_info.get('beer_name_jp'),
-                    'beer_name_core': enriched_info.get('beer_name_core'),
-                    'search_hint': enriched_info.get('search_hint'),
-                    'product_type': enriched_info.get('product_type', 'beer'),
-                    'is_set': enriched_info.get('is_set', False),
-                    'payload': enriched_info.get('raw_response'),
-                    'updated_at': datetime.now(timezone.utc).isoformat()
-                }
-                return 'enriched', payload
+                return self._finish_item(url, enriched_info)
                 
             else:
                 logger.info(f"  ⏩ Extracted data already exists. Skipping extraction. (Brewery: {beer.get('brewery_name_en')})")
@@ -199,8 +182,93 @@ class LLMEnricher:
             record_enrichment_failure(self.supabase, url, 'gemini_error', error_message=str(e))
             return 'error', None
 
-    async def _extract_llm(self, beer: Dict[str, Any]) -> Optional[GeminiExtraction]:
-        """Helper to get hints and call LLM."""
+    async def _process_items(self, beers: List[Dict[str, Any]]) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Outcomes per beer, in `beers` order."""
+        if self.batch_size > 1:
+            return await self._process_items_batched(beers)
+
+        # 意図: 1件ずつ await すると、キャッシュで解決できる商品まで前の商品の LLM 待ち (レーンの RPM/TPM 間隔) に並んでしまう。
+        # 上限付きで並行に進め、LLM 呼び出しの間隔と TPM はモデルごとのレーン (core/lanes.py) に任せる
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def _process_with_sem(beer: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+            async with sem:
+                return await self._process_item(beer)
+
+        return list(await asyncio.gather(*(_process_with_sem(beer) for beer in beers)))
+
+    async def _process_items_batched(self, beers: List[Dict[str, Any]]) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Same outcomes as _process_item per beer, but the beers that need the LLM are extracted together
+        (extract_info_batch, `batch_size` titles per request) instead of one request per title.
+        Up to `concurrency` batches run at once; the Gemini lane still spaces the actual requests.
+        """
+        outcomes: List[Optional[Tuple[str, Optional[Dict[str, Any]]]]] = [None] * len(beers)
+        llm_positions: List[int] = []
+        for i, beer in enumerate(beers):
+            if beer.get('url') and not self.offline and self._needs_llm(beer):
+                llm_positions.append(i)
+            else:
+                outcomes[i] = await self._process_item(beer)
+
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def _extract_chunk(chunk: List[int]) -> None:
+            async with sem:
+                requests = [self._extraction_request(beers[i]) for i in chunk]
+                logger.info(f"  🤖 Calling LLM Extractor for {len(chunk)} titles...")
+                try:
+                    infos: List[GeminiExtraction] = await self.extractor.extract_info_batch(requests)
+                except Exception as e:
+                    logger.error(f"  ❌ Error in batch extraction: {e}")
+                    for i in chunk:
+                        record_enrichment_failure(self.supabase, beers[i]['url'], 'gemini_error', error_message=str(e))
+                        outcomes[i] = ('error', None)
+                    return
+                for i, info in zip(chunk, infos):
+                    try:
+                        outcomes[i] = self._finish_item(beers[i]['url'], info)
+                    except Exception as e:
+                        logger.error(f"  ❌ Error processing item: {e}")
+                        record_enrichment_failure(self.supabase, beers[i]['url'], 'gemini_error', error_message=str(e))
+                        outcomes[i] = ('error', None)
+
+        await asyncio.gather(*(
+            _extract_chunk(llm_positions[start:start + self.batch_size])
+            for start in range(0, len(llm_positions), self.batch_size)
+        ))
+        return [cast(Tuple[str, Optional[Dict[str, Any]]], o) for o in outcomes]
+
+    def _finish_item(self, url: str, enriched_info: Optional[GeminiExtraction]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Turns one extraction result into the gemini_data payload (and feeds the brewery registry)."""
+        if not enriched_info:
+            record_enrichment_failure(self.supabase, url, 'gemini_no_info', error_message="LLM returned no valid info.")
+            return 'error', None
+
+        # Self-Healing Dictionary Feedback Loop
+        b_en = enriched_info.get('brewery_name_en')
+        b_jp = enriched_info.get('brewery_name_jp')
+        if b_en and b_jp:
+            self.brewery_manager.learn_brewery_alias(brewery_name_en=b_en, new_alias=b_jp)
+
+        # Prepare payload
+        payload: Dict[str, Any] = {
+            'url': url,
+            'brewery_name_en': b_en,
+            'brewery_name_jp': b_jp,
+            'beer_name_en': enriched_info.get('beer_name_en'),
+            'beer_name_jp': enriched_info.get('beer_name_jp'),
+            'beer_name_core': enriched_info.get('beer_name_core'),
+            'search_hint': enriched_info.get('search_hint'),
+            'product_type': enriched_info.get('product_type', 'beer'),
+            'is_set': enriched_info.get('is_set', False),
+            'payload': enriched_info.get('raw_response'),
+            'updated_at': datetime.now(timezone.utc).isoformat()
+        }
+        return 'enriched', payload
+
+    def _extraction_request(self, beer: Dict[str, Any]) -> ExtractionRequest:
+        """Title + known-brewery hint + shop for the extractor."""
         known_brewery: Optional[str] = None
         beer_name: str = beer.get('name') or ""
         matches: List[Dict[str, Any]] = self.brewery_manager.find_breweries_in_text(beer_name)
@@ -208,9 +276,13 @@ class LLMEnricher:
         if matches:
             known_brewery = ", ".join([b['name_en'] for b in matches])
             logger.info(f"  🏭 Known brewery hints: {known_brewery}")
-        
+        return ExtractionRequest(beer_name, known_brewery, beer.get('shop'))
+
+    async def _extract_llm(self, beer: Dict[str, Any]) -> Optional[GeminiExtraction]:
+        """Helper to get hints and call LLM."""
+        request = self._extraction_request(beer)
         logger.info("  🤖 Calling LLM Extractor...")
-        return await self.extractor.extract_info(beer_name, known_brewery=known_brewery, shop=beer.get('shop'))
+        return await self.extractor.extract_info(request.product_name, known_brewery=request.known_brewery, shop=request.shop)
 
     def _save_gemini_data_batch(self, payloads: List[Dict[str, Any]]) -> None:
         """Helper to save a batch of enriched data to Supabase."""
@@ -268,7 +340,9 @@ async def enrich_extract(
     force_reprocess: bool = False,
     retry_unlinked: bool = False,
     llm_provider: str = "gemini",
-    llm_model_id: Optional[str] = None
+    llm_model_id: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
 ) -> None:
     """
     Entry point: Extract beers using the specified LLM.
@@ -280,6 +354,8 @@ async def enrich_extract(
         keyword_filter=keyword_filter,
         llm_provider=llm_provider,
         llm_model_id=llm_model_id,
-        retry_unlinked=retry_unlinked
+        retry_unlinked=retry_unlinked,
+        batch_size=batch_size,
+        concurrency=concurrency,
     )
     await enricher.run(limit=limit)
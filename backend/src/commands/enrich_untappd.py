@@ -4,6 +4,8 @@ Enriches beers with Untappd data.
 Modes:
 - missing: Finds Untappd URLs for beers that don't have one.
 - refresh: Updates details (rating, ABV, etc.) for beers that already have a URL.
+  By default ("bulk" strategy) stale rows are grouped by brewery and updated from the brewery's
+  paginated beer list (one request per 25 beers); rows not found there fall back to the detail page.
 """
 """
 Enrichment Phase 2: Untappd Search & Linking
@@ -19,16 +21,28 @@ import asyncio
 import logging
 import re
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional, Dict, Any, Set
+from typing import List, Optional, Dict, Any, Sequence, Set
 
+from backend.src.core.config import settings
 from backend.src.core.db import get_supabase_client, refresh_materialized_view
-from backend.src.core.types import UntappdBeerDetails, UntappdSearchResult
+from backend.src.core.lanes import log_lane_stats
+from backend.src.core.types import UntappdBeerDetails, UntappdSearchCandidate, UntappdSearchResult
 from backend.src.services.untappd.searcher import get_untappd_url, scrape_beer_details, search_brewery_beer
-from backend.src.services.untappd.validators import validate_beer_match, score_beer_match, validate_final_match
+from backend.src.services.untappd.brewery_resolution import brewery_resolution_cache
+from backend.src.services.untappd.circuit_breaker import untappd_breaker
+from backend.src.services.untappd.page_cache import page_cache
+from backend.src.services.untappd.single_flight import log_single_flight_stats
+from backend.src.services.untappd.candidate import Candidate
+from backend.src.services.untappd.validators import validate_beer_match, score_beer_match, score_beer_matches, validate_final_match
+from backend.src.services.untappd.retrieval_index import UntappdRetrievalIndex, build_retrieval_index
+from backend.src.services.untappd.phonetic import has_kana
+from backend.src.services.untappd.text_utils import has_variant_mismatch
 from backend.src.services.llm import BaseExtractor, get_llm_extractor
-from backend.src.services.store.brewery_manager import BreweryManager
+from backend.src.services.store.brewery_manager import BreweryManager, get_brewery_manager
 from backend.src.commands.failure_tracker import record_enrichment_failure, resolve_search_failure
-from backend.src.core.utils import map_details_to_payload
+from backend.src.core.utils import map_details_to_payload, map_list_item_to_payload
+from backend.src.services.untappd.brewery_catalog import brewery_catalog, scan_brewery_beer_list
+from backend.src.services.untappd.http_client import brewery_base_url
 from backend.src.services.untappd.db_queries import (
     fetch_beers,
     prefetch_gemini_untappd_urls,
@@ -51,9 +65,12 @@ class UntappdEnricher:
         offline: bool = False,
         force: bool = False,
         llm_provider: str = 'gemini',
-        llm_model_id: Optional[str] = None
+        llm_model_id: Optional[str] = None,
+        refresh_strategy: str = 'bulk',
+        brewery_manager: Optional[BreweryManager] = None,
     ):
         self.mode = mode
+        self.refresh_strategy = refresh_strategy
         self.shop_filter = shop_filter
         self.name_filter = name_filter
         self.offline = offline
@@ -65,7 +82,7 @@ class UntappdEnricher:
         
         if self.mode == 'missing':
             try:
-                self.brewery_manager = BreweryManager()
+                self.brewery_manager = brewery_manager or get_brewery_manager()
                 logger.info(f"  🏢 BreweryManager loaded ({len(self.brewery_manager.brewery_index)} breweries)")
             except Exception as e:
                 logger.warning(f"  ⚠️  BreweryManager unavailable: {e}")
@@ -84,6 +101,8 @@ class UntappdEnricher:
         self.total_success: int = 0
         self.collected_brewery_urls: Set[str] = set()
         self.skip_urls_for_backoff: Set[str] = set()
+        self._retrieval_index: Optional[UntappdRetrievalIndex] = None
+        self._retrieval_index_failed: bool = False
 
     async def run(self, limit: int = 50) -> Set[str]:
         """Runs the enrichment pipeline up to the specified limit."""
@@ -124,13 +143,12 @@ class UntappdEnricher:
             batch_gemini = []
             batch_scraped = []
 
-            # 検索エンジンのレートリミット（429 Too Many Requests等）を防ぐため、並列数を1に制限
-            sem = asyncio.Semaphore(1)
+            # 意図: 1本のビールは Untappd / DuckDuckGo / Gemini を順に待つため、直列処理だと全待ち時間の合計になる。
+            # 複数のビールを同時に進め、各サービスのレート制限はサービスごとのレーン (core/lanes.py) に任せる
+            sem = asyncio.Semaphore(settings.UNTAPPD_ENRICH_CONCURRENCY)
             
             async def _process_with_sem(i: int, beer: Dict[str, Any]) -> Optional[Dict[str, Any]]:
                 async with sem:
-                    # レートリミット回避のための待機時間
-                    await asyncio.sleep(3)
                     product_url_loop: Optional[str] = beer.get('url')
                     if not product_url_loop:
                         return None
@@ -152,9 +170,14 @@ class UntappdEnricher:
                     
                     return result
 
-            tasks = [_process_with_sem(i, beer) for i, beer in enumerate(beers_to_process, 1)]
-            results = await asyncio.gather(*tasks)
+            results: List[Optional[Dict[str, Any]]]
+            if self.mode == 'refresh' and self.refresh_strategy == 'bulk':
+                results = await self._process_refresh_bulk(beers_to_process)
+            else:
+                tasks = [_process_with_sem(i, beer) for i, beer in enumerate(beers_to_process, 1)]
+                results = await asyncio.gather(*tasks)
 
+            batch_untappd_list = []
             for result in results:
                 if result:
                     self.total_success += 1
@@ -164,14 +187,16 @@ class UntappdEnricher:
                     
                     if result.get('untappd_payload'):
                         batch_untappd.append(result['untappd_payload'])
+                    if result.get('untappd_list_payload'):
+                        batch_untappd_list.append(result['untappd_list_payload'])
                     if result.get('gemini_payload') and result['gemini_payload'].get('url'):
                         batch_gemini.append(result['gemini_payload'])
                     if result.get('scraped_payload') and result['scraped_payload'].get('url'):
                         batch_scraped.append(result['scraped_payload'])
 
             # Commit batch and refresh live materialized view immediately
-            if batch_untappd or batch_gemini or batch_scraped:
-                self._commit_updates_batch(batch_untappd, batch_gemini, batch_scraped)
+            if batch_untappd or batch_gemini or batch_scraped or batch_untappd_list:
+                self._commit_updates_batch(batch_untappd, batch_gemini, batch_scraped, batch_untappd_list)
                 if not self.offline and self.supabase:
                     refresh_materialized_view(self.supabase, logger)
 
@@ -181,6 +206,11 @@ class UntappdEnricher:
 
         logger.info(f"\n{'='*70}")
         logger.info("✨ Untappd enrichment completed!")
+        page_cache.log_stats(logger)
+        brewery_resolution_cache.log_stats(logger)
+        untappd_breaker.log_stats(logger)
+        log_single_flight_stats(logger)
+        log_lane_stats(logger)
         logger.info(f"{'='*70}")
 
         if not self.offline:
@@ -325,13 +355,18 @@ class UntappdEnricher:
             untappd_url: Optional[str] = None
 
             if self.offline:
-                logger.info(f"  🔍 [Offline] Searching DB for: {brewery} - {beer_name}")
-                db_res: Any = self.supabase.table('untappd_data').select('untappd_url') \
-                    .ilike('beer_name', beer_name) \
-                    .ilike('brewery_name', f"%{brewery}%") \
-                    .limit(1).execute()
-                if db_res.data:
-                    untappd_url = db_res.data[0]['untappd_url']
+                logger.info(f"  🔍 [Offline] Searching local index for: {brewery} - {beer_name}")
+                if self._get_retrieval_index() is not None:
+                    english_names: List[Optional[str]] = [beer_name, beer.get('beer_name_core')]
+                    untappd_url = self._search_retrieval_index(brewery, english_names, min_score=1) \
+                        or self._search_phonetic_index(brewery, [beer.get('beer_name_jp'), beer_name], english_names, min_score=1)
+                else:
+                    db_res: Any = self.supabase.table('untappd_data').select('untappd_url') \
+                        .ilike('beer_name', beer_name) \
+                        .ilike('brewery_name', f"%{brewery}%") \
+                        .limit(1).execute()
+                    untappd_url = db_res.data[0]['untappd_url'] if db_res.data else None
+                if untappd_url:
                     logger.info(f"  ✅ [Offline] Found in DB: {untappd_url}")
                 else:
                     logger.info(f"  ⏭️  [Offline] Not found in DB. Skipping.")
@@ -381,8 +416,8 @@ class UntappdEnricher:
         logger.info(f"  🔄 Refreshing: {beer.get('beer_name', 'Unknown')} ({untappd_url})")
 
         try:
-            await asyncio.sleep(2)
-            details: UntappdBeerDetails = await scrape_beer_details(untappd_url)
+            # Refresh exists to get current ratings: never serve the detail page from the page cache
+            details: UntappdBeerDetails = await scrape_beer_details(untappd_url, use_cache=False)
             untappd_payload: Dict[str, Any]
             if details:
                 untappd_payload = map_details_to_payload(details)
@@ -417,6 +452,58 @@ class UntappdEnricher:
             logger.error(f"  ❌ Refresh error: {e}")
             return None
 
+    async def _process_refresh_bulk(self, beers: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Process a batch in 'refresh' mode from brewery beer-list pages.
+
+        意図: 一覧ページは 1 ページで 25 本分の rating / ABV / IBU を返すので、古い untappd_data を
+        untappd_brewery_url ごとにまとめて一覧ページから更新する。
+        一覧に見つからないビール・ブルワリー URL 不明・ビール名未取得（詳細情報が必要）の行だけ詳細ページへ回す。
+        """
+        groups: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        detail_beers: List[Dict[str, Any]] = []
+        seen_untappd: Set[str] = set()
+        for beer in beers:
+            if beer.get('url'):
+                self.processed_this_run.add(beer['url'])
+            untappd_url: Optional[str] = beer.get('untappd_url')
+            if not untappd_url or "untappd.com/b/" not in untappd_url or untappd_url in seen_untappd:
+                continue
+            seen_untappd.add(untappd_url)
+            brewery_url: Optional[str] = beer.get('untappd_brewery_url')
+            if brewery_url and beer.get('untappd_beer_name'):
+                groups.setdefault(brewery_base_url(brewery_url), {})[untappd_url] = beer
+            else:
+                detail_beers.append(beer)
+
+        results: List[Optional[Dict[str, Any]]] = []
+        for i, (brewery_url, targets) in enumerate(groups.items(), 1):
+            # 意図: 古い行は日付順の一覧の奥にあることが多い。一覧をたどるのは詳細ページより安く済む範囲
+            # (対象本数未満のページ数) に限り、1 本だけのブルワリーは最初から詳細ページへ回す
+            if len(targets) < 2:
+                detail_beers.extend(targets.values())
+                continue
+            max_pages: int = min(len(targets) - 1, brewery_catalog.max_pages)
+            logger.info(
+                f"[Brewery {i}/{len(groups)}] 📋 Refreshing {len(targets)} beers from up to {max_pages} list pages: {brewery_url}"
+            )
+            found = await scan_brewery_beer_list(brewery_url, targets.keys(), max_pages=max_pages)
+            for untappd_url, item in found.items():
+                results.append({
+                    'untappd_list_payload': map_list_item_to_payload(untappd_url, item),
+                    'gemini_payload': {},
+                    'scraped_payload': {},
+                    'untappd_brewery_url': brewery_url,
+                })
+            missed = [beer for u, beer in targets.items() if u not in found]
+            if missed:
+                logger.info(f"  ↪️ {len(missed)} beers not on the list pages; using detail pages")
+            detail_beers.extend(missed)
+
+        for beer in detail_beers:
+            results.append(await self._process_beer_refresh(beer))
+        return results
+
     def _get_brewery_url_hint(self, brewery: str, beer_name: Optional[str] = None) -> Optional[str]:
         """Looks up the known Untappd brewery URL from BreweryManager."""
         if not self.brewery_manager or not brewery:
@@ -440,6 +527,80 @@ class UntappdEnricher:
             logger.warning(f"  ⚠️  BreweryManager lookup failed: {e}")
         return None
 
+    def _get_retrieval_index(self) -> Optional[UntappdRetrievalIndex]:
+        """Builds the local retrieval index over untappd_data on first use (once per run)."""
+        if self._retrieval_index is None and not self._retrieval_index_failed and self.supabase:
+            try:
+                breweries = self.brewery_manager.breweries if self.brewery_manager else []
+                self._retrieval_index = build_retrieval_index(self.supabase, breweries)
+            except Exception as e:
+                logger.warning(f"  ⚠️  Untappd retrieval index unavailable: {e}")
+                self._retrieval_index_failed = True
+        return self._retrieval_index
+
+    def _search_retrieval_index(self, brewery: str, beer_names: List[Optional[str]], min_score: int) -> Optional[str]:
+        """
+        Top-k from the local index, re-scored with score_beer_matches (same 0-100 rules as the network search).
+        Returns the best URL whose score reaches `min_score`.
+        """
+        index = self._get_retrieval_index()
+        if index is None:
+            return None
+        best_url: Optional[str] = None
+        best_score: int = 0
+        for name in dict.fromkeys(n for n in beer_names if n):
+            candidates = index.search(name, brewery, k=settings.UNTAPPD_INDEX_TOP_K)
+            scores = score_beer_matches([Candidate.from_mapping(c) for c in candidates], name, brewery)
+            for cand, score in zip(candidates, scores):
+                if score > best_score:
+                    best_url, best_score = cand['url'], score
+        if best_url and best_score >= min_score:
+            logger.info(f"  📇 [Index] {best_url} (score {best_score})")
+            return best_url
+        return None
+
+    def _search_phonetic_index(
+        self,
+        brewery: str,
+        beer_names: List[Optional[str]],
+        english_names: Sequence[Optional[str]] = (),
+        min_score: int = 1,
+    ) -> Optional[str]:
+        """
+        Kana names matched against the index by phonetic key (ホップロケット -> Hop Rocket).
+        Only an unambiguous hit is returned: one URL, found at a matching brewery.
+        When the product also has a Latin name, the hit must pass score_beer_matches (>= `min_score`)
+        and has_variant_mismatch against it as well.
+        """
+        index = self._get_retrieval_index()
+        if index is None:
+            return None
+        latin: List[str] = [n for n in dict.fromkeys(english_names) if n and not has_kana(n)]
+        for name in dict.fromkeys(n for n in beer_names if n and has_kana(n)):
+            hits = index.search_phonetic(name, brewery)
+            urls = list(dict.fromkeys(c['url'] for c in hits))
+            if len(urls) == 1:
+                # 意図: 子音の骨格は母音・r/l を落とすため別のビールとも一致する (メロンサワー / Lemon Sour)。
+                # 英名があればネットワーク検索と同じ採点で確かめてから採用する
+                if latin and not self._phonetic_hit_matches(hits[0], latin, brewery, min_score):
+                    logger.info(f"  🔤 [Phonetic] '{name}' -> {urls[0]} rejected: '{hits[0]['beer_name']}' does not match {latin}")
+                    continue
+                logger.info(f"  🔤 [Phonetic] '{name}' -> {urls[0]}")
+                return urls[0]
+            if urls:
+                logger.debug(f"  [Phonetic] '{name}' is ambiguous ({len(urls)} beers); not used")
+        return None
+
+    @staticmethod
+    def _phonetic_hit_matches(hit: UntappdSearchCandidate, names: List[str], brewery: str, min_score: int) -> bool:
+        cand: Candidate = Candidate.from_mapping(hit)
+        for name in names:
+            if has_variant_mismatch(name, cand.beer):
+                continue
+            if score_beer_matches([cand], name, brewery)[0] >= max(1, min_score):
+                return True
+        return False
+
     def _validate_cached_url(self, cached_url: str, beer_name: str, brewery: str) -> bool:
         """Checks if a cached untappd_url actually matches the expected beer and brewery using score_beer_match."""
         try:
@@ -448,13 +609,7 @@ class UntappdEnricher:
             res = self.supabase.table('untappd_data').select('beer_name, brewery_name, style').eq('untappd_url', cached_url).limit(1).execute()
             if not res.data:
                 return True
-            db_item = res.data[0]
-            from bs4 import BeautifulSoup
-            from backend.src.services.untappd.validators import score_beer_match
-            html = f'<div class="beer-item"><p class="name"><a>{db_item.get("beer_name", "")}</a></p><p class="brewery"><a>{db_item.get("brewery_name", "")}</a></p><p class="style">{db_item.get("style", "")}</p></div>'
-            soup = BeautifulSoup(html, 'lxml')
-            item = soup.select_one('.beer-item')
-            score = score_beer_match(item, beer_name, brewery)
+            score = score_beer_match(Candidate.from_mapping(res.data[0]), beer_name, brewery)
             if score == 0:
                 return False
             return True
@@ -501,6 +656,20 @@ class UntappdEnricher:
         beer_name_core: Optional[str] = beer.get('beer_name_core')
         original_title: Optional[str] = beer.get('name')
 
+        # Stage 0: a beer another shop already linked is found in the local index without any request
+        if settings.UNTAPPD_INDEX_ENABLED:
+            # 意図: カナだけの商品名は n-gram が Untappd の英字名と重ならないため、phonetic key でも引く。
+            # ここで確定すれば、ネットワーク検索も LLM の Phase A/B (英名推定・代替クエリ) も不要になる
+            local_url = self._search_retrieval_index(
+                brewery, [beer_name, beer_name_core], min_score=settings.UNTAPPD_INDEX_STAGE0_MIN_SCORE,
+            ) or self._search_phonetic_index(
+                brewery, [beer_name_jp, beer_name, beer_name_core], [beer_name, beer_name_core],
+                min_score=settings.UNTAPPD_INDEX_STAGE0_MIN_SCORE,
+            )
+            if local_url:
+                logger.info(f"  ✅ [Stage 0] Found in local index: {local_url}")
+                return local_url
+
         logger.info(f"  🔍 Searching Untappd for: {brewery} - {beer_name}")
         search_result: UntappdSearchResult = await get_untappd_url(
             brewery, beer_name,
@@ -509,6 +678,7 @@ class UntappdEnricher:
             search_hint=search_hint,
             beer_name_core=beer_name_core,
             original_title=original_title,
+            brewery_manager=self.brewery_manager,
         )
 
         # 3. Two-pass retry & inference when no_results
@@ -546,7 +716,6 @@ class UntappdEnricher:
                             if self.brewery_manager and eb_name and brewery:
                                 self.brewery_manager.learn_brewery_alias(brewery_name_en=eb_name, new_alias=brewery, untappd_url=c_b_url)
                             return b_found
-                        await asyncio.sleep(1)
 
                     if eb_name and eb_beer:
                         logger.info(f"  🔍 [Phase A] Trying get_untappd_url with inferred English names: {eb_name} - {eb_beer}")
@@ -555,13 +724,13 @@ class UntappdEnricher:
                             beer_name=eb_beer,
                             search_hint=f"{eb_name} {eb_beer}",
                             original_title=original_title,
+                            brewery_manager=self.brewery_manager,
                         )
                         if inf_result.get('success') and inf_result.get('url'):
                             logger.info(f"  🎉 [Phase A] Found via inferred English names: {inf_result.get('url')}")
                             if self.brewery_manager and eb_name and brewery:
                                 self.brewery_manager.learn_brewery_alias(brewery_name_en=eb_name, new_alias=brewery)
                             return inf_result.get('url')
-                        await asyncio.sleep(1)
             except Exception as inf_e:
                 logger.warning(f"  ⚠️ [Phase A] LLM inference failed: {inf_e}")
 
@@ -582,11 +751,11 @@ class UntappdEnricher:
                         search_hint=alt_query,
                         beer_name_core=beer_name_core,
                         original_title=original_title,
+                        brewery_manager=self.brewery_manager,
                     )
                     if retry_result.get('success'):
                         logger.info(f"  ✅ [Phase B] Found: {retry_result.get('url')}")
                         return retry_result.get('url')
-                    await asyncio.sleep(1)
             except Exception as e:
                 logger.warning(f"  ⚠️ [Phase B] LLM retry failed: {e}")
 
@@ -626,7 +795,6 @@ class UntappdEnricher:
         if "untappd.com/b/" not in untappd_url:
             return {}
 
-        await asyncio.sleep(2)  # Rate limiting
         logger.info(f"  🔄 Scraping beer details...")
         details: UntappdBeerDetails = await scrape_beer_details(untappd_url)
         if details:
@@ -687,9 +855,12 @@ class UntappdEnricher:
         untappd_payloads: List[Dict[str, Any]],
         gemini_updates: List[Dict[str, Any]],
         scraped_updates: List[Dict[str, Any]],
+        untappd_list_payloads: Optional[List[Dict[str, Any]]] = None,
     ) -> None:
         """Commits all accumulated updates to the database in batch."""
         upsert_untappd_data(self.supabase, untappd_payloads)
+        # List-page payloads carry fewer columns; a separate upsert keeps the other columns untouched
+        upsert_untappd_data(self.supabase, untappd_list_payloads or [])
         update_gemini_data_untappd_urls(self.supabase, gemini_updates)
         update_scraped_beers_untappd_urls(self.supabase, scraped_updates)
 
@@ -704,7 +875,8 @@ async def enrich_untappd(
     offline: bool = False,
     force: bool = False,
     llm_provider: str = 'gemini',
-    llm_model_id: Optional[str] = None
+    llm_model_id: Optional[str] = None,
+    refresh_strategy: str = 'bulk',
 ) -> Set[str]:
     """
     Entry point: Enrich beers with Untappd data.
@@ -716,6 +888,7 @@ async def enrich_untappd(
         offline=offline,
         force=force,
         llm_provider=llm_provider,
-        llm_model_id=llm_model_id
+        llm_model_id=llm_model_id,
+        refresh_strategy=refresh_strategy,
     )
     return await enricher.run(limit=limit)
@@ -11,6 +11,7 @@ from typing import List, Dict, Optional, Set, Any, Union
 
 from ..core.db import get_supabase_client, async_execute, refresh_materialized_view
 from ..core.types import ScrapedProduct
+from .stock_history import build_stock_change, record_stock_changes
 from ..scrapers import beervolta, chouseiya, ichigo_ichie, arome, maruho, antenna_america, witch_craft_market
 
 logger = logging.getLogger(__name__)
@@ -65,6 +66,7 @@ async def run_and_save_store(
     new_count: int = 0
     updated_count: int = 0
     beers_to_upsert: List[Dict[str, Any]] = []
+    stock_changes: List[Dict[str, Any]] = []
 
     # Items are likely Newest -> Oldest (Page 1 top -> Page N bottom)
     items_to_process: List[ScrapedProduct] = list(reversed(items))
@@ -104,8 +106,18 @@ async def run_and_save_store(
             'last_seen': current_time_iso,
         }
 
+        # 意図: 実際に観測した遷移だけを履歴に残す。new_only でも遷移のある既存商品は下で upsert し、
+        # scraped_beers を更新しないまま次回以降に同じ遷移を何度も記録しないようにする
+        change: Optional[Dict[str, Any]] = build_stock_change(
+            url, beer_data['shop'],
+            prev_status=existing.get('stock_status') if existing else None,
+            new_status=beer_data['stock_status'],
+            prev_price_num=existing.get('price_num') if existing else None,
+            new_price_num=beer_data['price_num'],
+            source='scrape', changed_at=current_time_iso,
+        )
         if existing and not reset_first_seen:
-            if new_only and not is_restock:
+            if new_only and not is_restock and not change:
                 continue
 
             # If shop provides an explicit item creation/published date (first_seen), always prioritize it
@@ -125,6 +137,8 @@ async def run_and_save_store(
             new_count += 1
 
         beers_to_upsert.append(beer_data)
+        if change:
+            stock_changes.append(change)
 
     if beers_to_upsert:
         batch_size: int = 1000
@@ -135,11 +149,18 @@ async def run_and_save_store(
                 logger.info(f"  💾 {display_name}: Upserted batch {i // batch_size + 1} ({len(batch)} items)")
             except Exception as e:
                 logger.error(f"  ❌ {display_name}: Error upserting batch: {e}")
+                # The stored status/price did not change, so neither did the history
+                failed_urls: Set[str] = {row['url'] for row in batch}
+                stock_changes = [c for c in stock_changes if c['url'] not in failed_urls]
         try:
             refresh_materialized_view(supabase, logger)
         except Exception as e:
             logger.warning(f"  ⚠️ {display_name}: Error refreshing view: {e}")
 
+    if stock_changes:
+        written: int = await record_stock_changes(supabase, stock_changes)
+        logger.info(f"  📈 {display_name}: Recorded {written} stock/price changes")
+
     return new_count, updated_count, len(beers_to_upsert)
 
 
@@ -171,7 +192,7 @@ async def scrape_to_supabase(
     
     while True:
         # Fetch in chunks
-        response: Any = await async_execute(supabase.table('scraped_beers').select('url, first_seen, stock_status, untappd_url').range(start, start + chunk_size - 1))
+        response: Any = await async_execute(supabase.table('scraped_beers').select('url, first_seen, stock_status, price_num, untappd_url').range(start, start + chunk_size - 1))
         
         if not response.data:
             break
@@ -0,0 +1,74 @@
+"""
+Helper functions for recording stock / price transitions.
+
+`scraped_beers` only keeps the latest state of each product, so restock / sale / sold-out
+analytics previously required re-scanning and diffing the whole table.
+This module appends a row to `stock_history` only when the status or the price actually
+changes, keyed by (url, changed_at), so the history stays small enough to aggregate directly.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import logging
+
+from ..core.db import async_execute
+
+logger = logging.getLogger(__name__)
+
+
+def build_stock_change(
+    url: str,
+    shop: Optional[str],
+    prev_status: Optional[str],
+    new_status: Optional[str],
+    prev_price_num: Optional[float],
+    new_price_num: Optional[float],
+    source: str,
+    changed_at: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Builds a `stock_history` row if the status or price changed, otherwise returns None.
+
+    意図: 価格が取得できなかった回 (new_price_num=None) は「変化なし」とみなす。
+    取得失敗のたびに価格が消えた/戻ったという偽の遷移を記録しないため。
+    新規商品 (prev が両方 None) は初期状態として 1 行だけ記録し、以降の遷移の起点にする。
+    """
+    status_changed: bool = bool(new_status) and new_status != prev_status
+    price_changed: bool = new_price_num is not None and new_price_num != prev_price_num
+
+    if not status_changed and not price_changed:
+        return None
+
+    return {
+        'url': url,
+        'changed_at': changed_at or datetime.now(timezone.utc).isoformat(),
+        'shop': shop,
+        'stock_status': new_status if new_status else prev_status,
+        'prev_stock_status': prev_status,
+        'price_num': new_price_num if new_price_num is not None else prev_price_num,
+        'prev_price_num': prev_price_num,
+        'source': source,
+    }
+
+
+async def record_stock_changes(supabase: Any, changes: List[Dict[str, Any]]) -> int:
+    """
+    Appends change rows to `stock_history`. Returns the number of rows written.
+
+    History is auxiliary data: failures are logged and never abort the scrape / stock update.
+    `ignore_duplicates` makes tenacity retries in async_execute idempotent on (url, changed_at).
+    """
+    if not changes:
+        return 0
+
+    batch_size: int = 1000
+    written: int = 0
+    for i in range(0, len(changes), batch_size):
+        batch: List[Dict[str, Any]] = changes[i:i + batch_size]
+        try:
+            await async_execute(
+                supabase.table('stock_history').upsert(batch, on_conflict='url,changed_at', ignore_duplicates=True)
+            )
+            written += len(batch)
+        except Exception as e:
+            logger.warning(f"  ⚠️ Failed to record stock history ({len(batch)} rows): {e}")
+    return written
@@ -0,0 +1,188 @@
+"""
+Dead-link sweeper.
+
+Finds product pages that were removed from the shop (404 / 410) without downloading them.
+`update-stock` only notices dead links as a side effect of full GET requests (and for Shopify
+items may fetch the HTML page a second time), so removed products keep costing a full page
+fetch on every stock update. This command probes each URL with HEAD, falling back to a
+1-byte Range GET for servers that reject HEAD, and marks removed products as 'Dead Link'.
+Both `update-stock` and `beer_info_view` skip 'Dead Link' rows from then on.
+
+Always defaults to dry-run mode (see .gemini/rules/database_safety.md).
+"""
+import asyncio
+import logging
+import ssl
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlparse
+
+import httpx
+
+from ..core.db import get_supabase_client, sync_execute, refresh_materialized_view
+from ..services.stock_checker import HEADERS
+from .stock_history import build_stock_change, record_stock_changes
+
+logger = logging.getLogger(__name__)
+
+DEAD_STATUS_CODES = (404, 410)
+# Servers that reject HEAD typically answer with one of these; retry with a ranged GET.
+HEAD_UNSUPPORTED_CODES = (403, 405, 501)
+PER_HOST_CONCURRENCY: int = 4
+PER_HOST_DELAY: float = 0.2
+FETCH_CHUNK_SIZE: int = 1000
+UPDATE_CHUNK_SIZE: int = 100
+
+
+async def probe_url(client: httpx.AsyncClient, url: str) -> int:
+    """
+    Returns the HTTP status of a product URL without downloading the page body.
+    Returns 0 on network errors (treated as "unknown", never as dead).
+
+    How: HEAD first; if the server does not support HEAD, send GET with `Range: bytes=0-0`
+    and only read the response headers (streamed, body is never consumed).
+    """
+    try:
+        response: httpx.Response = await client.head(url, headers=HEADERS)
+        if response.status_code not in HEAD_UNSUPPORTED_CODES:
+            return response.status_code
+
+        range_headers: Dict[str, str] = {**HEADERS, "Range": "bytes=0-0"}
+        async with client.stream("GET", url, headers=range_headers) as ranged:
+            return ranged.status_code
+    except Exception as e:
+        logger.debug(f"Probe failed for {url}: {e}")
+        return 0
+
+
+def _client_for_host(host: str) -> httpx.AsyncClient:
+    """Creates one pooled client per host (Arome needs legacy SSL ciphers)."""
+    verify_ssl: Union[bool, ssl.SSLContext] = True
+    if "arome.jp" in host:
+        ctx = ssl.create_default_context()
+        ctx.set_ciphers('DEFAULT@SECLEVEL=1')
+        verify_ssl = ctx
+    return httpx.AsyncClient(verify=verify_ssl, timeout=15.0, follow_redirects=True)
+
+
+async def _probe_host(host: str, beers: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Probes all URLs of one host over a single keep-alive connection pool.
+    意図: ホスト単位でまとめることで接続を再利用しつつ、同一ショップへの同時接続数を
+    PER_HOST_CONCURRENCY に抑える (ホスト同士は並列に走らせる)。
+    """
+    statuses: Dict[str, int] = {}
+    sem: asyncio.Semaphore = asyncio.Semaphore(PER_HOST_CONCURRENCY)
+
+    async with _client_for_host(host) as client:
+        async def bounded_probe(url: str) -> None:
+            async with sem:
+                statuses[url] = await probe_url(client, url)
+                await asyncio.sleep(PER_HOST_DELAY)
+
+        await asyncio.gather(*(bounded_probe(b['url']) for b in beers))
+
+    dead: int = sum(1 for s in statuses.values() if s in DEAD_STATUS_CODES)
+    logger.info(f"  🌐 {host}: probed {len(statuses)} URLs, {dead} dead")
+    return statuses
+
+
+def _fetch_sweep_targets(supabase: Any, shop_filter: Optional[str], limit: Optional[int]) -> List[Dict[str, Any]]:
+    """Loads non-dead products, oldest last_seen first, in 1000-row chunks."""
+    targets: List[Dict[str, Any]] = []
+    start: int = 0
+    while True:
+        query: Any = supabase.table('scraped_beers').select('url, name, shop, stock_status, price_num')\
+            .neq('stock_status', 'Dead Link')
+        if shop_filter:
+            query = query.eq('shop', shop_filter)
+        res: Any = sync_execute(query.order('last_seen', desc=False, nullsfirst=True).range(start, start + FETCH_CHUNK_SIZE - 1))
+        rows: List[Dict[str, Any]] = res.data or []
+        targets.extend(rows)
+        if len(rows) < FETCH_CHUNK_SIZE or (limit and len(targets) >= limit):
+            break
+        start += FETCH_CHUNK_SIZE
+    return targets[:limit] if limit else targets
+
+
+async def sweep_dead_links(
+    limit: Optional[int] = None,
+    shop_filter: Optional[str] = None,
+    dry_run: bool = True,
+) -> None:
+    """
+    Probes product URLs grouped by host and marks 404/410 pages as 'Dead Link'.
+    Requires dry_run=False to actually update data.
+    """
+    logger.info("=" * 70)
+    logger.info("🔗 Dead Link Sweeper")
+    logger.info("=" * 70)
+
+    supabase: Any = get_supabase_client()
+    beers: List[Dict[str, Any]] = _fetch_sweep_targets(supabase, shop_filter, limit)
+    if not beers:
+        logger.info("✨ No products to probe. Exiting.")
+        return
+
+    by_host: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for beer in beers:
+        if beer.get('url'):
+            by_host[urlparse(beer['url']).netloc].append(beer)
+    logger.info(f"🔍 Probing {len(beers)} URLs across {len(by_host)} hosts...")
+
+    host_results: List[Dict[str, int]] = await asyncio.gather(
+        *(_probe_host(host, host_beers) for host, host_beers in by_host.items())
+    )
+    statuses: Dict[str, int] = {url: code for result in host_results for url, code in result.items()}
+    dead_beers: List[Dict[str, Any]] = [b for b in beers if statuses.get(b.get('url', '')) in DEAD_STATUS_CODES]
+    unknown: int = sum(1 for code in statuses.values() if code == 0)
+
+    if unknown:
+        logger.info(f"  ℹ️  {unknown} URLs could not be probed (network errors); left untouched.")
+
+    if not dead_beers:
+        logger.info("✨ No dead links found.")
+        return
+
+    logger.warning(f"⚠️  Found {len(dead_beers)} dead links.")
+    sample_size: int = min(5, len(dead_beers))
+    logger.info(f"\n📋 Sample of records to be marked ({sample_size} of {len(dead_beers)}):")
+    for i, beer in enumerate(dead_beers[:sample_size]):
+        logger.info(f"  - [{i+1}] [{beer.get('shop')}] {str(beer.get('name', ''))[:60]} | HTTP {statuses.get(beer['url'])} | {beer['url']}")
+
+    if dry_run:
+        logger.info("\n🛡️  DRY RUN MODE ENABLED 🛡️")
+        logger.info("No data was actually updated.")
+        logger.info("To mark these records as 'Dead Link', run the command with the --execute flag.")
+        return
+
+    logger.info("\n✏️  EXECUTE MODE: Marking dead links...")
+    now_iso: str = datetime.now(timezone.utc).isoformat()
+    marked: int = 0
+    for i in range(0, len(dead_beers), UPDATE_CHUNK_SIZE):
+        chunk: List[Dict[str, Any]] = dead_beers[i:i + UPDATE_CHUNK_SIZE]
+        try:
+            sync_execute(
+                supabase.table('scraped_beers').update({'stock_status': 'Dead Link'}).in_('url', [b['url'] for b in chunk])
+            )
+            marked += len(chunk)
+        except Exception as e:
+            logger.error(f"  ❌ Failed to mark chunk {i // UPDATE_CHUNK_SIZE + 1}: {e}")
+            continue
+
+        changes: List[Dict[str, Any]] = []
+        for beer in chunk:
+            change: Optional[Dict[str, Any]] = build_stock_change(
+                beer['url'], beer.get('shop'),
+                prev_status=beer.get('stock_status'), new_status='Dead Link',
+                prev_price_num=beer.get('price_num'), new_price_num=None,
+                source='sweep-dead-links', changed_at=now_iso,
+            )
+            if change:
+                changes.append(change)
+        await record_stock_changes(supabase, changes)
+
+    logger.info(f"✅ Marked {marked} records as 'Dead Link'.")
+    if marked:
+        refresh_materialized_view(supabase, logger)
@@ -2,21 +2,34 @@ import asyncio
 import logging
 from typing import List, Optional, Dict, Any
 import httpx
-from datetime import datetime
+from datetime import datetime, timezone
 
 from ..core.db import get_supabase_client, refresh_materialized_view
 from ..services.stock_checker import check_stock_for_url, StockCheckResult
+from ..services.shop_registry import ShopAdapter, STRATEGY_LISTING_BULK, resolve_adapter
+from .scrape import parse_price
+from .stock_history import build_stock_change, record_stock_changes
 
 # Configure logging
 logger: logging.Logger = logging.getLogger(__name__)
 
 BATCH_SIZE: int = 50
 CONCURRENCY: int = 10
+# Below this many URLs per shop, per-URL checks are cheaper than a full listing scrape
+LISTING_BULK_MIN_ITEMS: int = 20
 
-async def process_beer(client: httpx.AsyncClient, beer: Dict[str, Any], supabase: Any) -> bool:
+async def process_beer(
+    client: httpx.AsyncClient,
+    beer: Dict[str, Any],
+    supabase: Any,
+    history: Optional[List[Dict[str, Any]]] = None,
+    result: Optional[StockCheckResult] = None,
+) -> bool:
     """
     Checks stock for a single beer and updates DB if changed.
     Returns True if updated (meaning stock status changed), False otherwise.
+    If `history` is given, a stock_history row is appended to it when status or price changed.
+    If `result` is given (e.g. from a listing_bulk scrape), no network check is made.
     """
     url: Optional[str] = beer.get('url')
     shop: Optional[str] = beer.get('shop')
@@ -25,7 +38,8 @@ async def process_beer(client: httpx.AsyncClient, beer: Dict[str, Any], supabase
     if not url or not shop: return False
     
     try:
-        result: StockCheckResult = await check_stock_for_url(client, url, shop)
+        if result is None:
+            result = await check_stock_for_url(client, url, shop)
         new_status: str = result.get("stock_status", "Unknown")
         new_price: Optional[str] = result.get("price")
         
@@ -35,7 +49,7 @@ async def process_beer(client: httpx.AsyncClient, beer: Dict[str, Any], supabase
         
         # Prepare update data
         data: Dict[str, Any] = {
-            "last_seen": datetime.now().isoformat()
+            "last_seen": datetime.now(timezone.utc).isoformat()
         }
         
         # Add stock status if changed
@@ -45,12 +59,23 @@ async def process_beer(client: httpx.AsyncClient, beer: Dict[str, Any], supabase
             data["stock_status"] = new_status
             
         # Add price if extracted
+        new_price_num: Optional[int] = parse_price(new_price)
         if new_price:
             data["price"] = new_price
+            data["price_num"] = new_price_num
             
         # Update DB
         try:
             supabase.table('scraped_beers').update(data).eq('url', url).execute()
+            if history is not None:
+                change: Optional[Dict[str, Any]] = build_stock_change(
+                    url, shop,
+                    prev_status=current_status, new_status=new_status,
+                    prev_price_num=parse_price(beer.get('price')), new_price_num=new_price_num,
+                    source='update-stock', changed_at=data["last_seen"],
+                )
+                if change:
+                    history.append(change)
             return status_changed
         except Exception as e:
             logger.error(f"DB Update failed for {url}: {e}")
@@ -60,6 +85,29 @@ async def process_beer(client: httpx.AsyncClient, beer: Dict[str, Any], supabase
         logger.error(f"Error processing {url}: {e}")
         return False
 
+async def fetch_listing_results(adapter: ShopAdapter, beers: List[Dict[str, Any]]) -> Dict[str, StockCheckResult]:
+    """
+    Runs the shop's listing scraper once and returns stock results for the requested URLs.
+
+    意図: 一覧ページに在庫表示があるショップ (listing_bulk) は、商品ごとに詳細ページを
+    取得する代わりに一覧を 1 周するだけで大半の URL の在庫が分かる。
+    一覧に現れなかった URL (削除・非公開など) は呼び出し側で詳細ページ確認にフォールバックする。
+    """
+    scraper = adapter['listing_scraper']
+    if not scraper:
+        return {}
+    try:
+        items = await scraper(limit=None, existing_urls=None, full_scrape=True)
+    except Exception as e:
+        logger.warning(f"[{adapter['shop']}] Listing scrape failed, falling back to per-URL checks: {e}")
+        return {}
+
+    wanted = {b['url'] for b in beers}
+    return {
+        item['url']: {"stock_status": item.get('stock_status') or "Unknown", "price": item.get('price')}
+        for item in items if item.get('url') in wanted
+    }
+
 async def update_stock_status(limit: Optional[int] = None, shop_filter: Optional[str] = None, sort_rating: bool = False, in_stock_only: bool = True) -> None:
     """
     Checks and updates stock status for existing items.
@@ -71,12 +119,14 @@ async def update_stock_status(limit: Optional[int] = None, shop_filter: Optional
     # 1. Fetch beers
     if sort_rating:
         logger.info("Fetching beers sorted by Untappd Rating (DESC)...")
-        query: Any = supabase.table('beer_info_view').select('name, url, shop, stock_status')\
+        query: Any = supabase.table('beer_info_view').select('name, url, shop, stock_status, price')\
             .order('untappd_rating', desc=True, nullsfirst=False)
     else:
         # Default fetch from scraped_beers, ordered by oldest last_seen
-        query = supabase.table('scraped_beers').select('name, url, shop, stock_status').order('last_seen', desc=False, nullsfirst=True)
+        query = supabase.table('scraped_beers').select('name, url, shop, stock_status, price').order('last_seen', desc=False, nullsfirst=True)
     
+    # Dead links (marked by update-stock or sweep-dead-links) are never rechecked
+    query = query.neq('stock_status', 'Dead Link')
     if in_stock_only:
         query = query.neq('stock_status', 'Sold Out')
         
@@ -88,16 +138,44 @@ async def update_stock_status(limit: Optional[int] = None, shop_filter: Optional
         
     logger.info(f"Checking stock for {len(beers)} items...")
     
+    # 2. Resolve shop adapters; listing_bulk shops answer many URLs with one listing scrape
+    adapters: Dict[str, ShopAdapter] = {}
+    by_shop: Dict[str, List[Dict[str, Any]]] = {}
+    for beer in beers:
+        shop_name: str = beer.get('shop') or ''
+        if shop_name not in adapters:
+            adapters[shop_name] = resolve_adapter(shop_name, beer.get('url') or '')
+        by_shop.setdefault(shop_name, []).append(beer)
+
+    prefetched: Dict[str, StockCheckResult] = {}
+    for shop_name, shop_beers in by_shop.items():
+        adapter: ShopAdapter = adapters[shop_name]
+        if adapter['strategy'] == STRATEGY_LISTING_BULK and len(shop_beers) >= LISTING_BULK_MIN_ITEMS:
+            found: Dict[str, StockCheckResult] = await fetch_listing_results(adapter, shop_beers)
+            logger.info(f"[{shop_name}] Listing bulk check covered {len(found)}/{len(shop_beers)} items")
+            prefetched.update(found)
+
     async with httpx.AsyncClient(timeout=15.0) as client:
         sem: asyncio.Semaphore = asyncio.Semaphore(CONCURRENCY)
+        # Per-shop rate limits declared by each adapter
+        shop_sems: Dict[str, asyncio.Semaphore] = {
+            name: asyncio.Semaphore(adapter['concurrency']) for name, adapter in adapters.items()
+        }
         
+        history: List[Dict[str, Any]] = []
+
         async def bounded_process(beer: Dict[str, Any]) -> bool:
-            async with sem:
-                await asyncio.sleep(0.2)
-                return await process_beer(client, beer, supabase)
+            url: str = beer.get('url') or ''
+            if url in prefetched:
+                return await process_beer(client, beer, supabase, history, result=prefetched[url])
+            shop_name: str = beer.get('shop') or ''
+            async with sem, shop_sems[shop_name]:
+                await asyncio.sleep(adapters[shop_name]['delay'])
+                return await process_beer(client, beer, supabase, history)
         
         updated_count: int = 0
         total_processed: int = 0
+        history_count: int = 0
         
         chunks: List[List[Dict[str, Any]]] = [beers[i:i + BATCH_SIZE] for i in range(0, len(beers), BATCH_SIZE)]
         
@@ -106,10 +184,13 @@ async def update_stock_status(limit: Optional[int] = None, shop_filter: Optional
             results: List[bool] = await asyncio.gather(*tasks)
             updated_count += sum(1 for r in results if r)
             total_processed += len(results)
+            if history:
+                history_count += await record_stock_changes(supabase, history)
+                history.clear()
             logger.info(f"Processed {total_processed}/{len(beers)}. Updated: {updated_count}")
             await asyncio.sleep(0.1)
 
-    logger.info(f"Stock Update Complete. Total Checked: {len(beers)}, Updated: {updated_count}")
+    logger.info(f"Stock Update Complete. Total Checked: {len(beers)}, Updated: {updated_count}, History rows: {history_count}")
     if updated_count > 0:
         refresh_materialized_view(supabase, logger)
 
@@ -11,6 +11,77 @@ class Settings:
     
     SCRAPER_SOLD_OUT_THRESHOLD: int = int(os.getenv("SCRAPER_SOLD_OUT_THRESHOLD", "30"))
     
+    # Untappd on-disk page cache (services/untappd/page_cache.py)
+    UNTAPPD_CACHE_ENABLED: bool = os.getenv("UNTAPPD_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+    UNTAPPD_CACHE_PATH: str = os.getenv(
+        "UNTAPPD_CACHE_PATH",
+        os.path.join(os.path.dirname(__file__), "..", "..", "data", "cache", "untappd_pages.sqlite3"),
+    )
+    UNTAPPD_CACHE_MAX_MB: int = int(os.getenv("UNTAPPD_CACHE_MAX_MB", "200"))
+    UNTAPPD_CACHE_TTL_DETAIL_HOURS: float = float(os.getenv("UNTAPPD_CACHE_TTL_DETAIL_HOURS", "24"))
+    UNTAPPD_CACHE_TTL_SEARCH_HOURS: float = float(os.getenv("UNTAPPD_CACHE_TTL_SEARCH_HOURS", "72"))
+    UNTAPPD_CACHE_TTL_BREWERY_HOURS: float = float(os.getenv("UNTAPPD_CACHE_TTL_BREWERY_HOURS", "168"))
+    UNTAPPD_CACHE_TTL_NEGATIVE_HOURS: float = float(os.getenv("UNTAPPD_CACHE_TTL_NEGATIVE_HOURS", "12"))
+    UNTAPPD_CACHE_TTL_DDG_HOURS: float = float(os.getenv("UNTAPPD_CACHE_TTL_DDG_HOURS", "168"))
+    # Brewery-name -> Untappd brewery URL resolutions (services/untappd/brewery_resolution.py)
+    UNTAPPD_BREWERY_RESOLUTION_PATH: str = os.getenv(
+        "UNTAPPD_BREWERY_RESOLUTION_PATH",
+        os.path.join(os.path.dirname(__file__), "..", "..", "data", "cache", "brewery_resolution.sqlite3"),
+    )
+    UNTAPPD_BREWERY_RESOLUTION_TTL_DAYS: float = float(os.getenv("UNTAPPD_BREWERY_RESOLUTION_TTL_DAYS", "30"))
+    UNTAPPD_BREWERY_RESOLUTION_NEGATIVE_TTL_DAYS: float = float(os.getenv("UNTAPPD_BREWERY_RESOLUTION_NEGATIVE_TTL_DAYS", "3"))
+
+    # Per-brewery beer catalog (services/untappd/brewery_catalog.py)
+    UNTAPPD_CATALOG_ENABLED: bool = os.getenv("UNTAPPD_CATALOG_ENABLED", "true").lower() not in ("0", "false", "no")
+    UNTAPPD_CATALOG_PATH: str = os.getenv(
+        "UNTAPPD_CATALOG_PATH",
+        os.path.join(os.path.dirname(__file__), "..", "..", "data", "cache", "untappd_catalog.sqlite3"),
+    )
+    UNTAPPD_CATALOG_TTL_HOURS: float = float(os.getenv("UNTAPPD_CATALOG_TTL_HOURS", "72"))
+    UNTAPPD_CATALOG_MAX_PAGES: int = int(os.getenv("UNTAPPD_CATALOG_MAX_PAGES", "20"))
+
+    # Per-service request lanes (core/lanes.py): concurrent requests and seconds between request starts
+    UNTAPPD_LANE_CONCURRENCY: int = int(os.getenv("UNTAPPD_LANE_CONCURRENCY", "2"))
+    UNTAPPD_LANE_INTERVAL: float = float(os.getenv("UNTAPPD_LANE_INTERVAL", "1.5"))
+    DDG_LANE_CONCURRENCY: int = int(os.getenv("DDG_LANE_CONCURRENCY", "1"))
+    DDG_LANE_INTERVAL: float = float(os.getenv("DDG_LANE_INTERVAL", "3.0"))
+    GEMINI_LANE_CONCURRENCY: int = int(os.getenv("GEMINI_LANE_CONCURRENCY", "2"))
+    GEMINI_LANE_INTERVAL: float = float(os.getenv("GEMINI_LANE_INTERVAL", "2.5"))
+    # Gemini prompt-token budget per minute and model (16K TPM on the Gemma free tier); 0 disables the TPM check
+    GEMINI_LANE_TPM: int = int(os.getenv("GEMINI_LANE_TPM", "16000"))
+    # Product titles per Gemini extraction request in enrich-extract (GeminiExtractor.extract_info_batch);
+    # 1 sends one title per request
+    GEMINI_EXTRACT_BATCH_SIZE: int = int(os.getenv("GEMINI_EXTRACT_BATCH_SIZE", "10"))
+    # Extraction units (batches, or titles with --batch-size 1) enrich-extract runs concurrently; LLM calls
+    # still queue on the Gemini lane's RPM/TPM budget, cache hits do not
+    LLM_ENRICH_CONCURRENCY: int = int(os.getenv("LLM_ENRICH_CONCURRENCY", "4"))
+    # Untappd circuit breaker (services/untappd/circuit_breaker.py): consecutive 403/429/503 before opening,
+    # first cool-down and its cap in seconds (doubles on every re-open)
+    UNTAPPD_BREAKER_THRESHOLD: int = int(os.getenv("UNTAPPD_BREAKER_THRESHOLD", "3"))
+    UNTAPPD_BREAKER_COOLDOWN: float = float(os.getenv("UNTAPPD_BREAKER_COOLDOWN", "30"))
+    UNTAPPD_BREAKER_MAX_COOLDOWN: float = float(os.getenv("UNTAPPD_BREAKER_MAX_COOLDOWN", "600"))
+    # Shared brewery registry (services/store/brewery_manager.py): incremental refresh interval
+    BREWERY_REGISTRY_REFRESH_SECONDS: float = float(os.getenv("BREWERY_REGISTRY_REFRESH_SECONDS", "300"))
+    # Untappd backend: "html" scrapes untappd.com, "api" uses the authenticated JSON API
+    # (services/untappd/api_client.py) with HTML as fallback; "api" needs the client id/secret
+    UNTAPPD_BACKEND: str = os.getenv("UNTAPPD_BACKEND", "html").lower()
+    UNTAPPD_API_BASE_URL: str = os.getenv("UNTAPPD_API_BASE_URL", "https://api.untappd.com/v4")
+    UNTAPPD_API_CLIENT_ID: str = os.getenv("UNTAPPD_API_CLIENT_ID", "")
+    UNTAPPD_API_CLIENT_SECRET: str = os.getenv("UNTAPPD_API_CLIENT_SECRET", "")
+    UNTAPPD_API_LANE_CONCURRENCY: int = int(os.getenv("UNTAPPD_API_LANE_CONCURRENCY", "2"))
+    # API quota is per hour (100 req/h by default): 36s spacing keeps a long run inside it
+    UNTAPPD_API_LANE_INTERVAL: float = float(os.getenv("UNTAPPD_API_LANE_INTERVAL", "36"))
+    # Local TF-IDF retrieval index over untappd_data (services/untappd/retrieval_index.py): used as Stage 0
+    # before any network search (accepted when the re-scored score_beer_match reaches the min score) and by --offline
+    UNTAPPD_INDEX_ENABLED: bool = os.getenv("UNTAPPD_INDEX_ENABLED", "true").lower() not in ("0", "false", "no")
+    UNTAPPD_INDEX_STAGE0_MIN_SCORE: int = int(os.getenv("UNTAPPD_INDEX_STAGE0_MIN_SCORE", "90"))
+    UNTAPPD_INDEX_TOP_K: int = int(os.getenv("UNTAPPD_INDEX_TOP_K", "10"))
+    # Beers processed concurrently by enrich-untappd (each waits on the lanes above)
+    UNTAPPD_ENRICH_CONCURRENCY: int = int(os.getenv("UNTAPPD_ENRICH_CONCURRENCY", "6"))
+    # In-brewery searches (main names, then JP / token fallbacks within the 5/10 candidate limits) in flight
+    # at once for one beer; the rest are cancelled on a candidate with score >= 90 (services/untappd/searcher.py)
+    UNTAPPD_SEARCH_FANOUT: int = int(os.getenv("UNTAPPD_SEARCH_FANOUT", "3"))
+    
     # Add other settings as needed
 
 settings = Settings()
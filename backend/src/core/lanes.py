@@ -0,0 +1,179 @@
+"""
+Per-service request lanes (concurrency + request spacing).
+
+Why: UntappdEnricher.run processed one beer at a time (Semaphore(1)) and slept a fixed 3s per beer,
+plus fixed sleeps between calls. A single beer waits on several independent upstreams (Untappd HTML,
+DuckDuckGo, Gemini), so the run time was the *sum* of every wait even though each service has its own limit.
+How: each upstream gets one process-wide Lane with its own budget:
+- concurrency: how many requests may be in flight at once
+- min_interval: minimum spacing between request *starts* (≒ 60 / RPM)
+- tokens_per_minute: optional TPM budget; `reserve(tokens=...)` also waits until the last 60 seconds
+  of reserved tokens leave room (LLM lanes; `reserve` returns the reservation and the caller replaces
+  its estimate with the actual usage through `correct_tokens`)
+Callers wrap only the network call in `async with get_lane(LANE_UNTAPPD).slot():`, so many beers can be
+in flight while every service still sees a steady, bounded request rate. Throughput is then bounded by
+the slowest lane instead of by the sum of all waits.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+LANE_UNTAPPD: str = "untappd"
+LANE_UNTAPPD_API: str = "untappd_api"
+LANE_DDG: str = "ddg"
+LANE_GEMINI: str = "gemini"
+
+
+class Lane:
+    """Concurrency limit and start-to-start spacing for one upstream service."""
+
+    def __init__(self, name: str, concurrency: int, min_interval: float, tokens_per_minute: int = 0):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.min_interval = max(0.0, min_interval)
+        self.tokens_per_minute = max(0, tokens_per_minute)
+        self.calls: int = 0
+        self.tokens: int = 0
+        self.waited: float = 0.0
+        self.max_in_flight: int = 0
+        self._in_flight: int = 0
+        self._next_start: float = 0.0
+        # [start time, tokens] of the requests in the current TPM window, ordered by start;
+        # entries are lists so a later correction updates the reservation in place
+        self._token_log: Deque[List[float]] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _bind(self) -> None:
+        # asyncio primitives belong to one event loop; cli runs one loop per command but tests run many
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._sem = asyncio.Semaphore(self.concurrency)
+            self._lock = asyncio.Lock()
+            self._in_flight = 0
+
+    def pause(self, seconds: float) -> None:
+        """Pushes the next allowed request start at least `seconds` into the future."""
+        self._next_start = max(self._next_start, time.monotonic() + seconds)
+
+    async def reserve(self, tokens: int = 0) -> Optional[List[float]]:
+        """
+        Waits for this caller's start time (spacing only, no concurrency slot).
+        With a TPM budget, `tokens` (an estimate) must also fit into the 60 seconds before the start;
+        the returned reservation is what `correct_tokens` adjusts once the actual usage is known.
+        """
+        self._bind()
+        assert self._lock is not None
+        reservation: Optional[List[float]] = None
+        async with self._lock:
+            now: float = time.monotonic()
+            start: float = max(now, self._next_start)
+            if self.tokens_per_minute and tokens > 0:
+                start = self._tpm_start(start, tokens)
+                reservation = self._token_log[-1]
+            self._next_start = start + self.min_interval
+        wait: float = start - now
+        self.calls += 1
+        if wait > 0:
+            self.waited += wait
+            await asyncio.sleep(wait)
+        return reservation
+
+    def _tpm_start(self, start: float, tokens: int) -> float:
+        """Earliest start >= `start` at which `tokens` fit into the TPM window; records the reservation."""
+        log = self._token_log
+        # Starts never move backwards, so entries that left the window at `start` are gone for good
+        while log and log[0][0] <= start - 60.0:
+            log.popleft()
+        used: int = sum(n for _, n in log)
+        # One request larger than the whole budget still runs, alone in its window
+        while log and used + tokens > self.tokens_per_minute:
+            t0, n = log.popleft()
+            start = max(start, t0 + 60.0)
+            used -= n
+        log.append([start, tokens])
+        self.tokens += tokens
+        return start
+
+    def correct_tokens(self, reservation: Optional[List[float]], tokens: int) -> None:
+        """
+        Replaces a reservation's estimate with the actual usage. The entry keeps its start time, so the
+        window stays ordered for eviction; an entry that already left the window only fixes the total.
+        """
+        if reservation is None:
+            return
+        tokens = max(0, tokens)
+        self.tokens += tokens - int(reservation[1])
+        reservation[1] = tokens
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Holds one of the lane's concurrency slots for the duration of a request."""
+        self._bind()
+        assert self._sem is not None
+        async with self._sem:
+            await self.reserve()
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+
+
+_lanes: Dict[str, Lane] = {}
+
+# (concurrency, min_interval, tokens_per_minute)
+_DEFAULT_BUDGETS: Dict[str, tuple] = {
+    LANE_UNTAPPD: (settings.UNTAPPD_LANE_CONCURRENCY, settings.UNTAPPD_LANE_INTERVAL, 0),
+    LANE_UNTAPPD_API: (settings.UNTAPPD_API_LANE_CONCURRENCY, settings.UNTAPPD_API_LANE_INTERVAL, 0),
+    LANE_DDG: (settings.DDG_LANE_CONCURRENCY, settings.DDG_LANE_INTERVAL, 0),
+    LANE_GEMINI: (settings.GEMINI_LANE_CONCURRENCY, settings.GEMINI_LANE_INTERVAL, settings.GEMINI_LANE_TPM),
+}
+
+
+def get_lane(
+    name: str,
+    concurrency: Optional[int] = None,
+    min_interval: Optional[float] = None,
+    tokens_per_minute: Optional[int] = None,
+) -> Lane:
+    """
+    Returns the process-wide lane for `name`, creating it on first use.
+    Budgets come from Settings for the known lanes; other names (e.g. one lane per Gemini model)
+    use the given values, falling back to the base lane's budget (`gemini:<model>` -> `gemini`).
+    """
+    lane = _lanes.get(name)
+    if lane is None:
+        default = _DEFAULT_BUDGETS.get(name) or _DEFAULT_BUDGETS.get(name.split(':', 1)[0], (1, 0.0, 0))
+        lane = Lane(
+            name,
+            concurrency if concurrency is not None else default[0],
+            min_interval if min_interval is not None else default[1],
+            tokens_per_minute if tokens_per_minute is not None else default[2],
+        )
+        _lanes[name] = lane
+    return lane
+
+
+def log_lane_stats(log: logging.Logger = logger) -> None:
+    """Logs per-lane request counts and time spent waiting for the rate budget."""
+    active = [lane for lane in _lanes.values() if lane.calls]
+    if not active:
+        return
+    log.info("  🚦 Request lanes:")
+    for lane in active:
+        tokens = f" tokens={lane.tokens}" if lane.tokens_per_minute else ""
+        log.info(
+            f"    {lane.name:<11} requests={lane.calls} waited={lane.waited:.1f}s "
+            f"max_in_flight={lane.max_in_flight}/{lane.concurrency}{tokens}"
+        )
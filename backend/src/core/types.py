@@ -85,6 +85,24 @@ class UntappdSearchCandidate(TypedDict, total=False):
     score: float
     source: str
 
+class UntappdCatalogBeer(TypedDict, total=False):
+    """One beer row from an Untappd brewery beer list page (`/w/<slug>/beer`)."""
+    url: str
+    beer_name: str
+    brewery_name: str
+    style: str
+    abv: str
+    ibu: str
+    rating: str
+    rating_count: str
+
+class UntappdBreweryCatalog(TypedDict):
+    """A brewery's locally stored beer list (newest first) and its crawl state."""
+    brewery_url: str
+    beers: List[UntappdCatalogBeer]
+    fetched_at: float
+    complete: bool
+
 class UntappdSearchResult(TypedDict, total=False):
     """Result of an Untappd search attempt."""
     url: Optional[str]
@@ -2,7 +2,7 @@ import re
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 
-from backend.src.core.types import UntappdBeerDetails
+from backend.src.core.types import UntappdBeerDetails, UntappdCatalogBeer
 
 def parse_numeric(val: Optional[str]) -> Optional[float]:
     """Helper to parse numeric values from strings."""
@@ -33,3 +33,24 @@ def map_details_to_payload(details: UntappdBeerDetails) -> Dict[str, Any]:
         'untappd_brewery_url': details.get('untappd_brewery_url'),
         'fetched_at': datetime.now(timezone.utc).isoformat()
     }
+
+def map_list_item_to_payload(untappd_url: str, item: UntappdCatalogBeer) -> Dict[str, Any]:
+    """
+    Maps a brewery beer-list row to untappd_data columns.
+    Only the columns a list page shows are included, so an upsert leaves label, brewery name
+    and brewery URL untouched (callers must not mix these payloads with full detail payloads in one upsert).
+    """
+    return {
+        'untappd_url': untappd_url,
+        'beer_name': item.get('beer_name'),
+        'style': item.get('style'),
+        'abv': item.get('abv'),
+        'abv_num': parse_numeric(item.get('abv')),
+        'ibu': item.get('ibu'),
+        'ibu_num': parse_numeric(item.get('ibu')),
+        'rating': item.get('rating'),
+        'rating_num': parse_numeric(item.get('rating')),
+        'rating_count': item.get('rating_count'),
+        'rating_count_num': parse_numeric(item.get('rating_count')),
+        'fetched_at': datetime.now(timezone.utc).isoformat()
+    }
@@ -14,6 +14,7 @@ SOLD_OUT_THRESHOLD: int = int(os.getenv('SCRAPER_SOLD_OUT_THRESHOLD', '30'))
 
 # Arome Search URL Template (Simplified)
 SEARCH_URL_TEMPLATE: str = "https://www.arome.jp/products/list.php?category_id=0&disp_number=100&pageno={page}"
+SHOP_NAME: str = "アローム"
 BASE_URL: str = "https://www.arome.jp"
 
 HEADERS: Dict[str, str] = {
@@ -106,7 +107,7 @@ def extract_product_data(item: Tag, is_area: bool = False) -> Optional[ScrapedPr
             "price": price,
             "image": image_url,
             "stock_status": stock_status,
-            "shop": "アローム"
+            "shop": SHOP_NAME
         }
 
     except Exception as e:
@@ -16,6 +16,7 @@ CATEGORY_BASES: List[str] = [
 
 # Threshold for consecutive sold-out items before stopping
 SOLD_OUT_THRESHOLD: int = int(os.getenv('SCRAPER_SOLD_OUT_THRESHOLD', '50'))
+SHOP_NAME: str = "BEER VOLTA"
 
 # Headers to mimic a real browser to be safe
 HEADERS: Dict[str, str] = {
@@ -127,7 +128,7 @@ def extract_product_data(item: Tag) -> Optional[ScrapedProduct]:
             'url': link,
             'image': img_url,
             'stock_status': stock_status,
-            'shop': 'BEER VOLTA'
+            'shop': SHOP_NAME
         }
     except Exception as e:
         print(f"[Beervolta] Error extracting product data: {e}")
@@ -8,6 +8,7 @@ from ..core.types import ScrapedProduct
 
 # Threshold for consecutive sold-out items before stopping
 SOLD_OUT_THRESHOLD: int = int(os.getenv('SCRAPER_SOLD_OUT_THRESHOLD', '50'))
+SHOP_NAME: str = "ちょうせいや"
 
 def extract_product_data(item: Tag) -> Optional[ScrapedProduct]:
     """Helper to extract product data from a soup item."""
@@ -64,7 +65,7 @@ def extract_product_data(item: Tag) -> Optional[ScrapedProduct]:
             "url": product_url,
             "image": image_url,
             "stock_status": stock_status,
-            "shop": "ちょうせいや"
+            "shop": SHOP_NAME
         }
 
     except Exception as e:
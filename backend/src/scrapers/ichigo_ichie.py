@@ -9,6 +9,7 @@ from ..core.types import ScrapedProduct
 
 # Threshold for consecutive sold-out items before stopping
 SOLD_OUT_THRESHOLD: int = int(os.getenv('SCRAPER_SOLD_OUT_THRESHOLD', '50'))
+SHOP_NAME: str = "一期一会～る"
 # Number of pages to fetch in parallel
 BATCH_SIZE: int = 10
 
@@ -112,7 +113,7 @@ def parse_page_content(content: Optional[bytes], selector: str = 'li.productlist
                 "url": product_url,
                 "image": image_url,
                 "stock_status": stock_status,
-                "shop": "一期一会～る"
+                "shop": SHOP_NAME
             }
             page_items.append(p_item)
 
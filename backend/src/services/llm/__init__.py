@@ -1,4 +1,4 @@
-from .base import BaseExtractor
-from .factory import get_llm_extractor
+from .base import BaseExtractor, ExtractionRequest
+from .factory import get_llm_extractor, reset_llm_extractors
 
-__all__ = ['BaseExtractor', 'get_llm_extractor']
+__all__ = ['BaseExtractor', 'ExtractionRequest', 'get_llm_extractor', 'reset_llm_extractors']
@@ -1,7 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, NamedTuple, Sequence
 from ...core.types import GeminiExtraction
 
+
+class ExtractionRequest(NamedTuple):
+    """One product title for extract_info / extract_info_batch."""
+    product_name: str
+    known_brewery: Optional[str] = None
+    shop: Optional[str] = None
+
+
 class BaseExtractor(ABC):
     """
     Abstract base class for LLM Extractors (Gemini, Local MLX, etc.)
@@ -14,6 +22,14 @@ class BaseExtractor(ABC):
         """
         pass
 
+    async def extract_info_batch(self, requests: Sequence[ExtractionRequest]) -> List[GeminiExtraction]:
+        """
+        Extracts several product titles; results are in `requests` order.
+        The default makes one extract_info call per title; providers that can answer several titles in one
+        request override this.
+        """
+        return [await self.extract_info(r.product_name, known_brewery=r.known_brewery, shop=r.shop) for r in requests]
+
     @abstractmethod
     async def suggest_search_queries(self, product_name: str, brewery: str, beer_name: str) -> List[str]:
         """
@@ -1,29 +1,35 @@
 import re
 import logging
 from typing import Optional, Dict, Any, List
-from ...core.db import get_supabase_client
+from ...core.db import async_execute, get_supabase_client
 from ...core.types import GeminiExtraction
+from ..store.brewery_manager import BreweryManager, get_brewery_manager
 
 logger = logging.getLogger(__name__)
 
 class LocalCacheResolver:
-    def __init__(self) -> None:
+    def __init__(self, brewery_manager: Optional[BreweryManager] = None) -> None:
         self.brewery_dict: Dict[str, Dict[str, Any]] = {}
+        self.brewery_manager: Optional[BreweryManager] = brewery_manager
+        self._dict_version: int = -1
         try:
             self.supabase = get_supabase_client()
+            if self.brewery_manager is None:
+                self.brewery_manager = get_brewery_manager()
             self._load_brewery_dictionary()
         except Exception as e:
             logger.warning(f"Could not initialize Supabase client for cache resolver: {e}")
             self.supabase = None
 
     def _load_brewery_dictionary(self) -> None:
-        """データベースからブルワリー辞書をメモリにロードする"""
-        if not self.supabase:
+        """共有ブルワリーレジストリからブルワリー辞書を作る (レジストリの索引が変わったときだけ作り直す)"""
+        bm = self.brewery_manager
+        if bm is None or bm.version == self._dict_version:
             return
         try:
-            res = self.supabase.table("breweries").select("id, name_en, name_jp, aliases, untappd_url").execute()
-            if res.data:
-                for row in res.data:
+            brewery_dict: Dict[str, Dict[str, Any]] = {}
+            if bm.breweries:
+                for row in bm.breweries:
                     keys = []
                     if row.get("name_en"):
                         keys.append(row["name_en"].lower())
@@ -38,8 +44,10 @@ class LocalCacheResolver:
                             keys.append(alias.lower())
 
                     for key in set(keys):
-                        self.brewery_dict[key] = row
-                logger.info(f"💾 Loaded {len(res.data)} breweries ({len(self.brewery_dict)} search keys) for local cache.")
+                        brewery_dict[key] = row
+                logger.info(f"💾 Loaded {len(bm.breweries)} breweries ({len(brewery_dict)} search keys) for local cache.")
+            self.brewery_dict = brewery_dict
+            self._dict_version = bm.version
         except Exception as e:
             logger.error(f"Failed to load brewery dictionary for cache: {e}")
 
@@ -49,7 +57,8 @@ class LocalCacheResolver:
             return None
         try:
             # 1. Get URLs with the exact matching name
-            res = self.supabase.table("scraped_beers").select("url").eq("name", product_name).execute()
+            # 意図: enrich-extract は複数の商品を並行に処理するため、同期クエリでイベントループを止めない
+            res = await async_execute(self.supabase.table("scraped_beers").select("url").eq("name", product_name))
             if not res.data:
                 return None
             
@@ -58,12 +67,11 @@ class LocalCacheResolver:
                 return None
             
             # 2. Find resolved gemini_data for those URLs
-            res_gemini = self.supabase.table("gemini_data") \
+            res_gemini = await async_execute(self.supabase.table("gemini_data") \
                 .select("*") \
                 .in_("url", urls) \
                 .not_.is_("brewery_name_en", "null") \
-                .limit(1) \
-                .execute()
+                .limit(1))
             
             if res_gemini.data and len(res_gemini.data) > 0:
                 gemini_data = res_gemini.data[0]
@@ -99,6 +107,7 @@ class LocalCacheResolver:
         """Tier 2: ショップ特有のルール分割 ＋ ブルワリー辞書マッチ"""
         if not product_name or not product_name.strip():
             return None
+        self._load_brewery_dictionary()
         if not shop or not self.brewery_dict:
             return None
 
@@ -1,15 +1,31 @@
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from .base import BaseExtractor
 
+# 意図: 抽出器はプロセス内で (provider, model) ごとに 1 インスタンスだけ作る。
+# 呼び出しのたびに作ると genai.Client / PromptBuilder (shop_rules.json) / LocalCacheResolver を毎回作り直し、
+# しかもインスタンスごとの日次カウンタやフォールバック状態 (429 後の model 切替) が共有されないため。
+_extractors: Dict[Tuple[str, str], BaseExtractor] = {}
+
+
 def get_llm_extractor(provider: str = "gemini", model_id: Optional[str] = None) -> BaseExtractor:
     """
-    Factory function to get the appropriate LLM Extractor.
-    provider: 'gemini' or 'local_mlx'
+    Returns the process-wide LLM Extractor for (provider, model_id), creating it on first use.
+    provider: 'gemini' or 'local_mlx'; model_id None means the provider's configured default.
     """
-    if provider == "local_mlx":
-        from .local_mlx_extractor import LocalMlxExtractor
-        return LocalMlxExtractor(model_id=model_id)
-    else:
-        # Default to gemini
-        from .gemini_extractor import GeminiExtractor
-        return GeminiExtractor()
+    key: Tuple[str, str] = (provider if provider == "local_mlx" else "gemini", model_id or "")
+    extractor = _extractors.get(key)
+    if extractor is None:
+        if key[0] == "local_mlx":
+            from .local_mlx_extractor import LocalMlxExtractor
+            extractor = LocalMlxExtractor(model_id=model_id)
+        else:
+            # Default to gemini
+            from .gemini_extractor import GeminiExtractor
+            extractor = GeminiExtractor(model_id=model_id)
+        _extractors[key] = extractor
+    return extractor
+
+
+def reset_llm_extractors() -> None:
+    """Drops the cached extractors (tests, or after changing credentials)."""
+    _extractors.clear()
@@ -1,22 +1,32 @@
 import os
 import json
+import asyncio
 import time
 import logging
-import asyncio
-from typing import Optional, Dict, Any, List, Tuple, cast
+from typing import Optional, Dict, Any, List, Sequence, Tuple, cast
 from google import genai
 from dotenv import load_dotenv
 from tenacity import retry, stop_after_attempt, wait_exponential
+from ...core.config import settings
+from ...core.lanes import LANE_GEMINI, get_lane
 from ...core.types import GeminiExtraction
-from ...core.db import get_supabase_client
+from ...core.db import async_execute, get_supabase_client
 from .cache_resolver import LocalCacheResolver
-from .base import BaseExtractor
+from .base import BaseExtractor, ExtractionRequest
 from .prompt_builder import PromptBuilder
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Rough prompt size for the TPM budget before the request is sent (corrected with usage_metadata afterwards)
+_CHARS_PER_TOKEN: int = 3
+
+
+def _title_key(title: str) -> str:
+    """Batch title echo as compared with the sent title: quotes, case and whitespace differences are ignored."""
+    return " ".join(title.strip().strip('"').split()).casefold()
+
 class GeminiExtractor(BaseExtractor):
     client: Optional[genai.Client]
     prompt_builder: PromptBuilder
@@ -27,7 +37,7 @@ class GeminiExtractor(BaseExtractor):
     model_interval: float
     global_daily_limit: int
 
-    def __init__(self) -> None:
+    def __init__(self, model_id: Optional[str] = None) -> None:
         api_key: Optional[str] = os.getenv("GEMINI_API_KEY")
         if not api_key:
             logger.warning("GEMINI_API_KEY not found. Extraction will be disabled.")
@@ -43,7 +53,7 @@ class GeminiExtractor(BaseExtractor):
         self.daily_request_count = 0
         
         # Model Configuration: Gemma 4 31B (30 RPM, 14.4K RPD)
-        self.model_id = os.getenv("GEMINI_MODEL_ID", "gemma-4-31b-it")
+        self.model_id = model_id or os.getenv("GEMINI_MODEL_ID", "gemma-4-31b-it")
         self.fallback_model_id = os.getenv("GEMINI_FALLBACK_MODEL_ID", "gemma-4-26b-a4b-it")
         self.model_interval = 2.5  # 30 RPMの制限に余裕を持たせる (約 24 RPM)
         self.global_daily_limit = 14000  # 14,400 RPDの制限に余裕を持たせる
@@ -67,7 +77,7 @@ class GeminiExtractor(BaseExtractor):
             try:
                 supabase = get_supabase_client()
                 # Check current detailed usage
-                res = supabase.rpc('check_api_usage_detailed', {'p_service_name': 'gemini'}).execute()
+                res = await async_execute(supabase.rpc('check_api_usage_detailed', {'p_service_name': 'gemini'}))
                 usage_data = res.data or {}
                 current_rpd = usage_data.get('rpd', 0)
                 current_rpm = usage_data.get('rpm', 0)
@@ -85,7 +95,9 @@ class GeminiExtractor(BaseExtractor):
                     logger.warning(f"  [Gemini] Local daily limit reached ({self.daily_request_count}/{self.global_daily_limit}). Skipping extraction.")
                     return None
 
-            await self._throttle(self.model_interval, self.model_id)
+            estimate: int = len(prompt) // _CHARS_PER_TOKEN + 1
+            reserved_model: str = self.model_id
+            reservation = await self._throttle(self.model_interval, reserved_model, estimate)
 
             config = None
             if schema and self._supports_response_schema(self.model_id):
@@ -110,7 +122,8 @@ class GeminiExtractor(BaseExtractor):
                 if self.model_id != self.fallback_model_id:
                     logger.warning(f"  [Gemini] {self.model_id} limit reached or unavailable. Falling back to {self.fallback_model_id}")
                     self.model_id = self.fallback_model_id
-                    await self._throttle(self.model_interval, self.model_id)
+                    reserved_model = self.model_id
+                    reservation = await self._throttle(self.model_interval, reserved_model, estimate)
                     logger.info(f"  [Gemini] Calling fallback {self.model_id}...")
                     fallback_config = None
                     if schema and self._supports_response_schema(self.model_id):
@@ -143,14 +156,16 @@ class GeminiExtractor(BaseExtractor):
                     total_tokens = getattr(usage, 'total_token_count', 0)
                     prompt_tokens = getattr(usage, 'prompt_token_count', 0)
                     comp_tokens = getattr(usage, 'candidates_token_count', 0)
+                if isinstance(prompt_tokens, int) and prompt_tokens:
+                    get_lane(f"{LANE_GEMINI}:{reserved_model}").correct_tokens(reservation, prompt_tokens)
                 
                 supabase = get_supabase_client()
-                supabase.rpc('log_api_usage', {
+                await async_execute(supabase.rpc('log_api_usage', {
                     'p_service_name': 'gemini',
                     'p_total': total_tokens,
                     'p_prompt': prompt_tokens,
                     'p_comp': comp_tokens
-                }).execute()
+                }))
                 self.daily_request_count += 1
         except Exception as e:
             logger.error(f"  [Gemini] Failed to log API usage in DB after execution: {e}")
@@ -161,15 +176,14 @@ class GeminiExtractor(BaseExtractor):
         
         return None
 
-    async def _throttle(self, interval: float, model_id: str) -> None:
-        """Simple rate limit delay."""
-        current_time: float = time.time()
-        time_since_last: float = current_time - self.last_request_time
-        if time_since_last < interval:
-            wait_time: float = interval - time_since_last
-            if wait_time > 0.1:
-                logger.debug(f"  [Gemini] Waiting {wait_time:.2f}s for {model_id}...")
-                await asyncio.sleep(wait_time)
+    async def _throttle(self, interval: float, model_id: str, tokens: int = 0) -> Optional[List[float]]:
+        """
+        Waits for this call's turn in the model's process-wide lane (core/lanes.py).
+        Concurrent callers are spaced `interval` apart instead of all passing a shared last_request_time check,
+        and wait for room in the lane's TPM budget for `tokens` (the estimated prompt size).
+        Returns the TPM reservation to correct with the actual prompt size.
+        """
+        return await get_lane(f"{LANE_GEMINI}:{model_id}", min_interval=interval).reserve(tokens)
 
     def _parse_json_response(self, text: str, sanitize: bool = False) -> Optional[Dict[str, Any]]:
         """Parses JSON from response text, cleaning markdown blocks and normalizing schema fields."""
@@ -189,18 +203,7 @@ class GeminiExtractor(BaseExtractor):
             
             data: Any = json.loads(content)
             if isinstance(data, dict):
-                normalized: Dict[str, Any] = dict(data)  # Keep all keys from parsed JSON
-                for key in ["brewery_name_jp", "brewery_name_en", "beer_name_jp", "beer_name_en", "beer_name_core", "search_hint", "english_brewery_name", "brewery_slug", "english_beer_name"]:
-                    val = data.get(key)
-                    normalized[key] = str(val).strip() if isinstance(val, str) and val.strip() else None
-                
-                ptype = data.get("product_type")
-                normalized["product_type"] = ptype if ptype in ["beer", "set", "glass", "other"] else "beer"
-                normalized["is_set"] = bool(data.get("is_set", False))
-                
-                if "queries" in data and isinstance(data["queries"], list):
-                    normalized["queries"] = [str(q).strip() for q in data["queries"] if isinstance(q, str) and str(q).strip()]
-                
+                normalized: Dict[str, Any] = self._normalize_fields(data)
                 normalized["raw_response"] = text
                 return normalized
             return None
@@ -208,8 +211,57 @@ class GeminiExtractor(BaseExtractor):
             logger.error(f"  [Gemini] Failed to parse JSON: {e}")
             return None
 
-    async def extract_info(self, product_name: str, known_brewery: Optional[str] = None, shop: Optional[str] = None) -> GeminiExtraction:
-        """Main entry point for extracting beer information."""
+    def _normalize_fields(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Blank names to None, unknown product types to "beer" (keeps all other keys)."""
+        normalized: Dict[str, Any] = dict(data)  # Keep all keys from parsed JSON
+        for key in ["brewery_name_jp", "brewery_name_en", "beer_name_jp", "beer_name_en", "beer_name_core", "search_hint", "english_brewery_name", "brewery_slug", "english_beer_name"]:
+            val = data.get(key)
+            normalized[key] = str(val).strip() if isinstance(val, str) and val.strip() else None
+
+        ptype = data.get("product_type")
+        normalized["product_type"] = ptype if ptype in ["beer", "set", "glass", "other"] else "beer"
+        normalized["is_set"] = bool(data.get("is_set", False))
+
+        if "queries" in data and isinstance(data["queries"], list):
+            normalized["queries"] = [str(q).strip() for q in data["queries"] if isinstance(q, str) and str(q).strip()]
+        return normalized
+
+    def _extraction_schema(self) -> Any:
+        """response_schema of one extraction result (None for models without schema support)."""
+        if not self._supports_response_schema(self.model_id):
+            return None
+        from google.genai import types
+        return types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "brewery_name_jp": types.Schema(type=types.Type.STRING, nullable=True),
+                "brewery_name_en": types.Schema(type=types.Type.STRING, nullable=True),
+                "beer_name_jp": types.Schema(type=types.Type.STRING, nullable=True),
+                "beer_name_en": types.Schema(type=types.Type.STRING, nullable=True),
+                "beer_name_core": types.Schema(type=types.Type.STRING, nullable=True),
+                "search_hint": types.Schema(type=types.Type.STRING, nullable=True),
+                "product_type": types.Schema(type=types.Type.STRING, enum=["beer", "set", "glass", "other"]),
+                "is_set": types.Schema(type=types.Type.BOOLEAN),
+            },
+            required=["product_type", "is_set"],
+        )
+
+    def _to_extraction(self, data: Dict[str, Any], product_name: str) -> GeminiExtraction:
+        res: GeminiExtraction = {
+            "brewery_name_jp": data.get("brewery_name_jp"),
+            "brewery_name_en": data.get("brewery_name_en"),
+            "beer_name_jp": data.get("beer_name_jp"),
+            "beer_name_en": data.get("beer_name_en"),
+            "beer_name_core": data.get("beer_name_core"),
+            "search_hint": data.get("search_hint"),
+            "product_type": data.get("product_type", "beer"),
+            "is_set": data.get("is_set", False),
+            "raw_response": data.get("raw_response")
+        }
+        return self.prompt_builder.apply_set_override(res, product_name)
+
+    async def _resolve_cached(self, product_name: str, shop: Optional[str]) -> Optional[GeminiExtraction]:
+        """Tier 1 (exact title) and Tier 2 (dictionary) caches; None when the LLM is needed."""
         # 1. Tier 1: Product Title Exact Match Cache
         tier1_res = await self.cache_resolver.resolve_tier1_exact_match(product_name)
         if tier1_res:
@@ -219,10 +271,20 @@ class GeminiExtractor(BaseExtractor):
         tier2_res = await self.cache_resolver.resolve_tier2_dictionary_match(product_name, shop)
         if tier2_res:
             return self.prompt_builder.apply_set_override(tier2_res, product_name)
+        return None
+
+    async def extract_info(self, product_name: str, known_brewery: Optional[str] = None, shop: Optional[str] = None) -> GeminiExtraction:
+        """Main entry point for extracting beer information."""
+        cached = await self._resolve_cached(product_name, shop)
+        if cached:
+            return cached
 
         if not self.client or self.daily_request_count >= self.global_daily_limit:
             return self.prompt_builder.apply_set_override(self.prompt_builder.empty_result(), product_name)
+        return await self._extract_single(product_name, known_brewery, shop)
 
+    async def _extract_single(self, product_name: str, known_brewery: Optional[str], shop: Optional[str]) -> GeminiExtraction:
+        """One LLM request for one title (no cache lookup)."""
         clean_name = self.prompt_builder.clean_product_title(product_name, shop)
         logger.info(f"[Gemini] Extracting: {clean_name} (Original: {product_name}, Known: {known_brewery}, Shop: {shop})")
 
@@ -231,24 +293,7 @@ class GeminiExtractor(BaseExtractor):
         logger.debug(f"[Gemini] Full Prompt:\n{'-'*40}\n{prompt}\n{'-'*40}")
 
         try:
-            schema = None
-            if self._supports_response_schema(self.model_id):
-                from google.genai import types
-                schema = types.Schema(
-                    type=types.Type.OBJECT,
-                    properties={
-                        "brewery_name_jp": types.Schema(type=types.Type.STRING, nullable=True),
-                        "brewery_name_en": types.Schema(type=types.Type.STRING, nullable=True),
-                        "beer_name_jp": types.Schema(type=types.Type.STRING, nullable=True),
-                        "beer_name_en": types.Schema(type=types.Type.STRING, nullable=True),
-                        "beer_name_core": types.Schema(type=types.Type.STRING, nullable=True),
-                        "search_hint": types.Schema(type=types.Type.STRING, nullable=True),
-                        "product_type": types.Schema(type=types.Type.STRING, enum=["beer", "set", "glass", "other"]),
-                        "is_set": types.Schema(type=types.Type.BOOLEAN),
-                    },
-                    required=["product_type", "is_set"],
-                )
-            data: Optional[Dict[str, Any]] = await self._generate_content(prompt, schema=schema)
+            data: Optional[Dict[str, Any]] = await self._generate_content(prompt, schema=self._extraction_schema())
             if data:
                 logger.info(f"  ✅ Extraction Success:")
                 logger.info(f"     - Brewery: {data.get('brewery_name_en')} ({data.get('brewery_name_jp')})")
@@ -256,23 +301,117 @@ class GeminiExtractor(BaseExtractor):
                 logger.info(f"     - Type:    {data.get('product_type')} (Set: {data.get('is_set')})")
                 
                 logger.debug(f"[Gemini] Success. Daily usage: {self.daily_request_count}/{self.global_daily_limit}")
-                res: GeminiExtraction = {
-                    "brewery_name_jp": data.get("brewery_name_jp"),
-                    "brewery_name_en": data.get("brewery_name_en"),
-                    "beer_name_jp": data.get("beer_name_jp"),
-                    "beer_name_en": data.get("beer_name_en"),
-                    "beer_name_core": data.get("beer_name_core"),
-                    "search_hint": data.get("search_hint"),
-                    "product_type": data.get("product_type", "beer"),
-                    "is_set": data.get("is_set", False),
-                    "raw_response": data.get("raw_response")
-                }
-                return self.prompt_builder.apply_set_override(res, product_name)
+                return self._to_extraction(data, product_name)
         except Exception as e:
             logger.error(f"[Gemini] Extraction failed: {e}")
 
         return self.prompt_builder.apply_set_override(self.prompt_builder.empty_result(), product_name)
 
+    async def extract_info_batch(self, requests: Sequence[ExtractionRequest]) -> List[GeminiExtraction]:
+        """
+        Extracts several titles with one request per GEMINI_EXTRACT_BATCH_SIZE titles (results in `requests` order).
+        Cached titles never reach the LLM. Each entry of the answer is checked on its own; a title whose
+        entry is missing, duplicated, empty or echoes another title, or a whole batch whose request failed,
+        falls back to single-title requests.
+        """
+        # Cache lookups are DB round trips only; run them together
+        results: List[Optional[GeminiExtraction]] = list(await asyncio.gather(
+            *(self._resolve_cached(req.product_name, req.shop) for req in requests)
+        ))
+        pending: List[int] = [i for i, r in enumerate(results) if r is None]
+
+        size = max(1, settings.GEMINI_EXTRACT_BATCH_SIZE)
+        for start in range(0, len(pending), size):
+            chunk = pending[start:start + size]
+            if not self.client or self.daily_request_count >= self.global_daily_limit:
+                for i in chunk:
+                    results[i] = self.prompt_builder.apply_set_override(self.prompt_builder.empty_result(), requests[i].product_name)
+                continue
+            if len(chunk) == 1:
+                r = requests[chunk[0]]
+                results[chunk[0]] = await self._extract_single(r.product_name, r.known_brewery, r.shop)
+                continue
+
+            entries = await self._generate_batch([requests[i] for i in chunk])
+            retry: List[int] = []
+            for pos, i in enumerate(chunk):
+                entry = entries.get(pos)
+                if entry is None:
+                    retry.append(i)
+                else:
+                    results[i] = self._to_extraction(entry, requests[i].product_name)
+            logger.info(f"  ✅ [Gemini Batch] {len(chunk) - len(retry)}/{len(chunk)} titles extracted in one request")
+            for i in retry:
+                r = requests[i]
+                logger.info(f"  🔄 [Gemini Batch] Falling back to a single request for: {r.product_name}")
+                results[i] = await self._extract_single(r.product_name, r.known_brewery, r.shop)
+
+        return [cast(GeminiExtraction, r) for r in results]
+
+    async def _generate_batch(self, requests: Sequence[ExtractionRequest]) -> Dict[int, Dict[str, Any]]:
+        """
+        One request for several titles. Returns the valid entries by title position:
+        a dict with an in-range, not repeated integer "index", a "title" echo of that index's title
+        and at least one extracted name (or a non-beer type).
+        """
+        prompt: str = self.prompt_builder.build_batch_extract_prompt(requests)
+        logger.info(f"[Gemini Batch] Extracting {len(requests)} titles in one request")
+        logger.debug(f"[Gemini Batch] Full Prompt:\n{'-'*40}\n{prompt}\n{'-'*40}")
+
+        schema = None
+        item_schema = self._extraction_schema()
+        if item_schema is not None:
+            from google.genai import types
+            item_schema.properties["index"] = types.Schema(type=types.Type.INTEGER)
+            item_schema.properties["title"] = types.Schema(type=types.Type.STRING)
+            item_schema.required = ["index", "title", "product_type", "is_set"]
+            schema = types.Schema(
+                type=types.Type.OBJECT,
+                properties={"items": types.Schema(type=types.Type.ARRAY, items=item_schema)},
+                required=["items"],
+            )
+        try:
+            data: Optional[Dict[str, Any]] = await self._generate_content(prompt, schema=schema)
+        except Exception as e:
+            logger.error(f"[Gemini Batch] Extraction failed: {e}")
+            return {}
+        items: Any = (data or {}).get("items")
+        if not isinstance(items, list):
+            logger.warning("  ⚠️ [Gemini Batch] Response has no items array")
+            return {}
+
+        titles: List[str] = [_title_key(self.prompt_builder.clean_product_title(r.product_name, r.shop)) for r in requests]
+        entries: Dict[int, Dict[str, Any]] = {}
+        repeated: set = set()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            idx = item.get("index")
+            if not isinstance(idx, int) or isinstance(idx, bool) or not 0 <= idx < len(requests):
+                continue
+            # 意図: index だけで紐付けると、番号がずれた回答が別商品の名前を URL に付け、
+            # learn_brewery_alias にも流れてしまう。タイトルの復唱が一致しない回答は単発リクエストへ回す
+            echo = item.get("title")
+            if not isinstance(echo, str) or _title_key(echo) != titles[idx]:
+                logger.warning(f"  ⚠️ [Gemini Batch] Entry {idx} echoes another title ({echo!r}); not used")
+                continue
+            if idx in entries:
+                repeated.add(idx)
+                continue
+            entry = self._normalize_fields(item)
+            has_names = any(entry.get(k) for k in ("brewery_name_en", "brewery_name_jp", "beer_name_en", "beer_name_jp"))
+            # Merchandise legitimately comes back without names; a "beer" without any name is a failed entry
+            if not has_names and entry["product_type"] not in ("glass", "other"):
+                continue
+            entry.pop("index", None)
+            entry.pop("title", None)
+            entry["raw_response"] = json.dumps(item, ensure_ascii=False)
+            entries[idx] = entry
+        # Two answers for one title mean the model lost track of the numbering: trust neither
+        for idx in repeated:
+            entries.pop(idx, None)
+        return entries
+
     async def suggest_search_queries(self, product_name: str, brewery: str, beer_name: str) -> List[str]:
         """
         Two-pass retry: When Untappd search fails, ask Gemini for alternative search queries.
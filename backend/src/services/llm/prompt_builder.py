@@ -2,11 +2,26 @@ import os
 import json
 import logging
 import re
-from typing import Optional, Dict, Any, List, Tuple, cast
+from typing import Optional, Dict, Any, List, Sequence, Tuple, cast
 from ...core.types import GeminiExtraction
+from .base import ExtractionRequest
 
 logger = logging.getLogger(__name__)
 
+# Field rules shared by the single-title and batch extraction prompts
+_EXTRACT_FIELD_RULES: str = """\
+        - **Volume / Size Removal**: ABSOLUTELY DO NOT include volume/capacity numbers (e.g. "355ml", "473ml", "568ml", "750ml", "330ml", "12oz", "500ml", "缶", "瓶") in `beer_name_en` or `beer_name_core`. Strip volume completely!
+        - **Collab**: If multiple breweries are involved (×, &, /), include all (e.g., "A x B").
+        - **Product Type**: "beer" (single can/bottle only), "set" (multi-can/bottle sets like "4 Cans Set", "4本セット", variety packs, tasting sets), "glass", "other".
+        - **Product Type Classification**: ALL consumable craft beverages (beers, ciders, meads, hard kombuchas, hard seltzers, gin sodas) MUST be classified as "beer" (or "set" if multi-pack). ONLY classify non-beverage merchandise, books, magazines, t-shirts, tote bags, or glassware accessories as "other" or "glass"! Note: Brewery names like "Other Half" containing "Other" are breweries, NOT product type "other"!
+        - **is_set**: MUST be `true` if the product contains multiple cans/bottles (e.g. "4 Cans Set", "4本セット", "飲み比べ", "アソート").
+        - **brewery_name_jp**: Preserve the original Japanese brewery name as-is (e.g., "ヨロッコ", "家守堂").
+        - **brewery_name_en**: Use the brewery's OFFICIAL English/romanized name if known (e.g., "Yorocco Beer" for ヨロッコ, "Yamorido" for 家守堂). For Japanese-only breweries, use phonetic romanization (NOT semantic translation). WRONG: "Root + Branch Brewing" for ヨロッコ. RIGHT: "Yorocco Beer".
+        - **beer_name_core**: The essential/searchable part of the beer name. Remove edition qualifiers ("Nth Anniversary", "Special Edition", "Limited", "Reserve"), volume suffixes ("355ml", "568ml"), and beer style suffixes (IPA, Stout, NE IPA, etc.). Example: "The Realm's Remedy 11th Anniversary IPA" → "The Realm's Remedy". "Casimiroa NE IPA" → "Casimiroa".
+        - **search_hint**: A short, optimized Untappd search query (max ~4 words). Format: "[beer_name_core] [brewery_name_en]". If the beer name is in Japanese (e.g. 金鬼, 其の十, 鬼伝説), ALWAYS include its romanized/phonetic reading (e.g. "Kin-oni", "Sono 10", "Oni Densetsu") in `search_hint` and `beer_name_en` so Untappd can find it!
+        - **Spelling Accuracy**: Be exact with brewery names (e.g. "Tamamura Honten", NOT "Tamamuro"; "Wakasaimo Honpo", NOT "Wakasaimo")."""
+
+
 class PromptBuilder:
     """
     Encapsulates all logic for generating LLM prompts, parsing configurations, and enforcing formatting rules.
@@ -178,16 +193,7 @@ class PromptBuilder:
         Rules:
         - **Format**: Follow shop-specific formatting if provided below.
         {guidance}
-        - **Volume / Size Removal**: ABSOLUTELY DO NOT include volume/capacity numbers (e.g. "355ml", "473ml", "568ml", "750ml", "330ml", "12oz", "500ml", "缶", "瓶") in `beer_name_en` or `beer_name_core`. Strip volume completely!
-        - **Collab**: If multiple breweries are involved (×, &, /), include all (e.g., "A x B").
-        - **Product Type**: "beer" (single can/bottle only), "set" (multi-can/bottle sets like "4 Cans Set", "4本セット", variety packs, tasting sets), "glass", "other".
-        - **Product Type Classification**: ALL consumable craft beverages (beers, ciders, meads, hard kombuchas, hard seltzers, gin sodas) MUST be classified as "beer" (or "set" if multi-pack). ONLY classify non-beverage merchandise, books, magazines, t-shirts, tote bags, or glassware accessories as "other" or "glass"! Note: Brewery names like "Other Half" containing "Other" are breweries, NOT product type "other"!
-        - **is_set**: MUST be `true` if the product contains multiple cans/bottles (e.g. "4 Cans Set", "4本セット", "飲み比べ", "アソート").
-        - **brewery_name_jp**: Preserve the original Japanese brewery name as-is (e.g., "ヨロッコ", "家守堂").
-        - **brewery_name_en**: Use the brewery's OFFICIAL English/romanized name if known (e.g., "Yorocco Beer" for ヨロッコ, "Yamorido" for 家守堂). For Japanese-only breweries, use phonetic romanization (NOT semantic translation). WRONG: "Root + Branch Brewing" for ヨロッコ. RIGHT: "Yorocco Beer".
-        - **beer_name_core**: The essential/searchable part of the beer name. Remove edition qualifiers ("Nth Anniversary", "Special Edition", "Limited", "Reserve"), volume suffixes ("355ml", "568ml"), and beer style suffixes (IPA, Stout, NE IPA, etc.). Example: "The Realm's Remedy 11th Anniversary IPA" → "The Realm's Remedy". "Casimiroa NE IPA" → "Casimiroa".
-        - **search_hint**: A short, optimized Untappd search query (max ~4 words). Format: "[beer_name_core] [brewery_name_en]". If the beer name is in Japanese (e.g. 金鬼, 其の十, 鬼伝説), ALWAYS include its romanized/phonetic reading (e.g. "Kin-oni", "Sono 10", "Oni Densetsu") in `search_hint` and `beer_name_en` so Untappd can find it!
-        - **Spelling Accuracy**: Be exact with brewery names (e.g. "Tamamura Honten", NOT "Tamamuro"; "Wakasaimo Honpo", NOT "Wakasaimo").
+        {_EXTRACT_FIELD_RULES.strip()}
  
         Output JSON:
         {{
@@ -204,6 +210,58 @@ class PromptBuilder:
 3. "テスト : 4本セット | TEST: 4 Cans Set《7/16-17入荷予定》" -> {{"brewery_name_jp": null, "brewery_name_en": null, "beer_name_en": "TEST", "beer_name_core": "TEST", "search_hint": "TEST", "product_type": "set", "is_set": true}}'''}
         """
 
+    def build_batch_extract_prompt(self, requests: Sequence[ExtractionRequest]) -> str:
+        """
+        Constructs one extraction prompt for several titles (GeminiExtractor.extract_info_batch).
+        Each shop's format rules and examples appear once, however many of its titles are in the batch;
+        the answer is {"items": [...]} with one entry per title, tagged with the title's index and echoing
+        the title itself, so an entry attached to the wrong number can be detected.
+        """
+        title_lines: List[str] = []
+        shop_sections: Dict[str, str] = {}
+        for idx, req in enumerate(requests):
+            line = f'[{idx}] "{self.clean_product_title(req.product_name, req.shop)}"'
+            if req.shop:
+                line += f" (shop: {req.shop})"
+            if req.known_brewery:
+                line += f" (brewery likely: '{req.known_brewery}')"
+            title_lines.append(line)
+            if req.shop and req.shop not in shop_sections:
+                guidance, examples = self.get_shop_guidance(req.shop)
+                if guidance or examples:
+                    shop_sections[req.shop] = f"        Shop \"{req.shop}\":\n        {guidance}\n        Examples (one title each):\n        {examples}"
+        titles_text = "\n".join(f"        {line}" for line in title_lines)
+        shops_text = "\n".join(shop_sections.values()) or "        (none)"
+
+        return f"""
+        Extract brewery and beer names from each of the {len(requests)} product titles below.
+        Identify each product type: "beer", "set", "glass", or "other".
+        Titles are independent: never carry names over from one title to another.
+
+        Product Titles:
+{titles_text}
+
+        Shop-specific formats (apply each only to the titles from that shop):
+{shops_text}
+
+        Rules:
+        {_EXTRACT_FIELD_RULES.strip()}
+
+        Output JSON only, with exactly one entry per title, "index" set to the title's [number]
+        and "title" set to that title copied exactly as listed (without the quotes):
+        {{"items": [
+          {{
+            "index": 0,
+            "title": "...",
+            "brewery_name_jp": "...", "brewery_name_en": "...",
+            "beer_name_jp": "...", "beer_name_en": "...",
+            "beer_name_core": "...",
+            "search_hint": "...",
+            "product_type": "...", "is_set": boolean
+          }}
+        ]}}
+        """
+
     def build_suggest_search_queries_prompt(self, product_name: str, brewery: str, beer_name: str) -> str:
         """Constructs the prompt for suggesting alternative search queries."""
         return f"""
@@ -0,0 +1,132 @@
+"""
+Shop adapter registry shared by the stock checker and the scrapers.
+
+Each adapter declares *how* a shop's stock should be checked instead of hard-coding
+an if/elif chain on display names:
+- strategy: which fast path to use
+    - json_api:      Shopify `/products/<handle>.json` (one small JSON per product, no HTML)
+    - listing_bulk:  listing pages already show stock, so one listing scrape answers many URLs
+    - detail_page:   fetch and parse the product detail page
+- charsets: decode order for the shop's HTML (EUC-JP shops first try EUC-JP)
+- impersonate: fetch through the primp browser-impersonating client (shops that block plain httpx)
+- selectors: declarative sold-out / in-stock / price selectors for the generic parser
+  (shops with a hand-written parser in stock_checker._DETAIL_PARSERS do not need them)
+- rate limits: per-shop concurrency and delay between requests
+
+Shop names and hosts come from the scraper modules themselves so the two sides cannot drift.
+Unknown shops are resolved by host, then by URL shape: Shopify-style product URLs get the
+JSON API path, everything else gets the structured-data (JSON-LD / meta availability)
+detail-page path before any full-text "SOLD OUT" scan.
+"""
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypedDict
+from urllib.parse import urlparse
+
+from ..core.types import ScrapedProduct
+from ..scrapers import antenna_america, arome, beervolta, chouseiya, ichigo_ichie, maruho, witch_craft_market
+
+STRATEGY_JSON_API: str = "json_api"
+STRATEGY_LISTING_BULK: str = "listing_bulk"
+STRATEGY_DETAIL_PAGE: str = "detail_page"
+
+ListingScraper = Callable[..., Awaitable[List[ScrapedProduct]]]
+
+DEFAULT_CHARSETS: Tuple[str, ...] = ('utf-8', 'euc-jp', 'shift_jis', 'cp932')
+EUC_JP_CHARSETS: Tuple[str, ...] = ('euc-jp', 'cp932', 'shift_jis', 'utf-8')
+
+# Selectors used by most Japanese EC platforms (Shopify / ColorMe / MakeShop / EC-CUBE)
+DEFAULT_SOLD_OUT_SELECTORS: Tuple[str, ...] = (".soldout", ".sold-out", ".btn-soldout", "img[src*='soldout']")
+DEFAULT_IN_STOCK_SELECTORS: Tuple[str, ...] = ("button[name='add']", "input[name='add']", "button.btn-addcart", "button.cart")
+DEFAULT_PRICE_SELECTORS: Tuple[str, ...] = (".product_price", ".price", "#price")
+
+
+class ShopAdapter(TypedDict):
+    """Declarative description of how to check one shop."""
+    shop: str
+    hosts: Tuple[str, ...]
+    strategy: str
+    charsets: Tuple[str, ...]
+    legacy_ssl: bool
+    impersonate: bool
+    sold_out_selectors: Tuple[str, ...]
+    in_stock_selectors: Tuple[str, ...]
+    price_selectors: Tuple[str, ...]
+    concurrency: int
+    delay: float
+    listing_scraper: Optional[ListingScraper]
+
+
+def make_adapter(shop: str, **overrides: Any) -> ShopAdapter:
+    """Builds an adapter with repo-wide defaults (JSON-LD-aware detail page, 5 parallel, 0.2s delay)."""
+    adapter: Dict[str, Any] = {
+        'shop': shop,
+        'hosts': (),
+        'strategy': STRATEGY_DETAIL_PAGE,
+        'charsets': DEFAULT_CHARSETS,
+        'legacy_ssl': False,
+        'impersonate': False,
+        'sold_out_selectors': DEFAULT_SOLD_OUT_SELECTORS,
+        'in_stock_selectors': DEFAULT_IN_STOCK_SELECTORS,
+        'price_selectors': DEFAULT_PRICE_SELECTORS,
+        'concurrency': 5,
+        'delay': 0.2,
+        'listing_scraper': None,
+    }
+    adapter.update(overrides)
+    return ShopAdapter(**adapter)  # type: ignore[typeddict-item]
+
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+SHOP_ADAPTERS: Dict[str, ShopAdapter] = {
+    adapter['shop']: adapter for adapter in (
+        make_adapter(antenna_america.SHOP_NAME, hosts=(_host(antenna_america.BASE_URL),), strategy=STRATEGY_JSON_API),
+        make_adapter(maruho.SHOP_NAME, hosts=(_host(maruho.BASE_URL),), strategy=STRATEGY_JSON_API),
+        # Shopify behind bot protection: the scraper only gets through with browser TLS impersonation
+        make_adapter(
+            witch_craft_market.SHOP_NAME, hosts=(_host(witch_craft_market.BASE_URL),), strategy=STRATEGY_JSON_API,
+            impersonate=True,
+        ),
+        # EC-CUBE with a weak DH key: legacy SSL ciphers and low parallelism
+        make_adapter(arome.SHOP_NAME, hosts=(_host(arome.BASE_URL),), legacy_ssl=True, concurrency=3, delay=0.5),
+        make_adapter(beervolta.SHOP_NAME, hosts=("beervolta.com",)),
+        # MakeShop / ColorMe listings mark sold-out items directly, so one listing scrape covers all URLs
+        make_adapter(
+            chouseiya.SHOP_NAME, hosts=("beer-chouseiya.shop",), strategy=STRATEGY_LISTING_BULK,
+            charsets=EUC_JP_CHARSETS, listing_scraper=chouseiya.scrape_chouseiya,
+        ),
+        make_adapter(
+            ichigo_ichie.SHOP_NAME, hosts=("151l.shop",), strategy=STRATEGY_LISTING_BULK,
+            charsets=EUC_JP_CHARSETS, listing_scraper=ichigo_ichie.scrape_ichigo_ichie,
+        ),
+    )
+}
+
+_ADAPTERS_BY_HOST: Dict[str, ShopAdapter] = {
+    host: adapter for adapter in SHOP_ADAPTERS.values() for host in adapter['hosts']
+}
+
+# `/products/<handle>` without a file extension (EC-CUBE uses /products/detail.php)
+_SHOPIFY_PRODUCT_PATH = re.compile(r'^/(?:collections/[^/]+/)?products/[^/.]+/?$')
+
+
+def resolve_adapter(shop: Optional[str], url: str = "") -> ShopAdapter:
+    """
+    Returns the adapter for a shop name, falling back to host lookup and then URL-shape inference.
+
+    意図: 新しいショップがレジストリ未登録でも遅い全文スキャンに落ちないよう、
+    Shopify 形式の URL は .json API、その他は構造化データ優先の detail page を既定にする。
+    """
+    if shop and shop in SHOP_ADAPTERS:
+        return SHOP_ADAPTERS[shop]
+
+    host: str = _host(url) if url else ""
+    if host in _ADAPTERS_BY_HOST:
+        return _ADAPTERS_BY_HOST[host]
+    if host.startswith("www.") and host[4:] in _ADAPTERS_BY_HOST:
+        return _ADAPTERS_BY_HOST[host[4:]]
+
+    strategy: str = STRATEGY_JSON_API if url and _SHOPIFY_PRODUCT_PATH.match(urlparse(url).path) else STRATEGY_DETAIL_PAGE
+    return make_adapter(shop or host or "Unknown Shop", hosts=(host,) if host else (), strategy=strategy)
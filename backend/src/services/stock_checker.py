@@ -1,7 +1,13 @@
+import asyncio
 import httpx
+import primp
 from bs4 import BeautifulSoup, Tag
+import re
 import ssl
-from typing import Optional, Dict, List, Tuple, TypedDict, Union
+from typing import Any, Callable, Optional, Dict, List, Tuple, TypedDict, Union
+
+from .shop_registry import ShopAdapter, SHOP_ADAPTERS, STRATEGY_JSON_API, DEFAULT_CHARSETS, resolve_adapter
+from ..scrapers import arome, beervolta, chouseiya, ichigo_ichie
 
 class StockCheckResult(TypedDict):
     """Result structure for stock and price checks."""
@@ -12,28 +18,47 @@ HEADERS: Dict[str, str] = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
-async def fetch_url(client: httpx.AsyncClient, url: str) -> Tuple[Optional[str], int]:
-    """Fetches a URL and returns content and status code."""
+_impersonating_client: Optional[primp.Client] = None
+
+def get_impersonating_client() -> primp.Client:
+    """Process-wide primp client (browser TLS impersonation) for shops with adapter['impersonate']."""
+    global _impersonating_client
+    if _impersonating_client is None:
+        _impersonating_client = primp.Client(impersonate="random", follow_redirects=True, timeout=15)
+    return _impersonating_client
+
+async def _get(client: httpx.AsyncClient, url: str, adapter: Optional[ShopAdapter]) -> Any:
+    """
+    GET through the shared httpx client, or through the primp client when the adapter requires impersonation.
+    primp is blocking, so it runs in a worker thread; our User-Agent is not sent, it would break the fingerprint.
+    Both responses expose status_code / content / json().
+    """
+    if adapter and adapter['impersonate']:
+        return await asyncio.to_thread(get_impersonating_client().get, url)
+    return await client.get(url, headers=HEADERS, timeout=15.0)
+
+async def fetch_url(client: httpx.AsyncClient, url: str, adapter: Optional[ShopAdapter] = None) -> Tuple[Optional[str], int]:
+    """Fetches a URL and returns content and status code, decoding with the shop's charsets."""
     try:
-        # Create custom SSL context for legacy support (Arome)
-        verify_ssl: Union[bool, ssl.SSLContext] = True
-        try:
-            ctx = ssl.create_default_context()
-            ctx.set_ciphers('DEFAULT@SECLEVEL=1')
-            verify_ssl = ctx
-        except Exception:
-            pass # Fallback to default verification if this fails
-            
-        if "arome.jp" in url:
+        legacy_ssl: bool = adapter['legacy_ssl'] if adapter else "arome.jp" in url
+        if legacy_ssl:
+            # Create custom SSL context for legacy support (Arome)
+            verify_ssl: Union[bool, ssl.SSLContext] = True
+            try:
+                ctx = ssl.create_default_context()
+                ctx.set_ciphers('DEFAULT@SECLEVEL=1')
+                verify_ssl = ctx
+            except Exception:
+                pass # Fallback to default verification if this fails
             async with httpx.AsyncClient(verify=verify_ssl, timeout=15.0, follow_redirects=True) as local_client:
                 response: httpx.Response = await local_client.get(url, headers=HEADERS)
         else:
-            # Use shared client
-            response = await client.get(url, headers=HEADERS, timeout=15.0)
+            # Use shared client (or the impersonating one)
+            response = await _get(client, url, adapter)
 
         # Handle encoding
         content: Optional[str] = None
-        encodings: List[str] = ['utf-8', 'euc-jp', 'shift_jis', 'cp932']
+        encodings: Tuple[str, ...] = adapter['charsets'] if adapter else DEFAULT_CHARSETS
         
         for enc in encodings:
             try:
@@ -166,12 +191,12 @@ def extract_price_ichigo_ichie(soup: BeautifulSoup) -> Optional[str]:
         return text
     return None
 
-async def check_stock_shopify(client: httpx.AsyncClient, url: str) -> StockCheckResult:
-    """Checks stock and price for Shopify-based sites (Antenna America, Maruho Saketen) via .json endpoint."""
+async def check_stock_shopify(client: httpx.AsyncClient, url: str, adapter: Optional[ShopAdapter] = None) -> StockCheckResult:
+    """Checks stock and price for Shopify-based sites (Antenna America, Maruho Saketen, ...) via .json endpoint."""
     result: StockCheckResult = {"stock_status": "Unknown", "price": None}
     json_url = f"{url.rstrip('/')}.json"
     try:
-        response = await client.get(json_url, headers=HEADERS, timeout=15.0)
+        response = await _get(client, json_url, adapter)
         if response.status_code == 404:
             result["stock_status"] = "Dead Link"
             return result
@@ -189,7 +214,7 @@ async def check_stock_shopify(client: httpx.AsyncClient, url: str) -> StockCheck
             result["stock_status"] = "In Stock" if in_stock else "Sold Out"
         else:
             # Fallback to HTML DOM check if json doesn't expose availability
-            content, status = await fetch_url(client, url)
+            content, status = await fetch_url(client, url, adapter)
             if status == 404:
                 result["stock_status"] = "Dead Link"
                 return result
@@ -215,20 +240,75 @@ async def check_stock_shopify(client: httpx.AsyncClient, url: str) -> StockCheck
         result["stock_status"] = "Error"
     return result
 
-async def check_stock_for_url(client: httpx.AsyncClient, url: str, shop: str) -> StockCheckResult:
+_AVAILABILITY_IN_STOCK = ("instock", "limitedavailability", "preorder", "in stock")
+_AVAILABILITY_SOLD_OUT = ("outofstock", "soldout", "discontinued", "out of stock")
+
+def _classify_availability(value: str) -> Optional[str]:
+    value = value.lower().rsplit("/", 1)[-1]
+    if any(token in value for token in _AVAILABILITY_SOLD_OUT):
+        return "Sold Out"
+    if any(token in value for token in _AVAILABILITY_IN_STOCK):
+        return "In Stock"
+    return None
+
+def check_stock_structured(soup: BeautifulSoup) -> Optional[str]:
     """
-    Main entry point for checking stock and price of a product URL.
+    Reads schema.org availability from meta tags / JSON-LD, if the page exposes it.
+    Most EC platforms emit this, so it is the cheapest reliable signal for shops without a bespoke parser.
     """
+    for meta in soup.select("meta[property='product:availability'], meta[property='og:availability'], [itemprop='availability']"):
+        value = str(meta.get("content") or meta.get("href") or "")
+        status = _classify_availability(value) if value else None
+        if status:
+            return status
+
+    for script in soup.select("script[type='application/ld+json']"):
+        raw = script.string or script.get_text()
+        match = re.search(r'"availability"\s*:\s*"([^"]+)"', raw or "")
+        if match:
+            status = _classify_availability(match.group(1))
+            if status:
+                return status
+    return None
+
+def check_stock_generic(soup: BeautifulSoup, adapter: ShopAdapter) -> str:
+    """Checks stock using structured data, then the adapter's declared selectors, then a text scan."""
+    structured = check_stock_structured(soup)
+    if structured:
+        return structured
+
+    if any(soup.select_one(sel) for sel in adapter['sold_out_selectors']):
+        return "Sold Out"
+    if any(soup.select_one(sel) for sel in adapter['in_stock_selectors']):
+        return "In Stock"
+
+    text: str = soup.get_text()
+    if "SOLD OUT" in text.upper() or "売り切れ" in text or "完売" in text:
+        return "Sold Out"
+    return "In Stock"
+
+def extract_price_generic(soup: BeautifulSoup, adapter: ShopAdapter) -> Optional[str]:
+    """Extracts a price from the adapter's declared price selectors."""
+    for sel in adapter['price_selectors']:
+        price_el: Optional[Tag] = soup.select_one(sel)
+        if price_el:
+            m = re.search(r'([1-9][0-9,]+)', price_el.get_text(strip=True))
+            if m:
+                return f"{m.group(1).replace(',', '')}円"
+    return None
+
+# Hand-written detail page parsers for shops whose markup needs more than selectors
+_DETAIL_PARSERS: Dict[str, Tuple[Callable[[BeautifulSoup], str], Callable[[BeautifulSoup], Optional[str]]]] = {
+    arome.SHOP_NAME: (check_stock_arome, extract_price_arome),
+    beervolta.SHOP_NAME: (check_stock_beervolta, extract_price_beervolta),
+    chouseiya.SHOP_NAME: (check_stock_chouseiya, extract_price_chouseiya),
+    ichigo_ichie.SHOP_NAME: (check_stock_ichigo_ichie, extract_price_ichigo_ichie),
+}
+
+async def check_stock_detail_page(client: httpx.AsyncClient, url: str, adapter: ShopAdapter) -> StockCheckResult:
+    """Fetches the product detail page and parses it with the shop's parser (or the generic one)."""
     result: StockCheckResult = {"stock_status": "Unknown", "price": None}
-    
-    if not url: 
-        return result
-    
-    # Shopify based shops directly use fast .json check
-    if shop in ("Antenna America", "マルホ酒店"):
-        return await check_stock_shopify(client, url)
-    
-    content, status = await fetch_url(client, url)
+    content, status = await fetch_url(client, url, adapter)
     
     # If the product page was removed (404 Not Found), treat it as Dead Link
     if status == 404:
@@ -240,24 +320,29 @@ async def check_stock_for_url(client: httpx.AsyncClient, url: str, shop: str) ->
         return result
         
     soup: BeautifulSoup = BeautifulSoup(content, 'lxml')
-    
-    if shop == "アローム":
-        result["stock_status"] = check_stock_arome(soup)
-        result["price"] = extract_price_arome(soup)
-    elif shop == "BEER VOLTA":
-        result["stock_status"] = check_stock_beervolta(soup)
-        result["price"] = extract_price_beervolta(soup)
-    elif shop == "ちょうせいや":
-        result["stock_status"] = check_stock_chouseiya(soup)
-        result["price"] = extract_price_chouseiya(soup)
-    elif shop == "一期一会～る":
-        result["stock_status"] = check_stock_ichigo_ichie(soup)
-        result["price"] = extract_price_ichigo_ichie(soup)
+    parsers = _DETAIL_PARSERS.get(adapter['shop'])
+    if parsers:
+        check_fn, price_fn = parsers
+        result["stock_status"] = check_fn(soup)
+        result["price"] = price_fn(soup)
     else:
-        # Default fallback
-        if "SOLD OUT" in soup.get_text().upper() or "売り切れ" in soup.get_text() or "完売" in soup.get_text():
-            result["stock_status"] = "Sold Out"
-        else:
-            result["stock_status"] = "In Stock"
-    
+        result["stock_status"] = check_stock_generic(soup, adapter)
+        result["price"] = extract_price_generic(soup, adapter)
     return result
+
+async def check_stock_for_url(client: httpx.AsyncClient, url: str, shop: str) -> StockCheckResult:
+    """
+    Main entry point for checking stock and price of a product URL.
+    Dispatch is driven by the shop adapter registry (see services/shop_registry.py);
+    listing_bulk shops are batched by update-stock and fall back to the detail page here.
+    """
+    if not url: 
+        return {"stock_status": "Unknown", "price": None}
+    
+    adapter: ShopAdapter = resolve_adapter(shop, url)
+    if adapter['strategy'] == STRATEGY_JSON_API:
+        result: StockCheckResult = await check_stock_shopify(client, url, adapter)
+        # Inferred (unregistered) Shopify-looking URLs may not be Shopify after all
+        if result["stock_status"] != "Error" or adapter['shop'] in SHOP_ADAPTERS:
+            return result
+    return await check_stock_detail_page(client, url, adapter)
@@ -1,18 +1,33 @@
 import os
 import re
+import time
+from datetime import datetime, timezone
 from typing import List, Dict, Optional, Any
+from backend.src.core.aho_corasick import AhoCorasick
+from backend.src.core.config import settings
 from backend.src.core.db import get_supabase_client
 
 class BreweryManager:
     """
     Manages brewery database in Supabase.
     Provides brewery lookup and matching functionality.
+
+    意図: 検索パスごと / コンポーネントごとにインスタンスを作ると、そのたびに breweries テーブルを
+    全件ロードして索引を作り直すことになる。プロセス内では get_brewery_manager() の共有インスタンスを
+    依存性注入で渡し、一度だけロードしたあとは updated_at による差分取得と learn_brewery_alias の
+    インプレース更新で最新に保つ。`version` は索引が変わるたびに増え、派生索引の再構築判定に使う。
     """
     
-    def __init__(self):
-        self.supabase = get_supabase_client()
+    def __init__(self, supabase: Optional[Any] = None):
+        self.supabase = supabase or get_supabase_client()
         self.breweries: List[Dict] = []
         self.brewery_index: Dict[str, Dict] = {}
+        self.last_updated_at: Optional[str] = None
+        self.refreshed_at: float = 0.0
+        self.version: int = 0
+        self._matcher: Optional[AhoCorasick] = None
+        self._matcher_keys: List[str] = []
+        self._matcher_state: tuple = ()
         self.load_breweries()
     
     def load_breweries(self) -> None:
@@ -21,14 +36,60 @@ class BreweryManager:
             response = self.supabase.table('breweries').select('*').limit(2000).execute()
             self.breweries = response.data
             self._build_index()
+            self._track_updated_at(self.breweries)
             print(f"[BreweryManager] Loaded {len(self.breweries)} breweries from Supabase")
         except Exception as e:
             print(f"[BreweryManager] Error loading breweries: {e}")
             self.breweries = []
-    
+        self.refreshed_at = time.monotonic()
+
+    def refresh(self) -> int:
+        """
+        Incremental refresh: fetches only rows whose updated_at is newer than the newest row seen so far
+        and merges them in place (existing dicts are updated, so references held elsewhere stay current).
+        Returns the number of changed rows.
+        """
+        if self.last_updated_at is None:
+            self.load_breweries()
+            return len(self.breweries)
+        try:
+            response = self.supabase.table('breweries').select('*').gt('updated_at', self.last_updated_at).execute()
+            rows: List[Dict] = response.data or []
+        except Exception as e:
+            print(f"[BreweryManager] Error refreshing breweries: {e}")
+            return 0
+        self.refreshed_at = time.monotonic()
+        if not rows:
+            return 0
+
+        by_id: Dict[Any, Dict] = {b.get('id'): b for b in self.breweries}
+        for row in rows:
+            existing = by_id.get(row.get('id'))
+            if existing is not None:
+                existing.clear()
+                existing.update(row)
+            else:
+                self.breweries.append(row)
+        self._build_index()
+        self._track_updated_at(rows)
+        print(f"[BreweryManager] Refreshed {len(rows)} changed breweries")
+        return len(rows)
+
+    def refresh_if_stale(self, max_age: float) -> int:
+        """Runs refresh() when the last load/refresh is older than `max_age` seconds."""
+        if time.monotonic() - self.refreshed_at < max_age:
+            return 0
+        return self.refresh()
+
+    def _track_updated_at(self, rows: List[Dict]) -> None:
+        # ISO 8601 timestamps from PostgREST compare correctly as strings
+        stamps = [r['updated_at'] for r in rows if r.get('updated_at')]
+        if stamps:
+            self.last_updated_at = max([self.last_updated_at or '', *stamps])
 
     def _build_index(self) -> None:
         """Build index for fast brewery lookup."""
+        self.version += 1
         self.brewery_index = {}
         for brewery in self.breweries:
             if brewery.get('name_en'):
@@ -75,6 +136,18 @@ class BreweryManager:
         
         return list(set([a for a in aliases if a]))
     
+    def _get_matcher(self) -> AhoCorasick:
+        """
+        Compiles the index keys into an Aho-Corasick automaton, only when the index has changed.
+        Keys are stored longest first, so a pattern's position doubles as its match priority.
+        """
+        state = (self.version, id(self.brewery_index), len(self.brewery_index))
+        if self._matcher is None or state != self._matcher_state:
+            self._matcher_keys = sorted(self.brewery_index.keys(), key=len, reverse=True)
+            self._matcher = AhoCorasick(self._matcher_keys)
+            self._matcher_state = state
+        return self._matcher
+
     def find_breweries_in_text(self, text: str) -> List[Dict]:
         """Search for all known breweries in product name."""
         if not text:
@@ -84,11 +157,12 @@ class BreweryManager:
         found_breweries = []
         found_keys = set()
         
-        # Sort keys by length descending to catch longer matches first (e.g. "West Coast Brewing" before "West Coast")
-        sorted_keys = sorted(self.brewery_index.keys(), key=len, reverse=True)
-        
-        for key in sorted_keys:
-            if key in text_lower:
+        # 意図: 全キーを 1 回の走査で見つけ (Aho-Corasick)、見つかったキーだけを長い順に処理する。
+        # Longer matches still come first (e.g. "West Coast Brewing" before "West Coast")
+        matcher = self._get_matcher()
+        for idx in sorted(matcher.find_all(text_lower)):
+            key = self._matcher_keys[idx]
+            if key in self.brewery_index:
                 brewery = self.brewery_index[key]
                 # Avoid adding same brewery multiple times via different aliases
                 if brewery['name_en'] not in found_keys:
@@ -193,10 +267,13 @@ class BreweryManager:
             
         if not payload:
             return False
+        # Other processes pick the change up through their incremental refresh
+        payload['updated_at'] = datetime.now(timezone.utc).isoformat()
             
         try:
             self.supabase.table('breweries').update(payload).eq('id', target_brewery['id']).execute()
             self.brewery_index[alias_lower] = target_brewery
+            self.version += 1
             print(f"[BreweryManager] 📈 Self-Healing Dict: Learned new alias '{new_alias}' for brewery '{target_brewery.get('name_en')}'")
             return True
         except Exception as e:
@@ -214,6 +291,23 @@ class BreweryManager:
         }
 
 
+_shared_manager: Optional[BreweryManager] = None
+
+
+def get_brewery_manager() -> BreweryManager:
+    """
+    Returns the process-wide brewery registry, loading it on first use.
+    Later calls refresh it incrementally once it is older than BREWERY_REGISTRY_REFRESH_SECONDS.
+    Components take the registry as a constructor / function argument and fall back to this one.
+    """
+    global _shared_manager
+    if _shared_manager is None:
+        _shared_manager = BreweryManager()
+    else:
+        _shared_manager.refresh_if_stale(settings.BREWERY_REGISTRY_REFRESH_SECONDS)
+    return _shared_manager
+
+
 if __name__ == "__main__":
     manager = BreweryManager()
     stats = manager.get_stats()
@@ -0,0 +1,243 @@
+"""
+Untappd JSON API (v4) backend.
+
+Why: everything else in this package scrapes HTML and depends on CSS selectors (`.name h1`,
+`.details .num`, `.beer-item`, ...), which is slow to parse and breaks whenever the markup changes.
+With API credentials, the same data comes back as JSON from `api.untappd.com`.
+How: http_client.py keeps its public function signatures. When UNTAPPD_BACKEND=api and credentials are
+set, each public function first asks this module and converts the JSON into the same TypedDicts the
+HTML parsers return:
+- beer info            GET /beer/info/{bid}              -> UntappdBeerDetails
+- brewery info         GET /brewery/info/{brewery_id}    -> UntappdBreweryDetails
+- brewery beer list    GET /brewery/beer_list/{id}       -> List[UntappdCatalogBeer]
+- beer / brewery search GET /search/beer, /search/brewery
+Every function returns None when the API cannot answer: no numeric id in the URL (vanity brewery URLs),
+an error status, or exhausted quota. The caller then falls back to the HTML path.
+Requests go through their own lane (`untappd_api`), separate from the HTML lane, because the API has its own quota.
+"""
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ...core.config import settings
+from ...core.lanes import LANE_UNTAPPD_API, get_lane
+from ...core.types import UntappdBeerDetails, UntappdBreweryDetails, UntappdCatalogBeer
+
+logger = logging.getLogger(__name__)
+
+BACKEND_HTML: str = "html"
+BACKEND_API: str = "api"
+
+_BEER_ID = re.compile(r'/b/[^/]+/(\d+)')
+_BREWERY_ID = re.compile(r'/w/[^/]+/(\d+)')
+
+_api_client: Optional[httpx.AsyncClient] = None
+
+
+def api_enabled() -> bool:
+    return (
+        settings.UNTAPPD_BACKEND == BACKEND_API
+        and bool(settings.UNTAPPD_API_CLIENT_ID)
+        and bool(settings.UNTAPPD_API_CLIENT_SECRET)
+    )
+
+
+def get_api_client() -> httpx.AsyncClient:
+    global _api_client
+    if _api_client is None or _api_client.is_closed:
+        _api_client = httpx.AsyncClient(
+            base_url=settings.UNTAPPD_API_BASE_URL.rstrip('/'),
+            timeout=httpx.Timeout(15.0, connect=10.0),
+            headers={"User-Agent": f"beer_info ({settings.UNTAPPD_API_CLIENT_ID})"},
+        )
+    return _api_client
+
+
+async def close_api_client() -> None:
+    global _api_client
+    if _api_client is not None and not _api_client.is_closed:
+        await _api_client.aclose()
+        _api_client = None
+
+
+def beer_id_from_url(url: str) -> Optional[str]:
+    m = _BEER_ID.search(url or "")
+    return m.group(1) if m else None
+
+
+def brewery_id_from_url(url: str) -> Optional[str]:
+    m = _BREWERY_ID.search(url or "")
+    return m.group(1) if m else None
+
+
+def _beer_url(beer: Dict[str, Any]) -> str:
+    return f"https://untappd.com/b/{beer.get('beer_slug', '')}/{beer.get('bid')}"
+
+
+def _brewery_url(brewery: Dict[str, Any]) -> str:
+    return f"https://untappd.com/w/{brewery.get('brewery_slug', '')}/{brewery.get('brewery_id')}"
+
+
+def _abv(value: Any) -> Optional[str]:
+    return f"{value}%" if value not in (None, "") else None
+
+
+def _ibu(value: Any) -> str:
+    return str(value) if value else "N/A"
+
+
+def _rating(value: Any) -> Optional[str]:
+    return f"{float(value):.2f}" if value not in (None, "") else None
+
+
+async def _api_get(path: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """GETs an API path and returns the `response` object, or None on any error."""
+    query: Dict[str, Any] = dict(params or {})
+    query.update(client_id=settings.UNTAPPD_API_CLIENT_ID, client_secret=settings.UNTAPPD_API_CLIENT_SECRET)
+    try:
+        async with get_lane(LANE_UNTAPPD_API).slot():
+            resp: httpx.Response = await get_api_client().get(path, params=query)
+    except Exception as e:
+        logger.warning(f"  ⚠️ [Untappd API] {path} failed: {e}")
+        return None
+    if resp.status_code != 200:
+        logger.warning(f"  ⚠️ [Untappd API] {path} returned {resp.status_code}; using HTML backend")
+        return None
+    remaining: Optional[str] = resp.headers.get("X-Ratelimit-Remaining")
+    if remaining is not None and remaining.isdigit() and int(remaining) < 5:
+        logger.warning(f"  ⚠️ [Untappd API] Only {remaining} requests left in the current hour")
+    try:
+        body: Dict[str, Any] = resp.json()
+    except ValueError:
+        return None
+    response = body.get("response")
+    return response if isinstance(response, dict) else None
+
+
+def _catalog_item(beer: Dict[str, Any], brewery: Dict[str, Any]) -> UntappdCatalogBeer:
+    item: UntappdCatalogBeer = {
+        'url': _beer_url(beer),
+        'beer_name': beer.get('beer_name', ''),
+        'brewery_name': brewery.get('brewery_name', ''),
+        'style': beer.get('beer_style', ''),
+        'ibu': _ibu(beer.get('beer_ibu')),
+        'rating_count': str(beer.get('rating_count', 0)),
+    }
+    abv = _abv(beer.get('beer_abv'))
+    if abv:
+        item['abv'] = abv
+    rating = _rating(beer.get('rating_score'))
+    if rating:
+        item['rating'] = rating
+    return item
+
+
+async def get_beer_details(url: str) -> Optional[UntappdBeerDetails]:
+    bid: Optional[str] = beer_id_from_url(url)
+    if not bid:
+        return None
+    response = await _api_get(f"/beer/info/{bid}", {"compact": "true"})
+    beer: Optional[Dict[str, Any]] = (response or {}).get('beer')
+    if not beer:
+        return None
+    brewery: Dict[str, Any] = beer.get('brewery') or {}
+    details: UntappdBeerDetails = {
+        'untappd_beer_name': beer.get('beer_name', ''),
+        'untappd_style': beer.get('beer_style', ''),
+        'untappd_ibu': _ibu(beer.get('beer_ibu')),
+        'untappd_rating_count': str(beer.get('rating_count', 0)),
+        'untappd_fetched_at': datetime.now().isoformat(),
+    }
+    if brewery:
+        details['untappd_brewery_name'] = brewery.get('brewery_name', '')
+        details['untappd_brewery_url'] = _brewery_url(brewery)
+    abv = _abv(beer.get('beer_abv'))
+    if abv:
+        details['untappd_abv'] = abv
+    rating = _rating(beer.get('rating_score'))
+    if rating:
+        details['untappd_rating'] = rating
+    if beer.get('beer_label'):
+        details['untappd_label'] = beer['beer_label']
+    return details
+
+
+async def get_brewery_details(url: str) -> Optional[UntappdBreweryDetails]:
+    brewery_id: Optional[str] = brewery_id_from_url(url)
+    if not brewery_id:
+        return None
+    response = await _api_get(f"/brewery/info/{brewery_id}", {"compact": "true"})
+    brewery: Optional[Dict[str, Any]] = (response or {}).get('brewery')
+    if not brewery:
+        return None
+    details: UntappdBreweryDetails = {'brewery_name': brewery.get('brewery_name', '')}
+    location: Dict[str, Any] = brewery.get('location') or {}
+    place: str = ", ".join(p for p in (location.get('brewery_city'), location.get('brewery_state')) if p)
+    country: str = brewery.get('country_name', '')
+    if place or country:
+        details['location'] = f"{place} {country}".strip() if place else country
+    if brewery.get('brewery_type'):
+        details['brewery_type'] = brewery['brewery_type']
+    if brewery.get('brewery_label'):
+        details['logo_url'] = brewery['brewery_label']
+    website: Optional[str] = (brewery.get('contact') or {}).get('url')
+    if website:
+        details['website'] = website
+    stats: Dict[str, Any] = brewery.get('stats') or {}
+    details['stats'] = {
+        key: str(stats[src]) for key, src in (
+            ('total_beers', 'beer_count'), ('unique_users', 'user_count'),
+            ('monthly_checkins', 'monthly_count'), ('rating_count', 'total_count'),
+        ) if src in stats
+    }
+    details['fetched_at'] = datetime.now().isoformat()
+    return details
+
+
+async def get_brewery_beer_list(brewery_url: str, offset: int = 0, limit: int = 25) -> Optional[List[UntappdCatalogBeer]]:
+    """One page of a brewery's beers, newest first (same contract as http_client.fetch_brewery_beer_list)."""
+    brewery_id: Optional[str] = brewery_id_from_url(brewery_url)
+    if not brewery_id:
+        return None
+    response = await _api_get(f"/brewery/beer_list/{brewery_id}", {"offset": offset, "limit": limit, "sort": "date"})
+    if response is None:
+        return None
+    brewery: Dict[str, Any] = response.get('brewery') or {}
+    items: List[Dict[str, Any]] = (response.get('beers') or {}).get('items') or []
+    return [_catalog_item(i.get('beer') or {}, i.get('brewery') or brewery) for i in items if (i.get('beer') or {}).get('bid')]
+
+
+async def search_brewery_beers(brewery_url: str, query: str, limit: int = 50) -> Optional[List[UntappdCatalogBeer]]:
+    """
+    Beer search restricted to one brewery (the API has no in-brewery search, so results are filtered by brewery id).
+    None when none of the global top `limit` results is from the brewery: for generic queries ("Hazy", "2")
+    that is no evidence the brewery has no such beer, so the caller falls back to the HTML in-brewery search.
+    """
+    brewery_id: Optional[str] = brewery_id_from_url(brewery_url)
+    if not brewery_id:
+        return None
+    response = await _api_get("/search/beer", {"q": query, "limit": limit})
+    if response is None:
+        return None
+    items: List[Dict[str, Any]] = (response.get('beers') or {}).get('items') or []
+    beers: List[UntappdCatalogBeer] = [
+        _catalog_item(i.get('beer') or {}, i.get('brewery') or {})
+        for i in items
+        if str((i.get('brewery') or {}).get('brewery_id')) == brewery_id and (i.get('beer') or {}).get('bid')
+    ]
+    return beers or None
+
+
+async def search_breweries(query: str, limit: int = 5) -> Optional[List[Dict[str, str]]]:
+    """Brewery search: [{'name', 'url'}] in API relevance order."""
+    response = await _api_get("/search/brewery", {"q": query, "limit": limit})
+    if response is None:
+        return None
+    items: List[Dict[str, Any]] = (response.get('brewery') or {}).get('items') or []
+    return [
+        {'name': b.get('brewery_name', ''), 'url': _brewery_url(b)}
+        for b in (i.get('brewery') or {} for i in items) if b.get('brewery_id')
+    ]
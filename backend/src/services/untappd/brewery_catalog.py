@@ -0,0 +1,318 @@
+"""
+Local per-brewery beer catalog.
+
+Why: Stage 2 of `_get_untappd_url_single` issued up to 1 + 1 + 6 brewery-scoped searches per beer
+(main name, Japanese name, token fallbacks), each a network round trip, and Untappd's in-brewery
+search is poor enough that the token fallbacks were needed in the first place.
+How: each brewery's full beer list (`/w/<slug>/beer?sort=created_at_desc`) is crawled once and kept
+in a SQLite file next to the page cache. Candidate generation and score_beer_match then run locally
+against every beer of the brewery, which covers what the name / JP / token searches were trying to find.
+- Refresh is incremental: the list is sorted newest first, so a stale catalog only re-reads pages
+  until it reaches a beer it already knows.
+- A crawl that stops at UNTAPPD_CATALOG_MAX_PAGES (or whose paging cannot be trusted) is marked
+  incomplete; the searcher then still falls back to the network search when the local list finds nothing.
+- A missing or stale catalog whose refresh fails yields None, so the searcher keeps using the
+  network search for that brewery.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ...core.config import settings
+from ...core.types import UntappdBreweryCatalog, UntappdCatalogBeer, UntappdSearchCandidate
+from .candidate import Candidate
+from .http_client import brewery_base_url, fetch_brewery_beer_list
+from .page_cache import normalize_cache_key
+from .single_flight import single_flight
+from .validators import score_beer_matches, validate_brewery_match
+
+logger = logging.getLogger(__name__)
+
+# Untappd shows 25 beers per brewery list page
+PAGE_SIZE: int = 25
+
+
+def catalog_key(brewery_url: str) -> str:
+    return normalize_cache_key(brewery_base_url(brewery_url))
+
+
+class BreweryCatalogStore:
+    """SQLite-backed store of brewery beer lists. Thread-safe; all operations are local I/O."""
+
+    def __init__(self, path: str, ttl: float, max_pages: int, enabled: bool = True):
+        self.path = path
+        self.ttl = ttl
+        self.max_pages = max_pages
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS breweries ("
+                " key TEXT PRIMARY KEY, fetched_at REAL NOT NULL, complete INTEGER NOT NULL DEFAULT 0)"
+            )
+            # seq grows with created_at: newer beers always get a higher seq than the ones already stored
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS beers ("
+                " brewery_key TEXT NOT NULL, url TEXT NOT NULL, seq INTEGER NOT NULL, data TEXT NOT NULL,"
+                " PRIMARY KEY (brewery_key, url))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def state(self, brewery_url: str) -> Optional[Tuple[float, bool]]:
+        """Returns (fetched_at, complete) or None when the brewery was never crawled."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT fetched_at, complete FROM breweries WHERE key = ?", (catalog_key(brewery_url),)
+            ).fetchone()
+        return (row[0], bool(row[1])) if row else None
+
+    def is_fresh(self, brewery_url: str) -> bool:
+        state = self.state(brewery_url)
+        return state is not None and time.time() - state[0] <= self.ttl
+
+    def load(self, brewery_url: str) -> Optional[UntappdBreweryCatalog]:
+        """Returns the stored catalog (newest beer first) regardless of age, or None."""
+        state = self.state(brewery_url)
+        if state is None:
+            return None
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT data FROM beers WHERE brewery_key = ? ORDER BY seq DESC", (catalog_key(brewery_url),)
+            ).fetchall()
+        return {
+            'brewery_url': brewery_base_url(brewery_url),
+            'beers': [json.loads(r[0]) for r in rows],
+            'fetched_at': state[0],
+            'complete': state[1],
+        }
+
+    def known_urls(self, brewery_url: str) -> Set[str]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT url FROM beers WHERE brewery_key = ?", (catalog_key(brewery_url),)
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def save(self, brewery_url: str, beers: List[UntappdCatalogBeer], complete: bool, replace: bool = False) -> None:
+        """
+        Stores `beers` (newest first) on top of the existing list and stamps the crawl time.
+        Beers that are already stored keep their position but get their data (rating etc.) updated.
+        With `replace`, the stored list is dropped first (a crawl that re-read the list from the top).
+        """
+        key: str = catalog_key(brewery_url)
+        with self._lock:
+            conn = self._connect()
+            if replace:
+                conn.execute("DELETE FROM beers WHERE brewery_key = ?", (key,))
+            top: int = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM beers WHERE brewery_key = ?", (key,)
+            ).fetchone()[0]
+            known: Set[str] = {r[0] for r in conn.execute("SELECT url FROM beers WHERE brewery_key = ?", (key,))}
+            new_beers = [b for b in beers if b['url'] not in known]
+            rows = [(key, b['url'], top + len(new_beers) - i, json.dumps(b, ensure_ascii=False)) for i, b in enumerate(new_beers)]
+            conn.executemany("INSERT INTO beers (brewery_key, url, seq, data) VALUES (?, ?, ?, ?)", rows)
+            conn.executemany(
+                "UPDATE beers SET data = ? WHERE brewery_key = ? AND url = ?",
+                [(json.dumps(b, ensure_ascii=False), key, b['url']) for b in beers if b['url'] in known],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO breweries (key, fetched_at, complete) VALUES (?, ?, ?)",
+                (key, time.time(), 1 if complete else 0),
+            )
+            conn.commit()
+
+    def absorb(self, brewery_url: str, beers: List[UntappdCatalogBeer], reached_end: bool) -> None:
+        """
+        Stores list pages read from the top (offset 0) by another caller, e.g. the bulk refresh.
+        The result stays complete if the pages reached the end of the list, or reached a beer that a
+        complete catalog already had.
+        """
+        previous = self.state(brewery_url)
+        known: Set[str] = self.known_urls(brewery_url)
+        if previous and previous[1]:
+            self.save(brewery_url, beers, complete=reached_end or bool(known & {b['url'] for b in beers}))
+        else:
+            # A partial catalog cannot tell where new rows belong; keep whichever list is longer
+            self.save(brewery_url, beers, complete=reached_end, replace=len(beers) >= len(known))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+brewery_catalog: BreweryCatalogStore = BreweryCatalogStore(
+    path=settings.UNTAPPD_CATALOG_PATH,
+    ttl=settings.UNTAPPD_CATALOG_TTL_HOURS * 3600,
+    max_pages=settings.UNTAPPD_CATALOG_MAX_PAGES,
+    enabled=settings.UNTAPPD_CATALOG_ENABLED,
+)
+
+
+async def crawl_brewery_catalog(brewery_url: str, store: BreweryCatalogStore) -> bool:
+    """
+    Crawls (or incrementally refreshes) one brewery's beer list into `store`.
+    Returns False when the first page could not be fetched.
+
+    意図: 一覧は created_at の新しい順なので、既知のビールが現れたページでそれ以降は取得済みと判断して打ち切る。
+    `start` ページングが無視されて同じページが返った場合は完全性を保証できないため incomplete として保存する。
+    """
+    known: Set[str] = store.known_urls(brewery_url)
+    previous = store.state(brewery_url)
+    # Only a complete catalog can stop at the first known beer; a partial one is re-read from the top
+    incremental: bool = bool(previous and previous[1])
+    collected: List[UntappdCatalogBeer] = []
+    seen: Set[str] = set()
+    complete: bool = False
+
+    for page in range(store.max_pages):
+        items = await fetch_brewery_beer_list(brewery_url, offset=page * PAGE_SIZE)
+        if items is None:
+            if page == 0:
+                return False
+            break
+        fresh = [i for i in items if i['url'] not in seen]
+        for i in fresh:
+            seen.add(i['url'])
+        collected.extend(fresh)
+        if len(items) < PAGE_SIZE:
+            complete = True
+            break
+        if incremental and any(i['url'] in known for i in items):
+            complete = True
+            break
+        if not fresh:
+            break
+
+    store.save(brewery_url, collected, complete, replace=not incremental)
+    logger.info(
+        f"  📚 [Catalog] {brewery_base_url(brewery_url)}: {len([c for c in collected if c['url'] not in known])} new / "
+        f"{len(store.known_urls(brewery_url))} beers ({'complete' if complete else 'partial'})"
+    )
+    return True
+
+
+@single_flight(lambda brewery_url, store=None: catalog_key(brewery_url or ""))
+async def get_brewery_catalog(
+    brewery_url: str, store: Optional[BreweryCatalogStore] = None
+) -> Optional[UntappdBreweryCatalog]:
+    """
+    Returns a fresh catalog for the brewery, crawling or refreshing it first when needed.
+    None means "no usable catalog" (disabled, or missing / stale and the refresh failed):
+    the caller should fall back to the network search.
+    """
+    store = store or brewery_catalog
+    if not brewery_url or not store.enabled:
+        return None
+    try:
+        if not store.is_fresh(brewery_url):
+            if not await crawl_brewery_catalog(brewery_url, store):
+                logger.info(f"  [Catalog] Could not refresh {brewery_url}; using network search")
+                return None
+        return store.load(brewery_url)
+    except sqlite3.Error as e:
+        logger.warning(f"  [Catalog] Store error for {brewery_url}: {e}")
+        return None
+
+
+def beer_id_key(url: str) -> str:
+    """Matches Untappd beer URLs by their numeric id (`/b/<slug>/<id>`) so renamed slugs still match."""
+    last: str = normalize_cache_key(url).rsplit('/', 1)[-1]
+    return last if last.isdigit() else normalize_cache_key(url)
+
+
+async def scan_brewery_beer_list(
+    brewery_url: str,
+    wanted_urls: Iterable[str],
+    max_pages: Optional[int] = None,
+    store: Optional[BreweryCatalogStore] = None,
+) -> Dict[str, UntappdCatalogBeer]:
+    """
+    Pages through a brewery's beer list until every URL in `wanted_urls` has been seen
+    (or the list / page budget ends) and returns {wanted_url: list row}.
+
+    意図: 一覧ページは 1 リクエストで最大 25 本分の rating / ABV / IBU を返すため、
+    ビールごとに詳細ページを取得するより桁違いに少ないリクエストで済む。読んだページはカタログにも反映する。
+    """
+    store = store or brewery_catalog
+    pending: Dict[str, str] = {beer_id_key(u): u for u in wanted_urls}
+    found: Dict[str, UntappdCatalogBeer] = {}
+    pages_read: List[UntappdCatalogBeer] = []
+    reached_end: bool = False
+
+    for page in range(max_pages or store.max_pages):
+        items = await fetch_brewery_beer_list(brewery_url, offset=page * PAGE_SIZE)
+        if items is None:
+            break
+        before: int = len(pages_read)
+        known_on_page: Set[str] = {b['url'] for b in pages_read}
+        pages_read.extend(i for i in items if i['url'] not in known_on_page)
+        for item in items:
+            wanted = pending.pop(beer_id_key(item['url']), None)
+            if wanted:
+                found[wanted] = item
+        if len(items) < PAGE_SIZE:
+            reached_end = True
+            break
+        # Paging ignored (same page again) or nothing left to look for
+        if len(pages_read) == before or not pending:
+            break
+
+    if pages_read and store.enabled:
+        try:
+            store.absorb(brewery_url, pages_read, reached_end)
+        except sqlite3.Error as e:
+            logger.debug(f"  [Catalog] Could not store list pages for {brewery_url}: {e}")
+    return found
+
+
+def score_catalog_candidates(
+    catalog: UntappdBreweryCatalog,
+    beer_names: Iterable[Optional[str]],
+    brewery_name: Optional[str] = None,
+    max_candidates: int = 15,
+) -> List[UntappdSearchCandidate]:
+    """
+    Scores every beer of the catalog locally with score_beer_matches (best score over `beer_names`).
+
+    The brewery is validated once for the whole catalog instead of per beer: every row of
+    a brewery list shares the same brewery, so the result is identical to checking each row.
+    """
+    names: List[str] = [n for n in dict.fromkeys(beer_names) if n]
+    beers: List[UntappdCatalogBeer] = catalog['beers']
+    if not names or not beers:
+        return []
+    catalog_brewery: str = next((b.get('brewery_name') for b in beers if b.get('brewery_name')), "")
+    if brewery_name and catalog_brewery and not validate_brewery_match(Candidate("", catalog_brewery), brewery_name):
+        return []
+
+    cands: List[Candidate] = [Candidate.from_mapping(beer) for beer in beers]
+    best: List[int] = [0] * len(cands)
+    for name in names:
+        best = [max(a, b) for a, b in zip(best, score_beer_matches(cands, name))]
+
+    scored: Dict[str, UntappdSearchCandidate] = {}
+    for beer, score in zip(beers, best):
+        if score <= 0:
+            continue
+        scored[beer['url']] = {
+            'url': beer['url'],
+            'beer_name': beer.get('beer_name', ''),
+            'brewery_name': beer.get('brewery_name', ''),
+            'style': beer.get('style', ''),
+            'score': float(score),
+            'source': 'untappd_catalog',
+        }
+    candidates = sorted(scored.values(), key=lambda c: c.get('score', 0.0), reverse=True)
+    return candidates[:max_candidates]
@@ -0,0 +1,125 @@
+"""
+Persistent brewery-name -> Untappd brewery URL resolution cache.
+
+Why: search_brewery(query) hits `untappd.com/search?type=brewery` and then DuckDuckGo for every brewery
+name BreweryManager does not know, once per alias in aliases.json and once per collab part, and
+misses were never remembered, so the same unknown names were searched again on every run.
+How: each resolution is stored in SQLite with
+- the resolved URL, or a *negative* entry when both lookups completed and found nothing
+- the time it was resolved, and
+- its provenance (which lookup / validation produced it: untappd_exact, untappd_partial,
+  untappd_first, ddg_validated, not_found), so weak resolutions can be told apart later.
+Positive and negative entries have separate TTLs. Lookups that failed (403, timeouts, DDG rate
+limits) are never stored, so a temporary block cannot turn into a remembered "not found".
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple, TypedDict
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROVENANCE_UNTAPPD_EXACT: str = "untappd_exact"
+PROVENANCE_UNTAPPD_PARTIAL: str = "untappd_partial"
+PROVENANCE_UNTAPPD_FIRST: str = "untappd_first"
+PROVENANCE_DDG_VALIDATED: str = "ddg_validated"
+PROVENANCE_NOT_FOUND: str = "not_found"
+
+
+class BreweryResolution(TypedDict):
+    """A cached brewery-name resolution (url is None for a negative entry)."""
+    query: str
+    url: Optional[str]
+    provenance: str
+    resolved_at: float
+
+
+def resolution_key(query: str) -> str:
+    return ' '.join((query or "").lower().split())
+
+
+class BreweryResolutionCache:
+    """SQLite-backed TTL cache of brewery search results. Thread-safe; all operations are local I/O."""
+
+    def __init__(self, path: str, ttl: float, negative_ttl: float, enabled: bool = True):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled
+        self.stats: Dict[str, int] = {"hits": 0, "negative_hits": 0, "misses": 0, "stores": 0}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS resolutions ("
+                " key TEXT PRIMARY KEY, query TEXT NOT NULL, url TEXT, provenance TEXT NOT NULL,"
+                " resolved_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, query: str) -> Optional[BreweryResolution]:
+        """Returns the unexpired resolution for `query` (positive or negative), or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            try:
+                row: Optional[Tuple[str, Optional[str], str, float]] = self._connect().execute(
+                    "SELECT query, url, provenance, resolved_at FROM resolutions WHERE key = ?",
+                    (resolution_key(query),),
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.debug(f"Brewery resolution cache read failed: {e}")
+                return None
+        if row is None or time.time() - row[3] > (self.ttl if row[1] else self.negative_ttl):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits" if row[1] else "negative_hits"] += 1
+        return {'query': row[0], 'url': row[1], 'provenance': row[2], 'resolved_at': row[3]}
+
+    def put(self, query: str, url: Optional[str], provenance: str) -> None:
+        """Stores a resolution; `url=None` records a negative result."""
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO resolutions (key, query, url, provenance, resolved_at) VALUES (?, ?, ?, ?, ?)",
+                    (resolution_key(query), query, url, provenance, time.time()),
+                )
+                conn.commit()
+                self.stats["stores"] += 1
+            except sqlite3.Error as e:
+                logger.debug(f"Brewery resolution cache write failed: {e}")
+
+    def log_stats(self, log: logging.Logger = logger) -> None:
+        if not self.enabled or not any(self.stats.values()):
+            return
+        s = self.stats
+        log.info(
+            f"  🏷️ Brewery resolution cache: hits={s['hits']} negative_hits={s['negative_hits']} "
+            f"misses={s['misses']} stores={s['stores']}"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+brewery_resolution_cache: BreweryResolutionCache = BreweryResolutionCache(
+    path=settings.UNTAPPD_BREWERY_RESOLUTION_PATH,
+    ttl=settings.UNTAPPD_BREWERY_RESOLUTION_TTL_DAYS * 86400,
+    negative_ttl=settings.UNTAPPD_BREWERY_RESOLUTION_NEGATIVE_TTL_DAYS * 86400,
+    enabled=settings.UNTAPPD_CACHE_ENABLED,
+)
@@ -0,0 +1,58 @@
+"""
+The record every beer / brewery scorer works on.
+
+Why: score_beer_match and validate_brewery_match used to accept either a live bs4 Tag or a dict and
+dug the names out with CSS selectors on every call, so the HTML layout leaked into scoring, and
+callers holding plain strings (DB rows) had to build fake HTML just to score them.
+How: HTML (and JSON / DB rows) is converted into a slotted, immutable `Candidate` once at the edge
+(parse_beer_list_item, the API backend, the catalog, DB reads). Scoring is plain string code on
+Candidate fields. `as_candidate` keeps the validators backwards compatible with Tag / dict callers.
+"""
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional, Union
+
+from bs4 import Tag
+
+
+@dataclass(frozen=True, slots=True)
+class Candidate:
+    """One Untappd beer as seen by the scorers."""
+    beer: str
+    brewery: str = ""
+    style: str = ""
+    url: str = ""
+
+    @classmethod
+    def from_mapping(cls, item: Mapping[str, Any]) -> "Candidate":
+        """From a list item / API item / DB row (`beer_name`|`name`, `brewery_name`|`brewery`, `style`, `url`)."""
+        return cls(
+            beer=item.get('beer_name') or item.get('name') or '',
+            brewery=item.get('brewery_name') or item.get('brewery') or '',
+            style=item.get('style') or '',
+            url=item.get('url') or '',
+        )
+
+    @classmethod
+    def from_tag(cls, elem: Tag) -> "Candidate":
+        """From an Untappd `.beer-item` element."""
+        name_tag: Optional[Tag] = elem.select_one('.name a')
+        brewery_tag: Optional[Tag] = elem.select_one('.brewery a') or elem.select_one('.brewery')
+        style_tag: Optional[Tag] = elem.select_one('.style')
+        href = name_tag.get('href') if name_tag else None
+        return cls(
+            beer=name_tag.get_text(strip=True) if name_tag else '',
+            brewery=brewery_tag.get_text(strip=True) if brewery_tag else '',
+            style=style_tag.get_text(strip=True) if style_tag else '',
+            url=f"https://untappd.com{href}" if isinstance(href, str) and href.startswith('/') else (href or ''),
+        )
+
+
+CandidateLike = Union[Candidate, Tag, Mapping[str, Any]]
+
+
+def as_candidate(obj: CandidateLike) -> Candidate:
+    if isinstance(obj, Candidate):
+        return obj
+    if isinstance(obj, Tag):
+        return Candidate.from_tag(obj)
+    return Candidate.from_mapping(obj)
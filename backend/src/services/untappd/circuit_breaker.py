@@ -0,0 +1,128 @@
+"""
+Host-level circuit breaker for untappd.com.
+
+Why: every Untappd call retried on its own with short sleeps on 429/403/503 and then fell back to
+the impersonating client. Once Untappd started blocking us, every in-flight beer kept hitting the
+host, which only made the block last longer.
+How: all Untappd responses in http_client.py are reported here.
+- After `threshold` consecutive block responses the breaker opens and pauses the Untappd lane
+  (core/lanes.py) for the cool-down, so no Untappd request starts until it expires. Work that does
+  not need Untappd (DuckDuckGo, Gemini, DB writes) keeps running in its own lanes meanwhile.
+- After the cool-down the breaker is half-open: `admit()` lets exactly one request through as a probe
+  while every other Untappd request waits. A success closes the breaker and resets the cool-down;
+  another block re-opens it immediately with the cool-down doubled (up to max_cooldown). A probe that
+  ends without a verdict (transport error, 5xx) hands the probe to the next waiting request.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from ...core.config import settings
+from ...core.lanes import LANE_UNTAPPD, get_lane
+
+logger = logging.getLogger(__name__)
+
+BLOCK_STATUSES = frozenset({403, 429, 503})
+
+
+class CircuitBreaker:
+    """Counts block responses for one host and pauses its lane with exponential cool-down."""
+
+    def __init__(self, name: str, lane_name: str, threshold: int, base_cooldown: float, max_cooldown: float):
+        self.name = name
+        self.lane_name = lane_name
+        self.threshold = max(1, threshold)
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.failures: int = 0
+        self.trips: int = 0
+        self.total_trips: int = 0
+        self.open_until: float = 0.0
+        self._next_cooldown: float = base_cooldown
+        # Set while a half-open probe is in flight; the other requests wait on it
+        self._probe_done: Optional[asyncio.Event] = None
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self.open_until
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """
+        Gate for one Untappd request; `record()` the response status inside the block.
+        Closed: passes straight through. Open: waits out the cool-down. Half-open: one caller
+        becomes the probe, the others wait until it has been recorded.
+        """
+        probe: Optional[asyncio.Event] = await self._acquire()
+        try:
+            yield
+        finally:
+            if probe is not None and probe is self._probe_done:
+                # 意図: 判定が出ないまま probe が終わった (通信エラー・5xx) ので、次の待機リクエストに probe を渡す
+                self._end_probe()
+
+    async def _acquire(self) -> Optional[asyncio.Event]:
+        while self.trips:
+            wait: float = self.open_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            if self._probe_done is None:
+                self._probe_done = asyncio.Event()
+                logger.info(f"  🔎 [{self.name}] Cool-down over, sending one probe request")
+                return self._probe_done
+            await self._probe_done.wait()
+        return None
+
+    def _end_probe(self) -> None:
+        if self._probe_done is not None:
+            self._probe_done.set()
+            self._probe_done = None
+
+    def record(self, status_code: Optional[int]) -> None:
+        """Reports one Untappd response status (None for a transport error, which is ignored)."""
+        if status_code is None:
+            return
+        if status_code not in BLOCK_STATUSES:
+            if status_code < 500 and (self.failures or self.trips):
+                if self.trips:
+                    logger.info(f"  ✅ [{self.name}] Circuit closed after {self.trips} trip(s)")
+                self.reset()
+            return
+        self.failures += 1
+        # Responses to requests already in flight when the breaker opened do not extend it
+        if self.is_open or self.failures < self.threshold:
+            return
+        cooldown: float = self._next_cooldown
+        self._next_cooldown = min(self.max_cooldown, max(cooldown * 2, 1.0))
+        self.trips += 1
+        self.total_trips += 1
+        self.open_until = time.monotonic() + cooldown
+        self._end_probe()
+        get_lane(self.lane_name).pause(cooldown)
+        logger.warning(
+            f"  🛑 [{self.name}] {self.failures} block responses (last {status_code}): "
+            f"pausing requests for {cooldown:.0f}s (trip {self.trips})"
+        )
+
+    def reset(self) -> None:
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self._next_cooldown = self.base_cooldown
+        self._end_probe()
+
+    def log_stats(self, log: logging.Logger = logger) -> None:
+        if self.total_trips:
+            log.info(f"  🛑 {self.name} circuit breaker: {self.total_trips} trip(s), open={self.is_open}")
+
+
+untappd_breaker: CircuitBreaker = CircuitBreaker(
+    "Untappd",
+    LANE_UNTAPPD,
+    threshold=settings.UNTAPPD_BREAKER_THRESHOLD,
+    base_cooldown=settings.UNTAPPD_BREAKER_COOLDOWN,
+    max_cooldown=settings.UNTAPPD_BREAKER_MAX_COOLDOWN,
+)
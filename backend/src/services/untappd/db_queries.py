@@ -34,7 +34,7 @@ def fetch_beers(
     elif mode == 'refresh':
         logger.info(f"\n📂 Loading batch of REFRESH beers (offset={offset})...")
         query = supabase.table('beer_info_view') \
-            .select('url, name, untappd_url, stock_status, untappd_fetched_at') \
+            .select('url, name, untappd_url, stock_status, untappd_fetched_at, untappd_brewery_url, untappd_beer_name') \
             .not_.is_('untappd_url', 'null') \
             .neq('stock_status', 'Sold Out')
         if not (name_filter or force):
@@ -3,15 +3,27 @@ HTTP client functions for Untappd scraping.
 Split from searcher.py for better modularity.
 """
 import asyncio
+import json
 import logging
 import urllib.parse
 from datetime import datetime
-from typing import Optional, Dict, Callable, List
+from typing import Optional, Dict, Callable, List, Tuple, cast
 import httpx
+import primp
 from bs4 import BeautifulSoup, Tag
-from ...core.types import UntappdBeerDetails, UntappdBreweryDetails, UntappdSearchCandidate
+from ...core.lanes import LANE_DDG, LANE_UNTAPPD, get_lane
+from ...core.types import UntappdBeerDetails, UntappdBreweryDetails, UntappdCatalogBeer, UntappdSearchCandidate
+from . import api_client as untappd_api
+from .candidate import Candidate
+from .brewery_resolution import (
+    brewery_resolution_cache, PROVENANCE_DDG_VALIDATED, PROVENANCE_NOT_FOUND,
+    PROVENANCE_UNTAPPD_EXACT, PROVENANCE_UNTAPPD_FIRST, PROVENANCE_UNTAPPD_PARTIAL,
+)
+from .circuit_breaker import untappd_breaker
+from .page_cache import page_cache, normalize_cache_key, MISSING, KIND_DETAIL, KIND_SEARCH, KIND_BREWERY, KIND_DDG
+from .single_flight import single_flight
 from .text_utils import normalize_for_comparison
-from .validators import clean_brewery_name
+from .validators import clean_brewery_name, score_beer_match, score_beer_matches
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +57,218 @@ async def close_async_client() -> None:
         _async_client = None
 
 
-async def search_brewery_beer_candidates(
-    brewery_url: str,
+async def untappd_get(url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    """
+    GET on untappd.com through the shared client, inside the Untappd lane's rate budget (core/lanes.py).
+    Every status is reported to the host circuit breaker, which holds requests back while Untappd is blocking us.
+    """
+    async with untappd_breaker.admit():
+        async with get_lane(LANE_UNTAPPD).slot():
+            resp: httpx.Response = await get_async_client().get(url, headers=headers)
+        untappd_breaker.record(resp.status_code)
+    return resp
+
+
+_impersonating_client: Optional[primp.Client] = None
+
+
+def get_impersonating_client() -> primp.Client:
+    """
+    Process-wide primp client (browser TLS impersonation, as used by the WITCH CRAFT MARKET scraper).
+    One client keeps its connection pool, so fallbacks reuse connections instead of forking curl
+    with a fresh TLS handshake per request.
+    """
+    global _impersonating_client
+    if _impersonating_client is None:
+        _impersonating_client = primp.Client(impersonate="random", follow_redirects=True, timeout=15)
+    return _impersonating_client
+
+
+async def fetch_with_impersonation(url: str, referer: Optional[str] = None, min_length: int = 500) -> Optional[str]:
+    """
+    Fallback transport when httpx is blocked or fails. Runs the blocking primp call in a worker
+    thread so the event loop keeps serving other beers. Only Referer is forwarded: overriding the
+    User-Agent would break the impersonated browser fingerprint.
+    Returns the HTML only for a 200 response longer than `min_length` (shorter bodies are block pages).
+    """
+    headers: Dict[str, str] = {"Referer": referer} if referer else {}
+    async with untappd_breaker.admit():
+        try:
+            async with get_lane(LANE_UNTAPPD).slot():
+                resp = await asyncio.to_thread(get_impersonating_client().get, url, headers=headers)
+        except Exception as e:
+            logger.warning(f"  ❌ Impersonating fallback failed for {url}: {e}")
+            return None
+        untappd_breaker.record(resp.status_code)
+    html: str = resp.text or ""
+    if resp.status_code == 200 and len(html) > min_length:
+        return html
+    logger.warning(f"  ❌ Impersonating fallback got {resp.status_code} ({len(html)} bytes) for {url}")
+    return None
+
+
+def brewery_base_url(brewery_url: str) -> str:
+    """Strips `/beer`, `/photos`, `/activity` so any brewery sub-page maps to `https://untappd.com/w/<slug>`."""
+    base_url: str = brewery_url.rstrip('/')
+    for suffix in ('/beer', '/photos', '/activity'):
+        if base_url.endswith(suffix):
+            base_url = base_url[:-len(suffix)]
+    return base_url
+
+
+def parse_beer_list_item(res: Tag, default_brewery: str = "") -> Optional[UntappdCatalogBeer]:
+    """
+    Parses one `.beer-item` of a brewery beer list / search page.
+    Returns None for items without a `/b/` beer link (ads, placeholders).
+    """
+    name_tag: Optional[Tag] = res.select_one('.name a')
+    if not name_tag:
+        return None
+    href: Optional[str] = name_tag.get('href')
+    if not href or "/b/" not in href:
+        return None
+
+    brewery_tag = res.select_one('.name .brewery a') or res.select_one('.name .brewery') or res.select_one('.brewery a') or res.select_one('.brewery')
+    style_tag = res.select_one('.style')
+    item: UntappdCatalogBeer = {
+        'url': f"https://untappd.com{href}",
+        'beer_name': name_tag.get_text(strip=True),
+        'brewery_name': brewery_tag.get_text(strip=True) if brewery_tag else default_brewery,
+        'style': style_tag.get_text(strip=True) if style_tag else "",
+    }
+
+    abv_tag: Optional[Tag] = res.select_one('.abv')
+    if abv_tag:
+        item['abv'] = abv_tag.get_text(strip=True).replace(' ABV', '')
+    ibu_tag: Optional[Tag] = res.select_one('.ibu')
+    if ibu_tag:
+        item['ibu'] = ibu_tag.get_text(strip=True).replace(' IBU', '')
+    rating_tag: Optional[Tag] = res.select_one('.num')
+    if rating_tag:
+        item['rating'] = rating_tag.get_text(strip=True).strip('()')
+    raters_tag: Optional[Tag] = res.select_one('.raters')
+    if raters_tag:
+        item['rating_count'] = raters_tag.get_text(strip=True).replace(' Ratings', '').replace(' Rating', '').strip('()')
+    return item
+
+
+async def fetch_brewery_beer_list(brewery_url: str, offset: int = 0) -> Optional[List[UntappdCatalogBeer]]:
+    """
+    Fetches one page of a brewery's beer list, newest first (`/w/<slug>/beer?sort=created_at_desc`).
+    Returns the parsed items ([] past the last page) or None when the page could not be fetched,
+    so callers can tell "no more beers" apart from "blocked".
+    Not stored in the page cache: the brewery catalog (brewery_catalog.py) is the cache for these pages.
+    With UNTAPPD_BACKEND=api the page comes from the JSON API (same page size) when the URL has a brewery id.
+    """
+    if untappd_api.api_enabled():
+        api_items = await untappd_api.get_brewery_beer_list(brewery_url, offset=offset)
+        if api_items is not None:
+            return api_items
+
+    base_url: str = brewery_base_url(brewery_url)
+    url: str = f"{base_url}/beer?sort=created_at_desc"
+    if offset:
+        url += f"&start={offset}"
+    headers: Dict[str, str] = {
+        "User-Agent": _UA,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Referer": base_url,
+    }
+
+    html: Optional[str] = None
+    for attempt in range(3):
+        try:
+            resp: httpx.Response = await untappd_get(url, headers=headers)
+            if resp.status_code == 200:
+                html = resp.text
+                break
+            elif resp.status_code in (429, 403, 503):
+                await asyncio.sleep(1 * (attempt + 1))
+            else:
+                logger.debug(f"Brewery beer list returned {resp.status_code}: {url}")
+                break
+        except Exception as httpx_e:
+            logger.debug(f"httpx error on fetch_brewery_beer_list: {httpx_e}")
+            await asyncio.sleep(1)
+
+    if not html:
+        html = await fetch_with_impersonation(url, referer=base_url, min_length=500)
+        if not html:
+            return None
+
+    soup: BeautifulSoup = BeautifulSoup(html, 'lxml')
+    header: Optional[Tag] = soup.select_one('.name h1')
+    brewery_name: str = header.get_text(strip=True) if header else ""
+    items: List[UntappdCatalogBeer] = []
+    for res in soup.select('.beer-item'):
+        item = parse_beer_list_item(res, default_brewery=brewery_name)
+        if item:
+            items.append(item)
+    return items
+
+
+def _rank_candidates(
+    items: List[UntappdCatalogBeer],
+    query: str,
+    validate_beer_fn: Optional[Callable],
+    validate_beer: Optional[str],
+    score_beer_fn: Optional[Callable],
+    validate_brewery: Optional[str],
+    max_candidates: int,
+) -> List[UntappdSearchCandidate]:
+    """
+    Scores parsed brewery-search items (HTML or JSON API) and returns the best `max_candidates`.
+    The score / validate functions see a `Candidate`, never the HTML element.
+    """
+    cands: List[Candidate] = [Candidate.from_mapping(item) for item in items]
+    # 意図: 既定の scorer なら 1 ページ分をまとめて採点する (期待名・ブルワリー側の正規化を 1 回で済ませる)
+    batch_scores: Optional[List[int]] = (
+        score_beer_matches(cands, validate_beer, validate_brewery)
+        if score_beer_fn is score_beer_match and validate_beer else None
+    )
+
+    candidates: List[UntappdSearchCandidate] = []
+    for i, (item, res) in enumerate(zip(items, cands)):
+        score = 0.0
+        if batch_scores is not None:
+            score = float(batch_scores[i])
+            if score <= 0:
+                continue
+        elif score_beer_fn and validate_beer:
+            try:
+                score = float(score_beer_fn(res, validate_beer, validate_brewery))
+            except TypeError:
+                score = float(score_beer_fn(res, validate_beer))
+            if score <= 0:
+                continue
+        elif validate_beer and validate_beer_fn:
+            try:
+                valid = validate_beer_fn(res, validate_beer, validate_brewery)
+            except TypeError:
+                valid = validate_beer_fn(res, validate_beer)
+            if not valid:
+                continue
+            score = 1.0
+
+        candidates.append({
+            'url': item['url'],
+            'beer_name': item['beer_name'],
+            'brewery_name': item.get('brewery_name', ''),
+            'style': item.get('style', ''),
+            'score': score,
+            'source': 'untappd_brewery'
+        })
+
+    if candidates:
+        candidates.sort(key=lambda x: x.get('score', 0.0), reverse=True)
+        logger.info(
+            f"  [Candidates] Found {len(candidates)} candidates within brewery for '{query}'"
+        )
+    return candidates[:max_candidates]
+
+
+def rank_brewery_candidates(
+    items: List[UntappdCatalogBeer],
     query: str,
     validate_beer_fn: Optional[Callable] = None,
     validate_beer: Optional[str] = None,
@@ -54,14 +276,30 @@ async def search_brewery_beer_candidates(
     validate_brewery: Optional[str] = None,
     max_candidates: int = 15,
 ) -> List[UntappdSearchCandidate]:
+    """Public ranking step of search_brewery_beer_candidates, for callers that keep the raw items."""
+    return _rank_candidates(
+        items, query, validate_beer_fn, validate_beer, score_beer_fn, validate_brewery, max_candidates,
+    )
+
+
+@single_flight(lambda brewery_url, query: (normalize_cache_key(brewery_url or ""), query))
+async def search_brewery_beer_items(brewery_url: str, query: str) -> Optional[List[UntappdCatalogBeer]]:
+    """
+    Raw (unscored) results of one in-brewery beer search (API or HTML, page-cached).
+    Kept separate from the ranking so a caller can score the same result page against
+    several expected names without searching again.
+    Returns None when the search did not complete (block page, exhausted retries, error), [] for no results.
+    """
     if not brewery_url or not query:
         return []
 
+    if untappd_api.api_enabled():
+        api_items = await untappd_api.search_brewery_beers(brewery_url, query)
+        if api_items is not None:
+            return api_items
+
     encoded_query: str = urllib.parse.quote(query)
-    base_url: str = brewery_url.rstrip('/')
-    for suffix in ('/beer', '/photos', '/activity'):
-        if base_url.endswith(suffix):
-            base_url = base_url[:-len(suffix)]
+    base_url: str = brewery_base_url(brewery_url)
     url: str = f"{base_url}/beer?q={encoded_query}&sort=created_at_desc"
 
     headers: Dict[str, str] = {
@@ -70,93 +308,62 @@ async def search_brewery_beer_candidates(
         "Referer": brewery_url
     }
     html: Optional[str] = None
+    cached = page_cache.get(url, KIND_SEARCH)
+    if cached == "":
+        logger.debug(f"  [Cache] Negative hit for brewery search '{query}'")
+        return []
+    from_cache: bool = cached is not MISSING
+    if from_cache:
+        html = cast(str, cached)
     try:
-        client = get_async_client()
-        for attempt in range(3):
+        for attempt in range(0 if from_cache else 3):
             try:
-                resp: httpx.Response = await client.get(url, headers=headers)
+                resp: httpx.Response = await untappd_get(url, headers=headers)
                 if resp.status_code == 200:
                     html = resp.text
                     break
                 elif resp.status_code in (429, 403, 503):
                     await asyncio.sleep(1 * (attempt + 1))
             except Exception as httpx_e:
-                logger.debug(f"httpx error on search_brewery_beer_candidates: {httpx_e}")
+                logger.debug(f"httpx error on search_brewery_beer_items: {httpx_e}")
                 await asyncio.sleep(1)
 
         if not html:
-            curl_cmd: List[str] = [
-                'curl', '-s', '-L',
-                '-H', f"User-Agent: {headers['User-Agent']}",
-                '-H', f"Referer: {headers['Referer']}",
-                url
-            ]
-            proc = await asyncio.create_subprocess_exec(
-                *curl_cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=12.0)
-            if proc.returncode == 0 and len(stdout) > 500:
-                html = stdout.decode('utf-8', errors='ignore')
+            html = await fetch_with_impersonation(url, referer=headers['Referer'], min_length=500)
 
         if html:
             soup: BeautifulSoup = BeautifulSoup(html, 'lxml')
             results: List[Tag] = soup.select('.beer-item')
+            if not results and not soup.select_one('.name h1'):
+                # Challenge / block page: not an answer, so not cached here or by the caller
+                return None
+            if not from_cache:
+                # Only a real brewery page with an empty list is a (shorter-lived) negative entry
+                page_cache.put(url, KIND_SEARCH, html, negative=not results)
 
-            candidates: List[UntappdSearchCandidate] = []
-            for res in results[:50]:
-                name_tag: Optional[Tag] = res.select_one('.name a')
-                if not name_tag:
-                    continue
-                href: Optional[str] = name_tag.get('href')
-                if not href or "/b/" not in href:
-                    continue
-
-                full_url = f"https://untappd.com{href}"
-                beer_text = name_tag.get_text(strip=True)
-
-                brewery_tag = res.select_one('.name .brewery a') or res.select_one('.name .brewery') or res.select_one('.brewery a') or res.select_one('.brewery')
-                brewery_text = brewery_tag.get_text(strip=True) if brewery_tag else ""
-
-                style_tag = res.select_one('.style')
-                style_text = style_tag.get_text(strip=True) if style_tag else ""
-
-                score = 0.0
-                if score_beer_fn and validate_beer:
-                    try:
-                        score = float(score_beer_fn(res, validate_beer, validate_brewery))
-                    except TypeError:
-                        score = float(score_beer_fn(res, validate_beer))
-                    if score <= 0:
-                        continue
-                elif validate_beer and validate_beer_fn:
-                    try:
-                        valid = validate_beer_fn(res, validate_beer, validate_brewery)
-                    except TypeError:
-                        valid = validate_beer_fn(res, validate_beer)
-                    if not valid:
-                        continue
-                    score = 1.0
-
-                candidates.append({
-                    'url': full_url,
-                    'beer_name': beer_text,
-                    'brewery_name': brewery_text,
-                    'style': style_text,
-                    'score': score,
-                    'source': 'untappd_brewery'
-                })
-
-            if candidates:
-                candidates.sort(key=lambda x: x.get('score', 0.0), reverse=True)
-                logger.info(
-                    f"  [Candidates] Found {len(candidates)} candidates within brewery for '{query}'"
-                )
-                return candidates[:max_candidates]
+            return [item for item in (parse_beer_list_item(res) for res in results[:50]) if item]
 
     except Exception as e:
         logger.error(f"Brewery beer search error for '{query}' at {brewery_url}: {e}")
 
-    return []
+    return None
+
+
+async def search_brewery_beer_candidates(
+    brewery_url: str,
+    query: str,
+    validate_beer_fn: Optional[Callable] = None,
+    validate_beer: Optional[str] = None,
+    score_beer_fn: Optional[Callable] = None,
+    validate_brewery: Optional[str] = None,
+    max_candidates: int = 15,
+) -> List[UntappdSearchCandidate]:
+    items = await search_brewery_beer_items(brewery_url, query)
+    if not items:
+        return []
+    return _rank_candidates(
+        items, query, validate_beer_fn, validate_beer, score_beer_fn, validate_brewery, max_candidates,
+    )
 
 
 async def search_brewery_beer(
@@ -174,7 +381,6 @@ async def search_brewery_beer(
         validate_beer=validate_beer,
         score_beer_fn=score_beer_fn,
         validate_brewery=validate_brewery,
-        max_candidates=1
     )
     if candidates:
         best = candidates[0]
@@ -187,11 +393,21 @@ async def search_brewery_beer(
 
 
 
-async def scrape_beer_details(url: str) -> UntappdBeerDetails:
+@single_flight(lambda url, use_cache=True: (normalize_cache_key(url or ""), use_cache))
+async def scrape_beer_details(url: str, use_cache: bool = True) -> UntappdBeerDetails:
+    """
+    Beer details from the detail page. `untappd_fetched_at` is when the page was fetched (its cache time
+    when it came from the page cache). use_cache=False always fetches (and re-caches) the page.
+    """
     details: UntappdBeerDetails = {}
     if not url or "untappd.com/b/" not in url:
         return details
 
+    if untappd_api.api_enabled():
+        api_details = await untappd_api.get_beer_details(url)
+        if api_details:
+            return api_details
+
     logger.info(f"Scraping details from: {url}")
     headers: Dict[str, str] = {
         "User-Agent": _UA,
@@ -201,14 +417,25 @@ async def scrape_beer_details(url: str) -> UntappdBeerDetails:
     }
 
     html: Optional[str] = None
+    cached, cached_at = page_cache.get_entry(url, KIND_DETAIL) if use_cache else (MISSING, None)
+    if cached == "":
+        return details
+    from_cache: bool = cached is not MISSING
+    if from_cache:
+        html = cast(str, cached)
+    fetched_at: datetime = datetime.fromtimestamp(cached_at) if cached_at is not None else datetime.now()
     try:
-        client = get_async_client()
-        for attempt in range(3):
+        for attempt in range(0 if from_cache else 3):
             try:
-                resp: httpx.Response = await client.get(url, headers=headers)
+                resp: httpx.Response = await untappd_get(url, headers=headers)
                 if resp.status_code == 200:
                     html = resp.text
                     break
+                elif resp.status_code in (404, 410):
+                    # The beer was removed: the one positive "missing" signal worth a negative entry
+                    logger.info(f"  Beer page returned {resp.status_code}: {url}")
+                    page_cache.put(url, KIND_DETAIL, None, negative=True)
+                    return details
                 elif resp.status_code in (429, 403, 503):
                     await asyncio.sleep(2 * (attempt + 1))
             except Exception as httpx_e:
@@ -216,28 +443,19 @@ async def scrape_beer_details(url: str) -> UntappdBeerDetails:
                 await asyncio.sleep(1)
 
         if not html:
-            logger.warning("httpx failed to load details. Trying curl fallback...")
-            curl_cmd: List[str] = [
-                'curl', '-s', '-L',
-                '-H', f"User-Agent: {headers['User-Agent']}",
-                '-H', f"Accept: {headers['Accept']}",
-                '-H', f"Referer: {headers['Referer']}",
-                url
-            ]
-            proc = await asyncio.create_subprocess_exec(
-                *curl_cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=15.0)
-            if proc.returncode == 0 and len(stdout) > 1000:
-                html = stdout.decode('utf-8', errors='ignore')
-                logger.info("  ✅ Curl fallback successful for beer details")
+            logger.warning("httpx failed to load details. Trying impersonating fallback...")
+            html = await fetch_with_impersonation(url, referer=headers['Referer'], min_length=1000)
+            if html:
+                logger.info("  ✅ Impersonating fallback successful for beer details")
             else:
-                logger.error(f"  ❌ Curl fallback failed for beer details (code: {proc.returncode})")
                 return details
 
         soup: BeautifulSoup = BeautifulSoup(html, 'lxml')
 
         name_tag: Optional[Tag] = soup.select_one('.name h1')
+        if not from_cache and name_tag is not None:
+            # A page without a beer header is not recognised (interstitial / block page) and is never cached
+            page_cache.put(url, KIND_DETAIL, html)
         if name_tag:
             details['untappd_beer_name'] = name_tag.get_text(strip=True)
 
@@ -282,7 +500,7 @@ async def scrape_beer_details(url: str) -> UntappdBeerDetails:
             count_text = count_text.replace(' Ratings', '').replace(' Rating', '').strip('()')
             details['untappd_rating_count'] = count_text
 
-        details['untappd_fetched_at'] = datetime.now().isoformat()
+        details['untappd_fetched_at'] = fetched_at.isoformat()
 
     except Exception as e:
         logger.error(f"Detail scrape error: {e}")
@@ -291,11 +509,35 @@ async def scrape_beer_details(url: str) -> UntappdBeerDetails:
 
 
 
+async def _fetch_brewery_page(url: str, headers: Dict[str, str]) -> Optional[str]:
+    """Fetches a brewery page (httpx, then impersonating fallback) and stores it in the page cache if recognised."""
+    resp: httpx.Response = await untappd_get(url, headers=headers)
+    html: str = resp.text
+    if resp.status_code != 200:
+        logger.warning(f"httpx failed ({resp.status_code}). Trying impersonating fallback...")
+        fallback_html: Optional[str] = await fetch_with_impersonation(url, referer=headers['Referer'], min_length=1000)
+        if not fallback_html:
+            return None
+        html = fallback_html
+        logger.info("  ✅ Impersonating fallback successful")
+
+    # Only a recognised brewery page is cached; a challenge / block page must not be served for 7 days
+    if BeautifulSoup(html, 'lxml').select_one('.name h1'):
+        page_cache.put(url, KIND_BREWERY, html)
+    return html
+
+
+@single_flight(lambda url: normalize_cache_key(url or ""))
 async def scrape_brewery_details(url: str) -> UntappdBreweryDetails:
     details: UntappdBreweryDetails = {}
     if not url:
         return details
 
+    if untappd_api.api_enabled():
+        api_details = await untappd_api.get_brewery_details(url)
+        if api_details:
+            return api_details
+
     logger.info(f"Scraping brewery details from: {url}")
     headers: Dict[str, str] = {
         "User-Agent": _UA,
@@ -304,28 +546,15 @@ async def scrape_brewery_details(url: str) -> UntappdBreweryDetails:
         "Referer": "https://untappd.com/"
     }
 
+    cached = page_cache.get(url, KIND_BREWERY)
+    if cached == "":
+        return details
     try:
-        client = get_async_client()
-        resp: httpx.Response = await client.get(url, headers=headers)
-        html: str = resp.text
-        if resp.status_code != 200:
-            logger.warning(f"httpx failed ({resp.status_code}). Trying curl fallback...")
-            curl_cmd: List[str] = [
-                'curl', '-s', '-L',
-                '-H', f"User-Agent: {headers['User-Agent']}",
-                '-H', f"Accept: {headers['Accept']}",
-                '-H', f"Referer: {headers['Referer']}",
-                url
-            ]
-            proc = await asyncio.create_subprocess_exec(
-                *curl_cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=15.0)
-            if proc.returncode == 0 and len(stdout) > 1000:
-                html = stdout.decode('utf-8', errors='ignore')
-                logger.info("  ✅ Curl fallback successful")
-            else:
-                logger.error(f"  ❌ Curl fallback failed (code: {proc.returncode})")
+        if cached is not MISSING:
+            html: str = cast(str, cached)
+        else:
+            html = await _fetch_brewery_page(url, headers)
+            if not html:
                 return details
 
         soup: BeautifulSoup = BeautifulSoup(html, 'lxml')
@@ -386,37 +615,112 @@ async def scrape_brewery_details(url: str) -> UntappdBreweryDetails:
     return details
 
 
+# Message of the DDGSException that ddgs.DDGS.text raises for a search without results
+_DDG_NO_RESULTS: str = "No results found."
+
+
+def _ddg_cache_key(query: str, max_results: int) -> str:
+    return f"https://duckduckgo.com/?q={urllib.parse.quote(' '.join(query.split()))}&max_results={max_results}"
+
+
+@single_flight(lambda query, max_results=10: (' '.join((query or "").split()), max_results))
+async def ddg_text_search(query: str, max_results: int = 10) -> List[Dict[str, str]]:
+    """
+    DuckDuckGo web search shared by Stage 3 of the beer search and the search_brewery fallback.
+
+    意図: 同じクエリは retry-failures や年フォールバックのたびに繰り返し発行され、レートリミット時には
+    30〜90 秒の待機まで誘発していた。結果をページキャッシュ (KIND_DDG) に保存し、結果ゼロも negative として
+    短めの TTL で記憶する。レートリミット等の例外はキャッシュせず呼び出し元へそのまま送出する。
+    """
+    key: str = _ddg_cache_key(query, max_results)
+    cached = page_cache.get(key, KIND_DDG)
+    if cached == "":
+        logger.debug(f"  [Cache] Negative hit for DDG query '{query}'")
+        return []
+    if cached is not MISSING:
+        return json.loads(cast(str, cached))
+
+    from ddgs import DDGS
+    from ddgs.exceptions import DDGSException
+
+    def _run() -> List[Dict[str, str]]:
+        with DDGS(timeout=10) as ddgs:
+            try:
+                res = ddgs.text(query, max_results=max_results)
+            except DDGSException as e:
+                # ddgs raises instead of returning [] when every engine answered without results;
+                # engine errors (rate limit, timeout) carry their own message and stay errors
+                if type(e) is DDGSException and str(e) == _DDG_NO_RESULTS:
+                    return []
+                raise
+            return list(res) if res else []
+
+    async with get_lane(LANE_DDG).slot():
+        raw = await asyncio.to_thread(_run)
+    results: List[Dict[str, str]] = [
+        {'href': r.get('href', ''), 'title': r.get('title', ''), 'body': r.get('body', '')}
+        for r in raw if isinstance(r, dict)
+    ]
+    page_cache.put(key, KIND_DDG, json.dumps(results, ensure_ascii=False), negative=not results)
+    return results
+
+
+@single_flight(lambda query: (query or "").strip().lower())
 async def search_brewery(query: str) -> Optional[str]:
+    """
+    Resolves a brewery name to its Untappd brewery URL (`/w/<slug>`), or None.
+    Resolutions - including "not found" - are remembered in the brewery resolution cache,
+    so repeated unknown names (aliases, collab parts, retry passes) cost nothing until they expire.
+    """
+    cached = brewery_resolution_cache.get(query)
+    if cached is not None:
+        logger.debug(f"  [Brewery Search] Cached ({cached['provenance']}) for '{query}': {cached['url']}")
+        return cached['url']
+    url, provenance = await _resolve_brewery(query)
+    if provenance:
+        brewery_resolution_cache.put(query, url, provenance)
+    return url
+
+
+async def _resolve_brewery(query: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Untappd brewery search (JSON API when enabled, else the HTML search page),
+    then a validated DuckDuckGo site search.
+    Returns (url, provenance). provenance is None when the lookup could not complete, i.e. the miss
+    must not be cached: the Untappd search itself failed (403 / 429 / block page / error) or DDG failed.
+    """
     encoded_query: str = urllib.parse.quote(query)
     url: str = f"https://untappd.com/search?q={encoded_query}&type=brewery"
 
     candidates = []
-    try:
-        client = get_async_client()
-        resp: httpx.Response = await client.get(url)
-        if resp.status_code == 200:
-            soup: BeautifulSoup = BeautifulSoup(resp.text, 'lxml')
-            for res in soup.select('.beer-item')[:5]:
-                name_tag: Optional[Tag] = res.select_one('.name a')
-                if name_tag:
-                    href: Optional[str] = name_tag.get('href')
-                    if href and "/b/" not in href:
-                        name_text = name_tag.get_text(strip=True)
-                        candidates.append((name_text, f"https://untappd.com{href}"))
-    except Exception as e:
-        logger.error(f"Brewery search error for '{query}': {e}")
+    api_results = await untappd_api.search_breweries(query) if untappd_api.api_enabled() else None
+    # True once Untappd answered the search (possibly with no results), as opposed to failing
+    untappd_answered: bool = api_results is not None
+    if api_results:
+        candidates = [(r['name'], r['url']) for r in api_results]
+    if not candidates:
+        try:
+            resp: httpx.Response = await untappd_get(url)
+            # Shorter bodies are block pages (same threshold as fetch_with_impersonation)
+            if resp.status_code == 200 and len(resp.text or "") > 500:
+                untappd_answered = True
+                soup: BeautifulSoup = BeautifulSoup(resp.text, 'lxml')
+                for res in soup.select('.beer-item')[:5]:
+                    name_tag: Optional[Tag] = res.select_one('.name a')
+                    if name_tag:
+                        href: Optional[str] = name_tag.get('href')
+                        if href and "/b/" not in href:
+                            name_text = name_tag.get_text(strip=True)
+                            candidates.append((name_text, f"https://untappd.com{href}"))
+        except Exception as e:
+            logger.error(f"Brewery search error for '{query}': {e}")
 
     # If no candidates found via direct /search page (since Untappd often JS-blocks it), try DuckDuckGo site search
     if not candidates:
         try:
-            from ddgs import DDGS
-            def _ddg_brewery():
-                with DDGS(timeout=10) as ddgs:
-                    res = ddgs.text(f"site:untappd.com/w/ {query}", max_results=3)
-                    if not res:
-                        res = ddgs.text(f"site:untappd.com {query} brewery", max_results=3)
-                    return list(res) if res else []
-            ddg_res = await asyncio.to_thread(_ddg_brewery)
+            ddg_res = await ddg_text_search(f"site:untappd.com/w/ {query}", max_results=3)
+            if not ddg_res:
+                ddg_res = await ddg_text_search(f"site:untappd.com {query} brewery", max_results=3)
             query_norm = normalize_for_comparison(query)
             query_clean = normalize_for_comparison(clean_brewery_name(query))
             for r in ddg_res:
@@ -440,23 +744,28 @@ async def search_brewery(query: str) -> Optional[str]:
                             is_valid_brewery = True
                     if is_valid_brewery:
                         logger.info(f"  [Brewery Search] Found validated brewery URL via DDG: {href_clean}")
-                        return href_clean
+                        return href_clean, PROVENANCE_DDG_VALIDATED
                     else:
                         logger.debug(f"  [Brewery Search] Ignored DDG result (mismatch with query '{query}'): {href_clean} ({title})")
         except Exception as ddg_e:
             logger.debug(f"  [Brewery Search] DDG brewery fallback failed: {ddg_e}")
-        return None
+            return None, None
+        if not untappd_answered:
+            # A temporary block must not become a remembered "brewery does not exist"
+            logger.info(f"  [Brewery Search] Untappd search failed and DDG found nothing for '{query}'; not caching the miss")
+            return None, None
+        return None, PROVENANCE_NOT_FOUND
 
     query_norm = normalize_for_comparison(query)
     for name, link in candidates:
         if normalize_for_comparison(name) == query_norm:
             logger.info(f"  [Brewery Search] Exact match found: {name}")
-            return link
+            return link, PROVENANCE_UNTAPPD_EXACT
             
     for name, link in candidates:
         if query_norm in normalize_for_comparison(name):
             logger.info(f"  [Brewery Search] Partial match found: {name}")
-            return link
+            return link, PROVENANCE_UNTAPPD_PARTIAL
             
     logger.info(f"  [Brewery Search] No exact match, falling back to first: {candidates[0][0]}")
-    return candidates[0][1]
+    return candidates[0][1], PROVENANCE_UNTAPPD_FIRST
@@ -0,0 +1,197 @@
+"""
+Persistent on-disk cache for Untappd HTML pages.
+
+Why: beer detail pages, brewery beer searches and brewery pages were re-fetched on every run
+and every retry pass (the per-run dicts in UntappdEnricher only helped within one run).
+How: pages are stored zlib-compressed in a single SQLite file keyed by the normalized URL
+(lower-cased host, sorted query, no fragment / trailing slash).
+- Each page kind has its own TTL (detail / search / brewery / ddg).
+- DuckDuckGo results are stored the same way, as JSON keyed by a pseudo URL of the query.
+- Results that are positively empty (a brewery search page with no `.beer-item`, a 404 beer page) are
+  cached as *negative* entries with a shorter TTL so misses are not re-requested immediately but expire sooner.
+- Transient failures (403/429/timeouts) and pages that are not recognised (challenge / block pages) are never cached.
+- The file is bounded by UNTAPPD_CACHE_MAX_MB; least recently used entries are evicted first.
+Hit / miss counters are kept per kind and logged at the end of the run (log_stats).
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KIND_DETAIL: str = "detail"
+KIND_SEARCH: str = "search"
+KIND_BREWERY: str = "brewery"
+# DuckDuckGo query -> JSON-encoded result list (shared by the beer and brewery web searches)
+KIND_DDG: str = "ddg"
+
+# Sentinel returned by get() when there is no usable entry
+MISSING = object()
+
+
+def normalize_cache_key(url: str) -> str:
+    """Normalizes a URL so equivalent requests share one cache entry."""
+    parts = urlsplit(url.strip())
+    path: str = parts.path.rstrip('/') or '/'
+    query: str = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower() or 'https', parts.netloc.lower(), path, query, ''))
+
+
+class UntappdPageCache:
+    """SQLite-backed TTL cache for raw HTML. Thread-safe; all operations are sub-millisecond local I/O."""
+
+    def __init__(
+        self,
+        path: str,
+        ttls: Dict[str, float],
+        negative_ttl: float,
+        max_bytes: int,
+        enabled: bool = True,
+    ):
+        self.path = path
+        self.ttls = ttls
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes_since_evict: int = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " key TEXT PRIMARY KEY, kind TEXT NOT NULL, body BLOB, negative INTEGER NOT NULL DEFAULT 0,"
+                " created_at REAL NOT NULL, last_access REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages(last_access)")
+            self._conn.commit()
+        return self._conn
+
+    def _count(self, kind: str, field: str) -> None:
+        bucket = self.stats.setdefault(kind, {"hits": 0, "negative_hits": 0, "misses": 0, "stores": 0})
+        bucket[field] += 1
+
+    def get(self, url: str, kind: str) -> object:
+        """
+        Returns the cached HTML, "" for a cached negative result, or `MISSING`.
+        Expired entries count as misses (they are overwritten on the next put).
+        """
+        return self.get_entry(url, kind)[0]
+
+    def get_entry(self, url: str, kind: str) -> Tuple[object, Optional[float]]:
+        """Like get(), plus the time (epoch seconds) the entry was stored; None with `MISSING`."""
+        if not self.enabled:
+            return MISSING, None
+        key: str = normalize_cache_key(url)
+        now: float = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                row: Optional[Tuple[bytes, int, float]] = conn.execute(
+                    "SELECT body, negative, created_at FROM pages WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self._count(kind, "misses")
+                    return MISSING, None
+                body, negative, created_at = row
+                ttl: float = self.negative_ttl if negative else self.ttls.get(kind, 0)
+                if now - created_at > ttl:
+                    self._count(kind, "misses")
+                    return MISSING, None
+                conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Untappd page cache read failed: {e}")
+                return MISSING, None
+
+        if negative:
+            self._count(kind, "negative_hits")
+            return "", created_at
+        self._count(kind, "hits")
+        return zlib.decompress(body).decode('utf-8'), created_at
+
+    def put(self, url: str, kind: str, html: Optional[str], negative: bool = False) -> None:
+        """Stores a page (or a negative marker when `negative` is True)."""
+        if not self.enabled:
+            return
+        key: str = normalize_cache_key(url)
+        body: Optional[bytes] = None if negative or not html else zlib.compress(html.encode('utf-8'))
+        size: int = len(body) if body else 0
+        now: float = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO pages (key, kind, body, negative, created_at, last_access, size)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, kind, body, 1 if body is None else 0, now, now, size),
+                )
+                conn.commit()
+                self._count(kind, "stores")
+                self._writes_since_evict += 1
+                if self._writes_since_evict >= 50:
+                    self._evict(conn)
+            except sqlite3.Error as e:
+                logger.debug(f"Untappd page cache write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Deletes least recently used entries until the stored bytes fit in max_bytes."""
+        self._writes_since_evict = 0
+        total: int = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess: int = total - self.max_bytes
+        freed: int = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM pages ORDER BY last_access ASC"):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM pages WHERE key = ?", doomed)
+        conn.commit()
+        logger.info(f"  🧹 Untappd page cache: evicted {len(doomed)} entries ({freed // 1024} KiB)")
+
+    def log_stats(self, log: logging.Logger = logger) -> None:
+        """Logs per-kind hit/miss counters for the current process."""
+        if not self.enabled or not self.stats:
+            return
+        log.info("  🗄️ Untappd page cache:")
+        for kind, s in sorted(self.stats.items()):
+            lookups: int = s["hits"] + s["negative_hits"] + s["misses"]
+            rate: float = (s["hits"] + s["negative_hits"]) / lookups * 100 if lookups else 0.0
+            log.info(
+                f"    {kind:<8} hits={s['hits']} negative_hits={s['negative_hits']} "
+                f"misses={s['misses']} stores={s['stores']} (hit rate {rate:.0f}%)"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+page_cache: UntappdPageCache = UntappdPageCache(
+    path=settings.UNTAPPD_CACHE_PATH,
+    ttls={
+        KIND_DETAIL: settings.UNTAPPD_CACHE_TTL_DETAIL_HOURS * 3600,
+        KIND_SEARCH: settings.UNTAPPD_CACHE_TTL_SEARCH_HOURS * 3600,
+        KIND_BREWERY: settings.UNTAPPD_CACHE_TTL_BREWERY_HOURS * 3600,
+        KIND_DDG: settings.UNTAPPD_CACHE_TTL_DDG_HOURS * 3600,
+    },
+    negative_ttl=settings.UNTAPPD_CACHE_TTL_NEGATIVE_HOURS * 3600,
+    max_bytes=settings.UNTAPPD_CACHE_MAX_MB * 1024 * 1024,
+    enabled=settings.UNTAPPD_CACHE_ENABLED,
+)
@@ -0,0 +1,149 @@
+"""
+Katakana -> romaji transliteration and fuzzy phonetic keys.
+
+Why: a shop title written only in kana ("ホップロケット") cannot be compared with the Untappd name
+("Hop Rocket"); normalize_for_comparison keeps the scripts apart. Such beers used to depend on the
+`beer_name_jp` brewery search or on the LLM inferring the English name (enrich_untappd Phase A/B).
+How: kana is transliterated deterministically (modified Hepburn, with small kana, ッ and ー). Both sides
+are then reduced to a consonant skeleton that ignores what katakana spelling changes or cannot express:
+- vowels, which katakana adds after every consonant;
+- r/l, which katakana merges and often drops ("water" -> ウォーター, but "beer" -> ビール);
+- semivowels, double letters, and the usual English digraphs.
+Equal keys mean "sounds alike"; the key only nominates candidates, and the caller still checks the brewery.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Pattern, Tuple
+
+_KANA: Dict[str, str] = {
+    'ア': 'a', 'イ': 'i', 'ウ': 'u', 'エ': 'e', 'オ': 'o',
+    'カ': 'ka', 'キ': 'ki', 'ク': 'ku', 'ケ': 'ke', 'コ': 'ko',
+    'ガ': 'ga', 'ギ': 'gi', 'グ': 'gu', 'ゲ': 'ge', 'ゴ': 'go',
+    'サ': 'sa', 'シ': 'shi', 'ス': 'su', 'セ': 'se', 'ソ': 'so',
+    'ザ': 'za', 'ジ': 'ji', 'ズ': 'zu', 'ゼ': 'ze', 'ゾ': 'zo',
+    'タ': 'ta', 'チ': 'chi', 'ツ': 'tsu', 'テ': 'te', 'ト': 'to',
+    'ダ': 'da', 'ヂ': 'ji', 'ヅ': 'zu', 'デ': 'de', 'ド': 'do',
+    'ナ': 'na', 'ニ': 'ni', 'ヌ': 'nu', 'ネ': 'ne', 'ノ': 'no',
+    'ハ': 'ha', 'ヒ': 'hi', 'フ': 'fu', 'ヘ': 'he', 'ホ': 'ho',
+    'バ': 'ba', 'ビ': 'bi', 'ブ': 'bu', 'ベ': 'be', 'ボ': 'bo',
+    'パ': 'pa', 'ピ': 'pi', 'プ': 'pu', 'ペ': 'pe', 'ポ': 'po',
+    'マ': 'ma', 'ミ': 'mi', 'ム': 'mu', 'メ': 'me', 'モ': 'mo',
+    'ヤ': 'ya', 'ユ': 'yu', 'ヨ': 'yo',
+    'ラ': 'ra', 'リ': 'ri', 'ル': 'ru', 'レ': 're', 'ロ': 'ro',
+    'ワ': 'wa', 'ヰ': 'i', 'ヱ': 'e', 'ヲ': 'o', 'ン': 'n', 'ヴ': 'vu',
+    'ヵ': 'ka', 'ヶ': 'ke', 'ヮ': 'wa',
+}
+# Small vowels replace the vowel of the previous syllable (フ+ァ -> fa, テ+ィ -> ti, ウ+ィ -> wi)
+_SMALL_VOWELS: Dict[str, str] = {'ァ': 'a', 'ィ': 'i', 'ゥ': 'u', 'ェ': 'e', 'ォ': 'o'}
+# Small ya/yu/yo palatalize the previous i-syllable (キ+ャ -> kya, シ+ャ -> sha)
+_SMALL_Y: Dict[str, str] = {'ャ': 'a', 'ュ': 'u', 'ョ': 'o'}
+_SOKUON: str = 'ッ'
+_CHOONPU: str = 'ー'
+_VOWELS: str = 'aeiou'
+
+_HIRAGANA_TO_KATAKANA: Dict[int, int] = {cp: cp + 0x60 for cp in range(0x3041, 0x3097)}
+
+# Applied per word, in order (earlier rules feed later ones)
+_KEY_RULES: Tuple[Tuple[Pattern[str], str], ...] = tuple((re.compile(p), r) for p, r in (
+    (r'x', 'ks'),
+    (r'qu?', 'k'),
+    (r't?ch', 'q'),       # ch / tch / チ: kept apart from k and s (q is free after the rule above)
+    (r'ph', 'f'),
+    (r'gh', ''),
+    (r'ck', 'k'),
+    (r'[st]h', 's'),
+    (r'c(?=[eiy])', 's'),
+    (r'c', 'k'),
+    (r'[zj]', 's'),
+    (r'v', 'b'),
+    (r'[rlwy]', ''),
+    (r'(?<=[^aeiou])h', ''),
+    (r'[aeiou]', ''),
+    (r'[^a-z0-9]', ''),
+))
+_RE_REPEAT: Pattern[str] = re.compile(r'(.)\1+')
+
+# Shorter keys collide too often to nominate anything
+MIN_KEY_LENGTH: int = 3
+
+_CACHE_SIZE: int = 8192
+
+
+def _is_kana(ch: str) -> bool:
+    return 'ァ' <= ch <= 'ー'
+
+
+def has_kana(text: str) -> bool:
+    """True if `text` contains hiragana or katakana."""
+    return any('ぁ' <= ch <= 'ー' for ch in text or '')
+
+
+def _romanize_run(run: str) -> str:
+    out: List[str] = []
+    geminate = False
+    for ch in run:
+        if ch == _SOKUON:
+            geminate = True
+            continue
+        if ch == _CHOONPU:
+            last = out[-1] if out else ''
+            if last and last[-1] in _VOWELS:
+                out.append(last[-1])
+            continue
+        if ch in _SMALL_Y and out and out[-1].endswith('i') and len(out[-1]) > 1:
+            base = out[-1][:-1]
+            out[-1] = base + ('' if base in ('sh', 'ch', 'j') else 'y') + _SMALL_Y[ch]
+            continue
+        if ch in _SMALL_VOWELS and out and out[-1][-1] in _VOWELS:
+            base = out[-1].rstrip(_VOWELS)
+            out[-1] = (base or 'w') + _SMALL_VOWELS[ch]
+            continue
+        syllable = _KANA.get(ch) or _SMALL_VOWELS.get(ch) or ('y' + _SMALL_Y[ch] if ch in _SMALL_Y else '')
+        if geminate and syllable and syllable[0] not in _VOWELS:
+            syllable = ('t' if syllable.startswith('ch') else syllable[0]) + syllable
+        geminate = False
+        out.append(syllable)
+    return ''.join(out)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def katakana_to_romaji(text: str) -> str:
+    """
+    Transliterates the kana in `text` to lowercase romaji (modified Hepburn); other characters pass through.
+    ・ becomes a space. e.g. "ホップ・ロケット" -> "hoppu roketto", "シャドウ" -> "shadou".
+    """
+    text = unicodedata.normalize('NFKC', text or '').translate(_HIRAGANA_TO_KATAKANA).replace('・', ' ')
+    parts: List[str] = []
+    run: List[str] = []
+    for ch in text:
+        if _is_kana(ch):
+            run.append(ch)
+            continue
+        if run:
+            parts.append(_romanize_run(''.join(run)))
+            run = []
+        # Japanese punctuation (「」、。 etc.) separates words like ASCII spaces do
+        parts.append(' ' if not ch.isascii() and unicodedata.category(ch).startswith('P') else ch.lower())
+    if run:
+        parts.append(_romanize_run(''.join(run)))
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def phonetic_key(text: str) -> str:
+    """
+    Consonant-skeleton key of a Latin or kana name; "" when the name has no usable key
+    (kanji or other scripts that cannot be transliterated, or fewer than MIN_KEY_LENGTH letters).
+    e.g. "Hop Rocket" and "ホップロケット" -> "hpkt".
+    """
+    romaji = katakana_to_romaji(text)
+    if any(not ch.isascii() for ch in romaji):
+        return ''
+    words: List[str] = []
+    for word in romaji.split():
+        for pattern, repl in _KEY_RULES:
+            word = pattern.sub(repl, word)
+        words.append(word)
+    key = _RE_REPEAT.sub(r'\1', ''.join(words))
+    return key if len(key) >= MIN_KEY_LENGTH else ''
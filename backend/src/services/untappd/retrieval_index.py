@@ -0,0 +1,269 @@
+"""
+Local retrieval index over every Untappd beer already stored in `untappd_data`.
+
+Why: a shop product is often a beer that some other shop already linked. Until now the only local lookup
+was one `ilike` query per beer (offline mode), which needs the names to match almost exactly and costs
+a DB round trip each time. Every beer in missing mode also went straight to the network search.
+How: beer names and brewery names (plus the registry's aliases and JP names) are turned into
+character n-gram TF-IDF vectors. These are L2-normalized rows of SciPy CSR matrices. A query
+(beer name + brewery name) is vectorized the same way and scored against all rows with one sparse
+mat-vec per side:
+- brewery similarity is the best cosine over all name variants of a brewery;
+- the final score is a weighted sum of beer and brewery cosines, and top-k comes from np.argpartition.
+Char n-grams make the match robust to spacing, punctuation, word order and small spelling
+differences, and also work for JP names. The index only proposes candidates; callers re-score them
+with score_beer_matches and keep the usual 0-100 acceptance rules.
+Kana-only shop names share no n-grams with the Latin Untappd names, so beer names are also bucketed by
+their phonetic key (services/untappd/phonetic.py); `search_phonetic` looks a kana name up in those buckets.
+"""
+import logging
+import math
+import time
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from ...core.types import UntappdSearchCandidate
+from .phonetic import phonetic_key
+
+logger = logging.getLogger(__name__)
+
+SOURCE_INDEX: str = "untappd_index"
+SOURCE_PHONETIC: str = "untappd_phonetic"
+
+# Character n-gram sizes: bigrams keep short JP names (2-4 kana) matchable, trigrams carry most of the signal
+_NGRAM_SIZES: Tuple[int, ...] = (2, 3)
+# Weight of the beer-name cosine when a brewery is given (the rest is the brewery cosine)
+_BEER_WEIGHT: float = 0.65
+_PAGE_SIZE: int = 1000
+# Brewery cosine a phonetic beer-name hit needs (unless the brewery's phonetic key matches too)
+_PHONETIC_BREWERY_MIN: float = 0.5
+
+
+def _normalize(text: str) -> str:
+    """NFKC + casefold, punctuation to spaces, single-spaced and padded so n-grams see word boundaries."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in text)
+    return f" {' '.join(cleaned.split())} "
+
+
+def _ngrams(text: str) -> Counter:
+    norm = _normalize(text)
+    grams: Counter = Counter()
+    if not norm.strip():
+        return grams
+    for n in _NGRAM_SIZES:
+        for i in range(len(norm) - n + 1):
+            grams[norm[i:i + n]] += 1
+    return grams
+
+
+def _brewery_key(url: Optional[str], name: Optional[str]) -> str:
+    if url:
+        return url.rstrip("/").lower()
+    return (name or "").strip().casefold()
+
+
+class _TfidfVectorizer:
+    """Char n-gram TF-IDF with a vocabulary fixed at fit time (sublinear tf, smoothed idf, L2 rows)."""
+
+    def __init__(self, docs: Sequence[str]):
+        counts: List[Counter] = [_ngrams(doc) for doc in docs]
+        df: Counter = Counter()
+        for grams in counts:
+            df.update(grams.keys())
+        self.vocab: Dict[str, int] = {gram: i for i, gram in enumerate(df)}
+        n_docs = len(docs)
+        self.idf: np.ndarray = np.array(
+            [math.log((1 + n_docs) / (1 + df[gram])) + 1.0 for gram in self.vocab], dtype=np.float32,
+        )
+        # Stored transposed (n-gram x document): a query row times this only touches the rows of its own
+        # n-grams, i.e. it works like an inverted index instead of a scan over all documents
+        self.matrix_t: sparse.csr_matrix = self._to_matrix(counts).T.tocsr()
+
+    def _to_matrix(self, counts: Sequence[Counter]) -> sparse.csr_matrix:
+        indptr: List[int] = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for grams in counts:
+            for gram, tf in grams.items():
+                col = self.vocab.get(gram)
+                if col is not None:
+                    indices.append(col)
+                    data.append(1.0 + math.log(tf))
+            indptr.append(len(indices))
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(counts), len(self.vocab)),
+        )
+        matrix = matrix.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags((1.0 / norms).astype(np.float32)) @ matrix)
+
+    def similarities(self, text: str) -> np.ndarray:
+        """Cosine similarity of `text` to every document."""
+        return (self._to_matrix([_ngrams(text)]) @ self.matrix_t).toarray().ravel()
+
+
+class UntappdRetrievalIndex:
+    """
+    Top-k candidate retrieval over known Untappd beers.
+    `rows` are untappd_data rows (untappd_url, beer_name, brewery_name, untappd_brewery_url, style);
+    `brewery_aliases` maps a brewery key (brewery URL, or the name when there is no URL) to extra names.
+    """
+
+    def __init__(self, rows: Sequence[Mapping[str, Any]], brewery_aliases: Optional[Mapping[str, Sequence[str]]] = None):
+        self.rows: List[Mapping[str, Any]] = [r for r in rows if r.get('untappd_url') and r.get('beer_name')]
+        aliases: Mapping[str, Sequence[str]] = brewery_aliases or {}
+
+        # One brewery "group" per distinct brewery; each group has one document per known name variant
+        group_of: Dict[str, int] = {}
+        self._beer_group: np.ndarray = np.zeros(len(self.rows), dtype=np.int32)
+        group_names: List[List[str]] = []
+        for i, row in enumerate(self.rows):
+            key = _brewery_key(row.get('untappd_brewery_url'), row.get('brewery_name'))
+            group = group_of.get(key)
+            if group is None:
+                group = group_of[key] = len(group_names)
+                group_names.append([])
+            names = group_names[group]
+            # The registry may know the brewery by a different URL form (vanity vs /w/<slug>/<id>), so also try its name
+            extra = (*aliases.get(key, ()), *aliases.get(_brewery_key(None, row.get('brewery_name')), ()))
+            for name in (row.get('brewery_name'), *extra):
+                if name and name not in names:
+                    names.append(name)
+            self._beer_group[i] = group
+
+        brewery_docs: List[str] = []
+        doc_group: List[int] = []
+        for group, names in enumerate(group_names):
+            for name in names:
+                brewery_docs.append(name)
+                doc_group.append(group)
+        self._n_groups: int = len(group_names)
+        self._doc_group: np.ndarray = np.asarray(doc_group, dtype=np.int32)
+
+        self._beers = _TfidfVectorizer([r['beer_name'] for r in self.rows])
+        self._breweries = _TfidfVectorizer(brewery_docs)
+        self._group_names: List[List[str]] = group_names
+        # Built on the first search_phonetic call (about half the TF-IDF build time; most runs never need it)
+        self._phonetic: Optional[Dict[str, List[int]]] = None
+        self._group_keys: List[Set[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _brewery_scores(self, brewery_name: str) -> np.ndarray:
+        """Best cosine per brewery group over its name variants."""
+        per_doc = self._breweries.similarities(brewery_name)
+        best = np.zeros(self._n_groups, dtype=np.float32)
+        np.maximum.at(best, self._doc_group, per_doc.astype(np.float32))
+        return best
+
+    def search(self, beer_name: str, brewery_name: Optional[str] = None, k: int = 10) -> List[UntappdSearchCandidate]:
+        """Top-k beers by TF-IDF similarity; `score` is 0-100 (retrieval score, not a score_beer_match score)."""
+        if not self.rows or not beer_name:
+            return []
+        beer_sim = self._beers.similarities(beer_name)
+        if brewery_name:
+            brewery_sim = self._brewery_scores(brewery_name)[self._beer_group]
+            scores = _BEER_WEIGHT * beer_sim + (1.0 - _BEER_WEIGHT) * brewery_sim
+        else:
+            scores = beer_sim
+        # Beers with no n-gram in common are never candidates, whatever their brewery
+        scores = np.where(beer_sim > 0, scores, 0.0)
+
+        k = min(k, len(self.rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        candidates: List[UntappdSearchCandidate] = []
+        for i in top:
+            if scores[i] <= 0:
+                break
+            row = self.rows[int(i)]
+            candidates.append({
+                'url': row['untappd_url'],
+                'beer_name': row.get('beer_name') or '',
+                'brewery_name': row.get('brewery_name') or '',
+                'style': row.get('style') or '',
+                'score': round(float(scores[i]) * 100, 1),
+                'source': SOURCE_INDEX,
+            })
+        return candidates
+
+    def _build_phonetic(self) -> Dict[str, List[int]]:
+        buckets: Dict[str, List[int]] = {}
+        for i, row in enumerate(self.rows):
+            key = phonetic_key(row['beer_name'])
+            if key:
+                buckets.setdefault(key, []).append(i)
+        self._group_keys = [{phonetic_key(n) for n in names} - {""} for names in self._group_names]
+        return buckets
+
+    def search_phonetic(self, beer_name: str, brewery_name: Optional[str]) -> List[UntappdSearchCandidate]:
+        """
+        Beers whose name sounds like `beer_name` (equal phonetic keys) at a brewery that matches `brewery_name`
+        by TF-IDF cosine or by phonetic key. `score` is the brewery support (0-100), best first.
+        A brewery is required: a phonetic key alone is far too coarse to identify a beer.
+        """
+        if self._phonetic is None:
+            self._phonetic = self._build_phonetic()
+        key = phonetic_key(beer_name or "")
+        rows = self._phonetic.get(key) if key else None
+        if not rows or not brewery_name:
+            return []
+        brewery_sim = self._brewery_scores(brewery_name)
+        brewery_key = phonetic_key(brewery_name)
+        scored: List[Tuple[float, int]] = []
+        for i in rows:
+            group = int(self._beer_group[i])
+            support = 1.0 if brewery_key and brewery_key in self._group_keys[group] else float(brewery_sim[group])
+            if support >= _PHONETIC_BREWERY_MIN:
+                scored.append((support, i))
+        scored.sort(key=lambda x: -x[0])
+        return [{
+            'url': self.rows[i]['untappd_url'],
+            'beer_name': self.rows[i].get('beer_name') or '',
+            'brewery_name': self.rows[i].get('brewery_name') or '',
+            'style': self.rows[i].get('style') or '',
+            'score': round(support * 100, 1),
+            'source': SOURCE_PHONETIC,
+        } for support, i in scored]
+
+
+def fetch_index_rows(supabase: Any) -> List[Dict[str, Any]]:
+    """All untappd_data rows the index needs (read-only, paged)."""
+    rows: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        res: Any = supabase.table('untappd_data') \
+            .select('untappd_url, beer_name, brewery_name, untappd_brewery_url, style') \
+            .order('untappd_url').limit(_PAGE_SIZE).offset(offset).execute()
+        page: List[Dict[str, Any]] = res.data or []
+        rows.extend(page)
+        if len(page) < _PAGE_SIZE:
+            return rows
+        offset += _PAGE_SIZE
+
+
+def registry_aliases(breweries: Sequence[Mapping[str, Any]]) -> Dict[str, List[str]]:
+    """Brewery registry rows -> {brewery key: [name_en, name_jp, *aliases]} keyed like the index groups."""
+    aliases: Dict[str, List[str]] = {}
+    for b in breweries:
+        names = [n for n in (b.get('name_en'), b.get('name_jp'), *(b.get('aliases') or [])) if n]
+        if not names:
+            continue
+        for key in {_brewery_key(b.get('untappd_url'), None), _brewery_key(None, b.get('name_en'))} - {""}:
+            aliases.setdefault(key, []).extend(names)
+    return aliases
+
+
+def build_retrieval_index(supabase: Any, breweries: Sequence[Mapping[str, Any]] = ()) -> UntappdRetrievalIndex:
+    start = time.perf_counter()
+    index = UntappdRetrievalIndex(fetch_index_rows(supabase), registry_aliases(breweries))
+    logger.info(f"  📇 Untappd retrieval index: {len(index)} beers in {time.perf_counter() - start:.2f}s")
+    return index
@@ -8,7 +8,7 @@ import logging
 import re
 import urllib.parse
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, NamedTuple, Tuple
 
 
 from .text_utils import (
@@ -19,9 +19,13 @@ from .text_utils import (
 )
 from .validators import validate_beer_match, score_beer_match, set_brewery_aliases
 from .http_client import (
-    search_brewery_beer, search_brewery_beer_candidates, scrape_beer_details, search_brewery
+    search_brewery_beer, search_brewery_beer_items, rank_brewery_candidates, scrape_beer_details, search_brewery,
+    ddg_text_search,
 )
-from ...core.types import UntappdSearchResult, UntappdSearchCandidate
+from .brewery_catalog import get_brewery_catalog, score_catalog_candidates
+from backend.src.services.store.brewery_manager import BreweryManager, get_brewery_manager
+from ...core.config import settings
+from ...core.types import UntappdSearchResult, UntappdSearchCandidate, UntappdCatalogBeer
 
 logger = logging.getLogger(__name__)
 
@@ -57,13 +61,17 @@ async def get_untappd_url(
     original_title: Optional[str] = None,
     skip_llm: bool = False,
     return_candidates: bool = False,
+    brewery_manager: Optional[BreweryManager] = None,
 ) -> UntappdSearchResult:
     """
     Searches for an Untappd beer page with a multi-stage strategy.
     Implements a two-pass search for year-labeled beers:
     1. Try with the year (e.g., "The Gateway 2026")
     2. If no results, fallback to searching without the year ("The Gateway").
+    `brewery_manager` is the shared brewery registry (defaults to the process-wide one).
+    Both passes share one _SearchContext, so the second pass only re-runs searches whose query changed.
     """
+    context = _SearchContext()
     # 1. まず元のクエリ（西暦あり）で検索
     result = await _get_untappd_url_single(
         brewery_name=brewery_name,
@@ -75,6 +83,8 @@ async def get_untappd_url(
         original_title=original_title,
         skip_llm=skip_llm,
         return_candidates=return_candidates,
+        brewery_manager=brewery_manager,
+        context=context,
     )
     
     if result.get('success'):
@@ -114,7 +124,11 @@ async def get_untappd_url(
             original_title=original_title,
             skip_llm=skip_llm,
             return_candidates=return_candidates,
+            brewery_manager=brewery_manager,
+            context=context,
         )
+        if context.reused:
+            logger.info(f"  [SearchContext] Year-fallback reused {context.reused} unchanged searches")
         if retry_result.get('success'):
             logger.info("✅ [Year-fallback] Found match without year!")
             return retry_result
@@ -122,6 +136,205 @@ async def get_untappd_url(
     return result
 
 
+# ── Stage 2 fan-out helpers ───────────────────────────────────────────────────
+
+# A candidate at or above this score ends the search early (remaining lookups are cancelled, DDG is skipped)
+_HIGH_CONFIDENCE_SCORE: float = 90
+
+_LOOKUP_MAIN: str = "main"
+_LOOKUP_JP: str = "jp"
+_LOOKUP_TOKEN: str = "token"
+
+_TOKEN_STOP_WORDS = {'ipa', 'dipa', 'tipa', 'neipa', 'ale', 'stout', 'lager', 'pilsner', 'sour', 'porter', 'saison', 'gose', 'hazy', 'double', 'triple', 'single', 'imperial', 'session', 'fruited', 'wild', 'beer', 'cider', 'mead', '330ml', '350ml', '500ml', '750ml'}
+
+
+class _BrewerySearch(NamedTuple):
+    """One in-brewery search of the Stage 2 fan-out."""
+    brewery_url: str
+    kind: str
+    query: str
+    validate_beer: str
+    max_candidates: int
+
+
+class _SearchContext:
+    """
+    Per-beer memo shared by the passes of get_untappd_url.
+    The year-fallback pass only changes the beer name, so brewery resolution, raw in-brewery result pages
+    (keyed by brewery URL + query text) and DDG results are reused; results are re-scored for the new name.
+    Only searches that completed are memoized; failed ones run again on the next pass.
+    """
+    __slots__ = ('brewery_urls', 'items', 'ddg', 'reused')
+
+    def __init__(self) -> None:
+        self.brewery_urls: Dict[Tuple[str, Optional[str]], List[str]] = {}
+        self.items: Dict[Tuple[str, str], List[UntappdCatalogBeer]] = {}
+        self.ddg: Dict[str, List[Dict[str, str]]] = {}
+        self.reused: int = 0
+
+    async def brewery_items(self, brewery_url: str, query: str) -> List[UntappdCatalogBeer]:
+        key = (brewery_url, query)
+        cached = self.items.get(key)
+        if cached is not None:
+            self.reused += 1
+            return cached
+        items = await search_brewery_beer_items(brewery_url, query)
+        if items is None:
+            # The search failed (block page, retries exhausted): the next pass searches again
+            return []
+        self.items[key] = items
+        return items
+
+    async def ddg_search(self, query: str) -> List[Dict[str, str]]:
+        cached = self.ddg.get(query)
+        if cached is not None:
+            self.reused += 1
+            return cached
+        # Failures (rate limit etc.) raise and are not memoized, so the caller's retry still hits the network
+        results = await ddg_text_search(query, max_results=10)
+        self.ddg[query] = results
+        return results
+
+
+def _has_high_confidence(candidates: List[UntappdSearchCandidate]) -> bool:
+    return any(c.get('score', 0) >= _HIGH_CONFIDENCE_SCORE for c in candidates)
+
+
+def _fallback_tokens(target_beer_name: str, beer_name_jp: Optional[str]) -> List[str]:
+    """Distinctive words and numbers of the beer names, for the token-fallback searches (most specific last word first)."""
+    tokens: List[str] = []
+    for text in [target_beer_name, beer_name_jp]:
+        if not text:
+            continue
+        # 英数字の複合語 (LR39等) から数字を取り出してトークンに追加
+        num_matches = re.findall(r'\b(?:LR|No\.?|Batch|#|Vol\.?)?\s*([0-9]{1,4})\b', text, re.IGNORECASE)
+        for nm in num_matches:
+            if nm not in tokens:
+                tokens.append(nm)
+        # LR の略称展開
+        if re.search(r'\bLR\s*([0-9]+)\b', text, re.IGNORECASE):
+            m_num = re.search(r'\bLR\s*([0-9]+)\b', text, re.IGNORECASE).group(1)
+            exp_token = f"Limited Release {m_num}"
+            if exp_token not in tokens:
+                tokens.append(exp_token)
+
+        words = re.split(r'[\s/—–\-([（）\])]+', text)
+        for w in reversed(words):
+            w_clean = w.strip()
+            if len(w_clean) < 2 or (w_clean.isascii() and not w_clean.isdigit() and len(w_clean) < 3):
+                continue
+            if w_clean.lower() in _TOKEN_STOP_WORDS:
+                continue
+            # LR39 などの複合語からの数字分離も確実に追加
+            num_sub = re.findall(r'[0-9]+', w_clean)
+            if num_sub and num_sub[0] not in tokens and len(num_sub[0]) >= 1:
+                tokens.append(num_sub[0])
+            if w_clean not in tokens and w_clean != target_beer_name and w_clean != beer_name_jp:
+                tokens.append(w_clean)
+    return tokens
+
+
+async def _run_brewery_search(
+    lk: _BrewerySearch, brewery_name: str, context: _SearchContext, gate: asyncio.Semaphore,
+) -> List[UntappdSearchCandidate]:
+    async with gate:
+        if (lk.brewery_url, lk.query) in context.items:
+            logger.debug(f"  [SearchContext] Reusing results for '{lk.query}' within brewery: {lk.brewery_url}")
+        elif lk.kind == _LOOKUP_MAIN:
+            logger.info(f"Searching for '{lk.query}' within brewery: {lk.brewery_url}")
+        elif lk.kind == _LOOKUP_JP:
+            logger.info(f"🔄 [JP-fallback] Searching for Japanese name '{lk.query}' within brewery: {lk.brewery_url}")
+        else:
+            logger.info(f"🔄 [Token-fallback] Searching for token '{lk.query}' within brewery: {lk.brewery_url}")
+        items = await context.brewery_items(lk.brewery_url, lk.query)
+    return rank_brewery_candidates(
+        items,
+        lk.query,
+        validate_beer_fn=validate_beer_match,
+        validate_beer=lk.validate_beer,
+        score_beer_fn=score_beer_match,
+        validate_brewery=brewery_name,
+        max_candidates=lk.max_candidates,
+    )
+
+
+async def _search_breweries(
+    brewery_urls: List[str],
+    target_beer_name: str,
+    beer_name_jp: Optional[str],
+    brewery_name: str,
+    context: _SearchContext,
+    candidates: List[UntappdSearchCandidate],
+    add_candidates: Callable[[List[UntappdSearchCandidate]], None],
+) -> None:
+    """
+    Stage 2 in-brewery searches with the sequential limits: per brewery the main-name search, the JP-name
+    search only while fewer than 5 candidates are collected, and the token searches only while fewer than
+    5 (merged in order until 10). `candidates` is the merged list so far; new ones go through `add_candidates`.
+    Concurrency (at most UNTAPPD_SEARCH_FANOUT at once per beer; the Untappd lane still limits globally):
+    - the main searches of all breweries start together, since every one of them is needed anyway;
+    - once the merge reaches a brewery's token searches, up to UNTAPPD_SEARCH_FANOUT of them are in flight;
+      they are merged in token order, no new one starts after 10 candidates, and the unmerged ones are cancelled;
+    - a candidate with score >= 90 ends the search and cancels everything still running or queued.
+    Queued lookups that are cancelled never send a request.
+    """
+    fanout: int = max(1, settings.UNTAPPD_SEARCH_FANOUT)
+    gate = asyncio.Semaphore(fanout)
+    started: List[asyncio.Task] = []
+
+    def start(lk: _BrewerySearch) -> "asyncio.Task[List[UntappdSearchCandidate]]":
+        task = asyncio.create_task(_run_brewery_search(lk, brewery_name, context, gate))
+        started.append(task)
+        return task
+
+    def merge(cands: List[UntappdSearchCandidate]) -> bool:
+        """Adds `cands`; True when the search can stop (high-confidence candidate)."""
+        add_candidates(cands)
+        return _has_high_confidence(cands)
+
+    tokens: List[str] = _fallback_tokens(target_beer_name, beer_name_jp)[:6]
+    try:
+        # 意図: 同一ブルワリー内の限定バッチやビンテージ年・ホップ違いの同名ビールを取りこぼさないよう、
+        # ブルワリー内検索の候補取得上限を 15 件に拡張（LLMコンテキスト的にも15〜20件は安全かつ高精度）
+        mains = [start(_BrewerySearch(url, _LOOKUP_MAIN, target_beer_name, target_beer_name, 15)) for url in brewery_urls]
+        for url, main in zip(brewery_urls, mains):
+            if merge(await main):
+                return
+            if len(candidates) < 5 and beer_name_jp and beer_name_jp != target_beer_name:
+                if merge(await start(_BrewerySearch(url, _LOOKUP_JP, beer_name_jp, beer_name_jp, 8))):
+                    return
+            if len(candidates) >= 5:
+                continue
+            token_lookups = [_BrewerySearch(url, _LOOKUP_TOKEN, t, target_beer_name, 8) for t in tokens]
+            token_tasks: List[asyncio.Task] = []
+            merged = 0
+            while merged < len(token_lookups) and len(candidates) < 10:
+                # A new token search only starts while the merged results are still below the limit
+                while len(token_tasks) < len(token_lookups) and len(token_tasks) - merged < fanout:
+                    token_tasks.append(start(token_lookups[len(token_tasks)]))
+                await asyncio.wait(token_tasks[merged:], return_when=asyncio.FIRST_COMPLETED)
+                if any(t.done() and _has_high_confidence(t.result()) for t in token_tasks[merged:]):
+                    # A high-confidence hit ends the search even if earlier tokens are still running
+                    for t in token_tasks[merged:]:
+                        if t.done():
+                            merge(t.result())
+                    return
+                while merged < len(token_tasks) and token_tasks[merged].done() and len(candidates) < 10:
+                    merge(token_tasks[merged].result())
+                    merged += 1
+            # The rest can no longer be merged (10 candidates reached)
+            for t in token_tasks[merged:]:
+                t.cancel()
+    finally:
+        pending = [t for t in started if not t.done()]
+        if pending:
+            logger.info(f"  [Fan-out] Search finished early; cancelling {len(pending)} pending brewery searches")
+        for t in pending:
+            t.cancel()
+        # Only reaps the cancelled tasks (no network wait): cancellation reaches them at their next await
+        await asyncio.gather(*started, return_exceptions=True)
+
+
 async def _get_untappd_url_single(
     brewery_name: str,
     beer_name: str,
@@ -132,10 +345,14 @@ async def _get_untappd_url_single(
     original_title: Optional[str] = None,
     skip_llm: bool = False,
     return_candidates: bool = False,
+    brewery_manager: Optional[BreweryManager] = None,
+    context: Optional[_SearchContext] = None,
 ) -> UntappdSearchResult:
     """
     Core search logic for a single pass.
+    `context` carries results of an earlier pass for the same beer (see get_untappd_url).
     """
+    context = context or _SearchContext()
     if not brewery_name and not beer_name and not beer_name_jp:
         return {
             'url': None,
@@ -156,12 +373,15 @@ async def _get_untappd_url_single(
     primary_brewery_search = primary_breweries[0] if primary_breweries else ""
     shop_names = {'choseiya', 'ちょうせいや', 'arome', 'アローム', 'beervolta', 'beer volta', 'maruho', 'maruho saketen', 'マルホ酒店', '151l', '一期一会～る', 'antenna america', 'アンテナアメリカ'}
 
-    candidate_brewery_urls: List[str] = [u_brewery_url] if u_brewery_url else []
+    brewery_key: Tuple[str, Optional[str]] = (brewery_name or "", u_brewery_url)
+    known_brewery_urls: Optional[List[str]] = context.brewery_urls.get(brewery_key)
+    candidate_brewery_urls: List[str] = list(known_brewery_urls or ([u_brewery_url] if u_brewery_url else []))
+    if known_brewery_urls is not None:
+        context.reused += 1
 
-    if not candidate_brewery_urls and primary_breweries:
+    if known_brewery_urls is None and not candidate_brewery_urls and primary_breweries:
         try:
-            from backend.src.services.store.brewery_manager import BreweryManager
-            bm = BreweryManager()
+            bm = brewery_manager or get_brewery_manager()
             for p_brew in primary_breweries:
                 if p_brew.lower() in shop_names:
                     continue
@@ -188,95 +408,48 @@ async def _get_untappd_url_single(
                         logger.info(f" Brewery found: {b_found_url}")
                         candidate_brewery_urls.append(b_found_url)
                         break
+    context.brewery_urls[brewery_key] = list(candidate_brewery_urls)
 
     # --- Stage 2: Search WITHIN Brewery ---
     all_candidates: List[UntappdSearchCandidate] = []
     seen_urls = set()
 
-    for cand_b_url in candidate_brewery_urls:
-        logger.info(f"Searching for '{target_beer_name}' within brewery: {cand_b_url}")
-        # 意図: 同一ブルワリー内の限定バッチやビンテージ年・ホップ違いの同名ビールを取りこぼさないよう、
-        # ブルワリー内検索の候補取得上限を 15 件に拡張（LLMコンテキスト的にも15〜20件は安全かつ高精度）
-        cands = await search_brewery_beer_candidates(
-            cand_b_url, 
-            target_beer_name, 
-            validate_beer_fn=validate_beer_match,
-            validate_beer=target_beer_name,
-            score_beer_fn=score_beer_match,
-            validate_brewery=brewery_name,
-            max_candidates=15
-        )
+    def add_candidates(cands: List[UntappdSearchCandidate]) -> None:
         for c in cands:
             u = c.get('url')
             if u and u not in seen_urls:
                 seen_urls.add(u)
                 all_candidates.append(c)
 
-        if len(all_candidates) < 5 and beer_name_jp and beer_name_jp != target_beer_name:
-            logger.info(f"🔄 [JP-fallback] Searching for Japanese name '{beer_name_jp}' within brewery: {cand_b_url}")
-            cands_jp = await search_brewery_beer_candidates(
-                cand_b_url,
-                beer_name_jp,
-                validate_beer_fn=validate_beer_match,
-                validate_beer=beer_name_jp,
-                score_beer_fn=score_beer_match,
-                validate_brewery=brewery_name,
-                max_candidates=8
+    network_brewery_urls: List[str] = []
+    for cand_b_url in candidate_brewery_urls:
+        # 意図: ブルワリーの全ビール一覧をローカルに持っていれば、名前 / 日本語名 / トークンの
+        # ネットワーク検索を繰り返さずに全件をローカルでスコアリングできる。
+        # カタログが無い・古くて更新できない場合、または部分カタログで候補ゼロの場合のみ従来の検索へ進む
+        catalog = await get_brewery_catalog(cand_b_url)
+        if catalog is not None:
+            local_cands = score_catalog_candidates(
+                catalog, [target_beer_name, beer_name_jp], brewery_name, max_candidates=15
             )
-            for c in cands_jp:
-                u = c.get('url')
-                if u and u not in seen_urls:
-                    seen_urls.add(u)
-                    all_candidates.append(c)
-
-        if len(all_candidates) < 5:
-            tokens = []
-            for text in [target_beer_name, beer_name_jp]:
-                if not text:
-                    continue
-                # 英数字の複合語 (LR39等) から数字を取り出してトークンに追加
-                num_matches = re.findall(r'\b(?:LR|No\.?|Batch|#|Vol\.?)?\s*([0-9]{1,4})\b', text, re.IGNORECASE)
-                for nm in num_matches:
-                    if nm not in tokens:
-                        tokens.append(nm)
-                # LR の略称展開
-                if re.search(r'\bLR\s*([0-9]+)\b', text, re.IGNORECASE):
-                    m_num = re.search(r'\bLR\s*([0-9]+)\b', text, re.IGNORECASE).group(1)
-                    exp_token = f"Limited Release {m_num}"
-                    if exp_token not in tokens:
-                        tokens.append(exp_token)
-
-                words = re.split(r'[\s/—–\-([（）\])]+', text)
-                for w in reversed(words):
-                    w_clean = w.strip()
-                    if len(w_clean) < 2 or (w_clean.isascii() and not w_clean.isdigit() and len(w_clean) < 3):
-                        continue
-                    if w_clean.lower() in {'ipa', 'dipa', 'tipa', 'neipa', 'ale', 'stout', 'lager', 'pilsner', 'sour', 'porter', 'saison', 'gose', 'hazy', 'double', 'triple', 'single', 'imperial', 'session', 'fruited', 'wild', 'beer', 'cider', 'mead', '330ml', '350ml', '500ml', '750ml'}:
-                        continue
-                    # LR39 などの複合語からの数字分離も確実に追加
-                    num_sub = re.findall(r'[0-9]+', w_clean)
-                    if num_sub and num_sub[0] not in tokens and len(num_sub[0]) >= 1:
-                        tokens.append(num_sub[0])
-                    if w_clean not in tokens and w_clean != target_beer_name and w_clean != beer_name_jp:
-                        tokens.append(w_clean)
-            for token in tokens[:6]:
-                logger.info(f"🔄 [Token-fallback] Searching for token '{token}' within brewery: {cand_b_url}")
-                cands_token = await search_brewery_beer_candidates(
-                    cand_b_url,
-                    token,
-                    validate_beer_fn=validate_beer_match,
-                    validate_beer=target_beer_name,
-                    score_beer_fn=score_beer_match,
-                    validate_brewery=brewery_name,
-                    max_candidates=8
+            add_candidates(local_cands)
+            if local_cands or catalog['complete']:
+                logger.info(
+                    f"  [Catalog] {len(local_cands)} local candidates for '{target_beer_name}' "
+                    f"from {len(catalog['beers'])} beers of {cand_b_url}"
                 )
-                for c in cands_token:
-                    u = c.get('url')
-                    if u and u not in seen_urls:
-                        seen_urls.add(u)
-                        all_candidates.append(c)
-                if len(all_candidates) >= 10:
-                    break
+                continue
+            logger.info(f"  [Catalog] Partial catalog had no match; searching Untappd for {cand_b_url}")
+        network_brewery_urls.append(cand_b_url)
+
+    if network_brewery_urls and _has_high_confidence(all_candidates):
+        logger.info(f"  [Fan-out] High-confidence catalog match; skipping brewery search for {len(network_brewery_urls)} breweries")
+    elif network_brewery_urls:
+        # 意図: メイン名 / 日本語名 / トークンの検索を 1 本ずつ待つと、1 ビールに最大 8 往復かかる。
+        # 従来の打ち切り条件 (5 件 / 10 件) で不要になる検索は開始もせず、必要な検索だけを上限付きで並行に進める
+        await _search_breweries(
+            network_brewery_urls, target_beer_name, beer_name_jp, brewery_name, context,
+            all_candidates, add_candidates,
+        )
 
     if candidate_brewery_urls and not all_candidates:
         logger.info(" Brewery-specific search returned no candidate matches.")
@@ -285,7 +458,7 @@ async def _get_untappd_url_single(
     # 意図: Untappdのサイト内検索（Stage 2）は検索精度が悪いため、
     # 有力な候補（score >= 90）が見つからなかった場合は、DuckDuckGoのウェブ検索を
     # 用いて Untappd のビールページを直接探しに行く
-    has_high_confidence_candidate = any(c.get('score', 0) >= 90 for c in all_candidates)
+    has_high_confidence_candidate = _has_high_confidence(all_candidates)
     if not all_candidates or (len(all_candidates) < 3 and not has_high_confidence_candidate):
         query: str
         if search_hint:
@@ -296,8 +469,6 @@ async def _get_untappd_url_single(
         logger.info(f"Searching DuckDuckGo for: '{query}'")
 
         try:
-            from ddgs import DDGS
-
             def title_is_valid(title: str, exp_brewery: str, exp_beer: str) -> bool:
                 t_norm: str = normalize_for_comparison(title)
                 
@@ -339,14 +510,7 @@ async def _get_untappd_url_single(
             max_retries = 3
             for attempt in range(max_retries):
                 try:
-                    def _do_ddg_search():
-                        with DDGS(timeout=10) as ddgs:
-                            res = ddgs.text(query, max_results=10)
-                            return list(res) if res else []
-                            
-                    results: Any = await asyncio.to_thread(_do_ddg_search)
-                    if not results:
-                        results = []
+                    results: List[Dict[str, str]] = await context.ddg_search(query)
                             
                     for res in results:
                         href: str = res.get("href", "")
@@ -0,0 +1,99 @@
+"""
+Single-flight coalescing for Untappd client calls.
+
+Why: the same brewery search / beer detail URL is often requested several times at once or
+back to back (year-fallback pass in get_untappd_url, collab splits, several shop listings
+pointing to one beer). Without coalescing each caller pays its own network round trip and parse.
+How: the first caller for a key starts the work as a separate task; concurrent callers with the
+same key await that task instead of issuing their own request.
+- The shared task is awaited through asyncio.shield, so cancelling one waiter (e.g. an early-
+  cancelled fan-out) never cancels the work other waiters depend on. When the last waiter is
+  cancelled nobody needs the result any more, so the task itself is cancelled (a request still
+  queued in its lane is dropped instead of being sent).
+- Results are deep-copied per caller because callers mutate the returned dicts/lists.
+- Once the task finishes the key is released; "back to back" repeats are then served by the
+  on-disk page cache (page_cache.py) rather than kept here.
+"""
+import asyncio
+import copy
+import functools
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls: int = 0
+        self.shared: int = 0
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._release(k, t))
+        else:
+            self.shared += 1
+            logger.debug(f"  [SingleFlight] {self.name}: joined in-flight call for {key!r}")
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(task) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            remaining = self._waiters.get(task, 1) - 1
+            if remaining:
+                self._waiters[task] = remaining
+            else:
+                self._waiters.pop(task, None)
+
+    def _release(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+_groups: List[SingleFlight] = []
+
+
+def single_flight(key_fn: Callable[..., Hashable]) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Decorator: coalesces concurrent calls of an async function whose `key_fn(*args, **kwargs)` match.
+    The wrapped function keeps its signature, so callers and test patches are unaffected.
+    """
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        group = SingleFlight(fn.__name__)
+        _groups.append(group)
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            result = await group.do(key_fn(*args, **kwargs), lambda: fn(*args, **kwargs))
+            return copy.deepcopy(result)
+
+        wrapper.single_flight = group  # type: ignore[attr-defined]
+        return wrapper
+    return decorator
+
+
+def log_single_flight_stats(log: logging.Logger = logger) -> None:
+    """Logs how many calls were served by joining an in-flight request."""
+    active = [g for g in _groups if g.calls]
+    if not active:
+        return
+    log.info("  🔀 Untappd single-flight:")
+    for g in active:
+        log.info(f"    {g.name}: {g.shared}/{g.calls} calls coalesced")
@@ -1,13 +1,24 @@
 """
 Text utility functions for beer/brewery name cleaning and normalization.
 Split from searcher.py for better modularity.
+
+Performance: scoring one candidate runs these normalizers many times on the same few strings.
+- Every pattern is compiled once at import (the `_RE_*` tables) instead of per call.
+- Character mappings use str.translate, and multi-word maps are one alternation pass.
+- The pure normalizers (no logging, immutable results) are memoized with bounded LRU caches.
+The outputs are identical to the straightforward per-pattern versions; see
+backend/scripts/benchmarks/bench_text_utils.py.
 """
 import re
 import logging
-from typing import Optional, List, Dict, Match
+from functools import lru_cache
+from typing import FrozenSet, Optional, List, Dict, Match, Pattern, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Size of each normalizer's LRU cache (distinct strings seen in one enrichment run stay well below this)
+_CACHE_SIZE: int = 8192
+
 # Regex pattern to safely split collaboration brewery names without breaking names like "Oxford"
 COLLAB_SPLIT_PATTERN = r'\s+(?:x|X|with)\s+|\s*[×&/+]\s*|\s*w/\s*'
 
@@ -24,17 +35,36 @@ _ABBREVIATION_MAP: Dict[str, str] = {
 }
 
 
+_RE_LR_NUMBER: Pattern[str] = re.compile(r'\bLR\s*([0-9]+)\b', re.IGNORECASE)
+# One pass over all whole-word abbreviations; the expansions never contain another abbreviation,
+# so this equals applying the map entries one after another
+_ABBREVIATION_LOOKUP: Dict[str, str] = {abbr.strip(): expanded.strip() for abbr, expanded in _ABBREVIATION_MAP.items()}
+_RE_ABBREVIATION: Pattern[str] = re.compile(
+    r'\b(?:' + '|'.join(re.escape(a) for a in sorted(_ABBREVIATION_LOOKUP, key=len, reverse=True)) + r')\b',
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _expand_abbreviations(text: str) -> str:
+    # Expand numeric combinations like LR39 -> Limited Release 39
+    result = _RE_LR_NUMBER.sub(r'Limited Release \1', text)
+    # Case-insensitive replacement of whole-word abbreviations
+    return _RE_ABBREVIATION.sub(lambda m: _ABBREVIATION_LOOKUP[m.group(0).lower()], result)
+
+
 def expand_abbreviations(text: str) -> str:
     """Expands common beer abbreviations (DDH, TDH, LR, etc.) for better matching."""
     if not text:
         return text
-    result = text
-    # Expand numeric combinations like LR39 -> Limited Release 39
-    result = re.sub(r'\bLR\s*([0-9]+)\b', r'Limited Release \1', result, flags=re.IGNORECASE)
-    for abbr, expanded in _ABBREVIATION_MAP.items():
-        # Case-insensitive replacement of whole-word abbreviations
-        result = re.sub(r'\b' + re.escape(abbr.strip()) + r'\b', expanded.strip(), result, flags=re.IGNORECASE)
-    return result
+    return _expand_abbreviations(text)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _normalize_for_comparison(text: str, expand_abbr: bool) -> str:
+    if expand_abbr:
+        text = _expand_abbreviations(text)
+    return "".join([c.lower() for c in text if c.isalnum()])
 
 
 def normalize_for_comparison(text: str, expand_abbr: bool = False) -> str:
@@ -46,9 +76,7 @@ def normalize_for_comparison(text: str, expand_abbr: bool = False) -> str:
     """
     if not text:
         return ""
-    if expand_abbr:
-        text = expand_abbreviations(text)
-    return "".join(c.lower() for c in text if c.isalnum())
+    return _normalize_for_comparison(text, expand_abbr)
 
 
 # Common beer style suffixes (sorted by length descending for greedy matching)
@@ -90,34 +118,40 @@ _WORD_NUMBER_MAP: Dict[str, str] = {
 }
 
 
+_ROMAN_TRANSLATION: Dict[int, str] = str.maketrans(_ROMAN_UNICODE_MAP)
+_RE_ASCII_WORD: Pattern[str] = re.compile(r'\b[a-zA-Z]+\b')
+
+
+def _replace_number_word(m: Match[str]) -> str:
+    return _WORD_NUMBER_MAP.get(m.group(0).lower(), m.group(0))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
 def normalize_numbers_and_romans(text: str) -> str:
     """Converts Roman numerals (Ⅲ, III) and word numbers (Three) to Arabic digits (3)."""
     if not text:
         return ""
-    result = text
-    for char, digit in _ROMAN_UNICODE_MAP.items():
-        result = result.replace(char, digit)
-    def replace_word(m: re.Match) -> str:
-        word = m.group(0).lower()
-        return _WORD_NUMBER_MAP.get(word, m.group(0))
-    result = re.sub(r'\b[a-zA-Z]+\b', replace_word, result)
-    return result
+    return _RE_ASCII_WORD.sub(_replace_number_word, text.translate(_ROMAN_TRANSLATION))
+
 
+def _stem_word(m: Match[str]) -> str:
+    w = m.group(0)
+    w_lower = w.lower()
+    if len(w_lower) > 4 and w_lower.endswith('ies'):
+        return w[:-3] + ('y' if w.islower() else 'Y')
+    if len(w_lower) > 4 and w_lower.endswith('es') and w_lower[-3] in 'xzsh':
+        return w[:-2]
+    if len(w_lower) > 3 and w_lower.endswith('s') and not w_lower.endswith(('ss', 'us', 'is', 'as', 'os', 'ys')):
+        return w[:-1]
+    return w
 
+
+@lru_cache(maxsize=_CACHE_SIZE)
 def normalize_singular_plural(text: str) -> str:
     """Normalizes plural and singular English words (e.g. Fruits -> Fruit, Berries -> Berry) for robust matching."""
     if not text:
         return ""
-    def _stem_word(w: str) -> str:
-        w_lower = w.lower()
-        if len(w_lower) > 4 and w_lower.endswith('ies'):
-            return w[:-3] + ('y' if w.islower() else 'Y')
-        if len(w_lower) > 4 and w_lower.endswith('es') and w_lower[-3] in 'xzsh':
-            return w[:-2]
-        if len(w_lower) > 3 and w_lower.endswith('s') and not w_lower.endswith(('ss', 'us', 'is', 'as', 'os', 'ys')):
-            return w[:-1]
-        return w
-    return re.sub(r'\b[a-zA-Z]+\b', lambda m: _stem_word(m.group(0)), text)
+    return _RE_ASCII_WORD.sub(_stem_word, text)
 
 
 # Variant modifier phrases that distinguish different versions of the same base beer.
@@ -147,17 +181,14 @@ VARIANT_MODIFIERS: List[str] = sorted([
 _VARIANT_MODIFIERS_NORM: List[str] = [normalize_for_comparison(m) for m in VARIANT_MODIFIERS]
 
 
-def extract_variant_modifiers(name: str) -> set:
+@lru_cache(maxsize=_CACHE_SIZE)
+def extract_variant_modifiers(name: str) -> FrozenSet[str]:
     """
     Extracts variant modifier keywords found in a beer name.
-    Returns a set of normalized modifier strings present in the name.
+    Returns a (frozen) set of normalized modifier strings present in the name.
     """
     name_norm = normalize_for_comparison(name, expand_abbr=True)
-    found: set = set()
-    for mod_norm in _VARIANT_MODIFIERS_NORM:
-        if mod_norm in name_norm:
-            found.add(mod_norm)
-    return found
+    return frozenset(mod_norm for mod_norm in _VARIANT_MODIFIERS_NORM if mod_norm in name_norm)
 
 
 def has_variant_mismatch(name_a: str, name_b: str) -> bool:
@@ -194,29 +225,45 @@ def has_variant_mismatch(name_a: str, name_b: str) -> bool:
 
 
 
+_RE_ORDINAL: Pattern[str] = re.compile(r'\b\d+(?:st|nd|rd|th)\b', re.IGNORECASE)
+
+
+def _replace_ordinal(m: Match[str]) -> str:
+    return _ORDINAL_MAP.get(m.group(0).lower(), m.group(0))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
 def normalize_ordinals(text: str) -> str:
     """Converts ordinal numbers (11th, 2nd, etc.) to their English word equivalents."""
-    def replace_ordinal(m: Match[str]) -> str:
-        return _ORDINAL_MAP.get(m.group(0).lower(), m.group(0))
-    return re.sub(r'\b\d+(?:st|nd|rd|th)\b', replace_ordinal, text, flags=re.IGNORECASE)
+    return _RE_ORDINAL.sub(_replace_ordinal, text)
 
 
+# Shared by strip_for_core_comparison and clean_beer_name
+_RE_BRACKETED_DATE: Pattern[str] = re.compile(r'\s*[([（]\s*(?:20)?\d{2}(?:[./-]\d{1,2})?\s*[)\]）]\s*')
+_RE_TRAILING_DATE: Pattern[str] = re.compile(r'\s+(?:20)?\d{2}[./-]\d{1,2}$')
+_RE_COLON_TAIL: Pattern[str] = re.compile(r':.*$')
+
+_RE_CORE_DASH: Pattern[str] = re.compile(r'\s*[–—-]\s*')
+_RE_CORE_STYLE_SUFFIX: Pattern[str] = re.compile(
+    r'\s+(?:Sake IPA|Sake Ale|Rice Ale|Sake|IPA|DIPA|TIPA|Hazy IPA|Double IPA|Triple IPA|NEIPA|West Coast IPA|'
+    r'Session IPA|Stout|Imperial Stout|Pale Ale|Lager|Pilsner|Sour|Porter|Ale|Saison|Gose)\s*$',
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
 def strip_for_core_comparison(text: str) -> str:
     """Strips year, date markers, style suffixes, dashes, and punctuation for core name comparison."""
     # Remove year/date in parens or brackets like (2026), (2026.07), [26/07], (2026-07)
-    text = re.sub(r'\s*[([（]\s*(?:20)?\d{2}(?:[./-]\d{1,2})?\s*[)\]）]\s*', ' ', text)
+    text = _RE_BRACKETED_DATE.sub(' ', text)
     # Remove standalone dates like 2026.07 at end
-    text = re.sub(r'\s+(?:20)?\d{2}[./-]\d{1,2}$', ' ', text)
+    text = _RE_TRAILING_DATE.sub(' ', text)
     # Remove em-dashes and en-dashes (common in Untappd names)
-    text = re.sub(r'\s*[–—-]\s*', ' ', text)
+    text = _RE_CORE_DASH.sub(' ', text)
     # Remove colons and everything after (often used for fruit additions in JP shops)
-    text = re.sub(r':.*$', '', text)
+    text = _RE_COLON_TAIL.sub('', text)
     # Remove common beer style suffixes at end
-    stripped = re.sub(
-        r'\s+(?:Sake IPA|Sake Ale|Rice Ale|Sake|IPA|DIPA|TIPA|Hazy IPA|Double IPA|Triple IPA|NEIPA|West Coast IPA|'
-        r'Session IPA|Stout|Imperial Stout|Pale Ale|Lager|Pilsner|Sour|Porter|Ale|Saison|Gose)\s*$',
-        '', text, flags=re.IGNORECASE
-    )
+    stripped = _RE_CORE_STYLE_SUFFIX.sub('', text)
     stripped_clean = stripped.strip()
     # Avoid over-stripping when the style word is part of a short core title (e.g. "Whisky Sour", "Breakfast Stout")
     if len(stripped_clean) <= 3 or (len(stripped_clean.split()) == 1 and len(text.strip().split()) == 2 and len(stripped_clean) <= 4):
@@ -224,94 +271,81 @@ def strip_for_core_comparison(text: str) -> str:
     return stripped_clean
 
 
-def clean_beer_name(name: str) -> str:
-    """
-    Cleans beer name by removing common noise patterns:
-    - Japanese series markers (〜, シリーズ, #XX, Vol.X)
-    - Batch/version markers (Batch X, Ver.X, etc.)
-    - Style descriptions in parentheses
-    """
-    if not name:
-        return name
-
-    original = name
-
+# clean_beer_name passes, in order: (pattern, replacement)
+_CLEAN_BEER_PASSES: List[Tuple[Pattern[str], str]] = [
     # Remove content after 〜 (wave dash - usually series info)
-    name = re.sub(r'〜.*$', '', name)
-    name = re.sub(r'~.*$', '', name)
-
+    (re.compile(r'〜.*$'), ''),
+    (re.compile(r'~.*$'), ''),
     # Remove シリーズ and everything after
-    name = re.sub(r'シリーズ.*$', '', name)
-
+    (re.compile(r'シリーズ.*$'), ''),
     # Remove hop treatment prefixes (TDH/DDH/SDH)
-    name = re.sub(r'\b(?:TDH|DDH|SDH)\s+', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\b(?:Triple|Double|Single)\s+Dry\s+Hopped\s+', '', name, flags=re.IGNORECASE)
-
+    (re.compile(r'\b(?:TDH|DDH|SDH)\s+', re.IGNORECASE), ''),
+    (re.compile(r'\b(?:Triple|Double|Single)\s+Dry\s+Hopped\s+', re.IGNORECASE), ''),
     # Remove date/year markers like (2026.07), (2026/07), (26.07), [2026.07], (2026)
-    name = re.sub(r'\s*[([（]\s*(?:20)?\d{2}(?:[./-]\d{1,2})?\s*[)\]）]\s*', ' ', name)
-    name = re.sub(r'\s+(?:20)?\d{2}[./-]\d{1,2}$', '', name)
-
+    (_RE_BRACKETED_DATE, ' '),
+    (_RE_TRAILING_DATE, ''),
     # Remove #XX, Vol.X, Batch X patterns
-    name = re.sub(r'#\d+', '', name)
-    name = re.sub(r'Vol\.?\s*\d+', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'Batch\s*\d+', '', name, flags=re.IGNORECASE)
-
+    (re.compile(r'#\d+'), ''),
+    (re.compile(r'Vol\.?\s*\d+', re.IGNORECASE), ''),
+    (re.compile(r'Batch\s*\d+', re.IGNORECASE), ''),
     # Remove container info in parentheses (e.g. (CAN), (BOTTLE)) but preserve NITRO/Cask variants
-    name = re.sub(
-        r'\s*\([^)]*(?:can|bottle|keg)[^)]*\)',
-        '', name, flags=re.IGNORECASE
-    )
+    (re.compile(r'\s*\([^)]*(?:can|bottle|keg)[^)]*\)', re.IGNORECASE), ''),
     # 日本語の括弧も同様に、缶・瓶・生樽の容器表記のみ除去（nitro/窒素/カスクは保護）
-    name = re.sub(
-        r'\s*[（(][^）)]*(?:can|bottle|keg|缶|瓶|生樽)[^）)]*[）)]',
-        '', name, flags=re.IGNORECASE
-    )
-
+    (re.compile(r'\s*[（(][^）)]*(?:can|bottle|keg|缶|瓶|生樽)[^）)]*[）)]', re.IGNORECASE), ''),
     # Remove Japanese parentheses content that looks like version info or anniversary
-    name = re.sub(r'（[^）]*版[^）]*）', '', name)
-    
+    (re.compile(r'（[^）]*版[^）]*）'), ''),
     # Remove anything after a colon (often used for variants like "Name: Cherry/Vanilla")
-    name = re.sub(r':.*$', '', name)
-
+    (_RE_COLON_TAIL, ''),
     # Remove style descriptions in parentheses
-    name = re.sub(
+    (re.compile(
         r'\s*\([^)]*(?:IPA|Lager|Stout|Ale|Saison|Porter|Pilsner|Pale|Hazy|DDH|TDH|DIPA|TIPA|Imperial|Session)[^)]*\)',
-        '', name, flags=re.IGNORECASE
-    )
-    name = re.sub(r'\s*\([^)]*w/[^)]*\)', '', name)  # e.g., "(w/Cryo Fresh Hops)"
-
+        re.IGNORECASE,
+    ), ''),
+    (re.compile(r'\s*\([^)]*w/[^)]*\)'), ''),  # e.g., "(w/Cryo Fresh Hops)"
     # Remove standalone beer style descriptors
-    name = re.sub(
+    (re.compile(
         r'\s+(?:Imperial|Russian Imperial|American Imperial)\s+(?:Stout|IPA|Porter|Lager|Pale Ale)\b',
-        '', name, flags=re.IGNORECASE
-    )
-    name = re.sub(
+        re.IGNORECASE,
+    ), ''),
+    (re.compile(
         r'\s+(?:West Coast|East Coast|New England|Hazy|Session|Double|Triple)\s+(?:IPA|Pale Ale|Lager)\b',
-        '', name, flags=re.IGNORECASE
-    )
-    name = re.sub(
-        r'\s+(?:Sour|Fruited|Barrel-Aged|Oak-Aged)\s+(?:Ale|Beer|Stout|IPA)\b',
-        '', name, flags=re.IGNORECASE
-    )
+        re.IGNORECASE,
+    ), ''),
+    (re.compile(r'\s+(?:Sour|Fruited|Barrel-Aged|Oak-Aged)\s+(?:Ale|Beer|Stout|IPA)\b', re.IGNORECASE), ''),
     # Single-word styles at the end
-    name = re.sub(r'\s+(?:Sake IPA|Sake Ale|Rice Ale|Sake|Hazy IPA|Double IPA|Triple IPA|West Coast IPA|Session IPA|NEIPA|IPA|DIPA|TIPA|Stout|Porter|Lager|Pilsner|Saison|Ale)$', '', name, flags=re.IGNORECASE)
-
+    (re.compile(
+        r'\s+(?:Sake IPA|Sake Ale|Rice Ale|Sake|Hazy IPA|Double IPA|Triple IPA|West Coast IPA|Session IPA|NEIPA|IPA|DIPA|TIPA|Stout|Porter|Lager|Pilsner|Saison|Ale)$',
+        re.IGNORECASE,
+    ), ''),
     # Remove -〇〇編- style suffixes
-    name = re.sub(r'-[^-]+編-?$', '', name)
-    name = re.sub(r'－[^－]+編－?$', '', name)
-
+    (re.compile(r'-[^-]+編-?$'), ''),
+    (re.compile(r'－[^－]+編－?$'), ''),
     # Remove version/multiplier markers (2x, 3x, etc.)
-    name = re.sub(r'\s+\d+[xX]\s*', ' ', name)
-    name = re.sub(r'\s+\d+[xX]$', '', name)
-
+    (re.compile(r'\s+\d+[xX]\s*'), ' '),
+    (re.compile(r'\s+\d+[xX]$'), ''),
     # Normalize DR./MR./ST. etc.
-    name = re.sub(r'\bDR\.\s*', 'Dr ', name, flags=re.IGNORECASE)
-    name = re.sub(r'\bMR\.\s*', 'Mr ', name, flags=re.IGNORECASE)
-    name = re.sub(r'\bST\.\s*', 'St ', name, flags=re.IGNORECASE)
-    
+    (re.compile(r'\bDR\.\s*', re.IGNORECASE), 'Dr '),
+    (re.compile(r'\bMR\.\s*', re.IGNORECASE), 'Mr '),
+    (re.compile(r'\bST\.\s*', re.IGNORECASE), 'St '),
     # Special: Remove parenthesis that contain long sentences (e.g. toe 25th Anniversary)
     # This prevents the search query from being too specific and failing entirely.
-    name = re.sub(r'\([^)]+\)', '', name)
+    (re.compile(r'\([^)]+\)'), ''),
+]
+
+
+def clean_beer_name(name: str) -> str:
+    """
+    Cleans beer name by removing common noise patterns:
+    - Japanese series markers (〜, シリーズ, #XX, Vol.X)
+    - Batch/version markers (Batch X, Ver.X, etc.)
+    - Style descriptions in parentheses
+    """
+    if not name:
+        return name
+
+    original = name
+    for pattern, replacement in _CLEAN_BEER_PASSES:
+        name = pattern.sub(replacement, name)
 
     # Clean up extra whitespace
     name = ' '.join(name.split())
@@ -322,6 +356,28 @@ def clean_beer_name(name: str) -> str:
     return name.strip()
 
 
+_BREWERY_SUFFIX_LIST: List[str] = [
+    # English
+    ' Beer Company', ' Brewing Co.', ' Brewing Company', ' Brewery Co.',
+    ' Beer Co', ' Brewing', ' Brewery', ' Beer', ' Co.', ' Company', ' Corporation', ' Corp.',
+    ' Brewhouse', ' Brewpub', ' Craft Beer',
+    # Czech
+    ' pivovar', ' pivovar a.s.', ' pivovarský dům',
+    # Spanish
+    ' cervecería', ' cerveza', ' cervezas',
+    # German
+    ' brauerei', ' bräu', ' brauhaus',
+    # French
+    ' brasserie',
+    # Italian
+    ' birrificio',
+    # Japanese
+    ' 醸造所', ' ブルワリー', ' ビール',
+]
+# Longest first, pre-lowered
+_BREWERY_SUFFIXES: List[str] = [s.lower() for s in sorted(_BREWERY_SUFFIX_LIST, key=len, reverse=True)]
+
+
 def clean_brewery_name(name: str) -> str:
     """
     Cleans brewery name by removing common suffixes (Brewing, Brewery, Beer, etc.)
@@ -330,29 +386,10 @@ def clean_brewery_name(name: str) -> str:
     if not name:
         return name
 
-    suffixes: List[str] = [
-        # English
-        ' Beer Company', ' Brewing Co.', ' Brewing Company', ' Brewery Co.',
-        ' Beer Co', ' Brewing', ' Brewery', ' Beer', ' Co.', ' Company', ' Corporation', ' Corp.',
-        ' Brewhouse', ' Brewpub', ' Craft Beer',
-        # Czech
-        ' pivovar', ' pivovar a.s.', ' pivovarský dům',
-        # Spanish
-        ' cervecería', ' cerveza', ' cervezas',
-        # German
-        ' brauerei', ' bräu', ' brauhaus',
-        # French
-        ' brasserie',
-        # Italian
-        ' birrificio',
-        # Japanese
-        ' 醸造所', ' ブルワリー', ' ビール',
-    ]
-    suffixes.sort(key=len, reverse=True)
-
     original = name
-    for suffix in suffixes:
-        if name.lower().endswith(suffix.lower()):
+    name_lower = name.lower()
+    for suffix in _BREWERY_SUFFIXES:
+        if name_lower.endswith(suffix):
             name = name[:-len(suffix)].strip()
             break
 
@@ -1,12 +1,21 @@
 """
 Validation functions for matching beer/brewery names in Untappd search results.
 Split from searcher.py for better modularity.
+
+Batch scoring: one search page yields N candidates that are all scored against the same expected name.
+`score_beer_matches` builds every normalized form of the expected beer / brewery once per batch
+(`_ExpectedBeer`, `_ExpectedBrewery`), then runs the unchanged score ladder for each candidate.
+The edit-ratio checks skip difflib when the answer is known without it:
+- For substring pairs the ratio has a closed form (`_substring_ratio`).
+- In the fuzzy-typo step the expected side is analysed once (SequenceMatcher.set_seq2), and the cheap
+  upper bounds (real_quick_ratio / quick_ratio) reject most candidates before ratio() is computed.
+Scores are identical to scoring each candidate on its own, on the same 0-100 scale.
 """
 import re
 import logging
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
 from difflib import SequenceMatcher
-from bs4 import Tag
+from .candidate import Candidate, CandidateLike, as_candidate
 from .text_utils import (
     normalize_for_comparison, normalize_ordinals, normalize_numbers_and_romans,
     normalize_singular_plural,
@@ -34,15 +43,37 @@ def set_brewery_aliases(aliases: Dict[str, List[str]]) -> None:
     pass
 
 
+_RE_PARENTHESIZED = re.compile(r'\s*[（(][^）)]*[）)]\s*')
+_RE_PARENTHESIZED_INSIDE = re.compile(r'[（(]([^）)]+)[）)]')
+_RE_ASCII_TOKEN = re.compile(r'[a-z0-9]+')
+_RE_YEAR = re.compile(r'\b20\d{2}\b')
+
+# Extra words that may surround a shorter name without making it a different beer
+_SUBSTRING_NOISE: Tuple[str, ...] = (
+    "barrel", "aged", "sour", "ale", "stout", "ipa", "collaborat", "batch", "edition", "series", "vol", "ver",
+    "double", "triple", "imperial", "hazy", "neipa", "shigakogen", "tamamura", "honten", "fresh", "hop", "wet",
+    "dry", "anniversary", "year",
+)
+_SUBSTRING_MIN_RATIO: float = 0.78
+_FUZZY_MIN_RATIO: float = 0.82
+# difflib's "popular element" junk heuristic applies once the second sequence has this many items
+_DIFFLIB_AUTOJUNK_LEN: int = 200
+_COLLAB_SEPARATORS: Tuple[str, ...] = (' x ', ' X ', 'x', 'X', '×', '/', '&', '+')
+
+# (normalized expected brewery, its ASCII words of 3+ chars): what _safe_substring accepts as remainder noise
+_BreweryNoise = Tuple[str, Tuple[str, ...]]
+_NO_BREWERY_NOISE: _BreweryNoise = ("", ())
+
+
 def get_name_parts(name: str) -> List[str]:
     """Extracts the full name, the part before parentheses, and any parts inside parentheses."""
     if not name:
         return []
     parts = [name]
-    outside = re.sub(r'\s*[（(][^）)]*[）)]\s*', ' ', name).strip()
+    outside = _RE_PARENTHESIZED.sub(' ', name).strip()
     if outside and outside != name:
         parts.append(outside)
-    insides = re.findall(r'[（(]([^）)]+)[）)]', name)
+    insides = _RE_PARENTHESIZED_INSIDE.findall(name)
     for inc in insides:
         inc_clean = inc.strip()
         if inc_clean and inc_clean not in parts:
@@ -50,8 +81,26 @@ def get_name_parts(name: str) -> List[str]:
     return parts
 
 
-def _is_safe_substring_match(str_a: str, str_b: str, expected_brewery: Optional[str] = None) -> bool:
-    """Checks if one string being inside the other is a safe match without major extra unrelated words."""
+def _brewery_noise(expected_brewery: Optional[str]) -> _BreweryNoise:
+    if not expected_brewery:
+        return _NO_BREWERY_NOISE
+    words = tuple(w for w in _RE_ASCII_TOKEN.findall(expected_brewery.lower()) if len(w) >= 3)
+    return normalize_for_comparison(expected_brewery), words
+
+
+def _substring_ratio(shorter: str, longer: str) -> float:
+    """
+    SequenceMatcher(None, shorter, longer).ratio() when `shorter in longer`, without running difflib.
+    With no junk, the longest matching block is all of `shorter` and nothing is left on either side of it,
+    so the ratio is exactly 2·len(shorter) / (len(shorter) + len(longer)). difflib's autojunk heuristic
+    (second sequence of 200+ chars) can break that, so long strings still go through difflib.
+    """
+    if len(longer) >= _DIFFLIB_AUTOJUNK_LEN:
+        return SequenceMatcher(None, shorter, longer).ratio()
+    return 2.0 * len(shorter) / (len(shorter) + len(longer))
+
+
+def _safe_substring(str_a: str, str_b: str, noise: _BreweryNoise) -> bool:
     if not str_a or not str_b:
         return False
     if str_a == str_b:
@@ -61,26 +110,97 @@ def _is_safe_substring_match(str_a: str, str_b: str, expected_brewery: Optional[
         return False
     if len(shorter) < 3:
         return False
-    ratio = SequenceMatcher(None, shorter, longer).ratio()
-    if ratio >= 0.78:
+    if _substring_ratio(shorter, longer) >= _SUBSTRING_MIN_RATIO:
         return True
     # If ratio < 0.78, check if the extra portion is purely style/variant/number/brewery noise
     remainder = longer.replace(shorter, "")
-    remainder = re.sub(r'\b20\d{2}\b', '', remainder)
-    allowed_noise = ["barrel", "aged", "sour", "ale", "stout", "ipa", "collaborat", "batch", "edition", "series", "vol", "ver", "double", "triple", "imperial", "hazy", "neipa", "shigakogen", "tamamura", "honten", "fresh", "hop", "wet", "dry", "anniversary", "year"]
-    if any(n in remainder for n in allowed_noise):
+    remainder = _RE_YEAR.sub('', remainder)
+    if any(n in remainder for n in _SUBSTRING_NOISE):
         return True
-    if expected_brewery:
-        brew_norm = normalize_for_comparison(expected_brewery)
-        if brew_norm and (brew_norm in remainder or remainder in brew_norm):
-            return True
-        for b_word in re.findall(r'[a-z0-9]+', expected_brewery.lower()):
-            if len(b_word) >= 3 and b_word in remainder:
-                return True
-    return False
+    brew_norm, brew_words = noise
+    if brew_norm and (brew_norm in remainder or remainder in brew_norm):
+        return True
+    return any(b_word in remainder for b_word in brew_words)
 
 
-def validate_beer_match(result_element: Union[Tag, Dict[str, Any]], expected_beer: str, expected_brewery: Optional[str] = None) -> bool:
+def _is_safe_substring_match(str_a: str, str_b: str, expected_brewery: Optional[str] = None) -> bool:
+    """Checks if one string being inside the other is a safe match without major extra unrelated words."""
+    return _safe_substring(str_a, str_b, _brewery_noise(expected_brewery))
+
+
+class _ExpectedBeer:
+    """
+    Every form of the expected beer name that the score ladder compares against, built once per batch.
+    The core-name forms (steps 4-7) are built on first use only, because clean_beer_name logs and most
+    batches are decided before step 4.
+    """
+    __slots__ = (
+        'name', 'norm', 'expanded', 'words', 'ord', 'num', 'pl',
+        'clean', 'core', 'ord_core', 'parts', 'fuzzy',
+    )
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.norm: str = normalize_for_comparison(name)
+        self.expanded: str = normalize_for_comparison(name, expand_abbr=True)
+        self.words = frozenset(_RE_ASCII_TOKEN.findall(name.lower()))
+        self.ord: str = normalize_for_comparison(normalize_ordinals(name))
+        self.num: str = normalize_for_comparison(normalize_numbers_and_romans(name))
+        self.pl: str = normalize_for_comparison(normalize_singular_plural(name))
+        self.clean: Optional[str] = None
+        self.core: str = ""
+        self.ord_core: str = ""
+        self.parts: List[Tuple[str, str]] = []
+        self.fuzzy: Optional[SequenceMatcher] = None
+
+    def ensure_core(self) -> None:
+        if self.clean is not None:
+            return
+        self.clean = clean_beer_name(self.name)
+        self.core = normalize_for_comparison(strip_for_core_comparison(self.clean))
+        self.ord_core = _ord_core(self.clean)
+        self.parts = _comparable_parts(self.clean)
+        # 意図: difflib は第 2 引数側の解析 (b2j) をキャッシュするので、固定の期待名を seq2 にして使い回す
+        self.fuzzy = SequenceMatcher(None)
+        self.fuzzy.set_seq2(self.core)
+
+
+def _ord_core(clean: str) -> str:
+    return normalize_for_comparison(strip_for_core_comparison(normalize_singular_plural(normalize_numbers_and_romans(normalize_ordinals(clean)))))
+
+
+def _comparable_parts(clean: str) -> List[Tuple[str, str]]:
+    """(part, normalized core of part) for the parts long enough to compare (step 6)."""
+    parts: List[Tuple[str, str]] = []
+    for part in get_name_parts(clean):
+        part_norm = normalize_for_comparison(strip_for_core_comparison(part))
+        if not part_norm:
+            continue
+        if (part_norm.isascii() and len(part_norm) < 3) or len(part_norm) < 2:
+            continue
+        parts.append((part, part_norm))
+    return parts
+
+
+class _ExpectedBrewery:
+    """Forms of the expected brewery name used by validate_brewery_match, built once per batch."""
+    __slots__ = ('name', 'norm', 'cleaned', 'cleaned_norm', 'boundary', 'collab_parts', 'noise')
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.norm: str = normalize_for_comparison(name)
+        self.cleaned: str = clean_brewery_name(name)
+        self.cleaned_norm: str = normalize_for_comparison(self.cleaned)
+        self.boundary: Pattern[str] = re.compile(rf'\b{re.escape(self.cleaned.lower())}\b')
+        self.collab_parts: List[Tuple[str, str]] = []
+        if any(sep in name for sep in _COLLAB_SEPARATORS):
+            for part in re.split(COLLAB_SPLIT_PATTERN, name):
+                if part:
+                    self.collab_parts.append((part, normalize_for_comparison(part)))
+        self.noise: _BreweryNoise = _brewery_noise(name)
+
+
+def validate_beer_match(result_element: CandidateLike, expected_beer: str, expected_brewery: Optional[str] = None) -> bool:
     """
     Returns True if the Untappd beer element matches expected_beer and expected_brewery.
     Calls score_beer_match internally and requires score > 0.
@@ -88,7 +208,7 @@ def validate_beer_match(result_element: Union[Tag, Dict[str, Any]], expected_bee
     return score_beer_match(result_element, expected_beer, expected_brewery) > 0
 
 
-def score_beer_match(result_elem: Union[Tag, Dict[str, Any]], expected_beer: str, expected_brewery: Optional[str] = None) -> int:
+def score_beer_match(result_elem: CandidateLike, expected_beer: str, expected_brewery: Optional[str] = None) -> int:
     """
     Scores how well an Untappd beer element matches expected_beer (and expected_brewery).
     Returns an integer from 0 to 100:
@@ -103,44 +223,68 @@ def score_beer_match(result_elem: Union[Tag, Dict[str, Any]], expected_beer: str
       -  50: Part/Token exact or inclusion match (parentheses splitting)
       -   0: No acceptable match or variant mismatch detected
     """
-    if not result_elem:
-        return 0
+    return score_beer_matches([result_elem], expected_beer, expected_brewery)[0]
+
+
+def score_beer_matches(
+    result_elems: Sequence[CandidateLike], expected_beer: str, expected_brewery: Optional[str] = None,
+) -> List[int]:
+    """
+    score_beer_match for N candidates against one expected beer (and brewery), in input order.
+    The expected-side forms are computed once, and the brewery check is done once per distinct
+    candidate brewery name (a brewery search page usually has just one).
+    """
     if not expected_beer:
-        return 100
+        return [100 if elem else 0 for elem in result_elems]
+
+    expected = _ExpectedBeer(expected_beer)
+    expected_brew: Optional[_ExpectedBrewery] = _ExpectedBrewery(expected_brewery) if expected_brewery else None
+    noise: _BreweryNoise = expected_brew.noise if expected_brew else _NO_BREWERY_NOISE
+    brewery_ok: Dict[str, bool] = {}
+
+    scores: List[int] = []
+    for elem in result_elems:
+        if not elem:
+            scores.append(0)
+            continue
+        cand = as_candidate(elem)
+        # An empty result brewery always passes validate_brewery_match
+        if expected_brew and cand.brewery:
+            ok = brewery_ok.get(cand.brewery)
+            if ok is None:
+                ok = brewery_ok[cand.brewery] = _brewery_matches(cand.brewery, expected_brew)
+            if not ok:
+                logger.debug(f"  [Validation] Beer BLOCKED (Brewery Mismatch): expected brewery '{expected_brewery}'")
+                scores.append(0)
+                continue
+        scores.append(_score_candidate(cand, expected, noise))
+    return scores
+
 
-    if expected_brewery and not validate_brewery_match(result_elem, expected_brewery):
-        logger.debug(f"  [Validation] Beer BLOCKED (Brewery Mismatch): expected brewery '{expected_brewery}'")
+def _score_candidate(cand: Candidate, expected: _ExpectedBeer, noise: _BreweryNoise) -> int:
+    """The score ladder of score_beer_match for one candidate whose brewery already passed."""
+    result_beer: str = cand.beer
+    if not result_beer:
         return 0
+    expected_beer: str = expected.name
+    style_text: str = cand.style.lower()
 
-    if isinstance(result_elem, dict):
-        result_beer = result_elem.get('beer_name') or result_elem.get('name') or ''
-        if not result_beer:
-            return 0
-        style_text = (result_elem.get('style') or '').lower()
-    else:
-        name_tag: Optional[Tag] = result_elem.select_one('.name a')
-        if not name_tag:
-            return 0
-        result_beer = name_tag.get_text(strip=True)
-        style_tag = result_elem.select_one('.style')
-        style_text = style_tag.get_text(strip=True).lower() if style_tag else ""
-    
     # 0. Check variant mismatch right upfront
     if has_variant_mismatch(result_beer, expected_beer):
         logger.debug(f"  [Validation] Beer BLOCKED (Variant Mismatch): '{result_beer}' vs '{expected_beer}'")
         return 0
 
     rb_norm: str = normalize_for_comparison(result_beer)
-    eb_norm: str = normalize_for_comparison(expected_beer)
+    eb_norm: str = expected.norm
 
     if not rb_norm or not eb_norm:
         return 0
 
     # Check distinct keyword/style clashes if names are not exact matches
     if rb_norm != eb_norm:
-        eb_words = set(re.findall(r'[a-z0-9]+', expected_beer.lower()))
-        rb_words = set(re.findall(r'[a-z0-9]+', result_beer.lower()))
-        style_words = set(re.findall(r'[a-z0-9]+', style_text))
+        eb_words = expected.words
+        rb_words = set(_RE_ASCII_TOKEN.findall(result_beer.lower()))
+        style_words = set(_RE_ASCII_TOKEN.findall(style_text))
 
         # Block New Engi-land vs Engi!? cross-matching on Shiga Kogen
         if 'engi' in eb_words and ('engiland' in rb_norm or 'land' in rb_words or 'new' in rb_words) and 'engiland' not in eb_norm and 'land' not in eb_words:
@@ -165,102 +309,96 @@ def score_beer_match(result_elem: Union[Tag, Dict[str, Any]], expected_beer: str
 
     # 1b. Exact match after abbreviation expansion (e.g. BA -> Barrel Aged, DDH -> Double Dry Hopped)
     rb_expanded: str = normalize_for_comparison(result_beer, expand_abbr=True)
-    eb_expanded: str = normalize_for_comparison(expected_beer, expand_abbr=True)
+    eb_expanded: str = expected.expanded
     if rb_expanded == eb_expanded:
         logger.info(f"  [Validation] Beer MATCH (Abbr Expanded, 95): '{result_beer}' matches '{expected_beer}'")
         return 95
 
     # 2. Direct inclusion check (with variant guard)
-    if _is_safe_substring_match(rb_norm, eb_norm, expected_brewery):
+    if _safe_substring(rb_norm, eb_norm, noise):
         logger.info(f"  [Validation] Beer MATCH (90): '{result_beer}' matches '{expected_beer}'")
         return 90
 
     # 2b. Direct inclusion after abbreviation expansion
-    if _is_safe_substring_match(rb_expanded, eb_expanded, expected_brewery):
+    if _safe_substring(rb_expanded, eb_expanded, noise):
         logger.info(f"  [Validation] Beer MATCH (Abbr Inclusion, 88): '{result_beer}' matches '{expected_beer}'")
         return 88
 
     # 3. Ordinal normalization check (11th -> eleventh, etc.)
     rb_ord: str = normalize_for_comparison(normalize_ordinals(result_beer))
-    eb_ord: str = normalize_for_comparison(normalize_ordinals(expected_beer))
+    eb_ord: str = expected.ord
     if rb_ord == eb_ord:
         logger.info(f"  [Validation] Beer MATCH (Ordinal Exact, 85): '{result_beer}' matches '{expected_beer}'")
         return 85
-    if _is_safe_substring_match(rb_ord, eb_ord, expected_brewery):
+    if _safe_substring(rb_ord, eb_ord, noise):
         logger.info(f"  [Validation] Beer MATCH (Ordinal, 80): '{result_beer}' matches '{expected_beer}'")
         return 80
 
     # 3b. Number & Roman numeral normalization check (III / Three / Ⅲ -> 3)
     rb_num: str = normalize_for_comparison(normalize_numbers_and_romans(result_beer))
-    eb_num: str = normalize_for_comparison(normalize_numbers_and_romans(expected_beer))
+    eb_num: str = expected.num
     if rb_num == eb_num:
         logger.info(f"  [Validation] Beer MATCH (Number/Roman Exact, 85): '{result_beer}' matches '{expected_beer}'")
         return 85
-    if _is_safe_substring_match(rb_num, eb_num, expected_brewery):
+    if _safe_substring(rb_num, eb_num, noise):
         logger.info(f"  [Validation] Beer MATCH (Number/Roman, 80): '{result_beer}' matches '{expected_beer}'")
         return 80
 
     # 3c. Singular/Plural normalization check (Fruits -> Fruit)
     rb_pl: str = normalize_for_comparison(normalize_singular_plural(result_beer))
-    eb_pl: str = normalize_for_comparison(normalize_singular_plural(expected_beer))
+    eb_pl: str = expected.pl
     if rb_pl == eb_pl:
         logger.info(f"  [Validation] Beer MATCH (Singular/Plural Exact, 85): '{result_beer}' matches '{expected_beer}'")
         return 85
-    if _is_safe_substring_match(rb_pl, eb_pl, expected_brewery):
+    if _safe_substring(rb_pl, eb_pl, noise):
         logger.info(f"  [Validation] Beer MATCH (Singular/Plural, 80): '{result_beer}' matches '{expected_beer}'")
         return 80
 
     # 4. Core name comparison: clean name, strip year, dashes, style suffixes
+    expected.ensure_core()
     rb_clean = clean_beer_name(result_beer)
-    eb_clean = clean_beer_name(expected_beer)
     rb_core: str = normalize_for_comparison(strip_for_core_comparison(rb_clean))
-    eb_core: str = normalize_for_comparison(strip_for_core_comparison(eb_clean))
+    eb_core: str = expected.core
     if rb_core and eb_core:
         if rb_core == eb_core:
             logger.info(f"  [Validation] Beer MATCH (Core Exact, 75): '{result_beer}' matches '{expected_beer}'")
             return 75
-        elif _is_safe_substring_match(rb_core, eb_core, expected_brewery):
+        elif _safe_substring(rb_core, eb_core, noise):
             logger.info(f"  [Validation] Beer MATCH (Core, 70): '{result_beer}' matches '{expected_beer}'")
             return 70
 
     # 5. Combined: ordinal + number/roman + singular/plural + core stripping
-    rb_ord_core: str = normalize_for_comparison(strip_for_core_comparison(normalize_singular_plural(normalize_numbers_and_romans(normalize_ordinals(rb_clean)))))
-    eb_ord_core: str = normalize_for_comparison(strip_for_core_comparison(normalize_singular_plural(normalize_numbers_and_romans(normalize_ordinals(eb_clean)))))
-    if rb_ord_core and eb_ord_core and _is_safe_substring_match(rb_ord_core, eb_ord_core, expected_brewery):
+    rb_ord_core: str = _ord_core(rb_clean)
+    eb_ord_core: str = expected.ord_core
+    if rb_ord_core and eb_ord_core and _safe_substring(rb_ord_core, eb_ord_core, noise):
         logger.info(f"  [Validation] Beer MATCH (Ordinal+Core, 60): '{result_beer}' matches '{expected_beer}'")
         return 60
 
     # 6. Part / Token Inclusion Check (for multilingual or parenthesized titles like "Doron (どろん)" vs "Ise Shima Doron")
-    rb_parts = get_name_parts(rb_clean)
-    eb_parts = get_name_parts(eb_clean)
-    for rp in rb_parts:
-        for ep in eb_parts:
-            rp_norm = normalize_for_comparison(strip_for_core_comparison(rp))
-            ep_norm = normalize_for_comparison(strip_for_core_comparison(ep))
-            if not rp_norm or not ep_norm:
-                continue
-            if (rp_norm.isascii() and len(rp_norm) < 3) or len(rp_norm) < 2:
-                continue
-            if (ep_norm.isascii() and len(ep_norm) < 3) or len(ep_norm) < 2:
-                continue
-            if rp_norm == ep_norm or _is_safe_substring_match(rp_norm, ep_norm, expected_brewery):
+    for rp, rp_norm in _comparable_parts(rb_clean):
+        for ep, ep_norm in expected.parts:
+            if rp_norm == ep_norm or _safe_substring(rp_norm, ep_norm, noise):
                 if not has_variant_mismatch(result_beer, expected_beer):
                     logger.info(f"  [Validation] Beer MATCH (Part/Token Inclusion, 75): '{rp}' matches '{ep}'")
                     return 75
 
     # 7. Fuzzy Match / Typo Tolerance (for minor spelling errors like "Hopwierd" vs "Hopwired")
     if len(rb_core) >= 4 and len(eb_core) >= 4:
-        ratio = SequenceMatcher(None, rb_core, eb_core).ratio()
-        if ratio >= 0.82:
-            if not has_variant_mismatch(result_beer, expected_beer):
-                logger.info(f"  [Validation] Beer MATCH (Fuzzy Typo, 70): '{result_beer}' ≈ '{expected_beer}' (ratio={ratio:.2f})")
-                return 70
+        matcher = expected.fuzzy
+        matcher.set_seq1(rb_core)
+        # real_quick_ratio / quick_ratio are upper bounds of ratio(): most candidates are rejected without it
+        if matcher.real_quick_ratio() >= _FUZZY_MIN_RATIO and matcher.quick_ratio() >= _FUZZY_MIN_RATIO:
+            ratio = matcher.ratio()
+            if ratio >= _FUZZY_MIN_RATIO:
+                if not has_variant_mismatch(result_beer, expected_beer):
+                    logger.info(f"  [Validation] Beer MATCH (Fuzzy Typo, 70): '{result_beer}' ≈ '{expected_beer}' (ratio={ratio:.2f})")
+                    return 70
 
     logger.info(f"  [Validation] Beer FAIL: '{result_beer}' ({rb_norm}) != '{expected_beer}' ({eb_norm})")
     return 0
 
 
-def validate_brewery_match(result_element: Union[Tag, Dict[str, Any]], expected_brewery: str) -> bool:
+def validate_brewery_match(result_element: CandidateLike, expected_brewery: str) -> bool:
     """
     Checks if the brewery name in the search result matches the expected brewery.
     Uses normalized comparison, aliases, and collab logic.
@@ -268,18 +406,16 @@ def validate_brewery_match(result_element: Union[Tag, Dict[str, Any]], expected_
     if not expected_brewery:
         return True
 
-    if isinstance(result_element, dict):
-        result_brewery = result_element.get('brewery_name') or result_element.get('brewery') or ''
-        if not result_brewery:
-            return True
-    else:
-        brewery_tag = result_element.select_one('.brewery')
-        if not brewery_tag:
-            return True
-        result_brewery = brewery_tag.get_text(strip=True)
+    result_brewery: str = as_candidate(result_element).brewery
+    if not result_brewery:
+        return True
+    return _brewery_matches(result_brewery, _ExpectedBrewery(expected_brewery))
+
 
+def _brewery_matches(result_brewery: str, expected: _ExpectedBrewery) -> bool:
+    expected_brewery: str = expected.name
     rb_norm: str = normalize_for_comparison(result_brewery)
-    eb_norm: str = normalize_for_comparison(expected_brewery)
+    eb_norm: str = expected.norm
 
     # 1. Normalization Check
     if rb_norm in eb_norm or eb_norm in rb_norm:
@@ -288,9 +424,8 @@ def validate_brewery_match(result_element: Union[Tag, Dict[str, Any]], expected_
 
     # 2. Cleaned Name Check (removes brewery suffixes like 'brewing', etc.)
     cleaned_result: str = clean_brewery_name(result_brewery)
-    cleaned_expected: str = clean_brewery_name(expected_brewery)
     cr_norm: str = normalize_for_comparison(cleaned_result)
-    ce_norm: str = normalize_for_comparison(cleaned_expected)
+    ce_norm: str = expected.cleaned_norm
     if cr_norm and ce_norm:
         if cr_norm == ce_norm:
             logger.info(f"  [Validation] Brewery MATCH (Cleaned Exact): '{result_brewery}' matches '{expected_brewery}'")
@@ -298,22 +433,16 @@ def validate_brewery_match(result_element: Union[Tag, Dict[str, Any]], expected_
         # Check safe substring match or word boundary match to prevent "rio" matching "riococktail"
         if len(ce_norm) >= 4 and (ce_norm in cr_norm or cr_norm in ce_norm):
             # Verify word boundary for cleaned names
-            pattern = rf'\b{re.escape(cleaned_expected.lower())}\b'
-            if re.search(pattern, cleaned_result.lower()) or _is_safe_substring_match(cr_norm, ce_norm):
+            if expected.boundary.search(cleaned_result.lower()) or _safe_substring(cr_norm, ce_norm, _NO_BREWERY_NOISE):
                 logger.info(f"  [Validation] Brewery MATCH (Cleaned Safe Substring): '{result_brewery}' matches '{expected_brewery}'")
                 return True
 
     # 3. Collaboration Check (x, ×, /, &)
-    if any(sep in expected_brewery for sep in [' x ', ' X ', 'x', 'X', '×', '/', '&', '+']):
-        # Treat both target and expected breweries as potential lists of collaborators
-        parts: List[str] = re.split(COLLAB_SPLIT_PATTERN, expected_brewery)
-        for part in parts:
-            if not part:
-                continue
-            part_norm: str = normalize_for_comparison(part)
-            if part_norm and (part_norm in rb_norm or rb_norm in part_norm):
-                logger.info(f"  [Validation] Brewery MATCH (Collab): '{result_brewery}' matches part '{part}'")
-                return True
+    # Treat both target and expected breweries as potential lists of collaborators
+    for part, part_norm in expected.collab_parts:
+        if part_norm and (part_norm in rb_norm or rb_norm in part_norm):
+            logger.info(f"  [Validation] Brewery MATCH (Collab): '{result_brewery}' matches part '{part}'")
+            return True
 
     logger.info(f"  [Validation] Brewery FAIL: '{result_brewery}' != '{expected_brewery}'")
     return False
@@ -0,0 +1,44 @@
+import pytest
+
+from backend.src.core.lanes import LANE_DDG, LANE_GEMINI, LANE_UNTAPPD, LANE_UNTAPPD_API, get_lane
+from backend.src.services.untappd.brewery_catalog import brewery_catalog
+from backend.src.services.untappd.brewery_resolution import brewery_resolution_cache
+from backend.src.services.untappd.circuit_breaker import untappd_breaker
+from backend.src.services.untappd.page_cache import page_cache
+
+
+@pytest.fixture(autouse=True)
+def _disable_untappd_page_cache():
+    """Keeps tests hermetic: the on-disk Untappd caches must not leak between tests."""
+    enabled = (page_cache.enabled, brewery_resolution_cache.enabled)
+    page_cache.enabled = brewery_resolution_cache.enabled = False
+    yield
+    page_cache.enabled, brewery_resolution_cache.enabled = enabled
+
+
+@pytest.fixture(autouse=True)
+def _disable_untappd_brewery_catalog():
+    """Same for the per-brewery catalog: searcher tests exercise the network search path."""
+    enabled = brewery_catalog.enabled
+    brewery_catalog.enabled = False
+    yield
+    brewery_catalog.enabled = enabled
+
+
+@pytest.fixture(autouse=True)
+def _no_lane_spacing():
+    """Request lanes keep their concurrency limits in tests but do not space requests out or cool down."""
+    lanes = [get_lane(name) for name in (LANE_UNTAPPD, LANE_UNTAPPD_API, LANE_DDG, LANE_GEMINI)]
+    intervals = [lane.min_interval for lane in lanes]
+    for lane in lanes:
+        lane.min_interval = 0.0
+        lane._next_start = 0.0
+    # A tripped breaker must not hold a test for the real cool-down (tests that mock asyncio.sleep would spin)
+    cooldowns = (untappd_breaker.base_cooldown, untappd_breaker.max_cooldown)
+    untappd_breaker.base_cooldown = untappd_breaker.max_cooldown = 0.01
+    untappd_breaker.reset()
+    yield
+    for lane, interval in zip(lanes, intervals):
+        lane.min_interval = interval
+    untappd_breaker.base_cooldown, untappd_breaker.max_cooldown = cooldowns
+    untappd_breaker.reset()
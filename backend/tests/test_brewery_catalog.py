@@ -0,0 +1,116 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from bs4 import BeautifulSoup
+
+from backend.src.services.untappd.brewery_catalog import (
+    BreweryCatalogStore, PAGE_SIZE, get_brewery_catalog, scan_brewery_beer_list, score_catalog_candidates,
+)
+from backend.src.services.untappd.http_client import parse_beer_list_item
+
+BREWERY = "https://untappd.com/w/test-brewing/12345"
+
+
+def _store(tmp_path, **kwargs):
+    params = dict(ttl=60, max_pages=5)
+    params.update(kwargs)
+    return BreweryCatalogStore(str(tmp_path / "catalog.sqlite3"), **params)
+
+
+def _beer(n, name=None):
+    return {'url': f"https://untappd.com/b/test-brewing-{n}/{n}", 'beer_name': name or f"Beer {n}",
+            'brewery_name': "Test Brewing", 'style': "IPA - New England"}
+
+
+def _pages(beers):
+    """Fake fetch_brewery_beer_list serving `beers` (newest first) in PAGE_SIZE pages."""
+    async def fetch(brewery_url, offset=0):
+        return beers[offset:offset + PAGE_SIZE]
+    return fetch
+
+
+def test_parse_beer_list_item():
+    html = (
+        '<div class="beer-item"><p class="name"><a href="/b/test-brewing-hazy/1">Hazy</a></p>'
+        '<p class="style">IPA - New England</p><p class="abv">6.5% ABV</p><p class="ibu">N/A IBU</p>'
+        '<span class="num">(3.91)</span><p class="raters">1,234 Ratings</p></div>'
+    )
+    item = parse_beer_list_item(BeautifulSoup(html, 'lxml').select_one('.beer-item'), default_brewery="Test Brewing")
+    assert item == {
+        'url': "https://untappd.com/b/test-brewing-hazy/1", 'beer_name': "Hazy", 'brewery_name': "Test Brewing",
+        'style': "IPA - New England", 'abv': "6.5%", 'ibu': "N/A", 'rating': "3.91", 'rating_count': "1,234",
+    }
+
+
+@pytest.mark.asyncio
+async def test_initial_crawl_then_incremental_refresh(tmp_path):
+    store = _store(tmp_path, ttl=0)
+    old = [_beer(n) for n in range(40, 0, -1)]
+    fetch = AsyncMock(side_effect=_pages(old))
+    with patch('backend.src.services.untappd.brewery_catalog.fetch_brewery_beer_list', fetch):
+        catalog = await get_brewery_catalog(BREWERY, store=store)
+    assert fetch.await_count == 2
+    assert catalog['complete'] is True
+    assert [b['url'] for b in catalog['beers']] == [b['url'] for b in old]
+
+    # Two new releases: the refresh reads only the first page and stops at the first known beer
+    fetch = AsyncMock(side_effect=_pages([_beer(42), _beer(41)] + old))
+    with patch('backend.src.services.untappd.brewery_catalog.fetch_brewery_beer_list', fetch):
+        catalog = await get_brewery_catalog(BREWERY, store=store)
+    assert fetch.await_count == 1
+    assert catalog['complete'] is True
+    assert [b['beer_name'] for b in catalog['beers'][:3]] == ["Beer 42", "Beer 41", "Beer 40"]
+    assert len(catalog['beers']) == 42
+
+
+@pytest.mark.asyncio
+async def test_fresh_catalog_skips_network_and_failed_crawl_returns_none(tmp_path):
+    store = _store(tmp_path)
+    store.save(BREWERY, [_beer(1)], complete=True)
+    fetch = AsyncMock(return_value=None)
+    with patch('backend.src.services.untappd.brewery_catalog.fetch_brewery_beer_list', fetch):
+        assert (await get_brewery_catalog(BREWERY, store=store))['beers'] == [_beer(1)]
+        fetch.assert_not_awaited()
+        assert await get_brewery_catalog("https://untappd.com/w/other/1", store=store) is None
+
+
+@pytest.mark.asyncio
+async def test_ignored_paging_is_marked_partial(tmp_path):
+    store = _store(tmp_path)
+    first_page = [_beer(n) for n in range(PAGE_SIZE, 0, -1)]
+    fetch = AsyncMock(return_value=first_page)
+    with patch('backend.src.services.untappd.brewery_catalog.fetch_brewery_beer_list', fetch):
+        catalog = await get_brewery_catalog(BREWERY, store=store)
+    assert fetch.await_count == 2
+    assert catalog['complete'] is False
+    assert len(catalog['beers']) == PAGE_SIZE
+
+
+def test_score_catalog_candidates():
+    catalog = {
+        'brewery_url': BREWERY, 'fetched_at': 0.0, 'complete': True,
+        'beers': [_beer(1, "Hop Rocket"), _beer(2, "Hop Rocket Double"), _beer(3, "Night Owl Stout")],
+    }
+    cands = score_catalog_candidates(catalog, ["Hop Rocket", None], "Test Brewing")
+    assert cands[0]['beer_name'] == "Hop Rocket"
+    assert cands[0]['score'] == 100.0
+    assert cands[0]['source'] == 'untappd_catalog'
+    assert "Night Owl Stout" not in [c['beer_name'] for c in cands]
+    assert score_catalog_candidates(catalog, ["Hop Rocket"], "Completely Different Brewery") == []
+
+
+@pytest.mark.asyncio
+async def test_scan_brewery_beer_list_stops_once_all_found(tmp_path):
+    store = _store(tmp_path)
+    beers = [_beer(n) for n in range(80, 0, -1)]
+    fetch = AsyncMock(side_effect=_pages(beers))
+    # Slug renamed since the row was stored: matched by beer id
+    wanted = ["https://untappd.com/b/old-slug/70", _beer(40)['url']]
+    with patch('backend.src.services.untappd.brewery_catalog.fetch_brewery_beer_list', fetch):
+        found = await scan_brewery_beer_list(BREWERY, wanted, store=store)
+    assert fetch.await_count == 2
+    assert found["https://untappd.com/b/old-slug/70"]['beer_name'] == "Beer 70"
+    assert found[_beer(40)['url']]['beer_name'] == "Beer 40"
+    # The pages read were absorbed into the catalog as a partial list
+    assert store.state(BREWERY)[1] is False
+    assert len(store.load(BREWERY)['beers']) == 2 * PAGE_SIZE
@@ -146,3 +146,89 @@ def test_learn_brewery_alias_reject_collab(mock_supabase):
     result = manager.learn_brewery_alias(brewery_name_en="West Coast Brewing", new_alias="West Coast Brewing x Uchu Brewing")
     assert result is False
 
+
+def test_refresh_merges_changed_rows_in_place(mock_supabase):
+    mock_response = MagicMock()
+    mock_response.data = [
+        {"id": "1", "name_en": "West Coast Brewing", "name_jp": "", "aliases": [],
+         "untappd_url": "https://untappd.com/WestCoastBrewing", "updated_at": "2026-01-01T00:00:00+00:00"},
+    ]
+    mock_supabase.table.return_value.select.return_value.limit.return_value.execute.return_value = mock_response
+
+    manager = BreweryManager()
+    held = manager.brewery_index["west coast brewing"]
+    version = manager.version
+
+    changed = MagicMock()
+    changed.data = [
+        {"id": "1", "name_en": "West Coast Brewing", "name_jp": "", "aliases": ["WCB"],
+         "untappd_url": "https://untappd.com/WestCoastBrewing", "updated_at": "2026-02-01T00:00:00+00:00"},
+        {"id": "2", "name_en": "Uchu Brewing", "name_jp": "", "aliases": [],
+         "untappd_url": "https://untappd.com/UchuBrewing", "updated_at": "2026-02-02T00:00:00+00:00"},
+    ]
+    gt = mock_supabase.table.return_value.select.return_value.gt
+    gt.return_value.execute.return_value = changed
+
+    assert manager.refresh() == 2
+    gt.assert_called_with('updated_at', "2026-01-01T00:00:00+00:00")
+    # Existing dicts are updated in place, new rows are appended
+    assert held["aliases"] == ["WCB"]
+    assert manager.brewery_index["wcb"] is held
+    assert "uchu brewing" in manager.brewery_index
+    assert manager.last_updated_at == "2026-02-02T00:00:00+00:00"
+    assert manager.version > version
+
+def test_get_brewery_manager_is_shared(mock_supabase):
+    mock_response = MagicMock()
+    mock_response.data = []
+    mock_supabase.table.return_value.select.return_value.limit.return_value.execute.return_value = mock_response
+
+    with patch('backend.src.services.store.brewery_manager._shared_manager', None):
+        from backend.src.services.store.brewery_manager import get_brewery_manager
+        first = get_brewery_manager()
+        assert get_brewery_manager() is first
+        mock_supabase.table.return_value.select.return_value.limit.assert_called_once()
+
+def test_cache_resolver_follows_learned_aliases(mock_supabase):
+    from backend.src.services.llm.cache_resolver import LocalCacheResolver
+    mock_response = MagicMock()
+    mock_response.data = [
+        {"id": "1", "name_en": "West Coast Brewing", "name_jp": "", "aliases": [],
+         "untappd_url": "https://untappd.com/WestCoastBrewing"},
+    ]
+    mock_supabase.table.return_value.select.return_value.limit.return_value.execute.return_value = mock_response
+
+    manager = BreweryManager()
+    with patch('backend.src.services.llm.cache_resolver.get_supabase_client', return_value=mock_supabase):
+        resolver = LocalCacheResolver(brewery_manager=manager)
+    assert "west coast" in resolver.brewery_dict
+    assert "wcb" not in resolver.brewery_dict
+
+    manager.learn_brewery_alias(brewery_name_en="West Coast Brewing", new_alias="WCB")
+    resolver._load_brewery_dictionary()
+    assert "wcb" in resolver.brewery_dict
+
+def test_find_breweries_in_text_longest_first_once_per_brewery(mock_supabase):
+    mock_response = MagicMock()
+    mock_response.data = [
+        {"id": "1", "name_en": "West Coast", "name_jp": "", "aliases": ["WC"], "untappd_url": None},
+        {"id": "2", "name_en": "West Coast Brewing", "name_jp": "ウエストコースト", "aliases": ["WCB"], "untappd_url": None},
+        {"id": "3", "name_en": "Coast", "name_jp": "", "aliases": [], "untappd_url": None},
+    ]
+    mock_supabase.table.return_value.select.return_value.limit.return_value.execute.return_value = mock_response
+
+    manager = BreweryManager()
+    found = manager.find_breweries_in_text("West Coast Brewing / ウエストコースト Hazy IPA (WCB)")
+    assert [b["id"] for b in found] == ["2", "1", "3"]
+    assert manager.find_breweries_in_text("Nothing known here") == []
+
+    # A learned alias is matched without rebuilding anything by hand
+    manager.learn_brewery_alias(brewery_name_en="Coast", new_alias="Kost")
+    assert [b["id"] for b in manager.find_breweries_in_text("kost pils")] == ["3"]
+
+def test_aho_corasick_matches_substring_scan():
+    from backend.src.core.aho_corasick import AhoCorasick
+    patterns = ["he", "she", "his", "hers", "", "ushe", "x"]
+    matcher = AhoCorasick(patterns)
+    for text in ["ushers", "ahishers", "", "xyz", "shhe"]:
+        assert matcher.find_all(text) == {i for i, p in enumerate(patterns) if p in text}
@@ -0,0 +1,91 @@
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.src.services.untappd import http_client
+from backend.src.services.untappd.brewery_resolution import (
+    BreweryResolutionCache, PROVENANCE_DDG_VALIDATED, PROVENANCE_NOT_FOUND,
+)
+
+
+def _cache(tmp_path, **kwargs):
+    params = dict(ttl=60, negative_ttl=60)
+    params.update(kwargs)
+    return BreweryResolutionCache(str(tmp_path / "resolution.sqlite3"), **params)
+
+
+def test_positive_and_negative_entries(tmp_path):
+    cache = _cache(tmp_path, negative_ttl=0.05)
+    cache.put("Foo Brewing", "https://untappd.com/w/foo-brewing", PROVENANCE_DDG_VALIDATED)
+    cache.put("Unknown Brewery", None, PROVENANCE_NOT_FOUND)
+
+    hit = cache.get("  foo   BREWING ")
+    assert hit['url'] == "https://untappd.com/w/foo-brewing"
+    assert hit['provenance'] == PROVENANCE_DDG_VALIDATED
+    assert hit['resolved_at'] <= time.time()
+    assert cache.get("Unknown Brewery")['url'] is None
+    time.sleep(0.1)
+    # Negative entries expire sooner than positive ones
+    assert cache.get("Unknown Brewery") is None
+    assert cache.get("Foo Brewing") is not None
+
+
+@pytest.mark.asyncio
+async def test_search_brewery_remembers_misses_but_not_failures(tmp_path):
+    cache = _cache(tmp_path)
+    empty_page = MagicMock(status_code=200, text="<html><body>No results</body></html>" + " " * 600)
+    untappd = AsyncMock(return_value=empty_page)
+    ddg = AsyncMock(return_value=[])
+
+    with patch.object(http_client, "brewery_resolution_cache", cache), \
+            patch.object(http_client, "untappd_get", untappd), \
+            patch.object(http_client, "ddg_text_search", ddg):
+        # Untappd answered with no results and DDG found nothing: a real miss, remembered
+        assert await http_client.search_brewery("Nowhere Brewing") is None
+        assert await http_client.search_brewery("Nowhere Brewing") is None
+        assert untappd.await_count == 1
+        assert cache.get("Nowhere Brewing")['provenance'] == PROVENANCE_NOT_FOUND
+
+        # A blocked Untappd search is not a "not found" either, even when DDG finds nothing
+        untappd.return_value = MagicMock(status_code=403, text="")
+        assert await http_client.search_brewery("Blocked Brewing") is None
+        assert await http_client.search_brewery("Blocked Brewing") is None
+        assert untappd.await_count == 3
+        assert cache.get("Blocked Brewing") is None
+
+        # A DDG failure is not a "not found": the next call searches again
+        ddg.side_effect = RuntimeError("202 Ratelimit")
+        assert await http_client.search_brewery("Flaky Brewing") is None
+        ddg.side_effect = None
+        ddg.return_value = [{"href": "https://untappd.com/w/flaky-brewing/beer", "title": "Flaky Brewing"}]
+        assert await http_client.search_brewery("Flaky Brewing") == "https://untappd.com/w/flaky-brewing"
+
+    assert cache.get("Flaky Brewing")['provenance'] == PROVENANCE_DDG_VALIDATED
+
+
+@pytest.mark.asyncio
+async def test_search_brewery_remembers_a_miss_reported_by_ddgs(tmp_path):
+    from ddgs.exceptions import DDGSException
+
+    cache = _cache(tmp_path)
+    empty_page = MagicMock(status_code=200, text="<html><body>No results</body></html>" + " " * 600)
+    untappd = AsyncMock(return_value=empty_page)
+    ddgs = MagicMock()
+    ddgs.__enter__ = MagicMock(return_value=ddgs)
+    ddgs.__exit__ = MagicMock(return_value=False)
+    # ddgs raises this instead of returning an empty list
+    ddgs.text.side_effect = DDGSException("No results found.")
+
+    with patch.object(http_client, "brewery_resolution_cache", cache), \
+            patch.object(http_client, "untappd_get", untappd), \
+            patch("ddgs.DDGS", return_value=ddgs):
+        assert await http_client.search_brewery("Nowhere Brewing") is None
+        assert await http_client.search_brewery("Nowhere Brewing") is None
+
+    # Both DDG queries ran once, then the miss was served from the resolution cache
+    assert [c.args[0] for c in ddgs.text.call_args_list] == [
+        "site:untappd.com/w/ Nowhere Brewing", "site:untappd.com Nowhere Brewing brewery",
+    ]
+    assert untappd.await_count == 1
+    assert cache.get("Nowhere Brewing")['provenance'] == PROVENANCE_NOT_FOUND
@@ -0,0 +1,36 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from backend.src.services.untappd.candidate import Candidate, as_candidate
+from backend.src.services.untappd.validators import score_beer_match, validate_brewery_match
+
+HTML = (
+    '<div class="beer-item"><p class="name"><a href="/b/stone-ipa/1">Stone IPA</a></p>'
+    '<p class="brewery"><a>Stone Brewing</a></p><p class="style">IPA - American</p></div>'
+)
+
+
+def test_tag_dict_and_candidate_convert_identically():
+    tag = BeautifulSoup(HTML, 'lxml').select_one('.beer-item')
+    row = {'beer_name': "Stone IPA", 'brewery_name': "Stone Brewing", 'style': "IPA - American",
+           'url': "https://untappd.com/b/stone-ipa/1"}
+    expected = Candidate("Stone IPA", "Stone Brewing", "IPA - American", "https://untappd.com/b/stone-ipa/1")
+    assert as_candidate(tag) == expected
+    assert as_candidate(row) == expected
+    assert as_candidate(expected) is expected
+    assert as_candidate({'name': "Stone IPA", 'brewery': "Stone Brewing"}) == Candidate("Stone IPA", "Stone Brewing")
+
+
+def test_candidate_is_slotted_and_immutable():
+    cand = Candidate("Stone IPA")
+    assert not hasattr(cand, '__dict__')
+    with pytest.raises(AttributeError):
+        cand.beer = "Other"  # type: ignore[misc]
+
+
+def test_scorers_agree_across_inputs():
+    tag = BeautifulSoup(HTML, 'lxml').select_one('.beer-item')
+    cand = as_candidate(tag)
+    assert score_beer_match(cand, "Stone IPA", "Stone Brewing") == score_beer_match(tag, "Stone IPA", "Stone Brewing") == 100
+    assert validate_brewery_match(Candidate("", "Modern Times"), "Stone Brewing") is False
+    assert score_beer_match(Candidate(""), "Stone IPA") == 0
@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.src.core.lanes import Lane
+from backend.src.services.untappd import circuit_breaker
+from backend.src.services.untappd.circuit_breaker import CircuitBreaker
+
+
+def _breaker(monkeypatch, **kwargs):
+    lane = Lane("test-host", concurrency=1, min_interval=0.0)
+    monkeypatch.setattr(circuit_breaker, "get_lane", lambda name: lane)
+    params = dict(threshold=3, base_cooldown=10, max_cooldown=25)
+    params.update(kwargs)
+    return CircuitBreaker("Test", "test-host", **params), lane
+
+
+def test_opens_after_threshold_and_pauses_lane(monkeypatch):
+    breaker, lane = _breaker(monkeypatch)
+    breaker.record(429)
+    breaker.record(403)
+    assert not breaker.is_open
+    breaker.record(429)
+    assert breaker.is_open
+    assert lane._next_start >= time.monotonic() + 9
+
+
+def test_cooldown_doubles_on_reopen_and_is_capped(monkeypatch):
+    breaker, lane = _breaker(monkeypatch, threshold=1)
+    cooldowns = []
+    for _ in range(3):
+        breaker.open_until = 0.0  # cool-down elapsed: the next request is a probe
+        breaker.record(429)
+        cooldowns.append(breaker.open_until - time.monotonic())
+    assert [round(c) for c in cooldowns] == [10, 20, 25]
+    assert breaker.total_trips == 3
+
+
+def test_success_closes_and_resets(monkeypatch):
+    breaker, lane = _breaker(monkeypatch, threshold=1)
+    breaker.record(503)
+    breaker.open_until = 0.0
+    breaker.record(200)
+    assert breaker.failures == 0 and breaker.trips == 0
+    breaker.record(429)
+    assert round(breaker.open_until - time.monotonic()) == 10
+
+
+def test_in_flight_blocks_do_not_extend_open_breaker(monkeypatch):
+    breaker, lane = _breaker(monkeypatch, threshold=1)
+    breaker.record(429)
+    until = breaker.open_until
+    breaker.record(429)
+    breaker.record(None)
+    assert breaker.open_until == until and breaker.trips == 1
+
+
+@pytest.mark.asyncio
+async def test_half_open_lets_one_probe_through(monkeypatch):
+    breaker, lane = _breaker(monkeypatch, threshold=1)
+    breaker.record(429)
+    breaker.open_until = 0.0  # cool-down elapsed: half-open
+    started = []
+
+    async def request(i):
+        async with breaker.admit():
+            started.append(i)
+            await asyncio.sleep(0.01)
+            breaker.record(200)
+
+    tasks = [asyncio.create_task(request(i)) for i in range(3)]
+    await asyncio.sleep(0)
+    assert started == [0]
+    await asyncio.gather(*tasks)
+    assert started == [0, 1, 2]
+    assert breaker.trips == 0
+
+
+@pytest.mark.asyncio
+async def test_blocked_probe_reopens_and_holds_the_others(monkeypatch):
+    breaker, lane = _breaker(monkeypatch, threshold=1, base_cooldown=0.05, max_cooldown=0.05)
+    breaker.record(429)
+    breaker.open_until = 0.0
+    started = []
+
+    async def request(i, status):
+        async with breaker.admit():
+            started.append((i, breaker.trips))
+            breaker.record(status)
+
+    probe = asyncio.create_task(request(0, 429))
+    waiter = asyncio.create_task(request(1, 200))
+    await probe
+    assert breaker.is_open and started == [(0, 1)]
+    await waiter
+    # The waiter only went out as the next probe, after the re-opened cool-down
+    assert started == [(0, 1), (1, 2)]
+    assert breaker.trips == 0
+
+
+@pytest.mark.asyncio
+async def test_probe_without_verdict_hands_over_to_next_request(monkeypatch):
+    breaker, lane = _breaker(monkeypatch, threshold=1)
+    breaker.record(429)
+    breaker.open_until = 0.0
+    started = []
+
+    async def failing_probe():
+        async with breaker.admit():
+            started.append("probe")
+            raise RuntimeError("connection reset")
+
+    async def request():
+        async with breaker.admit():
+            started.append("next")
+            breaker.record(200)
+
+    probe = asyncio.create_task(failing_probe())
+    waiter = asyncio.create_task(request())
+    with pytest.raises(RuntimeError):
+        await probe
+    await waiter
+    assert started == ["probe", "next"] and breaker.trips == 0
@@ -0,0 +1,42 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.src.commands.enrich_untappd import UntappdEnricher
+
+BREWERY = "https://untappd.com/w/test-brewing/12345"
+
+
+@pytest.mark.asyncio
+async def test_bulk_refresh_groups_by_brewery_and_falls_back_to_detail():
+    with patch('backend.src.commands.enrich_untappd.get_supabase_client', return_value=MagicMock()):
+        enricher = UntappdEnricher(mode='refresh')
+
+    beers = [
+        {'url': 'https://shop/1', 'untappd_url': 'https://untappd.com/b/a/1', 'untappd_brewery_url': BREWERY + '/beer', 'untappd_beer_name': 'A'},
+        {'url': 'https://shop/2', 'untappd_url': 'https://untappd.com/b/b/2', 'untappd_brewery_url': BREWERY, 'untappd_beer_name': 'B'},
+        # Same beer sold by another shop: refreshed once
+        {'url': 'https://shop/3', 'untappd_url': 'https://untappd.com/b/a/1', 'untappd_brewery_url': BREWERY, 'untappd_beer_name': 'A'},
+        # Never fully scraped: needs the detail page
+        {'url': 'https://shop/4', 'untappd_url': 'https://untappd.com/b/c/3', 'untappd_brewery_url': BREWERY, 'untappd_beer_name': None},
+        # Only stale beer of its brewery: one detail page is cheaper than paging the list
+        {'url': 'https://shop/5', 'untappd_url': 'https://untappd.com/b/d/4', 'untappd_brewery_url': 'https://untappd.com/w/other/1', 'untappd_beer_name': 'D'},
+    ]
+    scan = AsyncMock(return_value={'https://untappd.com/b/a/1': {'url': 'https://untappd.com/b/a/1', 'beer_name': 'A', 'rating': '3.91', 'rating_count': '1,234', 'abv': '6%'}})
+    detail = AsyncMock(return_value={'untappd_payload': {'untappd_url': 'x'}})
+    with patch('backend.src.commands.enrich_untappd.scan_brewery_beer_list', scan), \
+            patch.object(enricher, '_process_beer_refresh', detail):
+        results = await enricher._process_refresh_bulk(beers)
+
+    scan.assert_awaited_once()
+    assert scan.await_args.args[0] == BREWERY
+    assert set(scan.await_args.args[1]) == {'https://untappd.com/b/a/1', 'https://untappd.com/b/b/2'}
+    # Fewer list pages than the detail pages they replace
+    assert scan.await_args.kwargs['max_pages'] == 1
+    payload = results[0]['untappd_list_payload']
+    assert payload['untappd_url'] == 'https://untappd.com/b/a/1'
+    assert payload['rating_num'] == 3.91 and payload['rating_count_num'] == 1234.0
+    assert 'image_url' not in payload and 'untappd_brewery_url' not in payload
+    # b/2 was not on the list pages, c/3 has no beer name yet
+    assert [c.args[0]['url'] for c in detail.await_args_list] == ['https://shop/4', 'https://shop/2', 'https://shop/5']
+    assert enricher.processed_this_run == {'https://shop/1', 'https://shop/2', 'https://shop/3', 'https://shop/4', 'https://shop/5'}
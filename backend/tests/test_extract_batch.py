@@ -0,0 +1,152 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.src.core.config import settings
+from backend.src.services.llm import ExtractionRequest
+from backend.src.services.llm.gemini_extractor import GeminiExtractor
+
+
+def _entry(index, title, brewery, beer):
+    return {'index': index, 'title': title, 'brewery_name_en': brewery, 'beer_name_en': beer,
+            'product_type': "beer", 'is_set': False}
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    ex = GeminiExtractor()
+    ex.client = MagicMock()
+    ex.daily_request_count = 0
+    monkeypatch.setattr(settings, "GEMINI_EXTRACT_BATCH_SIZE", 10)
+
+    async def no_cache(product_name, shop):
+        return {'brewery_name_en': "Cached", 'beer_name_en': "Hit", 'product_type': "beer", 'is_set': False} \
+            if product_name == "cached title" else None
+    monkeypatch.setattr(ex, "_resolve_cached", no_cache)
+    return ex
+
+
+@pytest.mark.asyncio
+async def test_batch_checks_each_entry_and_falls_back_per_title(extractor, monkeypatch):
+    prompts, singles = [], []
+
+    def sent(i):
+        return extractor.prompt_builder.clean_product_title(requests[i].product_name, requests[i].shop)
+
+    async def fake_generate(prompt, schema=None):
+        prompts.append(prompt)
+        # Batch positions 0-3 are requests 0, 2, 3 and 4 (the cached title is not sent)
+        return {'items': [
+            _entry(0, f' "{sent(0)}" ', "VERTERE", "Nemophila"),     # quotes / spacing around the echo are fine
+            _entry(1, sent(3), "Lolev Beer", "Lion"),               # echoes another title: shifted numbering
+            _entry(2, sent(3), "Lolev Beer", "Lion"),
+            _entry(2, sent(3), "Lolev Beer", "Lion Again"),         # repeated index: neither answer is trusted
+            _entry(7, sent(4), "Out Of", "Range"),
+            {'index': 3, 'title': sent(4), 'product_type': "beer"},  # no names
+        ]}
+
+    async def fake_single(product_name, known_brewery, shop):
+        singles.append(product_name)
+        return {'brewery_name_en': "Single", 'beer_name_en': product_name, 'product_type': "beer", 'is_set': False}
+
+    monkeypatch.setattr(extractor, "_generate_content", fake_generate)
+    monkeypatch.setattr(extractor, "_extract_single", fake_single)
+    requests = [
+        ExtractionRequest("バテレ : ネモフィラ | VERTERE: Nemophila 350ml", shop="BEER VOLTA"),
+        ExtractionRequest("cached title"),
+        ExtractionRequest("トートピア : スピンフォビア | Totopia: Spinphobia", shop="BEER VOLTA"),
+        ExtractionRequest("Lion 473ml/Lolev Beer", known_brewery="Lolev Beer", shop="Maruho"),
+        ExtractionRequest("West Coast IPA / Green Cheek"),
+    ]
+    results = await extractor.extract_info_batch(requests)
+
+    assert len(prompts) == 1
+    # The BEER VOLTA rules are sent once for its two titles; the cached title is not sent at all
+    assert prompts[0].count('Shop "BEER VOLTA"') == 1 and "cached title" not in prompts[0]
+    assert '"title": "..."' in prompts[0]
+    assert [r['beer_name_en'] for r in results] == [
+        "Nemophila", "Hit", requests[2].product_name, requests[3].product_name, requests[4].product_name,
+    ]
+    assert singles == [requests[2].product_name, requests[3].product_name, requests[4].product_name]
+    assert '"index": 0' in results[0]['raw_response']
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_request_falls_back_to_single_calls(extractor, monkeypatch):
+    async def failing_generate(prompt, schema=None):
+        raise RuntimeError("503 unavailable")
+
+    singles = []
+
+    async def fake_single(product_name, known_brewery, shop):
+        singles.append(product_name)
+        return extractor.prompt_builder.empty_result()
+
+    monkeypatch.setattr(extractor, "_generate_content", failing_generate)
+    monkeypatch.setattr(extractor, "_extract_single", fake_single)
+    results = await extractor.extract_info_batch([ExtractionRequest("A / B"), ExtractionRequest("C / D")])
+    assert singles == ["A / B", "C / D"] and len(results) == 2
+
+
+@pytest.mark.asyncio
+async def test_enricher_batches_only_the_titles_that_need_the_llm(monkeypatch):
+    from backend.src.commands import enrich_extract
+
+    fake_extractor = MagicMock()
+    batches = []
+
+    async def fake_batch(requests):
+        batches.append([r.product_name for r in requests])
+        return [{'brewery_name_en': "Brewery", 'brewery_name_jp': None, 'beer_name_en': r.product_name,
+                 'product_type': "beer", 'is_set': False, 'raw_response': "{}"} for r in requests]
+    fake_extractor.extract_info_batch = fake_batch
+    manager = MagicMock()
+    manager.find_breweries_in_text.return_value = []
+
+    with patch.object(enrich_extract, "get_supabase_client"), \
+            patch.object(enrich_extract, "get_llm_extractor", return_value=fake_extractor), \
+            patch.object(enrich_extract, "record_enrichment_failure"):
+        enricher = enrich_extract.LLMEnricher(brewery_manager=manager, batch_size=2)
+        outcomes = await enricher._process_items_batched([
+            {'url': "u1", 'name': "Beer 1"},
+            {'url': "u2", 'name': "Done", 'brewery_name_en': "B", 'beer_name_en': "Done", 'search_hint': "Done B"},
+            {'url': "u3", 'name': "Beer 3"},
+            {'url': "u4", 'name': "Beer 4"},
+        ])
+
+    assert batches == [["Beer 1", "Beer 3"], ["Beer 4"]]
+    assert [status for status, _ in outcomes] == ['enriched', 'already_exists', 'enriched', 'enriched']
+    assert outcomes[2][1]['url'] == "u3" and outcomes[2][1]['beer_name_en'] == "Beer 3"
+
+
+@pytest.mark.asyncio
+async def test_enricher_runs_titles_concurrently_and_keeps_order(monkeypatch):
+    import asyncio
+    from backend.src.commands import enrich_extract
+
+    fake_extractor = MagicMock()
+    in_flight, peak = 0, 0
+
+    async def fake_extract(product_name, known_brewery=None, shop=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # The cached title answers at once; the others wait like an LLM call
+        await asyncio.sleep(0 if product_name == "cached" else 0.02)
+        in_flight -= 1
+        return {'brewery_name_en': "Brewery", 'brewery_name_jp': None, 'beer_name_en': product_name,
+                'product_type': "beer", 'is_set': False, 'raw_response': "{}"}
+    fake_extractor.extract_info = fake_extract
+    manager = MagicMock()
+    manager.find_breweries_in_text.return_value = []
+
+    with patch.object(enrich_extract, "get_supabase_client"), \
+            patch.object(enrich_extract, "get_llm_extractor", return_value=fake_extractor), \
+            patch.object(enrich_extract, "record_enrichment_failure"):
+        enricher = enrich_extract.LLMEnricher(brewery_manager=manager, batch_size=1, concurrency=3)
+        outcomes = await enricher._process_items([{'url': f"u{i}", 'name': name}
+                                                  for i, name in enumerate(["Beer 0", "cached", "Beer 2", "Beer 3", "Beer 4"])])
+
+    assert peak == 3
+    assert [payload['url'] for _, payload in outcomes] == ["u0", "u1", "u2", "u3", "u4"]
+    assert all(status == 'enriched' for status, _ in outcomes)
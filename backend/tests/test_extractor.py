@@ -30,3 +30,17 @@ async def test_extract_info_mocked(mock_model_class):
     assert result["beer_name_en"] == "Test Beer"
     assert result["product_type"] == "beer"
     assert result["is_set"] is False
+
+
+def test_get_llm_extractor_shares_instances_per_model():
+    from backend.src.services.llm import get_llm_extractor, reset_llm_extractors
+    reset_llm_extractors()
+    try:
+        default = get_llm_extractor()
+        assert get_llm_extractor(provider="gemini") is default
+        other = get_llm_extractor(provider="gemini", model_id="gemini-2.5-flash")
+        assert other is not default
+        assert other.model_id == "gemini-2.5-flash"
+        assert get_llm_extractor(provider="gemini", model_id="gemini-2.5-flash") is other
+    finally:
+        reset_llm_extractors()
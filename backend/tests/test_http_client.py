@@ -0,0 +1,39 @@
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from backend.src.services.untappd import http_client
+from backend.src.services.untappd.circuit_breaker import untappd_breaker
+
+
+class TestImpersonatingFallback(unittest.IsolatedAsyncioTestCase):
+    async def test_beer_details_fall_back_to_primp_when_blocked(self):
+        blocked = MagicMock(status_code=403, text="blocked")
+        client = MagicMock()
+        client.get = AsyncMock(return_value=blocked)
+
+        page = '<div class="name"><h1>Hazy</h1><p class="style">IPA - New England</p></div>' + " " * 1000
+        primp_client = MagicMock()
+        primp_client.get = MagicMock(return_value=MagicMock(status_code=200, text=page))
+        trips = untappd_breaker.total_trips
+
+        with patch.object(http_client, "get_async_client", return_value=client), \
+             patch.object(http_client, "get_impersonating_client", return_value=primp_client), \
+             patch.object(http_client.asyncio, "sleep", new=AsyncMock()):
+            details = await http_client.scrape_beer_details("https://untappd.com/b/foo-hazy/1")
+
+        self.assertEqual(details.get("untappd_beer_name"), "Hazy")
+        primp_client.get.assert_called_once()
+        # Three 403s opened the breaker; the fallback waited out the cool-down and went as the probe,
+        # whose 200 closed the breaker again
+        self.assertEqual(client.get.await_count, 3)
+        self.assertEqual(untappd_breaker.total_trips, trips + 1)
+        self.assertEqual(untappd_breaker.trips, 0)
+        self.assertFalse(untappd_breaker.is_open)
+        # The impersonated fingerprint must not be overridden by our User-Agent
+        self.assertNotIn("User-Agent", primp_client.get.call_args.kwargs["headers"])
+
+    async def test_short_block_page_is_rejected(self):
+        primp_client = MagicMock()
+        primp_client.get = MagicMock(return_value=MagicMock(status_code=200, text="Just a moment..."))
+        with patch.object(http_client, "get_impersonating_client", return_value=primp_client):
+            self.assertIsNone(await http_client.fetch_with_impersonation("https://untappd.com/b/x/1", min_length=500))
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.src.core.lanes import Lane, get_lane
+
+
+@pytest.mark.asyncio
+async def test_lane_limits_concurrency():
+    lane = Lane("test", concurrency=2, min_interval=0.0)
+
+    async def work():
+        async with lane.slot():
+            await asyncio.sleep(0.02)
+
+    await asyncio.gather(*(work() for _ in range(6)))
+    assert lane.calls == 6
+    assert lane.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_lane_spaces_request_starts():
+    lane = Lane("test", concurrency=10, min_interval=0.05)
+    starts = []
+
+    async def work():
+        async with lane.slot():
+            starts.append(time.monotonic())
+
+    await asyncio.gather(*(work() for _ in range(4)))
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert all(g >= 0.04 for g in gaps)
+
+
+@pytest.mark.asyncio
+async def test_independent_lanes_do_not_wait_on_each_other():
+    slow = Lane("slow", concurrency=1, min_interval=0.2)
+    fast = Lane("fast", concurrency=1, min_interval=0.0)
+    await slow.reserve()
+    t0 = time.monotonic()
+    async with fast.slot():
+        pass
+    assert time.monotonic() - t0 < 0.1
+
+
+def test_get_lane_is_process_wide_and_inherits_base_budget():
+    assert get_lane("gemini:test-model") is get_lane("gemini:test-model")
+    assert get_lane("gemini:test-model").concurrency == get_lane("gemini").concurrency
+    assert get_lane("gemini:other-model", min_interval=0.5).min_interval == 0.5
+
+
+def test_tpm_budget_pushes_starts_past_the_window():
+    lane = Lane("tpm", concurrency=1, min_interval=0.0, tokens_per_minute=100)
+    assert lane._tpm_start(0.0, 60) == 0.0
+    assert lane._tpm_start(1.0, 30) == 1.0
+    # 60 + 30 + 30 > 100: waits until the first reservation leaves the window
+    assert lane._tpm_start(2.0, 30) == 60.0
+    # A request larger than the whole budget waits for an empty window, then still runs
+    assert lane._tpm_start(61.0, 500) == 120.0
+    assert lane.tokens == 620
+
+
+@pytest.mark.asyncio
+async def test_correct_tokens_updates_the_reservation_in_place():
+    lane = Lane("tpm-correct", concurrency=1, min_interval=0.0, tokens_per_minute=1000)
+    first = await lane.reserve(tokens=400)
+    second = await lane.reserve(tokens=400)
+    lane.correct_tokens(first, 700)
+    lane.correct_tokens(second, -50)
+    # Corrections stay on their own entries, so the window remains ordered by start time
+    assert list(lane._token_log) == [first, second]
+    assert [n for _, n in lane._token_log] == [700, 0]
+    assert lane.tokens == 700
+    lane.correct_tokens(None, 100)
+    assert lane.tokens == 700
+
+
+@pytest.mark.asyncio
+async def test_reserve_without_tpm_budget_ignores_tokens():
+    lane = Lane("no-tpm", concurrency=1, min_interval=0.0)
+    t0 = time.monotonic()
+    for _ in range(3):
+        await lane.reserve(tokens=10_000)
+    assert time.monotonic() - t0 < 0.1 and lane.tokens == 0
@@ -0,0 +1,164 @@
+import time
+from unittest.mock import MagicMock, AsyncMock, patch
+
+import pytest
+from ddgs.exceptions import DDGSException, RatelimitException
+
+from backend.src.services.untappd.page_cache import (
+    UntappdPageCache, MISSING, KIND_DETAIL, KIND_SEARCH, KIND_DDG, normalize_cache_key,
+)
+
+
+def _cache(tmp_path, **kwargs):
+    params = dict(ttls={KIND_DETAIL: 60, KIND_SEARCH: 60, KIND_DDG: 60}, negative_ttl=30, max_bytes=10 * 1024 * 1024)
+    params.update(kwargs)
+    return UntappdPageCache(str(tmp_path / "pages.sqlite3"), **params)
+
+
+def test_normalize_cache_key():
+    assert normalize_cache_key("https://Untappd.com/w/foo/beer/?sort=created_at_desc&q=IPA#x") == \
+        normalize_cache_key("https://untappd.com/w/foo/beer?q=IPA&sort=created_at_desc")
+
+
+def test_put_get_and_stats(tmp_path):
+    cache = _cache(tmp_path)
+    url = "https://untappd.com/b/foo-bar/1"
+    assert cache.get(url, KIND_DETAIL) is MISSING
+    cache.put(url, KIND_DETAIL, "<html>beer</html>")
+    assert cache.get(url, KIND_DETAIL) == "<html>beer</html>"
+    assert cache.stats[KIND_DETAIL] == {"hits": 1, "negative_hits": 0, "misses": 1, "stores": 1}
+
+
+def test_negative_entries_use_negative_ttl(tmp_path):
+    cache = _cache(tmp_path, negative_ttl=0.05)
+    url = "https://untappd.com/w/foo/beer?q=none"
+    cache.put(url, KIND_SEARCH, "<html></html>", negative=True)
+    assert cache.get(url, KIND_SEARCH) == ""
+    time.sleep(0.1)
+    assert cache.get(url, KIND_SEARCH) is MISSING
+
+
+def test_eviction_is_size_bounded(tmp_path):
+    import os
+    cache = _cache(tmp_path, max_bytes=20 * 1024)
+    for i in range(60):
+        cache.put(f"https://untappd.com/b/beer/{i}", KIND_DETAIL, os.urandom(4096).hex())
+    # Eviction runs every 50 writes and drops the least recently used entries first
+    assert cache.get("https://untappd.com/b/beer/0", KIND_DETAIL) is MISSING
+    assert cache.get("https://untappd.com/b/beer/59", KIND_DETAIL) is not MISSING
+
+
+@pytest.mark.asyncio
+async def test_brewery_search_served_from_cache(tmp_path):
+    from backend.src.services.untappd import http_client
+
+    html = """
+    <div class="beer-item"><p class="name"><a href="/b/foo-hazy/1">Hazy</a></p>
+    <p class="brewery"><a href="/w/foo/1">Foo Brewing</a></p><p class="style">IPA</p></div>
+    """
+    resp = MagicMock(status_code=200, text=html)
+    client = MagicMock()
+    client.get = AsyncMock(return_value=resp)
+
+    with patch.object(http_client, "page_cache", _cache(tmp_path)), \
+         patch.object(http_client, "get_async_client", return_value=client):
+        first = await http_client.search_brewery_beer_candidates("https://untappd.com/w/foo/1", "Hazy")
+        second = await http_client.search_brewery_beer_candidates("https://untappd.com/w/foo/1/", "Hazy")
+
+    assert first == second and first[0]['url'] == "https://untappd.com/b/foo-hazy/1"
+    assert client.get.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_ddg_results_and_misses_are_cached(tmp_path):
+    from backend.src.services.untappd import http_client
+
+    ddgs = MagicMock()
+    ddgs.__enter__ = MagicMock(return_value=ddgs)
+    ddgs.__exit__ = MagicMock(return_value=False)
+    def text(q, max_results):
+        if "foo" in q:
+            return [{"href": "https://untappd.com/w/foo/1", "title": "Foo Brewing", "body": ""}]
+        # What ddgs actually does for a search without results
+        raise DDGSException("No results found.")
+
+    ddgs.text.side_effect = text
+
+    with patch.object(http_client, "page_cache", _cache(tmp_path)), patch("ddgs.DDGS", return_value=ddgs):
+        first = await http_client.ddg_text_search("site:untappd.com/w/ foo", max_results=3)
+        again = await http_client.ddg_text_search("site:untappd.com/w/  foo", max_results=3)
+        assert await http_client.ddg_text_search("untappd nothing here") == []
+        assert await http_client.ddg_text_search("untappd nothing here") == []
+
+    assert first == again and first[0]["href"] == "https://untappd.com/w/foo/1"
+    # One web search per distinct query: the hit and the miss were both served from the cache
+    assert ddgs.text.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_ddg_errors_are_not_cached(tmp_path):
+    from backend.src.services.untappd import http_client
+
+    ddgs = MagicMock()
+    ddgs.__enter__ = MagicMock(return_value=ddgs)
+    ddgs.__exit__ = MagicMock(return_value=False)
+    ddgs.text.side_effect = [
+        RuntimeError("202 Ratelimit"),
+        DDGSException(RatelimitException("202 Ratelimit")),
+        [{"href": "https://untappd.com/b/x/1", "title": "X"}],
+    ]
+
+    with patch.object(http_client, "page_cache", _cache(tmp_path)), patch("ddgs.DDGS", return_value=ddgs):
+        with pytest.raises(RuntimeError):
+            await http_client.ddg_text_search("untappd x")
+        with pytest.raises(DDGSException):
+            await http_client.ddg_text_search("untappd x")
+        assert (await http_client.ddg_text_search("untappd x"))[0]["href"] == "https://untappd.com/b/x/1"
+
+
+@pytest.mark.asyncio
+async def test_only_recognised_pages_are_negative_cached(tmp_path):
+    from backend.src.services.untappd import http_client
+
+    block = MagicMock(status_code=200, text="<html><title>Just a moment...</title></html>")
+    empty = MagicMock(status_code=200, text='<div class="name"><h1>Foo Brewing</h1></div>')
+    gone = MagicMock(status_code=404, text="")
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=[block, empty, gone])
+    cache = _cache(tmp_path)
+
+    with patch.object(http_client, "page_cache", cache), \
+         patch.object(http_client, "get_async_client", return_value=client), \
+         patch.object(http_client, "fetch_with_impersonation", AsyncMock(return_value=None)):
+        # A block page is a failed search, not an empty one
+        assert await http_client.search_brewery_beer_items("https://untappd.com/w/foo", "Block") is None
+        assert await http_client.search_brewery_beer_items("https://untappd.com/w/foo", "None") == []
+        assert await http_client.scrape_beer_details("https://untappd.com/b/foo-gone/1") == {}
+
+    # The challenge page is not cached; the empty brewery search and the 404 beer page are negative entries
+    assert cache.get("https://untappd.com/w/foo/beer?q=Block&sort=created_at_desc", KIND_SEARCH) is MISSING
+    assert cache.get("https://untappd.com/w/foo/beer?q=None&sort=created_at_desc", KIND_SEARCH) == ""
+    assert cache.get("https://untappd.com/b/foo-gone/1", KIND_DETAIL) == ""
+
+
+@pytest.mark.asyncio
+async def test_cached_details_keep_their_fetch_time_and_refresh_bypasses_the_cache(tmp_path):
+    from backend.src.services.untappd import http_client
+
+    url = "https://untappd.com/b/foo-hazy/1"
+    cache = _cache(tmp_path)
+    cache.put(url, KIND_DETAIL, '<div class="name"><h1>Hazy</h1></div><div class="details"><span class="num">(3.9)</span></div>')
+    cached_at = cache.get_entry(url, KIND_DETAIL)[1]
+    fresh = MagicMock(status_code=200, text='<div class="name"><h1>Hazy</h1></div><div class="details"><span class="num">(4.1)</span></div>')
+    client = MagicMock()
+    client.get = AsyncMock(return_value=fresh)
+
+    with patch.object(http_client, "page_cache", cache), \
+         patch.object(http_client, "get_async_client", return_value=client):
+        from_cache = await http_client.scrape_beer_details(url)
+        refreshed = await http_client.scrape_beer_details(url, use_cache=False)
+
+    from datetime import datetime
+    assert from_cache['untappd_rating'] == "3.9"
+    assert from_cache['untappd_fetched_at'] == datetime.fromtimestamp(cached_at).isoformat()
+    assert refreshed['untappd_rating'] == "4.1" and client.get.await_count == 1
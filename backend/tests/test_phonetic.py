@@ -0,0 +1,38 @@
+import pytest
+
+from backend.src.services.untappd.phonetic import has_kana, katakana_to_romaji, phonetic_key
+
+
+@pytest.mark.parametrize("kana, romaji", [
+    ("ホップロケット", "hoppuroketto"),
+    ("ムーンジュース", "muunjuusu"),
+    ("シャドウ", "shadou"),
+    ("ファンタジー", "fantajii"),
+    ("ハイウェイ", "haiwei"),
+    ("マッチ", "matchi"),
+    ("うちゅうブルーイング", "uchuuburuuingu"),
+    ("ｻﾝｾｯﾄ・ハイウェイ", "sansetto haiwei"),
+    ("ヘイジーIPA", "heijiiipa"),
+])
+def test_katakana_to_romaji(kana, romaji):
+    assert katakana_to_romaji(kana) == romaji
+
+
+@pytest.mark.parametrize("kana, latin", [
+    ("ホップロケット", "Hop Rocket"),
+    ("ムーンジュース", "Moon Juice"),
+    ("サンセット・ハイウェイ", "Sunset Highway"),
+    ("ヘイジーIPA", "Hazy IPA"),
+    ("ダブルチョコレートスタウト", "Double Chocolate Stout"),
+    ("シャドウボクサー", "Shadow Boxer"),
+    ("インディア ペールエール", "India Pale Ale"),
+])
+def test_kana_and_latin_names_share_a_key(kana, latin):
+    assert phonetic_key(kana) and phonetic_key(kana) == phonetic_key(latin)
+
+
+def test_unusable_keys_are_empty():
+    assert phonetic_key("常陸野ネスト") == ""   # kanji cannot be transliterated
+    assert phonetic_key("ビール") == ""         # too short to nominate anything
+    assert phonetic_key("Hop Rocket") != phonetic_key("Moon Juice")
+    assert has_kana("うちゅう") and has_kana("IPAホップ") and not has_kana("Hop Rocket")
@@ -0,0 +1,120 @@
+from unittest.mock import MagicMock, patch
+
+from backend.src.commands.enrich_untappd import UntappdEnricher
+from backend.src.services.untappd.retrieval_index import UntappdRetrievalIndex, fetch_index_rows, registry_aliases
+
+ROWS = [
+    {'untappd_url': "https://untappd.com/b/uchu-lager/1", 'beer_name': "Uchu Lager", 'brewery_name': "Uchu Brewing",
+     'untappd_brewery_url': "https://untappd.com/UchuBrewing", 'style': "Lager - Helles"},
+    {'untappd_url': "https://untappd.com/b/mars/2", 'beer_name': "Mars", 'brewery_name': "Uchu Brewing",
+     'untappd_brewery_url': "https://untappd.com/UchuBrewing", 'style': "IPA - New England"},
+    {'untappd_url': "https://untappd.com/b/stone-ipa/3", 'beer_name': "Stone IPA", 'brewery_name': "Stone Brewing",
+     'untappd_brewery_url': "https://untappd.com/StoneBrewing", 'style': "IPA - American"},
+    {'untappd_url': "https://untappd.com/b/lager/4", 'beer_name': "Uchu Lager", 'brewery_name': "Other Brewing",
+     'untappd_brewery_url': "https://untappd.com/OtherBrewing", 'style': "Lager"},
+    {'untappd_url': None, 'beer_name': "No URL"},
+]
+BREWERIES = [{'name_en': "Uchu Brewing", 'name_jp': "うちゅうブルーイング", 'aliases': ["UCHU"],
+              'untappd_url': "https://untappd.com/UchuBrewing/"}]
+
+
+def test_search_ranks_by_beer_and_brewery():
+    index = UntappdRetrievalIndex(ROWS, registry_aliases(BREWERIES))
+    assert len(index) == 4
+
+    top = index.search("UCHU-LAGER", "Uchu Brewing", k=3)
+    assert top[0]['url'] == "https://untappd.com/b/uchu-lager/1"
+    assert top[0]['source'] == "untappd_index" and top[0]['score'] > top[1]['score']
+
+    # JP brewery names reach the right brewery through the registry aliases
+    assert index.search("Lager Uchu", "うちゅうブルーイング", k=1)[0]['url'] == "https://untappd.com/b/uchu-lager/1"
+    assert index.search("Lager Uchu", "Other Brewing", k=1)[0]['url'] == "https://untappd.com/b/lager/4"
+
+
+def test_search_without_overlap_returns_nothing():
+    index = UntappdRetrievalIndex(ROWS)
+    assert index.search("ｘｙｚｗ", None) == []
+    assert index.search("", "Uchu Brewing") == []
+    assert UntappdRetrievalIndex([]).search("Mars") == []
+
+
+def test_fetch_index_rows_pages_until_short_page():
+    supabase = MagicMock()
+    query = supabase.table.return_value.select.return_value.order.return_value.limit.return_value
+    query.offset.return_value.execute.side_effect = [MagicMock(data=[ROWS[0]] * 1000), MagicMock(data=[ROWS[1]])]
+    assert len(fetch_index_rows(supabase)) == 1001
+    assert [c.args for c in query.offset.call_args_list] == [(0,), (1000,)]
+
+
+def test_enricher_accepts_index_hits_by_score_beer_match():
+    supabase = MagicMock()
+    query = supabase.table.return_value.select.return_value.order.return_value.limit.return_value
+    query.offset.return_value.execute.return_value = MagicMock(data=ROWS)
+    with patch('backend.src.commands.enrich_untappd.get_supabase_client', return_value=supabase):
+        enricher = UntappdEnricher(mode='refresh')
+
+    assert enricher._search_retrieval_index("Uchu Brewing", ["Uchu Lager"], min_score=90) == "https://untappd.com/b/uchu-lager/1"
+    # Retrieved, but rejected by the validator (brewery mismatch)
+    assert enricher._search_retrieval_index("Stone Brewing", ["Mars"], min_score=1) is None
+    assert query.offset.call_count == 1
+
+
+def test_search_phonetic_needs_a_matching_brewery():
+    rows = ROWS + [
+        {'untappd_url': "https://untappd.com/b/hop-rocket/5", 'beer_name': "Hop Rocket", 'brewery_name': "Uchu Brewing",
+         'untappd_brewery_url': "https://untappd.com/UchuBrewing", 'style': "IPA - American"},
+        {'untappd_url': "https://untappd.com/b/hop-rocket/6", 'beer_name': "Hop Rocket", 'brewery_name': "Stone Brewing",
+         'untappd_brewery_url': "https://untappd.com/StoneBrewing", 'style': "IPA - American"},
+    ]
+    index = UntappdRetrievalIndex(rows, registry_aliases(BREWERIES))
+
+    # Kana beer name + JP brewery name (registry alias), kana brewery name (phonetic), Latin brewery name
+    for brewery in ("うちゅうブルーイング", "ウチュウブルーイング", "Uchu Brewing"):
+        hits = index.search_phonetic("ホップロケット", brewery)
+        assert [c['url'] for c in hits] == ["https://untappd.com/b/hop-rocket/5"]
+        assert hits[0]['source'] == "untappd_phonetic"
+    assert index.search_phonetic("ホップロケット", None) == []
+    assert index.search_phonetic("ホップロケット", "Unknown Brewery") == []
+
+
+def test_enricher_phonetic_lookup_skips_ambiguous_names():
+    supabase = MagicMock()
+    query = supabase.table.return_value.select.return_value.order.return_value.limit.return_value
+    query.offset.return_value.execute.return_value = MagicMock(data=ROWS + [
+        {'untappd_url': "https://untappd.com/b/hop-rocket/5", 'beer_name': "Hop Rocket", 'brewery_name': "Uchu Brewing",
+         'untappd_brewery_url': "https://untappd.com/UchuBrewing"},
+        {'untappd_url': "https://untappd.com/b/hoppy-rocket/7", 'beer_name': "Hoppy Rocket", 'brewery_name': "Uchu Brewing",
+         'untappd_brewery_url': "https://untappd.com/UchuBrewing"},
+        {'untappd_url': "https://untappd.com/b/moon-juice/8", 'beer_name': "Moon Juice", 'brewery_name': "Uchu Brewing",
+         'untappd_brewery_url': "https://untappd.com/UchuBrewing"},
+    ])
+    with patch('backend.src.commands.enrich_untappd.get_supabase_client', return_value=supabase):
+        enricher = UntappdEnricher(mode='refresh')
+
+    assert enricher._search_phonetic_index("Uchu Brewing", ["ムーンジュース"]) == "https://untappd.com/b/moon-juice/8"
+    # "Hop Rocket" and "Hoppy Rocket" share a key: left to the network search
+    assert enricher._search_phonetic_index("Uchu Brewing", ["ホップロケット"]) is None
+    # Latin names are left to the TF-IDF search
+    assert enricher._search_phonetic_index("Uchu Brewing", ["Moon Juice"]) is None
+
+
+def test_enricher_phonetic_hit_is_rescored_against_the_english_name():
+    supabase = MagicMock()
+    query = supabase.table.return_value.select.return_value.order.return_value.limit.return_value
+    query.offset.return_value.execute.return_value = MagicMock(data=ROWS + [
+        {'untappd_url': "https://untappd.com/b/lemon-sour/9", 'beer_name': "Lemon Sour", 'brewery_name': "Uchu Brewing",
+         'untappd_brewery_url': "https://untappd.com/UchuBrewing"},
+        {'untappd_url': "https://untappd.com/b/hop-rocket/5", 'beer_name': "Hop Rocket", 'brewery_name': "Uchu Brewing",
+         'untappd_brewery_url': "https://untappd.com/UchuBrewing"},
+    ])
+    with patch('backend.src.commands.enrich_untappd.get_supabase_client', return_value=supabase):
+        enricher = UntappdEnricher(mode='refresh')
+
+    # メロンサワー and Lemon Sour share the consonant key "mns"
+    assert enricher._search_phonetic_index("Uchu Brewing", ["メロンサワー"]) == "https://untappd.com/b/lemon-sour/9"
+    assert enricher._search_phonetic_index("Uchu Brewing", ["メロンサワー"], ["Melon Sour"], min_score=90) is None
+    # Same base beer, different variant
+    assert enricher._search_phonetic_index("Uchu Brewing", ["ホップロケット"], ["Hop Rocket Nitro"], min_score=1) is None
+    assert enricher._search_phonetic_index(
+        "Uchu Brewing", ["ホップロケット"], ["Hop Rocket", "ホップロケット"], min_score=90,
+    ) == "https://untappd.com/b/hop-rocket/5"
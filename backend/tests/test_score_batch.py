@@ -0,0 +1,41 @@
+import json
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from backend.src.services.untappd import validators
+from backend.src.services.untappd.candidate import Candidate
+
+# Per-pair scores of the pre-batch score_beer_match on bench_score_candidates.py's cases,
+# pinned once so the tests do not import the legacy copy kept for the benchmark
+GOLDEN_PATH = Path(__file__).parent / "data" / "score_batch_golden.json"
+
+
+def test_batch_scores_match_pinned_per_pair_scores():
+    golden = json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+    candidates = [Candidate(beer, brewery, style) for beer, brewery, style in golden["candidates"]]
+    assert len(golden["queries"]) > 100
+    for query in golden["queries"]:
+        beer, brewery = query["beer"], query["brewery"]
+        batch = validators.score_beer_matches(candidates, beer, brewery)
+        assert batch == query["scores"], (beer, brewery)
+        for cand, score in zip(candidates, batch):
+            assert validators.score_beer_match(cand, beer, brewery) == score, (cand, beer, brewery)
+
+
+def test_batch_handles_typos_empty_items_and_brewery_mismatch():
+    cands = [
+        Candidate("Hopwierd IPA", "Stone Brewing"),
+        Candidate("Hopwired IPA", "Modern Times"),
+        None,
+        Candidate("Hopwired", ""),
+    ]
+    assert validators.score_beer_matches(cands, "Hopwired IPA", "Stone Brewing") == [70, 0, 0, 90]
+    assert validators.score_beer_matches(cands, "Hopwired IPA", "Stone Brewing") == [
+        validators.score_beer_match(c, "Hopwired IPA", "Stone Brewing") for c in cands
+    ]
+    assert validators.score_beer_matches(cands, "") == [100, 100, 0, 100]
+
+
+def test_substring_ratio_equals_difflib():
+    for shorter, longer in [("abc", "xxabcxx"), ("hazy", "hazyhazy"), ("ab", "a" * 150 + "ab"), ("abc", "ab" * 150 + "abc")]:
+        assert validators._substring_ratio(shorter, longer) == SequenceMatcher(None, shorter, longer).ratio()
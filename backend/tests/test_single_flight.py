@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from backend.src.services.untappd.single_flight import SingleFlight, single_flight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_one_execution(self):
+        calls = 0
+
+        @single_flight(lambda key: key)
+        async def fetch(key):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"key": key, "items": [1, 2]}
+
+        a, b, c = await asyncio.gather(fetch("x"), fetch("x"), fetch("y"))
+        self.assertEqual(calls, 2)
+        self.assertEqual(a, b)
+        # Each caller gets its own copy
+        a["items"].append(3)
+        self.assertEqual(b["items"], [1, 2])
+
+    async def test_cancelled_waiter_does_not_cancel_shared_work(self):
+        group = SingleFlight("test")
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            await asyncio.sleep(0.02)
+            return 42
+
+        first = asyncio.ensure_future(group.do("k", work))
+        await started.wait()
+        second = asyncio.ensure_future(group.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, 42)
+        self.assertEqual(group.shared, 1)
+
+    async def test_last_cancelled_waiter_cancels_the_work(self):
+        group = SingleFlight("test")
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.ensure_future(group.do("k", work)) for _ in range(2)]
+        await started.wait()
+        waiters[0].cancel()
+        await asyncio.sleep(0)
+        self.assertFalse(cancelled.is_set())
+        waiters[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        self.assertEqual(group._waiters, {})
+
+    async def test_exceptions_propagate_to_all_waiters(self):
+        group = SingleFlight("test")
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise ValueError("blocked")
+
+        results = await asyncio.gather(group.do("k", boom), group.do("k", boom), return_exceptions=True)
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    async def test_scrape_beer_details_coalesced(self):
+        from backend.src.services.untappd import http_client
+
+        html = '<div class="name"><h1>Hazy</h1></div>' + " " * 1000
+
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return MagicMock(status_code=200, text=html)
+
+        client = MagicMock()
+        client.get = AsyncMock(side_effect=slow_get)
+        with patch.object(http_client, "get_async_client", return_value=client):
+            a, b = await asyncio.gather(
+                http_client.scrape_beer_details("https://untappd.com/b/foo-hazy/1"),
+                http_client.scrape_beer_details("https://untappd.com/b/foo-hazy/1/"),
+            )
+        self.assertEqual(client.get.await_count, 1)
+        self.assertEqual(a["untappd_beer_name"], "Hazy")
+        self.assertEqual(b["untappd_beer_name"], "Hazy")
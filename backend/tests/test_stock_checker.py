@@ -0,0 +1,80 @@
+import httpx
+import pytest
+from bs4 import BeautifulSoup
+
+from backend.src.services.shop_registry import (
+    resolve_adapter, STRATEGY_JSON_API, STRATEGY_DETAIL_PAGE, STRATEGY_LISTING_BULK,
+)
+from backend.src.services.stock_checker import check_stock_for_url, check_stock_structured
+
+
+def test_resolve_adapter_registered_shops():
+    assert resolve_adapter("マルホ酒店")['strategy'] == STRATEGY_JSON_API
+    assert resolve_adapter("アローム")['legacy_ssl'] is True
+    assert resolve_adapter("一期一会～る")['strategy'] == STRATEGY_LISTING_BULK
+    assert resolve_adapter("一期一会～る")['charsets'][0] == 'euc-jp'
+
+
+def test_resolve_adapter_by_host_and_url_shape():
+    # Unknown display name but known host
+    assert resolve_adapter("Maruho", "https://maruho.shop/products/foo")['shop'] == "マルホ酒店"
+    # Unknown shop: Shopify-style URL gets the JSON fast path, EC-CUBE style gets the detail page
+    assert resolve_adapter("New Shop", "https://new.example/products/hazy-ipa")['strategy'] == STRATEGY_JSON_API
+    assert resolve_adapter("New Shop", "https://new.example/products/detail.php?product_id=1")['strategy'] == STRATEGY_DETAIL_PAGE
+
+
+def test_check_stock_structured():
+    jsonld = '<script type="application/ld+json">{"offers": {"availability": "https://schema.org/OutOfStock"}}</script>'
+    assert check_stock_structured(BeautifulSoup(jsonld, 'lxml')) == "Sold Out"
+    meta = '<meta property="product:availability" content="instock">'
+    assert check_stock_structured(BeautifulSoup(meta, 'lxml')) == "In Stock"
+    assert check_stock_structured(BeautifulSoup('<p>hello</p>', 'lxml')) is None
+
+
+@pytest.mark.asyncio
+async def test_check_stock_for_url_unknown_shopify_shop_uses_json():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"product": {"variants": [{"available": False, "price": "1540.00"}]}})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await check_stock_for_url(client, "https://new.example/products/hazy-ipa", "New Shop")
+
+    assert seen == ["/products/hazy-ipa.json"]
+    assert result == {"stock_status": "Sold Out", "price": "1,540円"}
+
+
+@pytest.mark.asyncio
+async def test_check_stock_for_url_registered_detail_parser():
+    html = '<html><body><button class="btn-soldout">SOLD OUT</button><div class="product_price">税込 2,200円</div></body></html>'
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=html.encode('euc-jp'))
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await check_stock_for_url(client, "https://151l.shop/?pid=1", "一期一会～る")
+
+    assert result == {"stock_status": "Sold Out", "price": "2200円"}
+
+
+@pytest.mark.asyncio
+async def test_check_stock_for_url_impersonating_shop_uses_primp():
+    from unittest.mock import MagicMock, patch
+    from backend.src.services import stock_checker
+
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"product": {"variants": [{"available": True, "price": "880.00"}]}}
+    primp_client = MagicMock()
+    primp_client.get.return_value = response
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("plain httpx must not be used for this shop")
+
+    with patch.object(stock_checker, "get_impersonating_client", return_value=primp_client):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            result = await check_stock_for_url(client, "https://witchcraftmarket.com/products/hazy", "WITCH CRAFT MARKET")
+
+    primp_client.get.assert_called_once_with("https://witchcraftmarket.com/products/hazy.json")
+    assert result == {"stock_status": "In Stock", "price": "880円"}
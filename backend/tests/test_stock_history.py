@@ -0,0 +1,103 @@
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from backend.src.commands.stock_history import build_stock_change, record_stock_changes
+from backend.src.commands import update_stock
+
+
+def test_build_stock_change_no_change():
+    assert build_stock_change("u", "Shop", "In Stock", "In Stock", 1200, 1200, "scrape") is None
+
+
+def test_build_stock_change_missing_price_is_not_a_change():
+    # A failed price extraction must not be recorded as a price transition
+    assert build_stock_change("u", "Shop", "In Stock", "In Stock", 1200, None, "scrape") is None
+
+
+def test_build_stock_change_restock():
+    row = build_stock_change("u", "Shop", "Sold Out", "In Stock", 1200, 1200, "update-stock", changed_at="t")
+    assert row == {
+        'url': "u",
+        'changed_at': "t",
+        'shop': "Shop",
+        'stock_status': "In Stock",
+        'prev_stock_status': "Sold Out",
+        'price_num': 1200,
+        'prev_price_num': 1200,
+        'source': "update-stock",
+    }
+
+
+def test_build_stock_change_price_drop_and_first_observation():
+    sale = build_stock_change("u", "Shop", "In Stock", "In Stock", 1200, 980, "scrape")
+    assert sale is not None and sale['prev_price_num'] == 1200 and sale['price_num'] == 980
+
+    first = build_stock_change("u", "Shop", None, "In Stock", None, 980, "scrape")
+    assert first is not None and first['prev_stock_status'] is None
+
+
+@pytest.mark.asyncio
+async def test_record_stock_changes_swallows_errors():
+    supabase = MagicMock()
+    with patch('backend.src.commands.stock_history.async_execute', new=AsyncMock(side_effect=Exception("no table"))):
+        written = await record_stock_changes(supabase, [{'url': 'u', 'changed_at': 't'}])
+    assert written == 0
+
+
+@pytest.mark.asyncio
+async def test_process_beer_appends_history_only_on_change():
+    supabase = MagicMock()
+    history = []
+    beer = {'url': 'https://shop/a', 'shop': 'BEER VOLTA', 'stock_status': 'In Stock', 'price': '¥1,200'}
+
+    with patch.object(update_stock, 'check_stock_for_url', new=AsyncMock(return_value={'stock_status': 'In Stock', 'price': '¥1,200'})):
+        changed = await update_stock.process_beer(MagicMock(), beer, supabase, history)
+    assert changed is False
+    assert history == []
+
+    with patch.object(update_stock, 'check_stock_for_url', new=AsyncMock(return_value={'stock_status': 'Sold Out', 'price': '¥1,200'})):
+        changed = await update_stock.process_beer(MagicMock(), beer, supabase, history)
+    assert changed is True
+    assert len(history) == 1
+    assert history[0]['prev_stock_status'] == 'In Stock'
+    assert history[0]['stock_status'] == 'Sold Out'
+    assert history[0]['source'] == 'update-stock'
+
+
+@pytest.mark.asyncio
+async def test_new_only_scrape_records_a_change_once():
+    from datetime import datetime, timezone
+    from backend.src.commands import scrape
+
+    url = 'https://shop/a'
+    existing_data = {url: {'url': url, 'first_seen': 'f', 'stock_status': 'In Stock', 'price_num': 1200, 'untappd_url': None}}
+    history = []
+
+    async def record(supabase, changes):
+        history.extend(changes)
+        return len(changes)
+
+    async def run_once():
+        supabase = MagicMock()
+        item = {'url': url, 'name': 'Hazy', 'price': '¥980', 'stock_status': 'In Stock', 'shop': 'BEER VOLTA'}
+
+        async def scraper():
+            return [item]
+
+        with patch.object(scrape, 'async_execute', new=AsyncMock()), \
+             patch.object(scrape, 'refresh_materialized_view'), \
+             patch.object(scrape, 'record_stock_changes', new=record):
+            await scrape.run_and_save_store(
+                scraper(), 'BEER VOLTA', supabase, existing_data,
+                new_only=True, reset_first_seen=False, base_time=datetime.now(timezone.utc), store_index=0,
+            )
+        # The next hourly run loads what this one stored
+        for args, _ in supabase.table.return_value.upsert.call_args_list:
+            for row in args[0]:
+                existing_data[row['url']] = row
+
+    await run_once()
+    await run_once()
+    assert len(history) == 1
+    assert history[0]['prev_price_num'] == 1200 and history[0]['price_num'] == 980
+    assert existing_data[url]['first_seen'] == 'f'
@@ -0,0 +1,45 @@
+import httpx
+import pytest
+
+from backend.src.commands.sweep_dead_links import probe_url
+
+
+def _client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_probe_url_uses_head():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.method)
+        return httpx.Response(404)
+
+    async with _client(handler) as client:
+        assert await probe_url(client, "https://shop.example/products/gone") == 404
+    assert seen == ["HEAD"]
+
+
+@pytest.mark.asyncio
+async def test_probe_url_falls_back_to_range_get():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, request.headers.get("Range")))
+        if request.method == "HEAD":
+            return httpx.Response(405)
+        return httpx.Response(206, content=b"<")
+
+    async with _client(handler) as client:
+        assert await probe_url(client, "https://shop.example/products/alive") == 206
+    assert seen == [("HEAD", None), ("GET", "bytes=0-0")]
+
+
+@pytest.mark.asyncio
+async def test_probe_url_network_error_is_unknown():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("boom")
+
+    async with _client(handler) as client:
+        assert await probe_url(client, "https://shop.example/products/x") == 0
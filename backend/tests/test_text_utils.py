@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+from backend.src.services.untappd import text_utils
+
+# Outputs of the pre-optimisation text_utils over the benchmark corpus (scripts/benchmarks/titles.txt),
+# pinned once so the tests do not import the legacy copy kept for bench_text_utils.py
+GOLDEN_PATH = Path(__file__).parent / "data" / "text_utils_golden.json"
+
+
+def _normalize_for_comparison(expand):
+    return lambda text: text_utils.normalize_for_comparison(text, expand)
+
+
+def test_optimized_text_utils_match_pinned_outputs_on_corpus():
+    golden = json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+    corpus = golden["corpus"]
+    assert len(corpus) > 50
+    for name, expected in golden["outputs"].items():
+        if name == "normalize_for_comparison_expanded":
+            fn = _normalize_for_comparison(True)
+        elif name == "normalize_for_comparison":
+            fn = _normalize_for_comparison(False)
+        else:
+            fn = getattr(text_utils, name)
+        for text, want in zip(corpus, expected):
+            got = fn(text)
+            if isinstance(got, frozenset):
+                got = sorted(got)
+            assert got == want, (name, text)
+    for text, mismatches in zip(corpus, golden["variant_mismatches"]):
+        got = [j for j, other in enumerate(corpus) if text_utils.has_variant_mismatch(text, other)]
+        assert got == mismatches, text
+
+
+def test_memoized_results_are_not_shared_mutable_state():
+    mods = text_utils.extract_variant_modifiers("Bourbon Barrel Aged Imperial Stout")
+    assert isinstance(mods, frozenset)
+    assert text_utils.extract_variant_modifiers("Bourbon Barrel Aged Imperial Stout") is mods
+    # Cache is keyed on both arguments
+    assert text_utils.normalize_for_comparison("DDH IPA", True) != text_utils.normalize_for_comparison("DDH IPA", False)
@@ -0,0 +1,163 @@
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from backend.src.core.config import settings
+from backend.src.services.untappd import api_client, http_client
+from backend.src.services.untappd.validators import score_beer_match
+
+BREWERY = {'brewery_id': 12345, 'brewery_name': "Test Brewing", 'brewery_slug': "test-brewing"}
+OTHER_BREWERY = {'brewery_id': 999, 'brewery_name': "Other Brewing", 'brewery_slug': "other-brewing"}
+
+
+def _beer(bid, name, style="IPA - New England", abv=6.5, rating=3.91234):
+    return {'bid': bid, 'beer_name': name, 'beer_slug': f"test-brewing-{bid}", 'beer_style': style,
+            'beer_abv': abv, 'beer_ibu': 0, 'rating_score': rating, 'rating_count': 1234}
+
+
+ROUTES = {
+    "/v4/beer/info/1": {'beer': dict(_beer(1, "Hazy"), brewery=BREWERY, beer_label="https://img/hazy.png")},
+    "/v4/brewery/info/12345": {'brewery': dict(
+        BREWERY, brewery_type="Micro Brewery", country_name="Japan", brewery_label="https://img/logo.png",
+        location={'brewery_city': "Tokyo"}, contact={'url': "https://test.example"},
+        stats={'beer_count': 40, 'total_count': 5000},
+    )},
+    "/v4/brewery/beer_list/12345": {'brewery': BREWERY, 'beers': {'items': [
+        {'beer': _beer(2, "Hop Rocket")}, {'beer': _beer(1, "Hazy")},
+    ]}},
+    "/v4/search/beer": {'beers': {'items': [
+        {'beer': _beer(2, "Hop Rocket"), 'brewery': BREWERY},
+        {'beer': _beer(3, "Hop Rocket Double"), 'brewery': BREWERY},
+        {'beer': _beer(4, "Hop Rocket"), 'brewery': OTHER_BREWERY},
+    ]}},
+    "/v4/search/brewery": {'brewery': {'items': [{'brewery': OTHER_BREWERY}, {'brewery': BREWERY}]}},
+}
+
+
+class _StubApi(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        params = urllib.parse.parse_qs(parsed.query)
+        type(self).requests.append((parsed.path, params))
+        response = ROUTES.get(parsed.path)
+        authed = params.get('client_id') == ["cid"] and params.get('client_secret') == ["secret"]
+        status = 200 if response is not None and authed else (401 if not authed else 404)
+        body = json.dumps({'meta': {'code': status}, 'response': response or {}}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("X-Ratelimit-Remaining", "99")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api(monkeypatch):
+    server = HTTPServer(("127.0.0.1", 0), _StubApi)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _StubApi.requests = []
+    monkeypatch.setattr(settings, "UNTAPPD_BACKEND", "api")
+    monkeypatch.setattr(settings, "UNTAPPD_API_BASE_URL", f"http://127.0.0.1:{server.server_port}/v4")
+    monkeypatch.setattr(settings, "UNTAPPD_API_CLIENT_ID", "cid")
+    monkeypatch.setattr(settings, "UNTAPPD_API_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(api_client, "_api_client", None)
+    yield _StubApi
+    server.shutdown()
+    server.server_close()
+
+
+def _no_html(monkeypatch):
+    async def fail(*args, **kwargs):
+        raise AssertionError("HTML backend must not be used")
+    monkeypatch.setattr(http_client, "untappd_get", fail)
+
+
+def test_api_disabled_without_credentials(monkeypatch):
+    monkeypatch.setattr(settings, "UNTAPPD_BACKEND", "api")
+    monkeypatch.setattr(settings, "UNTAPPD_API_CLIENT_ID", "")
+    assert api_client.api_enabled() is False
+    assert api_client.beer_id_from_url("https://untappd.com/b/test-brewing-hazy/1") == "1"
+    assert api_client.brewery_id_from_url("https://untappd.com/TestBrewing") is None
+
+
+@pytest.mark.asyncio
+async def test_beer_and_brewery_details_use_api(stub_api, monkeypatch):
+    _no_html(monkeypatch)
+    beer = await http_client.scrape_beer_details("https://untappd.com/b/test-brewing-hazy/1")
+    assert beer['untappd_beer_name'] == "Hazy"
+    assert beer['untappd_brewery_url'] == "https://untappd.com/w/test-brewing/12345"
+    assert (beer['untappd_abv'], beer['untappd_ibu'], beer['untappd_rating']) == ("6.5%", "N/A", "3.91")
+    assert beer['untappd_label'] == "https://img/hazy.png"
+
+    brewery = await http_client.scrape_brewery_details("https://untappd.com/w/test-brewing/12345")
+    assert brewery['brewery_name'] == "Test Brewing"
+    assert brewery['location'] == "Tokyo Japan"
+    assert brewery['stats'] == {'total_beers': "40", 'rating_count': "5000"}
+    await api_client.close_api_client()
+
+
+@pytest.mark.asyncio
+async def test_beer_list_and_search_use_api(stub_api, monkeypatch):
+    _no_html(monkeypatch)
+    page = await http_client.fetch_brewery_beer_list("https://untappd.com/w/test-brewing/12345/beer", offset=25)
+    assert [b['beer_name'] for b in page] == ["Hop Rocket", "Hazy"]
+    assert stub_api.requests[-1][1]['offset'] == ["25"]
+
+    cands = await http_client.search_brewery_beer_candidates(
+        "https://untappd.com/w/test-brewing/12345", "Hop Rocket",
+        validate_beer="Hop Rocket", score_beer_fn=score_beer_match, validate_brewery="Test Brewing",
+    )
+    # Other breweries' beers are filtered out; scoring is the same as for HTML results
+    assert [c['url'] for c in cands][0] == "https://untappd.com/b/test-brewing-2/2"
+    assert cands[0]['score'] == 100.0
+    assert "https://untappd.com/b/test-brewing-4/4" not in [c['url'] for c in cands]
+
+    assert await http_client._resolve_brewery("Test Brewing") == (
+        "https://untappd.com/w/test-brewing/12345", "untappd_exact",
+    )
+    await api_client.close_api_client()
+
+
+@pytest.mark.asyncio
+async def test_api_failure_falls_back_to_html(stub_api, monkeypatch):
+    monkeypatch.setattr(settings, "UNTAPPD_API_CLIENT_SECRET", "wrong")
+    html_calls = []
+
+    async def fake_html(url, headers=None):
+        html_calls.append(url)
+        raise RuntimeError("offline")
+    monkeypatch.setattr(http_client, "untappd_get", fake_html)
+
+    async def no_impersonation(*args, **kwargs):
+        return None
+    monkeypatch.setattr(http_client, "fetch_with_impersonation", no_impersonation)
+    monkeypatch.setattr(http_client.asyncio, "sleep", lambda *_: no_impersonation())
+
+    assert await http_client.fetch_brewery_beer_list("https://untappd.com/w/test-brewing/12345") is None
+    assert html_calls and stub_api.requests[0][0] == "/v4/brewery/beer_list/12345"
+    await api_client.close_api_client()
+
+
+@pytest.mark.asyncio
+async def test_brewery_search_outside_global_results_falls_back_to_html(stub_api, monkeypatch):
+    html_calls = []
+    page = '<div class="name"><h1>Nowhere Brewing</h1></div>' + " " * 600
+
+    async def fake_html(url, headers=None):
+        html_calls.append(url)
+        return type("Resp", (), {"status_code": 200, "text": page})()
+    monkeypatch.setattr(http_client, "untappd_get", fake_html)
+
+    # The global search only returns beers of other breweries: not a miss for this brewery
+    assert await api_client.search_brewery_beers("https://untappd.com/w/nowhere/777", "Hop Rocket") is None
+    assert await http_client.search_brewery_beer_items("https://untappd.com/w/nowhere/777", "Hop Rocket") == []
+    assert html_calls == ["https://untappd.com/w/nowhere/777/beer?q=Hop%20Rocket&sort=created_at_desc"]
+    await api_client.close_api_client()
@@ -3,6 +3,7 @@ Tests for Untappd beer/brewery name validation logic.
 Covers: validate_beer_match, validate_brewery_match, strip_beer_suffix,
         score_beer_match, has_variant_mismatch
 """
+import asyncio
 import unittest
 from unittest.mock import MagicMock, patch
 from bs4 import BeautifulSoup
@@ -261,7 +262,7 @@ class TestAbbreviationExpansion(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(a, b)
 
 @patch('backend.src.services.llm.gemini_extractor.GeminiExtractor.select_best_untappd_candidate')
-@patch('backend.src.services.untappd.searcher.search_brewery_beer_candidates')
+@patch('backend.src.services.untappd.searcher.search_brewery_beer_items')
 @patch('backend.src.services.untappd.searcher.search_brewery')
 class TestGetUntappdUrl(unittest.IsolatedAsyncioTestCase):
 
@@ -386,6 +387,170 @@ class TestSearchBreweryBeerScoring(unittest.IsolatedAsyncioTestCase):
         self.assertIsNone(result)
 
 
+class TestStage2FanOut(unittest.IsolatedAsyncioTestCase):
+    """In-brewery searches keep the sequential limits, run concurrently and stop at the first high-confidence candidate."""
+
+    async def test_high_confidence_hit_cancels_pending_searches(self):
+        from backend.src.services.untappd import searcher
+
+        started, cancelled = [], []
+
+        async def fake_search(brewery_url, query, **kwargs):
+            started.append(query)
+            if query == "Rocket":
+                await asyncio.sleep(0.01)
+                return [{'url': "https://untappd.com/b/hop-rocket-2/1", 'beer_name': "Hop Rocket 2", 'score': 100.0}]
+            if query in ("Hop Rocket 2", "ホップロケット 2"):
+                return []
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(query)
+                raise
+            return []
+
+        with patch.object(searcher, "search_brewery_beer_items", side_effect=fake_search), \
+                patch.object(searcher, "rank_brewery_candidates", side_effect=lambda items, query, **kwargs: items), \
+                patch.object(searcher, "_fallback_tokens", return_value=["2", "Rocket", "Hop"]), \
+                patch.object(searcher.settings, "UNTAPPD_SEARCH_FANOUT", 3):
+            result = await asyncio.wait_for(searcher._get_untappd_url_single(
+                "Test Brewing", "Hop Rocket 2", beer_name_jp="ホップロケット 2",
+                brewery_url="https://untappd.com/TestBrewing", return_candidates=True,
+            ), timeout=1)
+
+        self.assertEqual(result['url'], "https://untappd.com/b/hop-rocket-2/1")
+        self.assertEqual(started[:2], ["Hop Rocket 2", "ホップロケット 2"])
+        # Every token search still running when the hit came in was cancelled
+        self.assertEqual(sorted(cancelled), ["2", "Hop"])
+
+    async def test_fallback_searches_only_start_below_the_limits(self):
+        from backend.src.services.untappd import searcher
+
+        started = []
+
+        async def fake_search(brewery_url, query, **kwargs):
+            started.append(query)
+            return [{'url': f"https://untappd.com/b/x/{query}-{n}", 'beer_name': f"X {n}", 'score': 50.0} for n in range(5)]
+
+        with patch.object(searcher, "search_brewery_beer_items", side_effect=fake_search), \
+                patch.object(searcher, "rank_brewery_candidates", side_effect=lambda items, query, **kwargs: items), \
+                patch.object(searcher, "ddg_text_search", return_value=[]):
+            await searcher._get_untappd_url_single(
+                "Test Brewing", "Moon Juice", beer_name_jp="ムーンジュース",
+                brewery_url="https://untappd.com/TestBrewing", return_candidates=True, skip_llm=True,
+            )
+        # The main search already returned 5 candidates: no JP or token search is sent
+        self.assertEqual(started, ["Moon Juice"])
+
+    async def test_token_searches_stop_at_ten_candidates(self):
+        from backend.src.services.untappd import searcher
+
+        started = []
+
+        async def fake_search(brewery_url, query, **kwargs):
+            started.append(query)
+            await asyncio.sleep(0.01)
+            return [{'url': f"https://untappd.com/b/x/{query}-{n}", 'beer_name': f"X {n}", 'score': 50.0} for n in range(4)]
+
+        with patch.object(searcher, "search_brewery_beer_items", side_effect=fake_search), \
+                patch.object(searcher, "rank_brewery_candidates", side_effect=lambda items, query, **kwargs: items), \
+                patch.object(searcher, "_fallback_tokens", return_value=["t1", "t2", "t3", "t4", "t5", "t6"]), \
+                patch.object(searcher.settings, "UNTAPPD_SEARCH_FANOUT", 2), \
+                patch.object(searcher, "ddg_text_search", return_value=[]):
+            result = await searcher._get_untappd_url_single(
+                "Test Brewing", "Moon Juice",
+                brewery_url="https://untappd.com/TestBrewing", return_candidates=True, skip_llm=True,
+            )
+        # 4 (main) + 4 (t1) + 4 (t2) >= 10: no further token search is sent
+        self.assertEqual(started, ["Moon Juice", "t1", "t2"])
+        self.assertEqual(len(result['candidates']), 12)
+
+    async def test_results_merge_in_sequential_order(self):
+        from backend.src.services.untappd import searcher
+
+        def cand(n):
+            return {'url': f"https://untappd.com/b/x/{n}", 'beer_name': f"X {n}", 'score': 50.0}
+
+        async def fake_search(brewery_url, query, **kwargs):
+            # Later lookups finish first; the merged order must not depend on timing
+            await asyncio.sleep({"Moon Juice": 0.03, "ムーンジュース": 0.02}.get(query, 0.0))
+            return {"Moon Juice": [cand(1)], "ムーンジュース": [cand(2)]}.get(query, [cand(3)])
+
+        with patch.object(searcher, "search_brewery_beer_items", side_effect=fake_search), \
+                patch.object(searcher, "rank_brewery_candidates", side_effect=lambda items, query, **kwargs: items):
+            result = await searcher._get_untappd_url_single(
+                "Test Brewing", "Moon Juice", beer_name_jp="ムーンジュース",
+                brewery_url="https://untappd.com/TestBrewing", return_candidates=True,
+            )
+        self.assertEqual([c['url'] for c in result['candidates']][:3], [cand(1)['url'], cand(2)['url'], cand(3)['url']])
+
+
+
+class TestYearFallbackReuse(unittest.IsolatedAsyncioTestCase):
+    """The year-fallback pass reuses brewery resolution and every search whose query did not change."""
+
+    async def test_second_pass_only_runs_changed_queries(self):
+        from backend.src.services.untappd import searcher
+
+        searched = []
+
+        async def fake_items(brewery_url, query):
+            searched.append((brewery_url, query))
+            return []
+
+        async def no_ddg(query, max_results=10):
+            return []
+
+        manager = MagicMock()
+        manager.find_breweries_in_text.return_value = []
+        with patch.object(searcher, "search_brewery_beer_items", side_effect=fake_items), \
+                patch.object(searcher, "search_brewery", return_value="https://untappd.com/TestBrewing") as brewery_search, \
+                patch.object(searcher, "ddg_text_search", side_effect=no_ddg):
+            result = await searcher.get_untappd_url(
+                "Test Brewing", "Moon Juice 2024", beer_name_jp="ムーンジュース",
+                skip_llm=True, brewery_manager=manager,
+            )
+
+        self.assertFalse(result['success'])
+        brewery_search.assert_called_once()
+        queries = [q for _, q in searched]
+        self.assertIn("Moon Juice 2024", queries)
+        self.assertIn("Moon Juice", queries)
+        self.assertEqual(queries.count("ムーンジュース"), 1)
+        self.assertEqual(len(searched), len(set(searched)))
+
+    async def test_failed_search_is_retried_on_second_pass(self):
+        from backend.src.services.untappd import searcher
+
+        searched = []
+
+        async def fake_items(brewery_url, query):
+            searched.append(query)
+            # The JP search hits a block page on the first pass only
+            if query == "ムーンジュース" and searched.count(query) == 1:
+                return None
+            return []
+
+        async def no_ddg(query, max_results=10):
+            return []
+
+        manager = MagicMock()
+        manager.find_breweries_in_text.return_value = []
+        with patch.object(searcher, "search_brewery_beer_items", side_effect=fake_items), \
+                patch.object(searcher, "search_brewery", return_value="https://untappd.com/TestBrewing"), \
+                patch.object(searcher, "ddg_text_search", side_effect=no_ddg):
+            result = await searcher.get_untappd_url(
+                "Test Brewing", "Moon Juice 2024", beer_name_jp="ムーンジュース",
+                skip_llm=True, brewery_manager=manager,
+            )
+
+        self.assertFalse(result['success'])
+        self.assertEqual(searched.count("ムーンジュース"), 2)
+        # Completed searches are still reused
+        others = [q for q in searched if q != "ムーンジュース"]
+        self.assertEqual(len(others), len(set(others)))
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,25 @@
+-- Migration 015: Append-only stock / price change log
+-- Rows are written only when stock_status or price_num actually changes
+-- (see backend/src/commands/stock_history.py), so restock / sale / sold-out
+-- analytics can aggregate this table instead of diffing scraped_beers snapshots.
+
+CREATE TABLE IF NOT EXISTS stock_history (
+  url TEXT NOT NULL, -- References scraped_beers.url
+  changed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  shop TEXT,
+  stock_status TEXT,
+  prev_stock_status TEXT, -- NULL for the first observation of a product
+  price_num NUMERIC,
+  prev_price_num NUMERIC,
+  source TEXT, -- 'scrape' | 'update-stock' | 'sweep-dead-links'
+  PRIMARY KEY (url, changed_at)
+);
+
+CREATE INDEX IF NOT EXISTS idx_stock_history_changed_at ON stock_history(changed_at DESC);
+CREATE INDEX IF NOT EXISTS idx_stock_history_shop_changed_at ON stock_history(shop, changed_at DESC);
+
+-- Enable RLS
+ALTER TABLE stock_history ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Public Read Stock History" ON stock_history FOR SELECT TO anon USING (true);
+CREATE POLICY "Auth Write Stock History" ON stock_history FOR ALL TO authenticated USING (true) WITH CHECK (true);